@@ -1,14 +1,17 @@
 # MOAI.py
 import logging
+import os
 import uuid
 import datetime
 import random
 import json # Certifique-se que está importado
+import threading
 import time
-from typing import Dict, Any, List, Optional, Union, cast # Adicionado 'cast'
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Union, Iterator, Callable, cast # Adicionado 'cast'
 
 # Importa os modelos do novo arquivo data_models.py
-from data_models import Proposal, Project, GeneratedCode, QualityReport, SecurityReport, Documentation, MonitoringSummary, ChatMessage, MOAILog, TestWorkspace
+from data_models import Proposal, Project, GeneratedCode, GeneratedCodeInfo, QualityReport, SecurityReport, Documentation, DocumentationInfo, MonitoringSummary, ChatMessage, MOAILog, MOAILogRollup, InfraSnapshot, TestWorkspace, ProjectReportStatus, SearchResult, new_id, short_id
 
 # Importa DatabaseManager
 from database_manager import DatabaseManager
@@ -31,6 +34,10 @@ from agent_ado import AgentADO, DocumentationOutput
 from agent_ams import AgentAMS, MonitoringSummaryOutput
 from agent_aid import AgentAID, InfraStatusOutput
 from test_workspace_manager import TestWorkspaceManager
+from portfolio_analytics import PortfolioAnalytics
+from db_maintenance import DatabaseMaintenance
+from single_flight import SingleFlight, coalesced, flight_key
+from speculation import ProposalSpeculator
 
 
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -39,6 +46,8 @@ logger = logging.getLogger(__name__)
 
 class SynapseForgeBackend:
     _instance = None # Singleton pattern
+    # Briefing do código inicial gerado pelo ADE-X na orquestração pós-aprovação
+    INITIAL_CODE_TASK = "Configuração inicial do projeto (setup de ambiente, estrutura de diretórios e ponto de entrada)."
 
     def __new__(cls, *args, **kwargs):
         if not cls._instance:
@@ -50,6 +59,28 @@ class SynapseForgeBackend:
             self.db_manager = DatabaseManager('synapse_forge.db')
             self.llm_simulator = LLMSimulator(eager_init=False) # Inicializa o LLM Simulator
             self.test_workspace_manager = TestWorkspaceManager()
+            self.analytics = PortfolioAnalytics(self.db_manager)
+            self.maintenance = DatabaseMaintenance(self.db_manager, on_results=self._log_maintenance_results)
+            # Idade máxima dos snapshots de infraestrutura antes de uma atualização em segundo plano
+            self.infra_snapshot_max_age = datetime.timedelta(minutes=int(os.getenv("SFORGE_INFRA_SNAPSHOT_MINUTES", "15")))
+            # Chamadas idênticas em curso (mesma operação, projeto e parâmetros) compartilham uma execução
+            self.single_flight = SingleFlight()
+            # Geração assíncrona de relatórios pelo LLM: um job por (tipo, projeto) de cada vez
+            self.report_executor = ThreadPoolExecutor(max_workers=int(os.getenv("SFORGE_REPORT_WORKERS", "2")), thread_name_prefix="sforge-reports")
+            # Falhas por (tipo, projeto): gravadas pelas threads do report_executor, lidas em request_report
+            self._report_failures: Dict[Tuple[str, Optional[str]], str] = {}
+            self._report_failures_lock = threading.Lock()
+            self.monitoring_max_age = datetime.timedelta(minutes=int(os.getenv("SFORGE_MONITORING_MAX_AGE_MINUTES", "60")))
+            # Orquestrações pós-aprovação em lote: teto global de jobs paralelos e limite por modelo do LLM
+            self.orchestration_executor = ThreadPoolExecutor(max_workers=int(os.getenv("SFORGE_ORCHESTRATION_WORKERS", "4")), thread_name_prefix="sforge-orchestration")
+            self.orchestration_model_limit = int(os.getenv("SFORGE_ORCHESTRATION_PER_MODEL", "2"))
+            self.orchestration_model_limits = self._parse_model_limits(os.getenv("SFORGE_ORCHESTRATION_MODEL_LIMITS", ""))
+            self._model_slots: Dict[str, threading.BoundedSemaphore] = {}
+            self._model_slots_lock = threading.Lock()
+            self._bulk_approvals: Dict[str, Dict[str, Any]] = {}
+            self._bulk_approvals_lock = threading.Lock()
+            # Executor para tarefas de manutenção fora do caminho da requisição (ex.: limpeza de workspaces em disco)
+            self.background_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="sforge-bg")
 
             # Inicializa os Agentes
             # Agentes base que não dependem de outros para inicialização
@@ -61,17 +92,35 @@ class SynapseForgeBackend:
             self.ase_agent = AgentASE(self.llm_simulator)
             self.ado_agent = AgentADO(self.llm_simulator)
             self.ams_agent = AgentAMS(self.llm_simulator)
-            self.aid_agent = AgentAID(self.llm_simulator)
+            self.aid_agent = AgentAID(self.llm_simulator, db_path=self.db_manager.db_path)
 
             # ANPAgent que depende de outros agentes
             self.anp_agent = AgentANP(self.llm_simulator, self.ara_agent, self.aad_agent, self.agp_agent)
+
+            # Pré-computação da orquestração pós-aprovação das propostas pendentes com o LLM ocioso
+            self.speculator = ProposalSpeculator(
+                self.db_manager, self.llm_simulator, self.aid_agent, self.adex_agent,
+                build_code_brief=lambda project: self._build_code_generation_brief(project, self.INITIAL_CODE_TASK),
+                model_slot=self._model_slot,
+                is_busy=lambda: bool(self.single_flight.active())
+            )
             
             self._initialized = True
             logger.info("SynapseForgeBackend (MOAI) inicializado com sucesso e orquestrando agentes.")
             self._initialize_data() # Inicializa com dados de exemplo se o DB estiver vazio
 
+    def start_background_services(self):
+        """
+        Inicia as threads de fundo: manutenção do banco (ANALYZE, vacuum incremental, poda do
+        change_log, retenção de logs e arquivo frio) e a especulação pós-aprovação com o LLM
+        ocioso. Chamado pela aplicação Streamlit; a API e a CLI de lote só as iniciam se pedirem,
+        para não disputar o LLM e o banco com o próprio trabalho.
+        """
+        self.maintenance.start()
+        self.speculator.start()
+
     def _add_moai_log(self, event_type: str, details: str, project_id: Optional[str] = None, agent_id: Optional[str] = None, status: str = "INFO"):
-        log_id = str(uuid.uuid4())
+        log_id = new_id()
         timestamp = datetime.datetime.now()
         log_entry = MOAILog(id=log_id, timestamp=timestamp, event_type=event_type, details=details, project_id=project_id, agent_id=agent_id, status=status)
         self.db_manager.add_moai_log(log_entry.dict())
@@ -144,7 +193,7 @@ class SynapseForgeBackend:
 
     def _initialize_data(self):
         logger.info("Inicializando dados de exemplo...")
-        if not self.db_manager.get_all_proposals():
+        if self.db_manager.count_proposals() == 0:
             logger.info("Nenhuma proposta encontrada. Criando dados de exemplo...")
             sample_reqs = {
                 "nome_projeto": "Sistema de Gestão de Eventos",
@@ -221,7 +270,7 @@ class SynapseForgeBackend:
                 if not approved_proposal_obj_final:
                     raise Exception(f"Proposta {approved_proposal_obj.id} não encontrada após atualização.")
 
-                project_id = str(uuid.uuid4())
+                project_id = new_id()
                 project = Project(
                     id=project_id,
                     proposal_id=approved_proposal_obj_final.id,
@@ -232,7 +281,7 @@ class SynapseForgeBackend:
                     started_at=datetime.datetime.now()
                 )
                 self.db_manager.add_project(project.dict())
-                self._add_moai_log("PROJECT_CREATED", f"Projeto '{project.name}' criado a partir da proposta {approved_proposal_obj_final.id[:8]}...", project_id=project.id)
+                self._add_moai_log("PROJECT_CREATED", f"Projeto '{project.name}' criado a partir da proposta {short_id(approved_proposal_obj_final.id)}...", project_id=project.id)
 
                 logger.info(f"Iniciando orquestração de agentes para o projeto {project.name}...")
                 self._orchestrate_after_approval(approved_proposal_obj_final.id, project.id)
@@ -242,7 +291,7 @@ class SynapseForgeBackend:
                 code_result = self.adex_agent.generate_code(project.name, project.client_name, initial_brief)
                 if code_result.get("filename"):
                     self.db_manager.add_generated_code(GeneratedCode(
-                        id=str(uuid.uuid4()),
+                        id=new_id(),
                         project_id=project_id,
                         filename=code_result.get('filename', 'initial_config.py'),
                         language=code_result.get('language', 'Python'),
@@ -268,7 +317,7 @@ class SynapseForgeBackend:
                     "estimated_time_moai": "Indefinido",
                     "terms_conditions_moai": "Termos e condições padrão (aprovados)."
                 })
-                project_id = str(uuid.uuid4())
+                project_id = new_id()
                 project = Project(
                     id=project_id,
                     proposal_id=approved_proposal_obj.id,
@@ -287,11 +336,11 @@ class SynapseForgeBackend:
         for project in projects:
             if project.status == "active":
                 try:
-                    generated_code_snippets = self.db_manager.get_generated_code_for_project(project.id)
+                    generated_code_snippets = self.db_manager.get_generated_code_metadata(project.id)
                     # Assumimos que AQTAgent.generate_quality_report retorna um Dict[str, Any]
                     quality_report_dict = self.aqt_agent.generate_quality_report(project.id, project.name, [c.dict() for c in generated_code_snippets])
                     self.db_manager.add_quality_report(QualityReport(
-                        id=str(uuid.uuid4()), project_id=project.id, report_data=quality_report_dict, generated_at=datetime.datetime.now()
+                        id=new_id(), project_id=project.id, report_data=quality_report_dict, generated_at=datetime.datetime.now()
                     ).dict())
                     self._add_moai_log("QUALITY_REPORT_GENERATED", f"Relatório de qualidade gerado para {project.name}.", project_id=project.id, agent_id="AQT")
                 except Exception as e:
@@ -299,11 +348,11 @@ class SynapseForgeBackend:
                     self._add_moai_log("QUALITY_REPORT_FAILED", f"Falha ao gerar relatório de qualidade para {project.name}. Erro: {e}", project_id=project.id, agent_id="AQT", status="ERROR")
 
                 try:
-                    generated_code_snippets = self.db_manager.get_generated_code_for_project(project.id)
+                    generated_code_snippets = self.db_manager.get_generated_code_metadata(project.id)
                     # Assumimos que ASEAgent.generate_security_report retorna um Dict[str, Any]
                     security_report_dict = self.ase_agent.generate_security_report(project.id, project.name, [c.dict() for c in generated_code_snippets])
                     self.db_manager.add_security_report(SecurityReport(
-                        id=str(uuid.uuid4()), project_id=project.id, report_data=security_report_dict, generated_at=datetime.datetime.now()
+                        id=new_id(), project_id=project.id, report_data=security_report_dict, generated_at=datetime.datetime.now()
                     ).dict())
                     self._add_moai_log("SECURITY_REPORT_GENERATED", f"Relatório de segurança gerado para {project.name}.", project_id=project.id, agent_id="ASE")
                 except Exception as e:
@@ -322,7 +371,7 @@ class SynapseForgeBackend:
                         final_doc_type = doc_content_dict.get('document_type', chosen_doc_type)
 
                         self.db_manager.add_documentation(Documentation(
-                            id=str(uuid.uuid4()),
+                            id=new_id(),
                             project_id=project.id,
                             filename=doc_content_dict.get('filename', f'doc_{uuid.uuid4().hex[:8]}.md'),
                             content=doc_content_dict['content'],
@@ -339,7 +388,7 @@ class SynapseForgeBackend:
                     # Assumimos que AMSAgent.generate_monitoring_summary retorna um Dict[str, Any]
                     monitoring_summary_dict = self.ams_agent.generate_monitoring_summary(project_id=project.id, project_name=project.name)
                     self.db_manager.add_monitoring_summary(MonitoringSummary(
-                        id=str(uuid.uuid4()), project_id=project.id, summary_data=monitoring_summary_dict, generated_at=datetime.datetime.now()
+                        id=new_id(), project_id=project.id, summary_data=monitoring_summary_dict, generated_at=datetime.datetime.now()
                     ).dict())
                     self._add_moai_log("PROJECT_MONITORING_SUMMARY", f"Resumo de monitoramento gerado para {project.name}.", project_id=project.id, agent_id="AMS")
                 except Exception as e:
@@ -354,15 +403,22 @@ class SynapseForgeBackend:
                 self.db_manager.update_monitoring_summary(existing_global_summary.id, summary_data=global_monitoring_summary_dict)
             else:
                 self.db_manager.add_monitoring_summary(MonitoringSummary(
-                    id=str(uuid.uuid4()), project_id=None, summary_data=global_monitoring_summary_dict, generated_at=datetime.datetime.now()
+                    id=new_id(), project_id=None, summary_data=global_monitoring_summary_dict, generated_at=datetime.datetime.now()
                 ).dict())
             self._add_moai_log("GLOBAL_MONITORING_SUMMARY", "Resumo de monitoramento global gerado/atualizado.", agent_id="AMS")
         except Exception as e:
             logger.error(f"Falha ao gerar resumo de monitoramento global: {e}")
             self._add_moai_log("GLOBAL_MONITORING_FAILED", f"Falha ao gerar resumo de monitoramento global. Erro: {e}", agent_id="AMS", status="ERROR")
 
+    @coalesced("generate_proposal")
+    def generate_proposal(self, req_data: Dict[str, Any]) -> Proposal:
+        """Gera o conteúdo da proposta pelo ANP (ARA, AAD e AGP) e a grava como pendente."""
+        # ANPAgent.generate_proposal_content retorna um Dict[str, Any]; erros do LLM sobem para a UI
+        proposal_content_dict = self.anp_agent.generate_proposal_content(req_data)
+        return self.create_proposal(req_data, initial_content=proposal_content_dict)
+
     def create_proposal(self, req_data: Dict[str, Any], status: str = "pending", initial_content: Optional[Dict[str, Any]] = None) -> Proposal:
-        proposal_id = str(uuid.uuid4())
+        proposal_id = new_id()
         submitted_at = datetime.datetime.now()
         approved_at = submitted_at if status == "approved" else None
 
@@ -411,16 +467,22 @@ class SynapseForgeBackend:
             )
         
         self.db_manager.update_proposal(proposal_id, **updated_fields)
-        self._add_moai_log("PROPOSAL_UPDATED", f"Proposta {proposal_id[:8]}... atualizada.", project_id=proposal_id)
+        self.speculator.discard([proposal_id]) # Rascunho pré-computado refletia o conteúdo anterior
+        self._add_moai_log("PROPOSAL_UPDATED", f"Proposta {short_id(proposal_id)}... atualizada.", project_id=proposal_id)
 
+    @coalesced("update_proposal_status")
     def update_proposal_status(self, proposal_id: str, new_status: str):
+        # Reservado antes da mudança de status: o projeto é criado com o id do rascunho pré-computado
+        reserved_project_id = self.speculator.reserved_project_id(proposal_id) if new_status == "approved" else None
         self.db_manager.update_proposal_status(proposal_id, new_status)
-        self._add_moai_log("PROPOSAL_STATUS_CHANGED", f"Status da proposta {proposal_id[:8]}... alterado para '{new_status}'.", project_id=proposal_id, status=new_status.upper())
+        if new_status == "rejected":
+            self.speculator.discard([proposal_id])
+        self._add_moai_log("PROPOSAL_STATUS_CHANGED", f"Status da proposta {short_id(proposal_id)}... alterado para '{new_status}'.", project_id=proposal_id, status=new_status.upper())
         
         if new_status == "approved":
             proposal = self.db_manager.get_proposal_by_id(proposal_id)
             if proposal:
-                project_id = str(uuid.uuid4())
+                project_id = reserved_project_id or new_id()
                 project = Project(
                     id=project_id,
                     proposal_id=proposal.id,
@@ -431,20 +493,24 @@ class SynapseForgeBackend:
                     started_at=datetime.datetime.now()
                 )
                 self.db_manager.add_project(project.dict())
-                self._add_moai_log("PROJECT_CREATED", f"Projeto '{project.name}' criado a partir da proposta {proposal_id[:8]}...", project_id=project_id, status="SUCCESS")
+                self._add_moai_log("PROJECT_CREATED", f"Projeto '{project.name}' criado a partir da proposta {short_id(proposal_id)}...", project_id=project_id, status="SUCCESS")
                 
                 self._orchestrate_after_approval(proposal_id, project_id)
                 
                 return project_id
             else:
                 logger.error(f"MOAI: Proposta com ID {proposal_id} não encontrada para criar projeto.")
-                self._add_moai_log("PROJECT_CREATION_FAILED", f"Falha ao criar projeto: Proposta {proposal_id[:8]}... não encontrada.", project_id=proposal_id, status="ERROR")
+                self._add_moai_log("PROJECT_CREATION_FAILED", f"Falha ao criar projeto: Proposta {short_id(proposal_id)}... não encontrada.", project_id=proposal_id, status="ERROR")
                 return None
         return None
 
     def _orchestrate_after_approval(self, proposal_id: str, project_id: str):
-        logger.info(f"MOAI: Iniciando orquestração pós-aprovação para proposta {proposal_id[:8]}... e projeto {project_id[:8]}...")
+        logger.info(f"MOAI: Iniciando orquestração pós-aprovação para proposta {short_id(proposal_id)}... e projeto {short_id(project_id)}...")
         self._add_moai_log("ORCHESTRATION_START", "Iniciando orquestração pós-aprovação.", project_id=project_id)
+        # Rascunho pré-computado com o LLM ocioso: promovido sem novas chamadas ao LLM
+        draft = self.speculator.claim(proposal_id, project_id)
+        if draft:
+            self._add_moai_log("SPECULATIVE_DRAFT_PROMOTED", f"Artefatos pré-computados promovidos ({draft.llm_ms / 1000:.1f}s de LLM economizados).", project_id=project_id, status="SUCCESS")
 
         try:
             # 1. AID: Provisionar o ambiente do projeto
@@ -453,7 +519,11 @@ class SynapseForgeBackend:
             if not project_obj_for_aid:
                 raise Exception(f"Projeto {project_id} não encontrado durante orquestração para AID.")
             # Assumimos que AIDAgent.provision_environment retorna um Dict[str, Any]
-            aid_response = self.aid_agent.provision_environment(project_id, project_obj_for_aid.name)
+            if draft:
+                aid_response = {"success": True, "message": draft.provision_message}
+            else:
+                with self._model_slot("AID"):
+                    aid_response = self.aid_agent.provision_environment(project_id, project_obj_for_aid.name)
             if aid_response["success"]:
                 self._update_agent_status("AID", "COMPLETED", project_id, aid_response["message"])
                 self._add_moai_log("ENV_PROVISIONED", aid_response["message"], project_id=project_id, agent_id="AID")
@@ -465,7 +535,11 @@ class SynapseForgeBackend:
             # 2. AID: Configurar as rotinas de backup
             self._update_agent_status("AID", "IN_PROGRESS", project_id, "Configurando backups.")
             # Assumimos que AIDAgent.configure_backups retorna um Dict[str, Any]
-            aid_backup_response = self.aid_agent.configure_backups(project_id, project_obj_for_aid.name)
+            if draft:
+                aid_backup_response = {"success": True, "message": draft.backup_message}
+            else:
+                with self._model_slot("AID"):
+                    aid_backup_response = self.aid_agent.configure_backups(project_id, project_obj_for_aid.name)
             if aid_backup_response["success"]:
                 self._update_agent_status("AID", "COMPLETED", project_id, aid_backup_response["message"])
                 self._add_moai_log("BACKUPS_CONFIGURED", aid_backup_response["message"], project_id=project_id, agent_id="AID")
@@ -475,17 +549,21 @@ class SynapseForgeBackend:
                 raise Exception(aid_backup_response["message"])
 
             # 3. Gerar código inicial do projeto (usando ADE-X)
-            if not self.db_manager.get_generated_code_for_project(project_id):
+            if not self.db_manager.has_generated_code(project_id):
                 self._update_agent_status("ADE-X", "IN_PROGRESS", project_id, "Gerando código inicial.")
                 project_obj = self.db_manager.get_project_by_id(project_id) # Recupera novamente para garantir o estado mais recente
                 
                 if project_obj:
                     # Assumimos que ADEXAgent.generate_code retorna um Dict[str, Any]
-                    code_brief = self._build_code_generation_brief(project_obj, "Configuração inicial do projeto (setup de ambiente, estrutura de diretórios e ponto de entrada).")
-                    code_result = self.adex_agent.generate_code(project_obj.name, project_obj.client_name, code_brief)
+                    if draft and draft.code:
+                        code_result = draft.code
+                    else:
+                        code_brief = self._build_code_generation_brief(project_obj, self.INITIAL_CODE_TASK)
+                        with self._model_slot("ADE-X"):
+                            code_result = self.adex_agent.generate_code(project_obj.name, project_obj.client_name, code_brief)
                     if code_result.get("filename"):
                         self.db_manager.add_generated_code(GeneratedCode(
-                            id=str(uuid.uuid4()),
+                            id=new_id(),
                             project_id=project_id,
                             filename=code_result.get('filename', 'initial_config.py'),
                             language=code_result.get('language', 'Python'),
@@ -506,16 +584,128 @@ class SynapseForgeBackend:
             self._add_moai_log("PROJECT_PROGRESS_UPDATED", "Progresso do projeto atualizado para 10% (ambiente e código inicial).", project_id=project_id)
 
             self._add_moai_log("ORCHESTRATION_COMPLETED", "Orquestração pós-aprovação concluída com sucesso.", project_id=project_id)
+            return True
 
         except Exception as e:
-            logger.error(f"ERRO CRÍTICO: Falha na orquestração de agentes para o projeto {project_id[:8]}.... Erro: {e}")
+            logger.error(f"ERRO CRÍTICO: Falha na orquestração de agentes para o projeto {short_id(project_id)}.... Erro: {e}")
             self._add_moai_log("ORCHESTRATION_FAILED", f"Falha crítica na orquestração: {e}", project_id=project_id, status="CRITICAL")
             self.db_manager.update_project_status(project_id, "on hold")
             self._add_moai_log("PROJECT_STATUS_CHANGED", "Projeto colocado 'em espera' devido a falha na orquestração.", project_id=project_id, status="ON_HOLD")
+            return False
+
+    @staticmethod
+    def _parse_model_limits(spec: str) -> Dict[str, int]:
+        """Converte "modelo=n,modelo=n" (SFORGE_ORCHESTRATION_MODEL_LIMITS) em {modelo: n}."""
+        limits = {}
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            model, _, limit = item.rpartition("=")
+            try:
+                limits[model.strip()] = max(1, int(limit))
+            except ValueError:
+                logger.warning(f"Limite de modelo inválido em SFORGE_ORCHESTRATION_MODEL_LIMITS: '{item}'.")
+        return limits
+
+    def _model_slot(self, agent_code: str) -> threading.BoundedSemaphore:
+        """Semáforo do modelo usado pelo agente: limita as chamadas simultâneas das orquestrações a cada modelo."""
+        model = get_agent_model(agent_code)
+        with self._model_slots_lock:
+            slot = self._model_slots.get(model)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.orchestration_model_limits.get(model, self.orchestration_model_limit))
+                self._model_slots[model] = slot
+        return slot
+
+    def bulk_approve_proposals(self, proposal_ids: List[str]) -> Dict[str, Any]:
+        """
+        Aprova várias propostas pendentes em uma única transação, cria os projetos e agenda as
+        orquestrações como jobs paralelos no orchestration_executor (teto global) com limite de
+        chamadas simultâneas por modelo. Não espera as orquestrações: o andamento agregado fica
+        em get_bulk_approval_progress().
+        """
+        now = datetime.datetime.now()
+        projects = []
+        for proposal_id in dict.fromkeys(proposal_ids):
+            proposal = self.db_manager.get_proposal_by_id(proposal_id)
+            if not proposal or proposal.status != "pending":
+                continue
+            projects.append(Project(
+                id=self.speculator.reserved_project_id(proposal.id) or new_id(),
+                proposal_id=proposal.id,
+                name=proposal.title,
+                client_name=proposal.requirements.get('nome_cliente', 'Cliente Desconhecido'),
+                status="active",
+                progress=0,
+                started_at=now
+            ).dict())
+        created_ids = set(self.db_manager.approve_proposals(projects)) if projects else set()
+        created = [project for project in projects if project["id"] in created_ids]
+
+        batch_id = new_id()
+        with self._bulk_approvals_lock:
+            self._bulk_approvals[batch_id] = {
+                "batch_id": batch_id, "total": len(created), "completed": 0, "failed": 0,
+                "started_at": now, "finished_at": None if created else now,
+            }
+            # Mantém só os lotes mais recentes
+            for old_batch_id in list(self._bulk_approvals)[:-20]:
+                del self._bulk_approvals[old_batch_id]
+
+        for project in created:
+            self._add_moai_log("PROPOSAL_STATUS_CHANGED", f"Status da proposta {short_id(project['proposal_id'])}... alterado para 'approved' (lote).", project_id=project["proposal_id"], status="APPROVED")
+            self._add_moai_log("PROJECT_CREATED", f"Projeto '{project['name']}' criado a partir da proposta {short_id(project['proposal_id'])}...", project_id=project["id"], status="SUCCESS")
+            job = self.single_flight.submit(flight_key("orchestrate_after_approval", project["id"]), self.orchestration_executor,
+                                            self._orchestrate_after_approval, project["proposal_id"], project["id"])
+            job.add_done_callback(lambda finished, batch_id=batch_id: self._finish_bulk_job(batch_id, finished))
+        self._add_moai_log("BULK_APPROVAL", f"{len(created)} proposta(s) aprovada(s) em lote; {len(created)} orquestração(ões) agendada(s).",
+                           status="SUCCESS" if created else "WARNING")
+        return {
+            "batch_id": batch_id,
+            "approved": len(created),
+            "skipped": len(dict.fromkeys(proposal_ids)) - len(created),
+            "project_ids": [project["id"] for project in created],
+        }
+
+    def _finish_bulk_job(self, batch_id: str, job: Future):
+        succeeded = not job.exception() and bool(job.result())
+        with self._bulk_approvals_lock:
+            batch = self._bulk_approvals.get(batch_id)
+            if batch is None:
+                return
+            batch["completed"] += 1
+            if not succeeded:
+                batch["failed"] += 1
+            if batch["completed"] >= batch["total"]:
+                batch["finished_at"] = datetime.datetime.now()
+
+    def get_speculation_stats(self) -> Dict[str, Any]:
+        """Rascunhos pós-aprovação: taxa de acerto, desperdício, tempo de LLM economizado e orçamento."""
+        return self.speculator.snapshot()
+
+    def get_bulk_approval_progress(self) -> Dict[str, Any]:
+        """Andamento das aprovações em lote deste processo: por lote e agregado, com projetos por minuto."""
+        now = datetime.datetime.now()
+        with self._bulk_approvals_lock:
+            batches = [dict(batch) for batch in reversed(list(self._bulk_approvals.values()))]
+        for batch in batches:
+            minutes = ((batch["finished_at"] or now) - batch["started_at"]).total_seconds() / 60
+            batch["projects_per_minute"] = batch["completed"] / minutes if minutes > 0 else 0.0
+        running = [batch for batch in batches if batch["finished_at"] is None]
+        window = [batch for batch in batches if batch["total"]]
+        minutes = ((now if running else max(batch["finished_at"] for batch in window)) - min(batch["started_at"] for batch in window)).total_seconds() / 60 if window else 0
+        completed = sum(batch["completed"] for batch in window)
+        return {
+            "batches": batches,
+            "total": sum(batch["total"] for batch in window),
+            "completed": completed,
+            "failed": sum(batch["failed"] for batch in window),
+            "running": bool(running),
+            "projects_per_minute": completed / minutes if minutes > 0 else 0.0,
+        }
 
 
     def get_dashboard_summary(self) -> Dict[str, Any]:
-        proposals = self.db_manager.get_all_proposals()
+        # Projeção parcial: apenas as colunas usadas pelos KPIs
+        proposals = self.db_manager.get_all_proposals(fields=("status", "estimated_value_moai"))
         projects = self.db_manager.get_all_projects()
         
         total_proposals = len(proposals)
@@ -576,6 +766,15 @@ class SynapseForgeBackend:
         return active_agents
 
     def get_infrastructure_health(self) -> Dict[str, Any]:
+        """Saúde global da infraestrutura, servida do snapshot armazenado e recalculada quando vence."""
+        snapshot = self.db_manager.get_infra_snapshots(None).get("infrastructure_health")
+        if not snapshot or datetime.datetime.now() - snapshot.refreshed_at >= self.infra_snapshot_max_age:
+            snapshot = self.db_manager.save_infra_snapshot(None, "infrastructure_health", self._probe_infrastructure_health()) or snapshot
+        if not snapshot:
+            return self._probe_infrastructure_health()
+        return {**snapshot.data, "refreshed_at": snapshot.refreshed_at}
+
+    def _probe_infrastructure_health(self) -> Dict[str, Any]:
         overall_status = random.choice(["Operacional", "Atenção", "Crítico"])
         return {
             "overall_status": overall_status,
@@ -590,63 +789,298 @@ class SynapseForgeBackend:
     def get_project_infra_status(self, project_id: str) -> Dict[str, Any]:
         return self.aid_agent.get_infrastructure_status(project_id)
 
-    # Assumimos que AIDAgent.trigger_manual_backup retorna um Dict[str, Any]
-    def trigger_manual_backup(self, project_id: str) -> Dict[str, Any]:
-        return self.aid_agent.trigger_manual_backup(project_id)
+    INFRA_SNAPSHOT_KINDS = ("infra_status", "backup_status")
+
+    @coalesced("refresh_infra_snapshot")
+    def refresh_infra_snapshot(self, project_id: str) -> Dict[str, InfraSnapshot]:
+        """
+        Consulta o AID (status da infraestrutura e política/status de backup, duas chamadas ao LLM)
+        e grava o resultado como snapshot do projeto. Respostas de erro também são gravadas,
+        para que a página não repita a chamada a cada renderização.
+        """
+        project = self.db_manager.get_project_by_id(project_id)
+        infra_status = self.aid_agent.get_infrastructure_status(project_id)
+        backup_info = self.aid_agent.configure_backups(project_id, project.name if project else "Projeto")
+        snapshots = {}
+        for kind, data in (("infra_status", infra_status), ("backup_status", backup_info)):
+            snapshot = self.db_manager.save_infra_snapshot(project_id, kind, data)
+            if snapshot:
+                snapshots[kind] = snapshot
+        failed = bool(infra_status.get("error")) or not backup_info.get("success")
+        self._add_moai_log("INFRA_SNAPSHOT_REFRESHED", f"Snapshot de infraestrutura e backup atualizado{' com erros do AID' if failed else ''}.",
+                           project_id=project_id, agent_id="AID", status="WARNING" if failed else "INFO")
+        return snapshots
+
+    def _refresh_infra_snapshot_in_background(self, project_id: str):
+        key = flight_key("refresh_infra_snapshot", project_id)
+        if self.single_flight.in_flight(key):
+            return
+
+        def run():
+            try:
+                self.refresh_infra_snapshot(project_id)
+            except Exception as e:
+                logger.error(f"Falha ao atualizar snapshot de infraestrutura do projeto {short_id(project_id)}...: {e}")
+        self.background_executor.submit(run)
+
+    def get_infra_snapshot(self, project_id: str) -> Dict[str, Any]:
+        """
+        Status de infraestrutura e backup do projeto a partir do snapshot armazenado, sem chamar
+        o LLM. Snapshots ausentes ou mais antigos que infra_snapshot_max_age disparam uma
+        atualização em segundo plano; até lá a versão anterior (ou None) é devolvida.
+        """
+        snapshots = self.db_manager.get_infra_snapshots(project_id)
+        now = datetime.datetime.now()
+        if any(kind not in snapshots or now - snapshots[kind].refreshed_at >= self.infra_snapshot_max_age
+               for kind in self.INFRA_SNAPSHOT_KINDS):
+            self._refresh_infra_snapshot_in_background(project_id)
+        refreshing = self.single_flight.in_flight(flight_key("refresh_infra_snapshot", project_id))
+        return {
+            "infra_status": snapshots.get("infra_status"),
+            "backup_status": snapshots.get("backup_status"),
+            "refreshing": refreshing,
+        }
+
+    def trigger_manual_backup(self, project_id: str, progress_callback: Optional[Callable[[float], None]] = None) -> Dict[str, Any]:
+        result = self.aid_agent.trigger_manual_backup(project_id, progress_callback=progress_callback)
+        if result["success"]:
+            self._add_moai_log("BACKUP_COMPLETED", result["message"], project_id=project_id, agent_id="AID")
+        else:
+            self._add_moai_log("BACKUP_FAILED", result["message"], project_id=project_id, agent_id="AID", status="ERROR")
+        return result
 
-    # Assumimos que AIDAgent.schedule_test_restore retorna um Dict[str, Any]
     def schedule_test_restore(self, project_id: str) -> Dict[str, Any]:
-        return self.aid_agent.schedule_test_restore(project_id)
+        result = self.aid_agent.schedule_test_restore(project_id)
+        if result["success"]:
+            self._add_moai_log("RESTORE_TEST_PASSED", result["message"], project_id=project_id, agent_id="AID")
+        else:
+            self._add_moai_log("RESTORE_TEST_FAILED", result["message"], project_id=project_id, agent_id="AID", status="ERROR")
+        return result
+
+    def get_backup_history(self) -> List[Dict[str, Any]]:
+        return self.aid_agent.list_backups()
+
+    def get_report_portfolio_summary(self) -> Dict[str, Any]:
+        return self.db_manager.get_report_portfolio_summary()
+
+    def find_projects_by_reports(self, quality_status: Optional[str] = None, risk_levels: Optional[List[str]] = None,
+                                 max_security_score: Optional[int] = None,
+                                 min_failed_tests: Optional[int] = None) -> List[ProjectReportStatus]:
+        return self.db_manager.find_projects_by_reports(quality_status=quality_status, risk_levels=risk_levels,
+                                                        max_security_score=max_security_score,
+                                                        min_failed_tests=min_failed_tests)
 
     def get_moai_log_events_count(self) -> Dict[str, int]:
-        all_logs = self.db_manager.get_all_moai_logs()
-        event_counts = {}
-        for log in all_logs:
-            event_counts[log.event_type] = event_counts.get(log.event_type, 0) + 1
-        return event_counts
+        # Agregação feita no SQLite (GROUP BY) em vez de carregar todos os logs
+        return self.db_manager.count_moai_log_events()
+
+    def run_log_retention(self) -> Dict[str, Any]:
+        """Executa agora a retenção de logs, que o agendador de manutenção roda periodicamente (ver DatabaseManager.apply_log_retention)."""
+        result = self.db_manager.run_maintenance("log_retention")
+        self._log_maintenance_results([result])
+        return result
+
+    def add_write_listener(self, listener: Callable[[], None]):
+        """
+        Registra um gancho chamado sempre que um método do backend grava no banco (aprovar,
+        editar, excluir, gerar artefatos...). Usado pela UI para revalidar seus caches.
+        """
+        self.db_manager.add_write_listener(listener)
+
+    def get_change_seq(self) -> int:
+        """Sequência atual do change_log; a UI compara com a sua para saber se algo mudou."""
+        return self.db_manager.get_change_seq()
+
+    def changes_since(self, seq: Optional[int]) -> Dict[str, Any]:
+        """Mudanças (tabela, id, operação) desde `seq` (ver DatabaseManager.changes_since)."""
+        return self.db_manager.changes_since(seq)
+
+    def sync_entity_cache(self):
+        """Descarta do cache de entidades o que mudou no banco, inclusive por outros processos."""
+        self.db_manager.sync_entity_cache(force=True)
+
+    def _log_maintenance_results(self, results: List[Dict[str, Any]]):
+        """Registra no log do MOAI apenas o que interessa: falhas, conversão do banco, espaço devolvido, logs e projetos arquivados."""
+        for result in results:
+            if result["task"] == "log_retention":
+                if not result["success"]:
+                    self._add_moai_log("LOG_RETENTION_FAILED", f"Falha na retenção de logs: {result.get('error')}", status="ERROR")
+                elif result["archived"]:
+                    self._add_moai_log("LOG_RETENTION", f"{result['archived']} log(s) arquivados em {result['segment']} e agregados por hora.")
+            elif result["task"] == "archive_projects" and "archived" in result:
+                self._log_projects_archived(result["archived"], result["failed"], result["rows"],
+                                            datetime.datetime.fromisoformat(result["cutoff"]))
+            elif not result["success"]:
+                problem = result.get("error") or "; ".join(result.get("messages", []))
+                self._add_moai_log("DB_MAINTENANCE_FAILED", f"Manutenção '{result['task']}' falhou: {problem}", status="ERROR")
+            elif result["task"] == "vacuum":
+                self._add_moai_log("DB_MAINTENANCE", f"Banco reconstruído com auto_vacuum incremental em {result['duration_ms']:.0f} ms.")
+            elif result.get("pages_freed"):
+                self._add_moai_log("DB_MAINTENANCE", f"Vacuum incremental devolveu {result['pages_freed']} página(s) ao sistema.")
+
+    def run_database_maintenance(self) -> List[Dict[str, Any]]:
+        """Executa agora todas as tarefas periódicas de manutenção (ver DatabaseMaintenance)."""
+        return self.maintenance.run_due_tasks(force=True)
+
+    def convert_database_to_incremental_vacuum(self) -> Dict[str, Any]:
+        """
+        Conversão única de um banco antigo para auto_vacuum=INCREMENTAL (VACUUM completo). Bloqueia
+        o banco durante a reescrita, por isso só roda por ação explícita do administrador.
+        """
+        result = self.db_manager.run_maintenance("vacuum")
+        self._log_maintenance_results([result])
+        return result
+
+    def get_database_health(self) -> Dict[str, Any]:
+        """Tamanho, páginas livres e fragmentação do banco, com a última execução de cada tarefa."""
+        health = self.db_manager.get_database_health()
+        health["maintenance_runs"] = self.db_manager.get_maintenance_runs()
+        return health
+
+    def get_log_rollups(self, project_id: Optional[str] = None, since: Optional[datetime.datetime] = None,
+                        until: Optional[datetime.datetime] = None) -> List[MOAILogRollup]:
+        return self.db_manager.get_log_rollups(project_id=project_id, since=since, until=until)
+
+    def get_moai_logs(self, project_id: Optional[str] = None, before: Optional[datetime.datetime] = None,
+                      before_id: Optional[str] = None, limit: Optional[int] = None,
+                      after_id: Optional[str] = None) -> List[MOAILog]:
+        self._ensure_project_hot(project_id)
+        return self.db_manager.get_moai_logs(project_id=project_id, before=before, before_id=before_id, limit=limit,
+                                             after_id=after_id)
+
+    def get_latest_moai_logs(self, n: int = 5) -> List[MOAILog]:
+        return self.db_manager.latest_logs(n)
+
+    def iter_moai_logs(self, project_id: Optional[str] = None) -> Iterator[MOAILog]:
+        self._ensure_project_hot(project_id)
+        return self.db_manager.iter_moai_logs(project_id=project_id)
 
     def get_all_proposals(self) -> List[Proposal]:
         return self.db_manager.get_all_proposals()
 
     def get_pending_proposals(self) -> int:
-        return len(self.db_manager.get_proposals(status="pending"))
+        return self.db_manager.count_proposals(status="pending")
+
+    def count_proposals(self, status: Optional[str] = None) -> int:
+        return self.db_manager.count_proposals(status=status)
+
+    def get_proposals(self, status: Optional[str] = None, fields: Optional[List[str]] = None) -> List[Proposal]:
+        return self.db_manager.get_proposals(status, fields=fields)
+
+    def get_proposals_page(self, status: Optional[str] = None, before: Optional[datetime.datetime] = None,
+                           before_id: Optional[str] = None, limit: Optional[int] = None,
+                           fields: Optional[List[str]] = None) -> List[Proposal]:
+        return self.db_manager.get_proposals_page(status=status, before=before, before_id=before_id, limit=limit, fields=fields)
 
-    def get_proposals(self, status: Optional[str] = None) -> List[Proposal]:
-        return self.db_manager.get_proposals(status)
+    def iter_proposals(self, status: Optional[str] = None) -> Iterator[Proposal]:
+        return self.db_manager.iter_proposals(status=status)
 
     def get_proposal_by_id(self, proposal_id: str) -> Optional[Proposal]:
         return self.db_manager.get_proposal_by_id(proposal_id)
 
     def delete_proposal(self, proposal_id: str) -> bool:
-        project = self.db_manager.get_project_by_proposal_id(proposal_id)
-        if project:
-            self.db_manager.delete_generated_code_by_project(project.id)
-            self.db_manager.delete_quality_report_by_project(project.id)
-            self.db_manager.delete_security_report_by_project(project.id)
-            self.db_manager.delete_documentation_by_project(project.id)
-            self.db_manager.delete_monitoring_summary_by_project(project.id)
-            self.db_manager.delete_moai_logs_by_project(project.id)
-            self.db_manager.delete_project(project.id)
-            self._add_moai_log("PROJECT_DELETED", f"Projeto {project.id[:8]}... associado à proposta {proposal_id[:8]}... excluído.", project_id=project.id)
-        
-        self.db_manager.delete_moai_logs_by_project(proposal_id)
-        
-        success = self.db_manager.delete_proposal(proposal_id)
-        if success:
-            self._add_moai_log("PROPOSAL_DELETED", f"Proposta {proposal_id[:8]}... excluída com sucesso.", project_id=proposal_id, status="SUCCESS")
+        return self.delete_proposals([proposal_id])
+
+    def delete_proposals(self, proposal_ids: List[str]) -> bool:
+        """
+        Exclui propostas, projetos derivados e todos os artefatos associados em uma única
+        transação. Os diretórios de workspaces de teste são removidos em segundo plano.
+        """
+        self.speculator.discard(proposal_ids)
+        result = self.db_manager.delete_project_graph(proposal_ids)
+        if not result["success"]:
+            for proposal_id in proposal_ids:
+                self._add_moai_log("PROPOSAL_DELETE_FAILED", f"Falha ao excluir proposta {short_id(proposal_id)}....", project_id=proposal_id, status="ERROR")
+            return False
+
+        for project_id in result["project_ids"]:
+            self._add_moai_log("PROJECT_DELETED", f"Projeto {short_id(project_id)}... excluído junto com a proposta associada.", project_id=project_id)
+        for proposal_id in proposal_ids:
+            self._add_moai_log("PROPOSAL_DELETED", f"Proposta {short_id(proposal_id)}... excluída com sucesso.", project_id=proposal_id, status="SUCCESS")
+
+        if result["workspace_paths"]:
+            self.background_executor.submit(self._remove_workspace_dirs, result["workspace_paths"])
+        if result["archive_paths"]:
+            self.background_executor.submit(self._remove_project_archives, result["archive_paths"])
+        return True
+
+    def _remove_workspace_dirs(self, workspace_paths: List[str]):
+        for workspace_path in workspace_paths:
+            try:
+                self.test_workspace_manager.delete_workspace(workspace_path)
+            except Exception as e:
+                logger.error(f"Falha ao remover diretório de workspace {workspace_path}: {e}")
+
+    @staticmethod
+    def _remove_project_archives(archive_paths: List[str]):
+        for archive_path in archive_paths:
+            try:
+                os.remove(archive_path)
+            except OSError as e:
+                logger.error(f"Falha ao remover arquivo frio {archive_path}: {e}")
+
+    def archive_project(self, project_id: str) -> Dict[str, Any]:
+        """Move os artefatos de um projeto concluído para o arquivo frio, deixando um stub em projects."""
+        result = self.db_manager.archive_project(project_id)
+        if result["success"]:
+            self._add_moai_log("PROJECT_ARCHIVED", f"Projeto arquivado: {result['rows']} registro(s) movidos para {result['archive_path']}.", project_id=project_id)
         else:
-            self. _add_moai_log("PROPOSAL_DELETE_FAILED", f"Falha ao excluir proposta {proposal_id[:8]}....", project_id=proposal_id, status="ERROR")
-        return success
+            self._add_moai_log("PROJECT_ARCHIVE_FAILED", f"Falha ao arquivar projeto: {result.get('error')}", project_id=project_id, status="ERROR")
+        return result
+
+    def archive_completed_projects(self, older_than_days: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Arquiva em lote os projetos concluídos há mais de N dias (padrão SFORGE_PROJECT_ARCHIVE_DAYS).
+        O agendador de manutenção faz o mesmo uma vez por dia (tarefa archive_projects).
+        """
+        summary = self.db_manager.archive_completed_projects(older_than_days)
+        self._log_projects_archived(len(summary["archived"]), len(summary["failed"]), summary["rows"], summary["cutoff"])
+        return summary
+
+    def _log_projects_archived(self, archived: int, failed: int, rows: int, cutoff: datetime.datetime):
+        if archived or failed:
+            self._add_moai_log(
+                "PROJECTS_ARCHIVED" if not failed else "PROJECTS_ARCHIVE_FAILED",
+                f"{archived} projeto(s) concluído(s) antes de {cutoff:%Y-%m-%d} arquivados ({rows} registro(s)); {failed} falha(s).",
+                status="INFO" if not failed else "WARNING",
+            )
+
+    def _ensure_project_hot(self, project_id: Optional[str]):
+        """Reidrata de forma transparente um projeto arquivado antes de acessar seus artefatos."""
+        if not project_id or not self.db_manager.is_project_archived(project_id):
+            return
+        result = self.db_manager.rehydrate_project(project_id)
+        if not result["success"]:
+            self._add_moai_log("PROJECT_REHYDRATE_FAILED", f"Falha ao reidratar projeto arquivado: {result.get('error')}", project_id=project_id, status="ERROR")
+        elif result["rows"]:
+            self._add_moai_log("PROJECT_REHYDRATED", f"Projeto reidratado do arquivo frio ({result['rows']} registro(s)).", project_id=project_id)
 
     def get_all_projects(self) -> List[Project]:
         return self.db_manager.get_all_projects()
 
+    def get_entity_cache_stats(self) -> Dict[str, Any]:
+        return self.db_manager.entity_cache_stats()
+
+    def get_single_flight_stats(self) -> Dict[str, Any]:
+        return self.single_flight.snapshot()
+
+    def get_active_jobs(self) -> List[Dict[str, Any]]:
+        """Operações caras em curso neste processo (relatórios, geração de código, snapshots...)."""
+        return self.single_flight.active()
+
+    def get_blob_storage_stats(self) -> Dict[str, Any]:
+        return self.db_manager.get_blob_storage_stats()
+
+    def search(self, text: str, entity_types: Optional[List[str]] = None, project_id: Optional[str] = None,
+               limit: int = 20) -> List[SearchResult]:
+        return self.db_manager.search(text, entity_types=entity_types, project_id=project_id, limit=limit)
+
     def get_project_by_id(self, project_id: str) -> Optional[Project]:
         return self.db_manager.get_project_by_id(project_id)
 
     def update_project_details(self, project_id: str, updated_fields: Dict[str, Any]):
         self.db_manager.update_project(project_id, **updated_fields)
-        self._add_moai_log("PROJECT_UPDATED", f"Detalhes do projeto {project_id[:8]}... atualizados.", project_id=project_id)
+        self._add_moai_log("PROJECT_UPDATED", f"Detalhes do projeto {short_id(project_id)}... atualizados.", project_id=project_id)
 
     def get_project_phases_status(self, project_id: str) -> List[Dict[str, Any]]:
         project = self.db_manager.get_project_by_id(project_id)
@@ -681,11 +1115,30 @@ class SynapseForgeBackend:
         return phases
 
     def get_generated_code_for_project(self, project_id: str) -> List[GeneratedCode]:
+        self._ensure_project_hot(project_id)
         return self.db_manager.get_generated_code_for_project(project_id)
 
+    def get_generated_code_metadata(self, project_id: str) -> List[GeneratedCodeInfo]:
+        self._ensure_project_hot(project_id)
+        return self.db_manager.get_generated_code_metadata(project_id)
+
+    def get_generated_code_content(self, code_id: str) -> Optional[str]:
+        return self.db_manager.get_generated_code_content(code_id)
+
     def get_test_workspaces(self, project_id: Optional[str] = None) -> List[TestWorkspace]:
+        self._ensure_project_hot(project_id)
         return self.db_manager.get_test_workspaces(project_id)
 
+    def get_test_workspaces_page(self, project_id: Optional[str] = None, before: Optional[datetime.datetime] = None,
+                                 before_id: Optional[str] = None, limit: Optional[int] = None) -> List[TestWorkspace]:
+        self._ensure_project_hot(project_id)
+        return self.db_manager.get_test_workspaces_page(project_id=project_id, before=before, before_id=before_id, limit=limit)
+
+    def iter_test_workspaces(self, project_id: Optional[str] = None) -> Iterator[TestWorkspace]:
+        self._ensure_project_hot(project_id)
+        return self.db_manager.iter_test_workspaces(project_id=project_id)
+
+    @coalesced("prepare_test_workspace")
     def prepare_test_workspace(
         self,
         project_id: str,
@@ -696,13 +1149,14 @@ class SynapseForgeBackend:
         project = self.db_manager.get_project_by_id(project_id)
         if not project:
             return {"success": False, "message": "Projeto não encontrado."}
+        self._ensure_project_hot(project_id) # O código selecionado pode estar no arquivo frio
 
         generated_code = self.db_manager.get_generated_code_by_id(code_id)
         if not generated_code:
             return {"success": False, "message": "Código selecionado não encontrado."}
 
         try:
-            workspace_id = str(uuid.uuid4())
+            workspace_id = new_id()
             workspace_fs = self.test_workspace_manager.create_workspace(
                 workspace_id=workspace_id,
                 filename=generated_code.filename,
@@ -726,7 +1180,7 @@ class SynapseForgeBackend:
             self.db_manager.add_test_workspace(workspace_record.dict())
             self._add_moai_log(
                 "TEST_WORKSPACE_CREATED",
-                f"Workspace {workspace_id[:8]}... criado para o arquivo {generated_code.filename}.",
+                f"Workspace {short_id(workspace_id)}... criado para o arquivo {generated_code.filename}.",
                 project_id=project_id,
                 agent_id="ADE-X",
             )
@@ -774,7 +1228,7 @@ class SynapseForgeBackend:
             self.db_manager.delete_test_workspace(workspace_id)
             self._add_moai_log(
                 "TEST_WORKSPACE_DELETED",
-                f"Workspace {workspace_id[:8]}... removido.",
+                f"Workspace {short_id(workspace_id)}... removido.",
                 project_id=workspace.project_id,
             )
             return {"success": True}
@@ -782,10 +1236,13 @@ class SynapseForgeBackend:
             logger.error(f"Falha ao remover workspace {workspace_id}: {e}")
             return {"success": False, "message": f"Erro ao remover workspace: {e}"}
 
+    @coalesced("generate_code_for_project")
     def generate_code_for_project(self, project_id: str, filename: str, language: str, description: str) -> Dict[str, Any]:
         project = self.db_manager.get_project_by_id(project_id)
         if not project:
             return {"success": False, "message": "Projeto não encontrado."}
+        # O código novo não pode ficar ao lado de um stub: traz o projeto de volta antes de gravar
+        self._ensure_project_hot(project_id)
         
         try:
             contextual_description = self._build_code_generation_brief(project, description)
@@ -794,7 +1251,7 @@ class SynapseForgeBackend:
             
             if code_result_dict.get('content'):
                 generated_code_obj = GeneratedCode(
-                    id=str(uuid.uuid4()),
+                    id=new_id(),
                     project_id=project_id,
                     filename=code_result_dict.get('filename', filename),
                     language=code_result_dict.get('language', language),
@@ -813,57 +1270,57 @@ class SynapseForgeBackend:
             return {"success": False, "message": f"Erro ao gerar código: {e}"}
 
     def get_quality_tests_report(self, project_id: str) -> Dict[str, Any]:
-        report = self.db_manager.get_quality_report_for_project(project_id)
-        if report:
-            return report.report_data
-        
-        project = self.db_manager.get_project_by_id(project_id)
-        if project:
-            try:
-                logger.info(f"MOAI: Gerando relatório de qualidade on-demand para o projeto {project_id}...")
-                generated_code_snippets = self.db_manager.get_generated_code_for_project(project.id)
-                # Assumimos que AQTAgent.generate_quality_report retorna um Dict[str, Any]
-                quality_report_dict = self.aqt_agent.generate_quality_report(project.id, project.name, [c.dict() for c in generated_code_snippets])
-                new_report = QualityReport(
-                    id=str(uuid.uuid4()), project_id=project.id, report_data=quality_report_dict, generated_at=datetime.datetime.now()
-                )
-                self.db_manager.add_quality_report(new_report.dict())
-                self._add_moai_log("QUALITY_REPORT_GENERATED_ON_DEMAND", f"Relatório de qualidade gerado on-demand para {project.name}..", project_id=project.id, agent_id="AQT")
-                return new_report.report_data
-            except Exception as e:
-                logger.error(f"MOAI: Falha ao gerar relatório de qualidade on-demand para {project_id}: {e}")
-                self._add_moai_log("QUALITY_REPORT_FAILED_ON_DEMAND", f"Falha ao gerar relatório de qualidade on-demand. Erro: {e}", project_id=project.id, agent_id="AQT", status="ERROR")
-                return {"error": f"Falha ao gerar relatório de qualidade: {e}"}
-        return {"error": "Relatório de qualidade não encontrado e projeto não existe para gerar um novo."}
+        """Último relatório de qualidade; sem relatório, enfileira a geração e retorna {"pending": True} na hora."""
+        return self._report_data_or_pending("quality", project_id)
 
     def get_security_audit_report(self, project_id: str) -> Dict[str, Any]:
-        report = self.db_manager.get_security_report_for_project(project_id)
-        if report:
-            return report.report_data
-        
-        project = self.db_manager.get_project_by_id(project_id)
-        if project:
-            try:
-                logger.info(f"MOAI: Gerando relatório de segurança on-demand para o projeto {project_id}...")
-                generated_code_snippets = self.db_manager.get_generated_code_for_project(project.id)
-                # Assumimos que ASEAgent.generate_security_report retorna um Dict[str, Any]
-                security_report_dict = self.ase_agent.generate_security_report(project.id, project.name, [c.dict() for c in generated_code_snippets])
-                new_report = SecurityReport(
-                    id=str(uuid.uuid4()), project_id=project.id, report_data=security_report_dict, generated_at=datetime.datetime.now()
-                )
-                self.db_manager.add_security_report(new_report.dict())
-                self._add_moai_log("SECURITY_REPORT_GENERATED_ON_DEMAND", f"Relatório de segurança gerado on-demand para {project.name}.", project_id=project.id, agent_id="ASE")
-                return new_report.report_data
-            except Exception as e:
-                logger.error(f"MOAI: Falha ao gerar relatório de segurança on-demand para {project_id}: {e}")
-                self._add_moai_log("SECURITY_REPORT_FAILED_ON_DEMAND", f"Falha ao gerar relatório de segurança on-demand. Erro: {e}", project_id=project.id, agent_id="ASE", status="ERROR")
-                return {"error": f"Falha ao gerar relatório de segurança: {e}"}
-        return {"error": "Relatório de segurança não encontrado e projeto não existe para gerar um novo."}
+        """Último relatório de segurança; sem relatório, enfileira a geração e retorna {"pending": True} na hora."""
+        return self._report_data_or_pending("security", project_id)
+
+    def _generate_quality_report(self, project_id: Optional[str]) -> Dict[str, Any]:
+        project = self.db_manager.get_project_by_id(project_id) if project_id else None
+        if not project:
+            raise ValueError("Projeto não existe para gerar um relatório de qualidade.")
+        logger.info(f"MOAI: Gerando relatório de qualidade on-demand para o projeto {project_id}...")
+        generated_code_snippets = self.db_manager.get_generated_code_metadata(project.id)
+        # Assumimos que AQTAgent.generate_quality_report retorna um Dict[str, Any]
+        quality_report_dict = self.aqt_agent.generate_quality_report(project.id, project.name, [c.dict() for c in generated_code_snippets])
+        new_report = QualityReport(
+            id=new_id(), project_id=project.id, report_data=quality_report_dict, generated_at=datetime.datetime.now()
+        )
+        self.db_manager.add_quality_report(new_report.dict())
+        self._add_moai_log("QUALITY_REPORT_GENERATED_ON_DEMAND", f"Relatório de qualidade gerado on-demand para {project.name}..", project_id=project.id, agent_id="AQT")
+        return new_report.report_data
+
+    def _generate_security_report(self, project_id: Optional[str]) -> Dict[str, Any]:
+        project = self.db_manager.get_project_by_id(project_id) if project_id else None
+        if not project:
+            raise ValueError("Projeto não existe para gerar um relatório de segurança.")
+        logger.info(f"MOAI: Gerando relatório de segurança on-demand para o projeto {project_id}...")
+        generated_code_snippets = self.db_manager.get_generated_code_metadata(project.id)
+        # Assumimos que ASEAgent.generate_security_report retorna um Dict[str, Any]
+        security_report_dict = self.ase_agent.generate_security_report(project.id, project.name, [c.dict() for c in generated_code_snippets])
+        new_report = SecurityReport(
+            id=new_id(), project_id=project.id, report_data=security_report_dict, generated_at=datetime.datetime.now()
+        )
+        self.db_manager.add_security_report(new_report.dict())
+        self._add_moai_log("SECURITY_REPORT_GENERATED_ON_DEMAND", f"Relatório de segurança gerado on-demand para {project.name}.", project_id=project.id, agent_id="ASE")
+        return new_report.report_data
 
     def get_documentation_for_project(self, project_id: str) -> List[Documentation]:
+        self._ensure_project_hot(project_id)
         return self.db_manager.get_documentation_by_project(project_id)
 
+    def get_documentation_metadata(self, project_id: str) -> List[DocumentationInfo]:
+        self._ensure_project_hot(project_id)
+        return self.db_manager.get_documentation_metadata(project_id)
+
+    def get_documentation_content(self, doc_id: str) -> Optional[str]:
+        return self.db_manager.get_documentation_content(doc_id)
+
+    @coalesced("generate_project_documentation")
     def generate_project_documentation(self, project_id: str) -> Dict[str, Any]:
+        self._ensure_project_hot(project_id)
         project = self.db_manager.get_project_by_id(project_id)
         if not project:
             return {"success": False, "message": "Projeto não encontrado."}
@@ -895,7 +1352,7 @@ class SynapseForgeBackend:
                 final_doc_type = doc_content_dict.get('document_type', chosen_doc_type)
 
                 new_doc_obj = Documentation(
-                    id=str(uuid.uuid4()),
+                    id=new_id(),
                     project_id=project_id,
                     filename=doc_content_dict.get('filename', f'doc_{uuid.uuid4().hex[:8]}.md'),
                     content=doc_content_dict['content'],
@@ -914,60 +1371,119 @@ class SynapseForgeBackend:
             return {"success": False, "message": f"Erro ao gerar documentação: {e}"}
 
     def get_commercial_report(self) -> Dict[str, Any]:
-        proposals = self.db_manager.get_all_proposals()
-        total_geradas = len(proposals)
-        aprovadas = len([p for p in proposals if p.status == "approved"])
-        rejeitadas = len([p for p in proposals if p.status == "rejected"])
-        
-        taxa_aprovacao = (aprovadas / total_geradas * 100) if total_geradas > 0 else 0
-        
-        valor_total_gerado = 0.0
-        valor_total_aprovado = 0.0
-        for p in proposals:
-            if p.estimated_value_moai is not None:
-                valor_total_gerado += p.estimated_value_moai
-                if p.status == "approved":
-                    valor_total_aprovado += p.estimated_value_moai
+        # Calculado de forma vetorizada e em cache pela versão dos dados (ver PortfolioAnalytics)
+        report = self.analytics.commercial_summary()
+        report["last_update"] = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        return report
 
-        return {
-            "propostas_geradas": total_geradas,
-            "propostas_aprovadas": aprovadas,
-            "propostas_rejeitadas": rejeitadas,
-            "taxa_aprovacao": taxa_aprovacao,
-            "valor_total_gerado": valor_total_gerado,
-            "valor_total_aprovado": valor_total_aprovado,
-            "last_update": datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        }
+    def get_portfolio_analytics(self) -> Dict[str, Any]:
+        return self.analytics.frames()
 
     def get_monitoring_summary(self, project_id: Optional[str] = None) -> Dict[str, Any]:
-        summary_db = self.db_manager.get_monitoring_summary(project_id=project_id)
-        if summary_db:
-            return summary_db.summary_data
-        
+        """Último resumo de monitoramento; sem resumo, enfileira a geração e retorna {"pending": True} na hora."""
+        return self._report_data_or_pending("monitoring", project_id)
+
+    def _generate_monitoring_summary(self, project_id: Optional[str]) -> Dict[str, Any]:
         project_name = None
         if project_id:
             project = self.db_manager.get_project_by_id(project_id)
             if project:
                 project_name = project.name
-        
+
+        logger.info(f"MOAI: Gerando resumo de monitoramento on-demand para {'global' if project_id is None else project_name}...")
+        # Assumimos que AMSAgent.generate_monitoring_summary retorna um Dict[str, Any]
+        summary_data_dict = self.ams_agent.generate_monitoring_summary(project_id=project_id, project_name=project_name)
+
+        new_summary = MonitoringSummary(
+            id=new_id(), project_id=project_id, summary_data=summary_data_dict, generated_at=datetime.datetime.now()
+        )
+        self.db_manager.add_monitoring_summary(new_summary.dict())
+        self._add_moai_log("MONITORING_SUMMARY_GENERATED_ON_DEMAND", f"Resumo de monitoramento gerado on-demand para {'global' if project_id is None else project_name}.", project_id=project_id, agent_id="AMS")
+        return new_summary.summary_data
+
+    # Relatórios gerados pelo LLM sob demanda: tipo -> (nome no log, agente, rótulo)
+    REPORT_KINDS = {
+        "quality": ("QUALITY_REPORT", "AQT", "relatório de qualidade"),
+        "security": ("SECURITY_REPORT", "ASE", "relatório de segurança"),
+        "monitoring": ("MONITORING_SUMMARY", "AMS", "resumo de monitoramento"),
+    }
+    # Tipos com variante global (project_id None); os demais exigem um projeto
+    GLOBAL_REPORT_KINDS = ("monitoring",)
+
+    def _latest_report(self, kind: str, project_id: Optional[str]) -> Optional[Union[QualityReport, SecurityReport, MonitoringSummary]]:
+        if kind == "quality":
+            return self.db_manager.get_quality_report_for_project(project_id)
+        if kind == "security":
+            return self.db_manager.get_security_report_for_project(project_id)
+        return self.db_manager.get_monitoring_summary(project_id=project_id)
+
+    def _run_report_job(self, kind: str, project_id: Optional[str]):
+        generate = {"quality": self._generate_quality_report, "security": self._generate_security_report,
+                    "monitoring": self._generate_monitoring_summary}[kind]
+        event_prefix, agent_id, label = self.REPORT_KINDS[kind]
         try:
-            logger.info(f"MOAI: Gerando resumo de monitoramento on-demand para {'global' if project_id is None else project_name}...")
-            # Assumimos que AMSAgent.generate_monitoring_summary retorna um Dict[str, Any]
-            summary_data_dict = self.ams_agent.generate_monitoring_summary(project_id=project_id, project_name=project_name)
-            
-            new_summary = MonitoringSummary(
-                id=str(uuid.uuid4()), project_id=project_id, summary_data=summary_data_dict, generated_at=datetime.datetime.now()
-            )
-            self.db_manager.add_monitoring_summary(new_summary.dict())
-            self._add_moai_log("MONITORING_SUMMARY_GENERATED_ON_DEMAND", f"Resumo de monitoramento gerado on-demand para {'global' if project_id is None else project_name}.", project_id=project_id, agent_id="AMS")
-            return new_summary.summary_data
+            generate(project_id)
+            with self._report_failures_lock:
+                self._report_failures.pop((kind, project_id), None)
         except Exception as e:
-            logger.error(f"MOAI: Falha ao gerar resumo de monitoramento on-demand para {'global' if project_id is None else project_name}: {e}")
-            self._add_moai_log("MONITORING_SUMMARY_FAILED_ON_DEMAND", f"Falha ao gerar resumo de monitoramento on-demand. Erro: {e}", project_id=project_id, agent_id="AMS", status="ERROR")
-            return {"error": f"Falha ao gerar resumo de monitoramento: {e}"}
+            logger.error(f"MOAI: Falha ao gerar {label} on-demand para {project_id or 'global'}: {e}")
+            with self._report_failures_lock:
+                self._report_failures[(kind, project_id)] = f"Falha ao gerar {label}: {e}"
+            self._add_moai_log(f"{event_prefix}_FAILED_ON_DEMAND", f"Falha ao gerar {label} on-demand. Erro: {e}", project_id=project_id, agent_id=agent_id, status="ERROR")
+
+    @staticmethod
+    def _report_flight_key(kind: str, project_id: Optional[str]) -> Tuple[str, Optional[str], str]:
+        return flight_key(f"{kind}_report", project_id)
+
+    def _enqueue_report_job(self, kind: str, project_id: Optional[str]) -> Future:
+        """Enfileira a geração do relatório; pedidos concorrentes do mesmo relatório recebem o mesmo job."""
+        return self.single_flight.submit(self._report_flight_key(kind, project_id), self.report_executor, self._run_report_job, kind, project_id)
+
+    def request_report(self, kind: str, project_id: Optional[str] = None, regenerate: bool = False) -> Dict[str, Any]:
+        """
+        Estado de um relatório sob demanda, sem esperar o LLM: {"data", "generated_at", "pending", "error"}.
+        Sem relatório (ou com `regenerate`, ou com um resumo de monitoramento mais antigo que
+        monitoring_max_age) a geração é enfileirada e o último relatório, se houver, é devolvido
+        enquanto isso. Após uma falha (inclusive de um resumo vencido), só uma nova chamada com
+        `regenerate` tenta de novo.
+        """
+        if kind not in self.REPORT_KINDS:
+            raise ValueError(f"Tipo de relatório desconhecido: {kind}")
+        self._ensure_project_hot(project_id)
+        key = (kind, project_id)
+        report = self._latest_report(kind, project_id)
+        stale = kind == "monitoring" and report is not None and datetime.datetime.now() - report.generated_at >= self.monitoring_max_age
+        # Verificação e enfileiramento sob o lock: um job que falha agora não deixa passar uma nova tentativa
+        with self._report_failures_lock:
+            if regenerate:
+                self._report_failures.pop(key, None)
+            if regenerate or ((report is None or stale) and key not in self._report_failures):
+                self._enqueue_report_job(kind, project_id)
+        pending = self.single_flight.in_flight(self._report_flight_key(kind, project_id))
+        if report is None and not pending:
+            # O job pode ter terminado entre a leitura e a verificação
+            report = self._latest_report(kind, project_id)
+        return {
+            "data": (report.summary_data if kind == "monitoring" else report.report_data) if report else None,
+            "generated_at": report.generated_at if report else None,
+            "pending": pending,
+            "error": self._failure_for(key),
+        }
+
+    def _failure_for(self, key: Tuple[str, Optional[str]]) -> Optional[str]:
+        with self._report_failures_lock:
+            return self._report_failures.get(key)
+
+    def _report_data_or_pending(self, kind: str, project_id: Optional[str]) -> Dict[str, Any]:
+        state = self.request_report(kind, project_id)
+        if state["data"] is not None:
+            return state["data"]
+        if state["pending"]:
+            return {"pending": True, "message": f"{self.REPORT_KINDS[kind][2].capitalize()} em geração."}
+        return {"error": state["error"] or f"{self.REPORT_KINDS[kind][2].capitalize()} não encontrado."}
 
     def add_chat_message(self, sender: str, message: str):
-        message_id = str(uuid.uuid4())
+        message_id = new_id()
         timestamp = datetime.datetime.now()
         chat_message = ChatMessage(id=message_id, sender=sender, message=message, timestamp=timestamp)
         self.db_manager.add_chat_message(chat_message.dict())
@@ -975,7 +1491,14 @@ class SynapseForgeBackend:
     def get_chat_history(self) -> List[ChatMessage]:
         return self.db_manager.get_chat_history()
 
-    def process_moai_chat(self, user_message: str) -> str:
+    def get_chat_messages(self, before: Optional[datetime.datetime] = None, before_id: Optional[str] = None,
+                          limit: Optional[int] = None) -> List[ChatMessage]:
+        return self.db_manager.get_chat_messages(before=before, before_id=before_id, limit=limit)
+
+    def iter_chat_history(self) -> Iterator[ChatMessage]:
+        return self.db_manager.iter_chat_history()
+
+    def _build_chat_messages(self, user_message: str) -> List[Dict[str, str]]:
         messages_history = self.db_manager.get_chat_history()
         llm_messages = []
         for msg in messages_history:
@@ -1006,6 +1529,10 @@ FORMATO:
 - Evite respostas fragmentadas ou truncadas"""
         
         llm_messages.insert(0, {'role': 'system', 'content': system_message})
+        return llm_messages
+
+    def process_moai_chat(self, user_message: str) -> str:
+        llm_messages = self._build_chat_messages(user_message)
 
         try:
             moai_model_name = get_agent_model('MOAI_Chat') # O MOAI Chat também usa um modelo
@@ -1032,3 +1559,15 @@ FORMATO:
         except Exception as e:
             logger.error(f"MOAI Chat: Erro inesperado ao processar mensagem do usuário '{user_message}'. Erro: {type(e).__name__}: {e}")
             return f"Ocorreu um erro inesperado ao tentar responder, CVO. ({type(e).__name__}: {e})"
+
+    def stream_moai_chat(self, user_message: str) -> Iterator[str]:
+        """
+        Versão em streaming de process_moai_chat: gera a resposta em trechos. Falhas do LLM viram
+        a mesma mensagem de desculpas, emitida como último trecho. Não grava o histórico.
+        """
+        llm_messages = self._build_chat_messages(user_message)
+        try:
+            yield from self.llm_simulator.chat_stream(llm_messages, model=get_agent_model('MOAI_Chat'))
+        except (LLMConnectionError, LLMGenerationError) as e:
+            logger.error(f"MOAI Chat: Falha ao processar mensagem do usuário '{user_message}' em streaming. Erro: {type(e).__name__}: {e}")
+            yield f"Desculpe, CVO, mas enfrentei um problema técnico ao processar sua solicitação ({type(e).__name__}). Por favor, tente novamente ou verifique a conexão com o LLM."
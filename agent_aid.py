@@ -1,9 +1,15 @@
 # agent_aid.py
 import logging
 import json
-import random
 import datetime
-from typing import Dict, Any, List, cast # Adicionado 'cast'
+import gzip
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, Any, List, Optional, Callable, cast # Adicionado 'cast'
 from pydantic import BaseModel, Field
 from llm_simulator import LLMSimulator, LLMConnectionError, LLMGenerationError
 from agent_models import get_agent_model
@@ -18,9 +24,19 @@ class InfraStatusOutput(BaseModel):
     alerts: List[str] = Field(description="Lista de alertas relacionados à infraestrutura.")
 
 class AgentAID:
-    def __init__(self, llm_simulator: LLMSimulator):
+    # Backup online do SQLite: páginas copiadas por passo e pausa entre passos, liberando o banco para os escritores
+    BACKUP_PAGES_PER_STEP = 256
+    BACKUP_STEP_SLEEP = 0.005
+
+    def __init__(self, llm_simulator: LLMSimulator, db_path: Optional[str] = None):
         self.llm_simulator = llm_simulator
         self.model_name = get_agent_model('AID') # Obtém o modelo para AID
+        # Banco de dados da Synapse Forge a ser copiado; os backups cobrem o banco inteiro (todos os projetos)
+        self.db_path = db_path
+        self.backup_dir = os.getenv("SFORGE_BACKUP_DIR") or os.path.join(
+            os.path.dirname(os.path.abspath(db_path or "synapse_forge.db")), "backups")
+        self.backup_retention = int(os.getenv("SFORGE_BACKUP_RETENTION", "7"))
+        self._backup_lock = threading.Lock() # Um backup por vez
         logger.info(f"AgentAID inicializado com modelo {self.model_name} e pronto para gerenciar infraestrutura.")
 
     def provision_environment(self, project_id: str, project_name: str) -> Dict[str, Any]:
@@ -75,13 +91,19 @@ class AgentAID:
             response_raw = self.llm_simulator.chat(messages=messages, model=self.model_name)
             response: Dict[str, Any] = cast(Dict[str, Any], response_raw) # Explicitamente informa ao Pylance que é um dicionário
             logger.info(f"AgentAID: Backups configurados com sucesso para '{project_name}' usando {self.model_name}.")
+            latest_backups = self.list_backups()
+            if latest_backups:
+                last_backup_status = f"Success ({latest_backups[0]['created_at'][:19].replace('T', ' ')})"
+            else:
+                last_backup_status = "Nenhum backup realizado"
             return {
                 "success": True,
                 "message": f"Backups configurados e status obtido. Detalhes: {response.get('content', 'N/A')}",
-                "details": { # Exemplo de detalhes retornados
-                    "policy_data": "Diário, retenção de 7 dias, dados e código.",
-                    "last_backup_status": random.choice(["Success", "Failed"]),
-                    "next_scheduled_backup": (datetime.datetime.now() + datetime.timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S')
+                "details": {
+                    "policy_data": (f"Backup online do banco SQLite em passos de {self.BACKUP_PAGES_PER_STEP} páginas, "
+                                    f"comprimido (gzip) com SHA-256; retenção dos {self.backup_retention} mais recentes."),
+                    "last_backup_status": last_backup_status,
+                    "next_scheduled_backup": "Sob demanda (backup manual)"
                 }
             }
         except (LLMConnectionError, LLMGenerationError) as e:
@@ -130,28 +152,182 @@ class AgentAID:
             logger.error(f"AgentAID: Erro inesperado ao obter status da infraestrutura: {e}")
             return {"error": str(e), "overall_status": "Critical", "resources": {}, "last_check": datetime.datetime.now().isoformat(), "alerts": [f"Erro inesperado: {e}"]}
 
-    def trigger_manual_backup(self, project_id: str) -> Dict[str, Any]:
+    def trigger_manual_backup(self, project_id: str,
+                              progress_callback: Optional[Callable[[float], None]] = None) -> Dict[str, Any]:
         """
-        Simula o acionamento de um backup manual.
+        Executa um backup online do banco com a API de backup do sqlite3, em passos de
+        BACKUP_PAGES_PER_STEP páginas (os escritores não ficam bloqueados durante a cópia).
+        A cópia é comprimida com gzip, registrada num manifesto JSON com o SHA-256 e as
+        métricas de tempo/vazão, e a política de retenção é aplicada em seguida.
+        progress_callback recebe a fração copiada (0.0 a 1.0) a cada passo.
         """
-        logger.info(f"AgentAID: Acionando backup manual para o projeto (ID: {project_id})...")
-        # Simula o resultado de uma operação de backup
-        success = random.choice([True, False])
-        if success:
-            message = "Backup manual concluído com sucesso."
+        logger.info(f"AgentAID: Acionando backup manual (solicitado pelo projeto {project_id})...")
+        if not self.db_path:
+            return {"success": False, "message": "Banco de dados não configurado para backup."}
+        if not self._backup_lock.acquire(blocking=False):
+            return {"success": False, "message": "Já existe um backup em andamento."}
+        try:
+            manifest = self._run_backup(progress_callback)
+            removed = self._apply_backup_retention()
+            message = (f"Backup manual concluído: {manifest['filename']} "
+                       f"({manifest['db_size'] / 1048576:.1f} MB -> {manifest['compressed_size'] / 1048576:.1f} MB, "
+                       f"{manifest['duration_seconds']:.2f}s, {manifest['throughput_mb_s']:.1f} MB/s).")
+            if removed:
+                message += f" {removed} backup(s) antigo(s) removido(s) pela retenção."
             logger.info(f"AgentAID: {message}")
-        else:
-            message = "Falha no backup manual. Verifique os logs."
-            logger.error(f"AgentAID: {message}")
-        return {"success": success, "message": message}
+            return {"success": True, "message": message, "details": manifest}
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f"AgentAID: Falha no backup manual: {e}")
+            return {"success": False, "message": f"Falha no backup manual: {e}"}
+        finally:
+            self._backup_lock.release()
+
+    def _run_backup(self, progress_callback: Optional[Callable[[float], None]]) -> Dict[str, Any]:
+        os.makedirs(self.backup_dir, exist_ok=True)
+        created_at = datetime.datetime.now()
+        base_name = f"{os.path.splitext(os.path.basename(self.db_path))[0]}_{created_at:%Y%m%d_%H%M%S_%f}"
+        raw_path = os.path.join(self.backup_dir, base_name + ".db.partial")
+        archive_path = os.path.join(self.backup_dir, base_name + ".db.gz")
+        progress = {"pages": 0, "steps": 0}
+
+        def on_progress(status: int, remaining: int, total: int):
+            progress["pages"] = total
+            progress["steps"] += 1
+            if progress_callback:
+                progress_callback((total - remaining) / total if total else 1.0)
+
+        try:
+            copy_start = time.perf_counter()
+            source = sqlite3.connect(self.db_path)
+            target = sqlite3.connect(raw_path)
+            try:
+                source.backup(target, pages=self.BACKUP_PAGES_PER_STEP, progress=on_progress, sleep=self.BACKUP_STEP_SLEEP)
+            finally:
+                target.close()
+                source.close()
+            copy_seconds = time.perf_counter() - copy_start
+
+            compress_start = time.perf_counter()
+            digest = hashlib.sha256()
+            with open(raw_path, "rb") as raw_file, gzip.open(archive_path, "wb", compresslevel=6) as archive_file:
+                for chunk in iter(lambda: raw_file.read(1 << 20), b""):
+                    digest.update(chunk)
+                    archive_file.write(chunk)
+            compress_seconds = time.perf_counter() - compress_start
+            db_size = os.path.getsize(raw_path)
+        finally:
+            if os.path.exists(raw_path):
+                os.remove(raw_path)
+
+        duration = copy_seconds + compress_seconds
+        manifest = {
+            "filename": os.path.basename(archive_path),
+            "created_at": created_at.isoformat(),
+            "db_size": db_size,
+            "compressed_size": os.path.getsize(archive_path),
+            "sha256": digest.hexdigest(), # Do banco descomprimido, conferido na restauração
+            "pages": progress["pages"],
+            "steps": progress["steps"],
+            "copy_seconds": round(copy_seconds, 3),
+            "compress_seconds": round(compress_seconds, 3),
+            "duration_seconds": round(duration, 3),
+            "throughput_mb_s": round(db_size / 1048576 / duration, 2) if duration else 0.0,
+        }
+        self._write_manifest(manifest)
+        return manifest
+
+    def _manifest_path(self, backup_filename: str) -> str:
+        return os.path.join(self.backup_dir, backup_filename[:-len(".db.gz")] + ".json")
+
+    def _write_manifest(self, manifest: Dict[str, Any]):
+        manifest_path = self._manifest_path(manifest["filename"])
+        with open(manifest_path + ".tmp", "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+        os.replace(manifest_path + ".tmp", manifest_path)
+
+    def list_backups(self) -> List[Dict[str, Any]]:
+        """Manifestos dos backups existentes, do mais recente para o mais antigo."""
+        if not os.path.isdir(self.backup_dir):
+            return []
+        manifests = []
+        for entry in sorted(os.listdir(self.backup_dir), reverse=True):
+            if not entry.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.backup_dir, entry), encoding="utf-8") as manifest_file:
+                    manifest = json.load(manifest_file)
+            except (OSError, ValueError) as e:
+                logger.warning(f"AgentAID: Manifesto de backup ilegível ignorado ({entry}): {e}")
+                continue
+            if os.path.exists(os.path.join(self.backup_dir, manifest.get("filename", ""))):
+                manifests.append(manifest)
+        return manifests
+
+    def _apply_backup_retention(self) -> int:
+        """Remove os backups além dos backup_retention mais recentes. Retorna quantos foram removidos."""
+        expired = self.list_backups()[self.backup_retention:]
+        for manifest in expired:
+            for path in (os.path.join(self.backup_dir, manifest["filename"]), self._manifest_path(manifest["filename"])):
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.warning(f"AgentAID: Não foi possível remover o backup expirado {path}: {e}")
+        return len(expired)
 
     def schedule_test_restore(self, project_id: str) -> Dict[str, Any]:
         """
-        Simula o agendamento de um teste de restauração de backup.
+        Executa o teste de restauração do backup mais recente: descomprime num arquivo temporário,
+        confere o SHA-256 do manifesto e roda PRAGMA integrity_check. O resultado e os tempos
+        ficam gravados no manifesto do backup testado.
         """
-        logger.info(f"AgentAID: Agendando teste de restauração para o projeto (ID: {project_id})...")
-        # Simula o agendamento
-        test_time = datetime.datetime.now() + datetime.timedelta(hours=random.randint(1, 24))
-        message = f"Teste de restauração agendado para {test_time.strftime('%Y-%m-%d %H:%M:%S')}."
-        logger.info(f"AgentAID: {message}")
-        return {"success": True, "message": message}
+        logger.info(f"AgentAID: Executando teste de restauração (solicitado pelo projeto {project_id})...")
+        backups = self.list_backups()
+        if not backups:
+            return {"success": False, "message": "Nenhum backup disponível para testar a restauração."}
+        manifest = backups[0]
+        try:
+            with tempfile.TemporaryDirectory(prefix="sforge_restore_") as scratch_dir:
+                restored_path = os.path.join(scratch_dir, "restore_test.db")
+                restore_start = time.perf_counter()
+                digest = hashlib.sha256()
+                with gzip.open(os.path.join(self.backup_dir, manifest["filename"]), "rb") as archive_file, \
+                        open(restored_path, "wb") as restored_file:
+                    for chunk in iter(lambda: archive_file.read(1 << 20), b""):
+                        digest.update(chunk)
+                        restored_file.write(chunk)
+                restore_seconds = time.perf_counter() - restore_start
+
+                verify_start = time.perf_counter()
+                conn = sqlite3.connect(restored_path)
+                try:
+                    integrity = conn.execute("PRAGMA integrity_check").fetchone()[0]
+                    table_count = conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'").fetchone()[0]
+                finally:
+                    conn.close()
+                verify_seconds = time.perf_counter() - verify_start
+        except (sqlite3.Error, OSError, EOFError, UnicodeDecodeError) as e: # Cópia corrompida pode gerar texto inválido no sqlite3
+            logger.error(f"AgentAID: Falha no teste de restauração de {manifest['filename']}: {e}")
+            return {"success": False, "message": f"Falha no teste de restauração: {e}"}
+
+        checksum_ok = digest.hexdigest() == manifest["sha256"]
+        restore_test = {
+            "tested_at": datetime.datetime.now().isoformat(),
+            "success": checksum_ok and integrity == "ok",
+            "checksum_ok": checksum_ok,
+            "integrity": integrity,
+            "tables": table_count,
+            "restore_seconds": round(restore_seconds, 3),
+            "verify_seconds": round(verify_seconds, 3),
+        }
+        manifest["restore_test"] = restore_test
+        self._write_manifest(manifest)
+
+        if restore_test["success"]:
+            message = (f"Teste de restauração de {manifest['filename']} aprovado: checksum e integridade OK "
+                       f"({table_count} tabelas; restauração {restore_seconds:.2f}s, verificação {verify_seconds:.2f}s).")
+            logger.info(f"AgentAID: {message}")
+        else:
+            message = (f"Teste de restauração de {manifest['filename']} reprovado: "
+                       f"checksum {'OK' if checksum_ok else 'divergente'}, integridade '{integrity}'.")
+            logger.error(f"AgentAID: {message}")
+        return {"success": restore_test["success"], "message": message, "details": restore_test}
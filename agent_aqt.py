@@ -30,7 +30,8 @@ class AgentAQT:
         """
         # Simula a análise de código para gerar um relatório
         simulated_analysis = {
-            "total_lines": sum(len(c.get('content', '').split('\n')) for c in code_snippets),
+            # Aceita tanto snippets completos quanto metadados (line_count) sem o conteúdo
+            "total_lines": sum(c['line_count'] if 'line_count' in c else len(c.get('content', '').split('\n')) for c in code_snippets),
             "total_files": len(code_snippets),
             "potential_bugs": random.randint(0, 5),
             "test_coverage": random.randint(70, 95),
@@ -0,0 +1,208 @@
+# batch_proposals.py
+"""
+Geração de propostas em lote a partir de planilhas de requisitos (CSV ou JSONL).
+
+Cada linha (CSV com cabeçalho) ou objeto (JSONL) tem o formato do `req_data` da Entrada de
+Requisitos: nome_projeto, nome_cliente, problema_negocio, objetivos_projeto,
+funcionalidades_esperadas, restricoes e publico_alvo. As propostas são geradas pelo ANP
+(ARA, AAD e AGP) com concorrência limitada e gravadas como pendentes via create_proposal.
+
+O progresso fica num arquivo JSONL ao lado da entrada (<entrada>.progress.jsonl), gravado a
+cada proposta concluída: ao reiniciar, as linhas já geradas são puladas e só as pendentes ou
+com falha são processadas. Ao final são exibidas vazão e latências.
+
+Uso: python batch_proposals.py requisitos.csv [--concurrency 4] [--progress arquivo] [--limit N]
+"""
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from MOAI import SynapseForgeBackend
+
+logger = logging.getLogger(__name__)
+
+REQ_FIELDS = (
+    "nome_projeto", "nome_cliente", "problema_negocio", "objetivos_projeto",
+    "funcionalidades_esperadas", "restricoes", "publico_alvo",
+)
+# Mesmos obrigatórios do formulário da Entrada de Requisitos
+REQUIRED_FIELDS = ("nome_projeto", "nome_cliente", "problema_negocio")
+
+
+def read_requirements(path: str) -> Iterator[Tuple[int, Union[str, Dict[str, Any]]]]:
+    """
+    Gera (número da linha, registro) a partir de um CSV com cabeçalho (dict por linha) ou de um
+    JSONL (texto da linha, decodificado em normalize_requirements para contar erros por linha).
+    """
+    if path.lower().endswith((".jsonl", ".ndjson")):
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if line.strip():
+                    yield line_number, line
+    else:
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            # Linha 1 é o cabeçalho
+            for line_number, row in enumerate(csv.DictReader(f), start=2):
+                yield line_number, row
+
+
+def normalize_requirements(raw: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """req_data validado a partir de uma linha do arquivo; ValueError se a linha for inválida."""
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON inválido: {e}")
+    if not isinstance(raw, dict):
+        raise ValueError(f"esperado um objeto com os campos do formulário, recebido {type(raw).__name__}")
+    req_data = {field: str(raw.get(field) or "").strip() for field in REQ_FIELDS}
+    missing = [field for field in REQUIRED_FIELDS if not req_data[field]]
+    if missing:
+        raise ValueError(f"campos obrigatórios ausentes: {', '.join(missing)}")
+    return req_data
+
+
+def row_key(line_number: int, req_data: Dict[str, Any]) -> str:
+    """Identifica a linha entre execuções: posição + conteúdo (editar a linha gera de novo)."""
+    digest = hashlib.sha256(json.dumps(req_data, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+    return f"{line_number}:{digest[:16]}"
+
+
+def load_progress(progress_path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Último registro de cada linha já processada (as falhas são reprocessadas).
+    Uma execução interrompida no meio de uma gravação deixa a última linha incompleta: ela é
+    descartada e cortada do arquivo, para que os novos registros comecem numa linha própria
+    (a linha de entrada correspondente é simplesmente processada de novo).
+    """
+    progress: Dict[str, Dict[str, Any]] = {}
+    if not os.path.exists(progress_path):
+        return progress
+    with open(progress_path, "rb") as f:
+        data = f.read()
+    lines = data.split(b"\n")
+    offset = 0
+    for index, line in enumerate(lines):
+        line_start, offset = offset, offset + len(line) + 1
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line.decode("utf-8"))
+        except ValueError:
+            if any(rest.strip() for rest in lines[index + 1:]):
+                raise
+            print(f"Última linha de {progress_path} incompleta (execução interrompida); descartada.", file=sys.stderr)
+            with open(progress_path, "r+b") as f:
+                f.truncate(line_start)
+            return progress
+        progress[entry["key"]] = entry
+    if data and not data.endswith(b"\n"):
+        # Registro completo gravado sem a quebra de linha final
+        with open(progress_path, "ab") as f:
+            f.write(b"\n")
+    return progress
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Percentil por posição mais próxima (lista já ordenada e não vazia)."""
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def generate(backend: SynapseForgeBackend, req_data: Dict[str, Any]) -> Tuple[str, float]:
+    started = time.perf_counter()
+    proposal = backend.generate_proposal(req_data)
+    return proposal.id, (time.perf_counter() - started) * 1000
+
+
+def run(input_path: str, concurrency: int, progress_path: str, limit: Optional[int] = None) -> Dict[str, Any]:
+    progress = load_progress(progress_path)
+    pending: List[Tuple[str, int, Dict[str, Any]]] = []
+    skipped = invalid = 0
+    for line_number, raw in read_requirements(input_path):
+        try:
+            req_data = normalize_requirements(raw)
+        except ValueError as e:
+            invalid += 1
+            print(f"Linha {line_number} ignorada: {e}", file=sys.stderr)
+            continue
+        key = row_key(line_number, req_data)
+        if progress.get(key, {}).get("status") == "ok":
+            skipped += 1
+            continue
+        pending.append((key, line_number, req_data))
+    if limit is not None:
+        pending = pending[:limit]
+
+    print(f"{len(pending)} proposta(s) a gerar, {skipped} já geradas em execuções anteriores, {invalid} linha(s) inválida(s). "
+          f"Concorrência: {concurrency}.")
+    backend = SynapseForgeBackend()
+    latencies: List[float] = []
+    failed = 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="sforge-batch") as executor, \
+            open(progress_path, "a", encoding="utf-8") as progress_file:
+        futures = {executor.submit(generate, backend, req_data): (key, line_number, req_data) for key, line_number, req_data in pending}
+        for done_count, future in enumerate(as_completed(futures), start=1):
+            key, line_number, req_data = futures[future]
+            entry: Dict[str, Any] = {"key": key, "line": line_number, "nome_projeto": req_data["nome_projeto"]}
+            try:
+                proposal_id, latency_ms = future.result()
+                latencies.append(latency_ms)
+                entry.update(status="ok", proposal_id=proposal_id, latency_ms=round(latency_ms, 1))
+            except Exception as e:
+                failed += 1
+                logger.error(f"Falha ao gerar proposta da linha {line_number}: {e}")
+                entry.update(status="error", error=f"{type(e).__name__}: {e}")
+            # Um registro por proposta concluída: é o ponto de retomada se o processo cair
+            progress_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            progress_file.flush()
+            print(f"[{done_count}/{len(pending)}] linha {line_number} ({req_data['nome_projeto']}): "
+                  f"{'ok ' + str(round(entry['latency_ms'])) + ' ms' if entry['status'] == 'ok' else entry['error']}")
+    elapsed = time.perf_counter() - started
+
+    stats: Dict[str, Any] = {
+        "generated": len(latencies), "failed": failed, "skipped": skipped, "invalid": invalid,
+        "elapsed_s": elapsed, "per_minute": len(latencies) / elapsed * 60 if elapsed > 0 else 0.0,
+    }
+    if latencies:
+        ordered = sorted(latencies)
+        stats.update(latency_mean_ms=sum(ordered) / len(ordered), latency_p50_ms=percentile(ordered, 0.5),
+                     latency_p90_ms=percentile(ordered, 0.9), latency_p99_ms=percentile(ordered, 0.99),
+                     latency_max_ms=ordered[-1])
+    return stats
+
+
+def print_stats(stats: Dict[str, Any]):
+    print(f"\nGeradas: {stats['generated']} | falhas: {stats['failed']} | puladas (retomada): {stats['skipped']} | inválidas: {stats['invalid']}")
+    print(f"Tempo total: {stats['elapsed_s']:.1f} s | vazão: {stats['per_minute']:.1f} propostas/min")
+    if stats["generated"]:
+        print(f"Latência por proposta (ms): média {stats['latency_mean_ms']:.0f} | p50 {stats['latency_p50_ms']:.0f} | "
+              f"p90 {stats['latency_p90_ms']:.0f} | p99 {stats['latency_p99_ms']:.0f} | máx {stats['latency_max_ms']:.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="Arquivo CSV (com cabeçalho) ou JSONL com os requisitos")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("SFORGE_BATCH_CONCURRENCY", "4")),
+                        help="Propostas geradas em paralelo (padrão: 4)")
+    parser.add_argument("--progress", help="Arquivo de progresso para retomada (padrão: <entrada>.progress.jsonl)")
+    parser.add_argument("--limit", type=int, help="Processa no máximo N linhas pendentes")
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency deve ser pelo menos 1")
+
+    stats = run(args.input, args.concurrency, args.progress or f"{args.input}.progress.jsonl", args.limit)
+    print_stats(stats)
+    sys.exit(1 if stats["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# bench_db_reads.py
+"""
+Micro-benchmark das leituras do DatabaseManager.
+
+Popula um banco temporário com N propostas e compara o tempo de listagem do
+caminho legado (Proposal(**row) por linha), da validação em lote com TypeAdapter,
+das leituras confiáveis (sem revalidação) e da projeção parcial de colunas.
+
+Uso: python bench_db_reads.py [--rows 100000]
+"""
+import argparse
+import datetime
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+
+from data_models import Proposal
+from database_manager import DatabaseManager
+
+
+def populate(db_path: str, rows: int):
+    conn = sqlite3.connect(db_path, detect_types=sqlite3.PARSE_DECLTYPES)
+    now = datetime.datetime.now()
+    requirements = json.dumps({
+        "nome_projeto": "Projeto de Benchmark",
+        "nome_cliente": "Cliente Benchmark",
+        "problema_negocio": "Problema de negócio de exemplo " * 4,
+        "funcionalidades_esperadas": "Cadastro, relatórios, integrações",
+    })
+    conn.executemany(
+        """
+        INSERT INTO proposals (id, title, description, requirements, problem_understanding_moai,
+                               solution_proposal_moai, scope_moai, technologies_suggested_moai,
+                               estimated_value_moai, estimated_time_moai, terms_conditions_moai,
+                               status, submitted_at, approved_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            (
+                str(uuid.uuid4()), f"Proposta {i}", "Descrição da proposta", requirements,
+                "Entendimento", "Solução", "Escopo", "Python, FastAPI, PostgreSQL",
+                float(i % 1000) * 100.0, "3 meses", "Termos padrão",
+                ("pending", "approved", "rejected")[i % 3], now - datetime.timedelta(minutes=i), None,
+            )
+            for i in range(rows)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def legacy_read(db_path: str):
+    """Reproduz a leitura original: PARSE_DECLTYPES + validação Pydantic linha a linha."""
+    conn = sqlite3.connect(db_path, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute("SELECT * FROM proposals").fetchall()
+    conn.close()
+    proposals = []
+    for row in rows:
+        proposal_dict = dict(row)
+        proposal_dict["requirements"] = json.loads(proposal_dict["requirements"])
+        proposals.append(Proposal(**proposal_dict))
+    return proposals
+
+
+def timed(label: str, fn, repeat: int = 3):
+    """Executa `fn` algumas vezes e reporta o melhor tempo (menos ruído de GC/cache)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+        del result
+    print(f"{label:<45} {best:8.3f}s")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench.db")
+        validated = DatabaseManager(db_path, trusted_reads=False)
+        trusted = DatabaseManager(db_path, trusted_reads=True)
+        populate(db_path, args.rows)
+
+        print(f"Propostas: {args.rows}")
+        baseline = timed("legado (Proposal(**row) por linha)", lambda: legacy_read(db_path))
+        timed("get_all_proposals (TypeAdapter em lote)", validated.get_all_proposals)
+        fast = timed("get_all_proposals (leitura confiável)", trusted.get_all_proposals)
+        projected = timed("get_all_proposals(fields=status, valor)",
+                          lambda: trusted.get_all_proposals(fields=("status", "estimated_value_moai")))
+        print(f"Ganho leitura confiável: {baseline / fast:.1f}x | com projeção: {baseline / projected:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# bench_ids.py
+"""
+Benchmark de inserção e tamanho de índices em moai_logs: IDs UUID4 aleatórios x UUIDv7.
+
+O cenário legado usa chaves UUID4 com os índices de timestamp que a paginação
+exigia; o cenário atual usa new_id() (UUIDv7) com a paginação pela própria chave
+primária. Para cada um mede a vazão de inserção (lotes com commit) e o tamanho
+em disco da tabela e de cada índice (via dbstat).
+
+Uso: python bench_ids.py [--rows 200000] [--batch 500]
+"""
+import argparse
+import datetime
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+
+from data_models import new_id
+from database_manager import DatabaseManager
+
+LEGACY_INDEXES = (
+    "CREATE INDEX idx_moai_logs_timestamp ON moai_logs (timestamp, id)",
+    "CREATE INDEX idx_moai_logs_project ON moai_logs (project_id, timestamp, id)",
+)
+
+
+def prepare(db_path: str, legacy: bool):
+    DatabaseManager(db_path)
+    if legacy:
+        conn = sqlite3.connect(db_path)
+        conn.execute("DROP INDEX IF EXISTS idx_moai_logs_project_id")
+        for statement in LEGACY_INDEXES:
+            conn.execute(statement)
+        conn.commit()
+        conn.close()
+
+
+def insert_logs(db_path: str, rows: int, batch: int, make_id) -> float:
+    conn = sqlite3.connect(db_path, detect_types=sqlite3.PARSE_DECLTYPES)
+    # Sem o índice de busca: mede apenas a tabela e seus índices B-tree
+    conn.execute("DROP TRIGGER IF EXISTS moai_logs_search_ai")
+    project_ids = [new_id() for _ in range(20)]
+    start = time.perf_counter()
+    for offset in range(0, rows, batch):
+        conn.executemany(
+            "INSERT INTO moai_logs (id, timestamp, event_type, details, project_id, agent_id, status) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                (make_id(), datetime.datetime.now(), "AGENT_STATUS_ADEX", "Status: RUNNING. Mensagem: gerando código",
+                 project_ids[i % len(project_ids)], "ADEX", "INFO")
+                for i in range(offset, min(offset + batch, rows))
+            ),
+        )
+        conn.commit()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+
+def btree_sizes(db_path: str):
+    conn = sqlite3.connect(db_path)
+    sizes = conn.execute("""
+        SELECT name, SUM(pgsize) FROM dbstat
+        WHERE name = 'moai_logs' OR name IN (SELECT name FROM sqlite_master WHERE tbl_name = 'moai_logs' AND type = 'index')
+        GROUP BY name ORDER BY name
+    """).fetchall()
+    conn.close()
+    return sizes
+
+
+def run(label: str, rows: int, batch: int, legacy: bool, make_id):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench.db")
+        prepare(db_path, legacy)
+        elapsed = insert_logs(db_path, rows, batch, make_id)
+        sizes = btree_sizes(db_path)
+        total = sum(size for _, size in sizes)
+        print(f"\n{label}: {rows / elapsed:,.0f} inserções/s ({elapsed:.2f}s) | total {total / 1048576:.1f} MB")
+        for name, size in sizes:
+            print(f"  {name:<32} {size / 1048576:8.1f} MB")
+        return rows / elapsed, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+
+    legacy_rate, legacy_size = run("UUID4 + índices de timestamp (legado)", args.rows, args.batch, True, lambda: str(uuid.uuid4()))
+    rate, size = run("UUIDv7 + paginação pela chave primária", args.rows, args.batch, False, new_id)
+    print(f"\nVazão: {rate / legacy_rate:.2f}x | espaço da tabela + índices: {size / legacy_size:.0%} do legado")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import streamlit as st
 import streamlit.components.v1 as components
 import datetime
 import os
+import time
 import random
 import pandas as pd
 import plotly.express as px
@@ -13,10 +14,15 @@ from MOAI import SynapseForgeBackend
 # Importa as exceções personalizadas para tratamento específico
 from llm_simulator import LLMConnectionError, LLMGenerationError
 # Importa os modelos de dados
-from data_models import Proposal, Project, Documentation, ChatMessage, MOAILog
+from data_models import Proposal, Project, Documentation, ChatMessage, MOAILog, short_id
+from view_cache import ViewModelCache
+from moai_api import serve_in_background
 # Importa o módulo de tema customizado
 from streamlit_theme import apply_custom_theme, format_status, create_card # Assumindo que estas funções existem e são úteis
 
+# Início do rerun completo do script (fragmentos reexecutam só a própria função)
+SCRIPT_STARTED_AT = time.perf_counter()
+
 # --- Aplicar Tema Customizado ---
 apply_custom_theme()
 
@@ -58,6 +64,22 @@ div[data-testid="metric-container"] [data-testid="stMetricLabel"] p {
 # e a inicialização de dados de exemplo de forma mais robusta.
 backend = SynapseForgeBackend()
 
+@st.cache_resource
+def start_background_services():
+    """Manutenção do banco e especulação pós-aprovação: uma vez por processo, só na aplicação Streamlit."""
+    backend.start_background_services()
+    return True
+
+start_background_services()
+
+@st.cache_resource
+def start_embedded_api():
+    """API HTTP no mesmo processo (SFORGE_API_PORT), compartilhando o backend: fila de jobs e single-flight."""
+    return serve_in_background(backend, os.getenv("SFORGE_API_HOST", "127.0.0.1"), int(os.environ["SFORGE_API_PORT"]))
+
+if os.getenv("SFORGE_API_PORT"):
+    start_embedded_api()
+
 # --- Funções Auxiliares ---
 def format_currency(value: Optional[float]) -> str:
     """Formata um valor float para a moeda brasileira (R$)."""
@@ -65,14 +87,148 @@ def format_currency(value: Optional[float]) -> str:
         return "N/A"
     return f"R$ {value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
 
+def format_bytes(size: float) -> str:
+    """Formata um tamanho em bytes de forma legível (B, KB, MB, GB)."""
+    for unit in ("B", "KB", "MB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
 # --- Inicializa o estado da aplicação (session_state) ---
 # Garante que as variáveis de estado existam ao iniciar ou recarregar a aplicação.
 if 'current_page' not in st.session_state:
     st.session_state.current_page = "dashboard"
 if 'last_chat_message_time' not in st.session_state:
     st.session_state.last_chat_message_time = datetime.datetime.now()
+if 'search_page_text' not in st.session_state:
+    st.session_state.search_page_text = ""
+# Reruns completos do script no último minuto (painel de depuração)
+_now = time.time()
+st.session_state.full_reruns = [started for started in st.session_state.get("full_reruns", []) if _now - started < 60] + [_now]
+# --- Cache de view models (compartilhado entre sessões, invalidado pelo change_log) ---
+REPORT_TABLES = ("quality_reports", "security_reports", "monitoring_summaries", "projects")
+# TTL em segundos por consulta; as demais só expiram por invalidação. O TTL cobre o que
+# não passa pelo change_log (ex.: rollups de logs, dados do LLM embutidos no resumo).
+VIEW_TTLS = {
+    "dashboard_summary": 60,
+    "agents_activity": 10,
+    "report_portfolio": 120,
+    "blob_stats": 300,
+}
+
+@st.cache_resource
+def get_view_cache() -> ViewModelCache:
+    view_cache = ViewModelCache(backend)
+    backend.add_write_listener(view_cache.mark_dirty) # Escritas do backend revalidam o cache na próxima leitura
+    return view_cache
+
+view_cache = get_view_cache()
+
+def view_cached(key: Any, depends_on, loader):
+    """
+    Retorna o view model em cache para `key` ou o carrega com `loader()`. `depends_on` lista tabelas
+    ou pares (tabela, id) cuja mudança invalida a entrada. Use apenas para leituras do banco.
+    """
+    name = key[0] if isinstance(key, tuple) else key
+    return view_cache.get(key, depends_on, loader, ttl=VIEW_TTLS.get(name))
+
+def cached_all_projects() -> List[Project]:
+    return view_cached("all_projects", ("projects",), backend.get_all_projects)
+
+def cached_project(project_id: str) -> Optional[Project]:
+    return view_cached(("project", project_id), (("projects", project_id),), lambda: backend.get_project_by_id(project_id))
+
+def cached_proposal(proposal_id: str) -> Optional[Proposal]:
+    return view_cached(("proposal", proposal_id), (("proposals", proposal_id),), lambda: backend.get_proposal_by_id(proposal_id))
+
+view_cache.sync()
+
+# --- Painéis ao vivo (st.fragment) ---
+# Reexecutam sozinhos a cada LIVE_PANEL_SECONDS sem rerun completo da página; a barra lateral,
+# o tema e o components.html não são refeitos a cada atualização.
+LIVE_PANEL_SECONDS = 10
+
+def count_fragment_run():
+    st.session_state.fragment_runs = st.session_state.get("fragment_runs", 0) + 1
+
+def log_status_emoji(log: MOAILog) -> str:
+    return "✅" if log.status == "SUCCESS" else ("⚠️" if log.status == "WARNING" else ("❌" if log.status == "ERROR" or log.status == "CRITICAL" else "ℹ️"))
+
+def recent_logs_delta(state_key: str, project_id: Optional[str] = None, limit: int = 5) -> List[MOAILog]:
+    """
+    Últimos `limit` logs mantidos na sessão. Sem mudança na sequência do change_log nada é lido;
+    com mudança, só os logs mais novos que o último exibido são buscados (keyset por id).
+    """
+    feed = st.session_state.get(state_key)
+    seq = view_cache.seq
+    if feed is not None and feed["seq"] == seq:
+        return feed["logs"]
+    if feed is None or not feed["logs"]:
+        logs = backend.get_moai_logs(project_id=project_id, limit=limit)
+    else:
+        newer = backend.get_moai_logs(project_id=project_id, after_id=feed["logs"][0].id, limit=limit)
+        logs = (newer + feed["logs"])[:limit]
+    st.session_state[state_key] = {"seq": seq, "logs": logs}
+    return logs
+
+@st.fragment(run_every=LIVE_PANEL_SECONDS)
+def agents_activity_panel():
+    count_fragment_run()
+    # Compartilhado entre sessões pelo TTL: uma verificação do LLM por intervalo, não uma por sessão
+    agents_data = view_cached("agents_activity", (), backend.get_agents_in_activity)
+    for agent in agents_data:
+        st.markdown(f"- **{agent['name']}**: {agent['status']} - *{agent['last_task']}*")
+
+@st.fragment(run_every=LIVE_PANEL_SECONDS)
+def recent_logs_panel():
+    count_fragment_run()
+    view_cache.sync()
+    latest_logs = recent_logs_delta("dashboard_logs", limit=5)
+    if latest_logs:
+        for log in latest_logs:
+            project_info = f" (Projeto: {short_id(log.project_id)}...)" if log.project_id else ""
+            agent_info = f" (Agente: {log.agent_id})" if log.agent_id else ""
+            st.write(f"{log_status_emoji(log)} {log.timestamp.strftime('%H:%M:%S')} - **{log.event_type}**{project_info}{agent_info}: {log.details}")
+    else:
+        st.info("Nenhum log recente do MOAI para exibir.")
+
+@st.fragment(run_every=LIVE_PANEL_SECONDS)
+def project_progress_panel(project_id: str):
+    """Progresso, fases e logs da orquestração do projeto, atualizados sem rerun completo."""
+    count_fragment_run()
+    view_cache.sync()
+    project = cached_project(project_id)
+    if not project:
+        st.error("Projeto selecionado não encontrado.")
+        return
+    st.progress(project.progress / 100.0, text=f"Progresso Geral: {project.progress}%")
+    st.write(f"**Status:** {project.status}")
+    if project.completed_at:
+        st.write(f"**Concluído em:** {project.completed_at.strftime('%Y-%m-%d')}")
+
+    st.subheader("Fases do Projeto:")
+    phases_data = view_cached(("project_phases", project_id), (("projects", project_id),),
+                              lambda: backend.get_project_phases_status(project_id))
+    for phase in phases_data:
+        status_emoji = "✅" if phase["status"] == "Concluído" else ("⏳" if phase["status"] == "Em Andamento" else "⚪")
+        st.markdown(f"- {status_emoji} **{phase['name']}**: {phase['status']}")
+
+    st.subheader("Logs do Projeto:")
+    # Os 10 logs mais recentes do projeto; as atualizações buscam só os logs novos
+    latest_project_logs = recent_logs_delta(f"project_logs_{project_id}", project_id=project_id, limit=10)
+    if latest_project_logs:
+        for log in latest_project_logs:
+            agent_info = f" (Agente: {log.agent_id})" if log.agent_id else ""
+            st.write(f"{log_status_emoji(log)} {log.timestamp.strftime('%H:%M:%S')} - **{log.event_type}**{agent_info}: {log.details}")
+    else:
+        st.info("Nenhum log para este projeto ainda.")
 
 # --- Funções para Navegação ---
+def set_current_page(page_name: str):
+    """Callback dos botões de navegação: roda antes do rerun do clique, sem forçar um segundo rerun."""
+    st.session_state.current_page = page_name
+
 def navigate_to(page_name: str):
     """Atualiza a página atual e força um re-run do Streamlit para navegar."""
     st.session_state.current_page = page_name
@@ -89,7 +245,7 @@ def dashboard_page():
     """)
 
     # Obtém o resumo do dashboard do backend do MOAI
-    summary = backend.get_dashboard_summary()
+    summary = view_cached("dashboard_summary", ("proposals", "projects"), backend.get_dashboard_summary)
 
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -111,33 +267,20 @@ def dashboard_page():
         st.metric("Projetos Concluídos", summary.get('completed_projects', 0))
     with col5:
         st.subheader("Atividade dos Agentes de IA:")
-        # Chama a função no backend que já lida com a verificação de disponibilidade do LLM
-        agents_data = backend.get_agents_in_activity() 
-        for agent in agents_data:
-            st.markdown(f"- **{agent['name']}**: {agent['status']} - *{agent['last_task']}*")
+        agents_activity_panel()
 
     st.markdown("---")
     st.subheader("Infraestrutura Global (Simulada):")
-    infra_health = backend.get_infrastructure_health() # Obtém dados de saúde da infraestrutura do backend
+    infra_health = backend.get_infrastructure_health() # Snapshot armazenado, renovado quando vence
     st.markdown(f"**Status Geral:** {infra_health['overall_status']}")
+    if infra_health.get("refreshed_at"):
+        st.caption(f"Snapshot de {infra_health['refreshed_at'].strftime('%d/%m/%Y %H:%M:%S')}")
     for component, details in infra_health['components'].items():
         st.markdown(f"- **{component}**: {details['status']} - {details['message']}")
 
     st.markdown("---")
     st.subheader("Logs Recentes do MOAI:")
-    # Acessa diretamente o db_manager do backend para logs
-    all_logs = backend.db_manager.get_all_moai_logs() 
-    if all_logs:
-        # Ordena os logs do mais recente para o mais antigo e pega os 5 primeiros
-        latest_logs = sorted(all_logs, key=lambda x: x.timestamp, reverse=True)[:5]
-        for log in latest_logs:
-            # Seleciona o emoji com base no status do log
-            status_emoji = "✅" if log.status == "SUCCESS" else ("⚠️" if log.status == "WARNING" else ("❌" if log.status == "ERROR" or log.status == "CRITICAL" else "ℹ️"))
-            project_info = f" (Projeto: {log.project_id[:8]}...)" if log.project_id else ""
-            agent_info = f" (Agente: {log.agent_id})" if log.agent_id else ""
-            st.write(f"{status_emoji} {log.timestamp.strftime('%H:%M:%S')} - **{log.event_type}**{project_info}{agent_info}: {log.details}")
-    else:
-        st.info("Nenhum log recente do MOAI para exibir.")
+    recent_logs_panel()
 
 
 def requirements_entry_page():
@@ -188,11 +331,9 @@ def requirements_entry_page():
                 }
                 try:
                     with st.spinner("⏳ MOAI e Agentes trabalhando na sua proposta..."):
-                        # O MOAI agora espera um dicionário do ANP e o converte internamente para a Proposal.
-                        # backend.anp_agent.generate_proposal_content deve retornar Dict[str, Any]
-                        proposal_content_dict = backend.anp_agent.generate_proposal_content(req_data)
-                        new_proposal = backend.create_proposal(req_data, initial_content=proposal_content_dict)
-                    st.success(f"✅ Proposta '{new_proposal.title}' gerada com sucesso! ID: {new_proposal.id[:8]}... Enviada para Central de Aprovações.")
+                        # Envios idênticos simultâneos (duplo clique, outra sessão) compartilham a mesma geração
+                        new_proposal = backend.generate_proposal(req_data)
+                    st.success(f"✅ Proposta '{new_proposal.title}' gerada com sucesso! ID: {short_id(new_proposal.id)}... Enviada para Central de Aprovações.")
                     navigate_to("aprovacoes")
                 except (LLMConnectionError, LLMGenerationError) as e:
                     # Captura erros específicos do LLM e fornece feedback útil
@@ -202,6 +343,325 @@ def requirements_entry_page():
                     st.info(f"Detalhes técnicos: {type(e).__name__}")
 
 
+# --- Paginação no servidor e expanders preguiçosos ---
+PAGE_SIZE_OPTIONS = [10, 25, 50]
+# Colunas lidas para as listagens; o conteúdo completo só é buscado quando o expander abre
+PROPOSAL_LIST_FIELDS = ["title", "status", "submitted_at", "approved_at"]
+CHAT_WINDOW = 30
+
+def _pager_next(state_key: str, cursor: Any):
+    st.session_state[state_key].append(cursor)
+
+def _pager_previous(state_key: str):
+    if len(st.session_state[state_key]) > 1:
+        st.session_state[state_key].pop()
+
+def _pager_reset(state_key: str):
+    st.session_state[state_key] = [None]
+
+def paginate(state_key: str, fetch_page, cursor_of, total: Optional[int] = None) -> list:
+    """
+    Paginação no servidor por keyset. A sessão guarda a pilha de cursores das páginas visitadas e
+    cada rerun busca só a página atual: `fetch_page(cursor, limit)` com um item extra para saber se
+    há próxima página. `cursor_of(item)` dá o cursor do último item, usado para a próxima página.
+    """
+    if state_key not in st.session_state:
+        st.session_state[state_key] = [None]
+    cursors = st.session_state[state_key]
+    page_size = st.session_state.get(f"{state_key}_size", PAGE_SIZE_OPTIONS[0])
+    items = fetch_page(cursors[-1], page_size + 1)
+    if not items and len(cursors) > 1:
+        # A página ficou vazia (itens removidos ou movidos): volta para a primeira
+        cursors[:] = [None]
+        items = fetch_page(None, page_size + 1)
+    has_next = len(items) > page_size
+    items = items[:page_size]
+    if not has_next and len(cursors) == 1 and page_size == PAGE_SIZE_OPTIONS[0]:
+        return items # Cabe numa página: sem controles
+
+    col_previous, col_info, col_next, col_size = st.columns([1, 2, 1, 1])
+    col_previous.button("◀ Anteriores", key=f"{state_key}_previous", disabled=len(cursors) == 1,
+                        on_click=_pager_previous, args=(state_key,), use_container_width=True)
+    pages = f" de {max(1, -(-total // page_size))}" if total is not None else ""
+    col_info.caption(f"Página {len(cursors)}{pages}" + (f" · {total} item(ns)" if total is not None else ""))
+    col_next.button("Próximas ▶", key=f"{state_key}_next", disabled=not has_next,
+                    on_click=_pager_next, args=(state_key, cursor_of(items[-1]) if has_next else None), use_container_width=True)
+    col_size.selectbox("Itens por página", PAGE_SIZE_OPTIONS, key=f"{state_key}_size", label_visibility="collapsed",
+                       on_change=_pager_reset, args=(state_key,))
+    return items
+
+def proposals_page(status: str, cursor: Optional[tuple], limit: int) -> List[Proposal]:
+    before, before_id = cursor if cursor else (None, None)
+    return view_cached(("proposals_page", status, cursor, limit), ("proposals",),
+                       lambda: backend.get_proposals_page(status, before=before, before_id=before_id, limit=limit,
+                                                          fields=PROPOSAL_LIST_FIELDS))
+
+def proposal_count(status: str) -> int:
+    return view_cached(("proposal_count", status), ("proposals",), lambda: backend.count_proposals(status))
+
+def lazy_expander(label: str, key: str):
+    """Expander com estado rastreado: o corpo só deve ser renderizado (e seus dados buscados) se `.open`."""
+    return st.expander(label, expanded=False, key=key, on_change="rerun")
+
+def render_pending_proposal(proposal: Proposal):
+    col_info = st.columns([2, 1])
+    
+    with col_info[0]:
+        st.markdown("#### 🔍 Entendimento do Problema")
+        st.write(proposal.problem_understanding_moai)
+        
+        st.markdown("#### 💡 Solução Proposta")
+        st.write(proposal.solution_proposal_moai)
+        
+        st.markdown("#### 📊 Escopo")
+        st.write(proposal.scope_moai)
+    
+    with col_info[1]:
+        st.markdown("#### 🛠️ Tecnologias")
+        st.write(proposal.technologies_suggested_moai)
+        
+        st.markdown("#### 📈 Estimativas")
+        # Exibir Valor e Prazo com fonte/tamanho consistentes aos campos do formulário
+        st.markdown(f"**Valor:** <span style='font-size:16px'>{format_currency(proposal.estimated_value_moai)}</span>", unsafe_allow_html=True)
+        st.markdown(f"**Prazo:** <span style='font-size:16px'>{proposal.estimated_time_moai}</span>", unsafe_allow_html=True)
+    
+    st.divider()
+    
+    st.markdown("#### 📋 Termos e Condições")
+    st.write(proposal.terms_conditions_moai)
+    
+    st.divider()
+    
+    # Estado para controlar a visibilidade do formulário de edição
+    edit_key = f"edit_proposal_content_{proposal.id}"
+    if edit_key not in st.session_state:
+        st.session_state[edit_key] = False
+
+    col_actions = st.columns(5)
+    with col_actions[0]:
+        if st.button("✅ Aprovar", key=f"approve_{proposal.id}", use_container_width=True):
+            with st.spinner(f"Aprovando proposta '{proposal.title}'..."):
+                project_id = backend.update_proposal_status(proposal.id, "approved")
+                if project_id:
+                    st.success(f"✅ Proposta aprovada! Projeto iniciado com ID: {short_id(project_id)}...")
+                else:
+                    st.error(f"❌ Erro ao criar projeto a partir da proposta.")
+                st.rerun() # Recarrega a página para atualizar as abas
+    
+    with col_actions[1]:
+        if st.button("❌ Rejeitar", key=f"reject_{proposal.id}", use_container_width=True):
+            with st.spinner(f"Rejeitando proposta '{proposal.title}'..."):
+                backend.update_proposal_status(proposal.id, "rejected")
+            st.warning(f"⚠️ Proposta rejeitada.")
+            st.rerun() # Recarrega a página para atualizar as abas
+    
+    with col_actions[2]:
+        if st.button("✏️ Editar", key=f"edit_{proposal.id}", use_container_width=True):
+            # Alterna o estado de edição e força o re-run
+            st.session_state[edit_key] = not st.session_state[edit_key]
+            st.rerun()
+    
+    with col_actions[3]:
+        # Botão "Visualizar Completo" para exibir todos os detalhes da proposta
+        view_full_key = f"view_full_{proposal.id}"
+        if st.button("📋 Visualizar Completo", key=f"full_{proposal.id}", use_container_width=True):
+            st.session_state[view_full_key] = not st.session_state.get(view_full_key, False)
+            # Não precisa de rerun aqui, o conteúdo pode ser expandido/colapsado abaixo
+    with col_actions[4]:
+        if st.button("🗑️ Excluir", key=f"delete_{proposal.id}", use_container_width=True):
+            with st.spinner(f"Removendo proposta '{proposal.title}' e registros associados..."):
+                deleted = backend.delete_proposal(proposal.id)
+            if deleted:
+                st.success(f"🗑️ Proposta '{proposal.title}' removida com sucesso.")
+            else:
+                st.error("❌ Não foi possível remover a proposta. Verifique os logs.")
+            st.rerun()
+    
+    # Exibe o formulário de edição se st.session_state[edit_key] for True
+    if st.session_state[edit_key]:
+        st.markdown("---")
+        st.subheader(f"✏️ Editar Conteúdo da Proposta: {proposal.title}")
+        with st.form(key=f"form_edit_proposal_{proposal.id}"):
+            st.markdown("**Informações Básicas**")
+            col_basic = st.columns(2)
+            with col_basic[0]:
+                edited_title = st.text_input("Título", value=proposal.title)
+            with col_basic[1]:
+                edited_estimated_time = st.text_input("Prazo Estimado", value=proposal.estimated_time_moai)
+            
+            edited_desc = st.text_area("Descrição", value=proposal.description, height=80)
+            
+            st.markdown("**Análise e Proposta**")
+            col_analysis = st.columns(2)
+            with col_analysis[0]:
+                edited_problem_understanding = st.text_area("Entendimento do Problema", value=proposal.problem_understanding_moai, height=100)
+            with col_analysis[1]:
+                edited_solution_proposal = st.text_area("Solução Proposta", value=proposal.solution_proposal_moai, height=100)
+            
+            st.markdown("**Detalhes Técnicos**")
+            col_tech = st.columns(2)
+            with col_tech[0]:
+                edited_scope = st.text_area("Escopo", value=proposal.scope_moai, height=80)
+                edited_technologies = st.text_area("Tecnologias Sugeridas", value=proposal.technologies_suggested_moai, height=80)
+            with col_tech[1]:
+                edited_estimated_value_str = st.text_input("💰 Valor Estimado (R$)", value=format_currency(proposal.estimated_value_moai))
+                edited_terms_conditions = st.text_area("Termos e Condições", value=proposal.terms_conditions_moai, height=80)
+
+            col_submit = st.columns(2)
+            with col_submit[0]:
+                save_changes = st.form_submit_button("💾 Salvar Alterações", use_container_width=True)
+            with col_submit[1]:
+                cancel_edit = st.form_submit_button("❌ Cancelar", use_container_width=True)
+            
+            if save_changes:
+                try:
+                    updated_fields = {
+                        "title": edited_title,
+                        "description": edited_desc,
+                        "problem_understanding_moai": edited_problem_understanding,
+                        "solution_proposal_moai": edited_solution_proposal,
+                        "scope_moai": edited_scope,
+                        "technologies_suggested_moai": edited_technologies,
+                        "estimated_value_moai": edited_estimated_value_str, # Será convertido para float no backend
+                        "estimated_time_moai": edited_estimated_time,
+                        "terms_conditions_moai": edited_terms_conditions
+                    }
+                    backend.update_proposal_content(proposal.id, updated_fields)
+                    st.success("✅ Proposta atualizada com sucesso!")
+                    st.session_state[edit_key] = False # Esconde o formulário de edição
+                    st.rerun() # Recarrega para mostrar as alterações
+                except Exception as e:
+                    st.error(f"❌ Erro ao salvar alterações: {e}")
+            if cancel_edit:
+                st.session_state[edit_key] = False
+                st.rerun()
+    
+    # Exibe detalhes completos se o estado for True (após o botão "Visualizar Completo")
+    if st.session_state.get(view_full_key, False):
+        st.markdown("---")
+        st.subheader("Detalhes Completos da Proposta:")
+        st.json(proposal.dict()) # Exibe a proposta como JSON completo para inspeção
+
+def render_approved_proposal(proposal: Proposal):
+    st.success(f"Aprovado em: {proposal.approved_at.strftime('%d/%m/%Y %H:%M') if proposal.approved_at else 'N/A'}")
+    st.write(proposal.description)
+    st.markdown(f"**Valor:** <span style='font-size:16px'>{format_currency(proposal.estimated_value_moai)}</span>", unsafe_allow_html=True)
+    st.markdown(f"**Prazo:** <span style='font-size:16px'>{proposal.estimated_time_moai}</span>", unsafe_allow_html=True)
+    
+    # Detalhes completos da solução para propostas aprovadas
+    if st.button("📄 Ver Solução Completa", key=f"view_approved_solution_{proposal.id}"):
+        st.markdown("#### 🔍 Entendimento do Problema")
+        st.write(proposal.problem_understanding_moai)
+        st.markdown("#### 💡 Solução Proposta")
+        st.write(proposal.solution_proposal_moai)
+        st.markdown("#### 📊 Escopo")
+        st.write(proposal.scope_moai)
+        st.markdown("#### 🛠️ Tecnologias")
+        st.write(proposal.technologies_suggested_moai)
+        st.markdown("#### 📋 Termos e Condições")
+        st.write(proposal.terms_conditions_moai)
+    if st.button("🗑️ Excluir Proposta/Projeto", key=f"delete_approved_{proposal.id}", use_container_width=True):
+        with st.spinner(f"Removendo proposta '{proposal.title}' e dados relacionados..."):
+            deleted = backend.delete_proposal(proposal.id)
+        if deleted:
+            st.success("🗑️ Proposta e registros derivados removidos.")
+        else:
+            st.error("❌ Falha ao remover esta proposta.")
+        st.rerun()
+
+def render_rejected_proposal(proposal: Proposal):
+    st.error(f"Rejeitado em: {proposal.submitted_at.strftime('%d/%m/%Y %H:%M')}")
+    st.write(proposal.description)
+    if st.button("🗑️ Excluir (Rejeitada)", key=f"delete_rejected_{proposal.id}", use_container_width=True):
+        with st.spinner(f"Removendo proposta rejeitada '{proposal.title}'..."):
+            deleted = backend.delete_proposal(proposal.id)
+        if deleted:
+            st.success("🗑️ Proposta rejeitada removida.")
+        else:
+            st.error("❌ Falha ao remover proposta rejeitada.")
+        st.rerun()
+
+# status -> (ícone do expander, renderização do corpo)
+PROPOSAL_TABS = {
+    "pending": ("📄", render_pending_proposal),
+    "approved": ("✅", render_approved_proposal),
+    "rejected": ("❌", render_rejected_proposal),
+}
+
+def proposal_list(status: str, total: int):
+    """Página atual das propostas com `status`; cada expander busca a proposta completa só quando aberto."""
+    icon, render_body = PROPOSAL_TABS[status]
+    page = paginate(f"proposals_pager_{status}", lambda cursor, limit: proposals_page(status, cursor, limit),
+                    lambda proposal: (proposal.submitted_at, proposal.id), total=total)
+    for summary in page:
+        expander = lazy_expander(f"{icon} {summary.title} (ID: {short_id(summary.id)}...)", key=f"proposal_expander_{summary.id}")
+        with expander:
+            if expander.open:
+                proposal = cached_proposal(summary.id)
+                if proposal:
+                    render_body(proposal)
+                else:
+                    st.warning("Proposta não encontrada (pode ter sido removida).")
+
+# --- Aprovação em lote ---
+BULK_PROGRESS_SECONDS = 3
+
+def _bulk_approve(proposal_ids: List[str]):
+    # Callback do botão: roda antes do rerun, então pode limpar a seleção dos widgets
+    st.session_state.bulk_approval_result = backend.bulk_approve_proposals(proposal_ids)
+    st.session_state.bulk_select_all = False
+    st.session_state.bulk_selected = []
+
+def bulk_approval_panel():
+    """Seleção de várias propostas pendentes e aprovação em uma única ação."""
+    expander = lazy_expander("📦 Aprovação em Lote", key="bulk_approval_expander")
+    with expander:
+        if not expander.open:
+            return
+        titles = {p.id: p.title for p in backend.get_proposals("pending", fields=["title"])}
+        select_all = st.checkbox(f"Selecionar todas as pendentes ({len(titles)})", key="bulk_select_all")
+        if select_all:
+            selected = list(titles)
+        else:
+            selected = st.multiselect("Propostas a aprovar", options=list(titles), key="bulk_selected",
+                                      format_func=lambda proposal_id: f"{titles.get(proposal_id, '?')} ({short_id(proposal_id)}...)")
+        st.caption("Os projetos são criados de imediato; as orquestrações (AID e ADE-X) rodam em paralelo com limite por modelo.")
+        st.button(f"✅ Aprovar selecionadas ({len(selected)})", key="bulk_approve", type="primary", disabled=not selected,
+                  on_click=_bulk_approve, args=(selected,), use_container_width=True)
+
+def _bulk_approval_progress(polling: bool):
+    progress = backend.get_bulk_approval_progress()
+    if polling and not progress["running"]:
+        st.rerun() # Lotes concluídos: rerun completo para atualizar contagens e abas
+    if not progress["batches"]:
+        return
+    st.markdown("#### 📦 Orquestrações em Lote")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Concluídas", f"{progress['completed']}/{progress['total']}")
+    col2.metric("Falhas", progress["failed"])
+    col3.metric("Projetos/min", f"{progress['projects_per_minute']:.1f}")
+    for batch in progress["batches"]:
+        if not batch["total"]:
+            continue
+        status = "concluído" if batch["finished_at"] else "em andamento"
+        st.progress(batch["completed"] / batch["total"],
+                    text=f"Lote {short_id(batch['batch_id'])}... ({batch['started_at'].strftime('%H:%M:%S')}, {status}): "
+                         f"{batch['completed']}/{batch['total']} · {batch['failed']} falha(s) · {batch['projects_per_minute']:.1f} projetos/min")
+
+# Enquanto há lote em andamento só o painel de progresso se reexecuta
+_bulk_approval_progress_polling = st.fragment(run_every=BULK_PROGRESS_SECONDS)(_bulk_approval_progress)
+_bulk_approval_progress_static = st.fragment(_bulk_approval_progress)
+
+def bulk_approval_progress_panel():
+    result = st.session_state.pop("bulk_approval_result", None)
+    if result:
+        st.success(f"✅ {result['approved']} proposta(s) aprovada(s) em lote; orquestrações em andamento.")
+        if result["skipped"]:
+            st.warning(f"⚠️ {result['skipped']} proposta(s) ignorada(s): já não estavam pendentes.")
+    running = backend.get_bulk_approval_progress()["running"]
+    (_bulk_approval_progress_polling if running else _bulk_approval_progress_static)(running)
+
+
 def approvals_center_page():
     """Renderiza a página da Central de Aprovações."""
     st.header("✅ Central de Aprovações")
@@ -209,211 +669,42 @@ def approvals_center_page():
     Revise e aprove as propostas geradas pelo MOAI. Sua aprovação transforma a proposta em um projeto ativo.
     """)
 
-    all_proposals = backend.get_all_proposals() # Obtém todas as propostas
-    
-    # Filtra as propostas por status
-    pending_proposals = [p for p in all_proposals if p.status == "pending"]
-    approved_proposals = [p for p in all_proposals if p.status == "approved"]
-    rejected_proposals = [p for p in all_proposals if p.status == "rejected"]
+    # Apenas contagens aqui; cada aba lê só a sua página de propostas
+    pending_count, approved_count, rejected_count = (proposal_count(status) for status in ("pending", "approved", "rejected"))
 
     # Abas para organizar as propostas visualmente
     tab1, tab2, tab3 = st.tabs([
-        f"⏳ Pendentes ({len(pending_proposals)})", 
-        f"✅ Aprovadas ({len(approved_proposals)})", 
-        f"❌ Rejeitadas ({len(rejected_proposals)})"
+        f"⏳ Pendentes ({pending_count})", 
+        f"✅ Aprovadas ({approved_count})", 
+        f"❌ Rejeitadas ({rejected_count})"
     ])
     
-    with tab1:
-        if pending_proposals:
-            for proposal in pending_proposals:
-                with st.expander(f"📄 {proposal.title} (ID: {proposal.id[:8]}...)", expanded=False):
-                    col_info = st.columns([2, 1])
-                    
-                    with col_info[0]:
-                        st.markdown("#### 🔍 Entendimento do Problema")
-                        st.write(proposal.problem_understanding_moai)
-                        
-                        st.markdown("#### 💡 Solução Proposta")
-                        st.write(proposal.solution_proposal_moai)
-                        
-                        st.markdown("#### 📊 Escopo")
-                        st.write(proposal.scope_moai)
-                    
-                    with col_info[1]:
-                        st.markdown("#### 🛠️ Tecnologias")
-                        st.write(proposal.technologies_suggested_moai)
-                        
-                        st.markdown("#### 📈 Estimativas")
-                        # Exibir Valor e Prazo com fonte/tamanho consistentes aos campos do formulário
-                        st.markdown(f"**Valor:** <span style='font-size:16px'>{format_currency(proposal.estimated_value_moai)}</span>", unsafe_allow_html=True)
-                        st.markdown(f"**Prazo:** <span style='font-size:16px'>{proposal.estimated_time_moai}</span>", unsafe_allow_html=True)
-                    
-                    st.divider()
-                    
-                    st.markdown("#### 📋 Termos e Condições")
-                    st.write(proposal.terms_conditions_moai)
-                    
-                    st.divider()
-                    
-                    # Estado para controlar a visibilidade do formulário de edição
-                    edit_key = f"edit_proposal_content_{proposal.id}"
-                    if edit_key not in st.session_state:
-                        st.session_state[edit_key] = False
-
-                    col_actions = st.columns(5)
-                    with col_actions[0]:
-                        if st.button("✅ Aprovar", key=f"approve_{proposal.id}", use_container_width=True):
-                            with st.spinner(f"Aprovando proposta '{proposal.title}'..."):
-                                project_id = backend.update_proposal_status(proposal.id, "approved")
-                                if project_id:
-                                    st.success(f"✅ Proposta aprovada! Projeto iniciado com ID: {project_id[:8]}...")
-                                else:
-                                    st.error(f"❌ Erro ao criar projeto a partir da proposta.")
-                                st.rerun() # Recarrega a página para atualizar as abas
-                    
-                    with col_actions[1]:
-                        if st.button("❌ Rejeitar", key=f"reject_{proposal.id}", use_container_width=True):
-                            with st.spinner(f"Rejeitando proposta '{proposal.title}'..."):
-                                backend.update_proposal_status(proposal.id, "rejected")
-                            st.warning(f"⚠️ Proposta rejeitada.")
-                            st.rerun() # Recarrega a página para atualizar as abas
-                    
-                    with col_actions[2]:
-                        if st.button("✏️ Editar", key=f"edit_{proposal.id}", use_container_width=True):
-                            # Alterna o estado de edição e força o re-run
-                            st.session_state[edit_key] = not st.session_state[edit_key]
-                            st.rerun()
-                    
-                    with col_actions[3]:
-                        # Botão "Visualizar Completo" para exibir todos os detalhes da proposta
-                        view_full_key = f"view_full_{proposal.id}"
-                        if st.button("📋 Visualizar Completo", key=f"full_{proposal.id}", use_container_width=True):
-                            st.session_state[view_full_key] = not st.session_state.get(view_full_key, False)
-                            # Não precisa de rerun aqui, o conteúdo pode ser expandido/colapsado abaixo
-                    with col_actions[4]:
-                        if st.button("🗑️ Excluir", key=f"delete_{proposal.id}", use_container_width=True):
-                            with st.spinner(f"Removendo proposta '{proposal.title}' e registros associados..."):
-                                deleted = backend.delete_proposal(proposal.id)
-                            if deleted:
-                                st.success(f"🗑️ Proposta '{proposal.title}' removida com sucesso.")
-                            else:
-                                st.error("❌ Não foi possível remover a proposta. Verifique os logs.")
-                            st.rerun()
-                    
-                    # Exibe o formulário de edição se st.session_state[edit_key] for True
-                    if st.session_state[edit_key]:
-                        st.markdown("---")
-                        st.subheader(f"✏️ Editar Conteúdo da Proposta: {proposal.title}")
-                        with st.form(key=f"form_edit_proposal_{proposal.id}"):
-                            st.markdown("**Informações Básicas**")
-                            col_basic = st.columns(2)
-                            with col_basic[0]:
-                                edited_title = st.text_input("Título", value=proposal.title)
-                            with col_basic[1]:
-                                edited_estimated_time = st.text_input("Prazo Estimado", value=proposal.estimated_time_moai)
-                            
-                            edited_desc = st.text_area("Descrição", value=proposal.description, height=80)
-                            
-                            st.markdown("**Análise e Proposta**")
-                            col_analysis = st.columns(2)
-                            with col_analysis[0]:
-                                edited_problem_understanding = st.text_area("Entendimento do Problema", value=proposal.problem_understanding_moai, height=100)
-                            with col_analysis[1]:
-                                edited_solution_proposal = st.text_area("Solução Proposta", value=proposal.solution_proposal_moai, height=100)
-                            
-                            st.markdown("**Detalhes Técnicos**")
-                            col_tech = st.columns(2)
-                            with col_tech[0]:
-                                edited_scope = st.text_area("Escopo", value=proposal.scope_moai, height=80)
-                                edited_technologies = st.text_area("Tecnologias Sugeridas", value=proposal.technologies_suggested_moai, height=80)
-                            with col_tech[1]:
-                                edited_estimated_value_str = st.text_input("💰 Valor Estimado (R$)", value=format_currency(proposal.estimated_value_moai))
-                                edited_terms_conditions = st.text_area("Termos e Condições", value=proposal.terms_conditions_moai, height=80)
-
-                            col_submit = st.columns(2)
-                            with col_submit[0]:
-                                save_changes = st.form_submit_button("💾 Salvar Alterações", use_container_width=True)
-                            with col_submit[1]:
-                                cancel_edit = st.form_submit_button("❌ Cancelar", use_container_width=True)
-                            
-                            if save_changes:
-                                try:
-                                    updated_fields = {
-                                        "title": edited_title,
-                                        "description": edited_desc,
-                                        "problem_understanding_moai": edited_problem_understanding,
-                                        "solution_proposal_moai": edited_solution_proposal,
-                                        "scope_moai": edited_scope,
-                                        "technologies_suggested_moai": edited_technologies,
-                                        "estimated_value_moai": edited_estimated_value_str, # Será convertido para float no backend
-                                        "estimated_time_moai": edited_estimated_time,
-                                        "terms_conditions_moai": edited_terms_conditions
-                                    }
-                                    backend.update_proposal_content(proposal.id, updated_fields)
-                                    st.success("✅ Proposta atualizada com sucesso!")
-                                    st.session_state[edit_key] = False # Esconde o formulário de edição
-                                    st.rerun() # Recarrega para mostrar as alterações
-                                except Exception as e:
-                                    st.error(f"❌ Erro ao salvar alterações: {e}")
-                            if cancel_edit:
-                                st.session_state[edit_key] = False
-                                st.rerun()
-                    
-                    # Exibe detalhes completos se o estado for True (após o botão "Visualizar Completo")
-                    if st.session_state.get(view_full_key, False):
-                        st.markdown("---")
-                        st.subheader("Detalhes Completos da Proposta:")
-                        st.json(proposal.dict()) # Exibe a proposta como JSON completo para inspeção
+    bulk_approval_progress_panel()
 
+    with tab1:
+        if pending_count:
+            bulk_approval_panel()
+            proposal_list("pending", pending_count)
         else:
             st.info("🎉 Nenhuma proposta pendente. Todas as propostas foram revisadas!")
     
     with tab2:
-        if approved_proposals:
-            for proposal in approved_proposals:
-                with st.expander(f"✅ {proposal.title} (ID: {proposal.id[:8]}...)", expanded=False):
-                    st.success(f"Aprovado em: {proposal.approved_at.strftime('%d/%m/%Y %H:%M') if proposal.approved_at else 'N/A'}")
-                    st.write(proposal.description)
-                    st.markdown(f"**Valor:** <span style='font-size:16px'>{format_currency(proposal.estimated_value_moai)}</span>", unsafe_allow_html=True)
-                    st.markdown(f"**Prazo:** <span style='font-size:16px'>{proposal.estimated_time_moai}</span>", unsafe_allow_html=True)
-                    
-                    # Detalhes completos da solução para propostas aprovadas
-                    if st.button("📄 Ver Solução Completa", key=f"view_approved_solution_{proposal.id}"):
-                        st.markdown("#### 🔍 Entendimento do Problema")
-                        st.write(proposal.problem_understanding_moai)
-                        st.markdown("#### 💡 Solução Proposta")
-                        st.write(proposal.solution_proposal_moai)
-                        st.markdown("#### 📊 Escopo")
-                        st.write(proposal.scope_moai)
-                        st.markdown("#### 🛠️ Tecnologias")
-                        st.write(proposal.technologies_suggested_moai)
-                        st.markdown("#### 📋 Termos e Condições")
-                        st.write(proposal.terms_conditions_moai)
-                    if st.button("🗑️ Excluir Proposta/Projeto", key=f"delete_approved_{proposal.id}", use_container_width=True):
-                        with st.spinner(f"Removendo proposta '{proposal.title}' e dados relacionados..."):
-                            deleted = backend.delete_proposal(proposal.id)
-                        if deleted:
-                            st.success("🗑️ Proposta e registros derivados removidos.")
-                        else:
-                            st.error("❌ Falha ao remover esta proposta.")
-                        st.rerun()
+        if approved_count:
+            proposal_list("approved", approved_count)
         else:
             st.info("📭 Nenhuma proposta aprovada ainda.")
     
     with tab3:
-        if rejected_proposals:
-            for proposal in rejected_proposals:
-                with st.expander(f"❌ {proposal.title} (ID: {proposal.id[:8]}...)", expanded=False):
-                    st.error(f"Rejeitado em: {proposal.submitted_at.strftime('%d/%m/%Y %H:%M')}")
-                    st.write(proposal.description)
-                    if st.button("🗑️ Excluir (Rejeitada)", key=f"delete_rejected_{proposal.id}", use_container_width=True):
-                        with st.spinner(f"Removendo proposta rejeitada '{proposal.title}'..."):
-                            deleted = backend.delete_proposal(proposal.id)
-                        if deleted:
-                            st.success("🗑️ Proposta rejeitada removida.")
-                        else:
-                            st.error("❌ Falha ao remover proposta rejeitada.")
-                        st.rerun()
+        if rejected_count:
+            if st.button(f"🗑️ Excluir todas as rejeitadas ({rejected_count})", key="delete_all_rejected", use_container_width=True):
+                with st.spinner("Removendo propostas rejeitadas..."):
+                    deleted = backend.delete_proposals([p.id for p in backend.get_proposals("rejected", fields=["id"])])
+                if deleted:
+                    st.success("🗑️ Propostas rejeitadas removidas.")
+                else:
+                    st.error("❌ Falha ao remover as propostas rejeitadas.")
+                st.rerun()
+            proposal_list("rejected", rejected_count)
         else:
             st.info("📭 Nenhuma proposta rejeitada.")
 
@@ -425,13 +716,13 @@ def project_timeline_page():
     Visualize o progresso dos projetos em andamento e as fases concluídas ou futuras.
     """)
 
-    all_projects = backend.get_all_projects()
+    all_projects = cached_all_projects()
     if not all_projects:
         st.info("Nenhum projeto ativo para exibir a linha do tempo.")
         return
 
     # Mapeia ID do projeto para o nome formatado para o selectbox
-    project_options_display = {f"{p.id[:8]}... - {p.name}": p.id for p in all_projects}
+    project_options_display = {f"{short_id(p.id)}... - {p.name}": p.id for p in all_projects}
     selected_project_key = st.selectbox(
         "Selecione um Projeto",
         options=list(project_options_display.keys()),
@@ -440,35 +731,12 @@ def project_timeline_page():
 
     if selected_project_key:
         selected_project_id = project_options_display[selected_project_key]
-        project = backend.get_project_by_id(selected_project_id)
+        project = cached_project(selected_project_id)
 
         if project:
-            st.markdown(f"### Projeto: {project.name} - {project.client_name} (ID: {project.id[:8]}...)")
-            st.progress(project.progress / 100.0, text=f"Progresso Geral: {project.progress}%")
-            st.write(f"**Status:** {project.status}")
+            st.markdown(f"### Projeto: {project.name} - {project.client_name} (ID: {short_id(project.id)}...)")
             st.write(f"**Iniciado em:** {project.started_at.strftime('%Y-%m-%d')}")
-            if project.completed_at:
-                st.write(f"**Concluído em:** {project.completed_at.strftime('%Y-%m-%d')}")
-
-            st.subheader("Fases do Projeto:")
-            phases_data = backend.get_project_phases_status(project.id)
-            
-            # Exibir como tabela ou lista
-            for phase in phases_data:
-                status_emoji = "✅" if phase["status"] == "Concluído" else ("⏳" if phase["status"] == "Em Andamento" else "⚪")
-                st.markdown(f"- {status_emoji} **{phase['name']}**: {phase['status']}")
-            
-            st.subheader("Logs do Projeto:")
-            # Filtra os logs do MOAI apenas para o projeto selecionado
-            project_logs = [log for log in backend.db_manager.get_all_moai_logs() if log.project_id == project.id]
-            if project_logs:
-                latest_project_logs = sorted(project_logs, key=lambda x: x.timestamp, reverse=True)[:10]
-                for log in latest_project_logs:
-                    status_emoji = "✅" if log.status == "SUCCESS" else ("⚠️" if log.status == "WARNING" else ("❌" if log.status == "ERROR" or log.status == "CRITICAL" else "ℹ️"))
-                    agent_info = f" (Agente: {log.agent_id})" if log.agent_id else ""
-                    st.write(f"{status_emoji} {log.timestamp.strftime('%H:%M:%S')} - **{log.event_type}**{agent_info}: {log.details}")
-            else:
-                st.info("Nenhum log para este projeto ainda.")
+            project_progress_panel(project.id)
 
         else:
             st.error("Projeto selecionado não encontrado.")
@@ -476,6 +744,91 @@ def project_timeline_page():
         st.info("Selecione um projeto para ver a linha do tempo.")
 
 
+# --- Relatórios gerados sob demanda (em segundo plano) ---
+REPORT_POLL_SECONDS = 2
+REPORT_LABELS = {"quality": "relatório de qualidade", "security": "relatório de segurança", "monitoring": "resumo de monitoramento"}
+
+def render_quality_report(quality_report_data: Dict[str, Any]):
+    st.write(f"**Status Geral:** {quality_report_data.get('overall_status', 'N/A')}")
+    st.write(f"**Total de Testes:** {quality_report_data.get('total_tests', 'N/A')}")
+    st.write(f"**Testes Aprovados:** {quality_report_data.get('passed_tests', 'N/A')}")
+    st.write(f"**Testes Falhos:** {quality_report_data.get('failed_tests', 'N/A')}")
+
+    st.markdown("---")
+    st.subheader("Detalhamento dos Testes:")
+    test_results = quality_report_data.get('test_results', [])
+    if test_results:
+        for test in test_results:
+            status_emoji = "✅" if test['status'] == 'Passed' else "❌"
+            st.markdown(f"- {status_emoji} **{test['name']}**: {test['status']} - {test['message']}")
+    else:
+        st.info("Nenhum detalhe de teste disponível.")
+
+def render_security_report(security_report_data: Dict[str, Any]):
+    st.write(f"**Status Geral de Segurança:** {security_report_data.get('overall_security_status', 'N/A')}")
+    st.write(f"**Vulnerabilidades Encontradas:** {security_report_data.get('vulnerabilities_found', 'N/A')}")
+    st.write(f"**Nível de Risco:** {security_report_data.get('risk_level', 'N/A')}")
+
+    st.markdown("---")
+    st.subheader("Vulnerabilidades Detalhadas:")
+    vulnerabilities = security_report_data.get('vulnerabilities', [])
+    if vulnerabilities:
+        for vuln in vulnerabilities:
+            st.markdown(f"- **{vuln['name']}**: {vuln['severity']} - {vuln['description']}")
+    else:
+        st.info("Nenhuma vulnerabilidade detalhada disponível.")
+
+def render_monitoring_summary(monitoring_summary: Dict[str, Any]):
+    st.write(f"**Status Geral dos Sistemas:** {monitoring_summary.get('system_health', {}).get('status', 'N/A')}")
+    st.write(f"**Uptime Médio:** {monitoring_summary.get('system_health', {}).get('average_uptime', 'N/A')}")
+
+    st.markdown("---")
+    st.subheader("Uso de Recursos (Global):")
+    resources = monitoring_summary.get('resource_usage', {})
+    st.write(f"**CPU:** {resources.get('cpu_usage', 'N/A')}")
+    st.write(f"**Memória:** {resources.get('memory_usage', 'N/A')}")
+    st.write(f"**Rede:** {resources.get('network_traffic', 'N/A')}")
+
+    st.markdown("---")
+    st.subheader("Alertas Recentes:")
+    alerts = monitoring_summary.get('recent_alerts', [])
+    if alerts:
+        for alert in alerts:
+            st.warning(f"- **{alert['severity']}**: {alert['message']} ({alert['timestamp']})")
+    else:
+        st.info("Nenhum alerta recente.")
+
+def _report_panel(kind: str, project_id: Optional[str], render_report, polling: bool):
+    label = REPORT_LABELS[kind]
+    report_state = backend.request_report(kind, project_id)
+    if polling and not report_state["pending"]:
+        st.rerun() # Geração concluída: rerun completo para trocar pelo painel estático com o relatório novo
+
+    if report_state["data"] is not None:
+        caption = f"Gerado em {report_state['generated_at'].strftime('%d/%m/%Y %H:%M:%S')}"
+        if report_state["pending"]:
+            caption += " · nova versão em geração, esta será substituída quando ficar pronta"
+        st.caption(caption)
+        render_report(report_state["data"])
+    elif report_state["pending"]:
+        st.info(f"⏳ Gerando {label} em segundo plano. Ele aparecerá aqui assim que ficar pronto.")
+    else:
+        st.warning(report_state["error"] or f"Nenhum {label} disponível.")
+
+    if not report_state["pending"]:
+        if st.button("🔄 Gerar Novamente", key=f"regenerate_{kind}_{project_id}"):
+            backend.request_report(kind, project_id, regenerate=True)
+            st.rerun()
+
+# Enquanto há geração pendente o painel se reexecuta sozinho (só o fragmento, não a página)
+_report_panel_polling = st.fragment(run_every=REPORT_POLL_SECONDS)(_report_panel)
+_report_panel_static = st.fragment(_report_panel)
+
+def report_panel(kind: str, project_id: Optional[str], render_report):
+    """Mostra o relatório (ou um placeholder) sem bloquear a página durante a geração pelo LLM."""
+    pending = backend.request_report(kind, project_id)["pending"]
+    (_report_panel_polling if pending else _report_panel_static)(kind, project_id, render_report, pending)
+
 def detailed_reports_page():
     """Renderiza a página de Relatórios Detalhados."""
     st.header("📊 Relatórios Detalhados")
@@ -491,7 +844,7 @@ def detailed_reports_page():
 
     if report_type == "Comercial":
         st.subheader("Relatório Comercial")
-        commercial_report = backend.get_commercial_report()
+        commercial_report = view_cached("commercial_report", ("proposals",), backend.get_commercial_report)
 
         col1, col2 = st.columns(2)
         with col1:
@@ -515,15 +868,70 @@ def detailed_reports_page():
         fig = px.pie(df_proposals_status, values='Quantidade', names='Status', title='Propostas por Status')
         st.plotly_chart(fig, use_container_width=True)
 
+        # Séries do portfólio: quadros pandas em cache no backend, recalculados só quando as propostas mudam
+        analytics = backend.get_portfolio_analytics()
+        tab_trend, tab_values, tab_approval_time, tab_clients = st.tabs(
+            ["📈 Tendência de Aprovação", "💰 Distribuição de Valores", "⏱️ Tempo até Aprovação", "🏢 Por Cliente"])
+        with tab_trend:
+            approval_trend = analytics["approval_trend"]
+            if approval_trend.empty:
+                st.info("Sem propostas para calcular a tendência.")
+            else:
+                st.plotly_chart(px.bar(approval_trend, x="month", y=["approved", "rejected"], barmode="group",
+                                       labels={"month": "Mês", "value": "Propostas", "variable": "Status"},
+                                       title="Propostas Decididas por Mês"), use_container_width=True)
+                st.plotly_chart(px.line(approval_trend, x="month", y="approval_rate", markers=True,
+                                        labels={"month": "Mês", "approval_rate": "Taxa de Aprovação (%)"},
+                                        title="Taxa de Aprovação Mensal"), use_container_width=True)
+        with tab_values:
+            value_distribution = analytics["value_distribution"]
+            if value_distribution.empty:
+                st.info("Nenhuma proposta com valor estimado.")
+            else:
+                st.plotly_chart(px.box(value_distribution, x="status", y="estimated_value_moai", points="outliers",
+                                       labels={"status": "Status", "estimated_value_moai": "Valor Estimado (R$)"},
+                                       title="Valor Estimado por Status"), use_container_width=True)
+                st.dataframe(analytics["value_stats"], use_container_width=True)
+        with tab_approval_time:
+            approval_stats = analytics["time_to_approval_stats"]
+            if not approval_stats["count"]:
+                st.info("Nenhuma proposta aprovada com data de aprovação registrada.")
+            else:
+                col_time = st.columns(3)
+                col_time[0].metric("Mediana (dias)", f"{approval_stats['median_days']:.1f}")
+                col_time[1].metric("Média (dias)", f"{approval_stats['mean_days']:.1f}")
+                col_time[2].metric("P90 (dias)", f"{approval_stats['p90_days']:.1f}")
+                st.plotly_chart(px.histogram(analytics["time_to_approval"], x="days", nbins=30,
+                                             labels={"days": "Dias até a Aprovação"},
+                                             title="Distribuição do Tempo até Aprovação"), use_container_width=True)
+        with tab_clients:
+            client_breakdown = analytics["client_breakdown"]
+            if client_breakdown.empty:
+                st.info("Sem propostas por cliente.")
+            else:
+                st.plotly_chart(px.bar(client_breakdown.head(15), x="client_name", y=["approved_value", "total_value"],
+                                       barmode="group", labels={"client_name": "Cliente", "value": "Valor (R$)", "variable": ""},
+                                       title="Valor por Cliente (Top 15)"), use_container_width=True)
+                st.dataframe(client_breakdown, use_container_width=True, hide_index=True)
+
 
     elif report_type == "Qualidade e Testes":
         st.subheader("Relatório de Qualidade e Testes (AQT)")
-        all_projects = backend.get_all_projects()
+        with st.expander("📈 Visão do Portfólio (último relatório de cada projeto)"):
+            quality_portfolio = view_cached("report_portfolio", REPORT_TABLES, backend.get_report_portfolio_summary)["quality"]
+            col_quality = st.columns(3)
+            col_quality[0].metric("Projetos com Relatório", quality_portfolio["projects"])
+            col_quality[1].metric("Projetos Reprovados", quality_portfolio["by_status"].get("Failed", 0))
+            col_quality[2].metric("Testes Falhando (total)", quality_portfolio["failed_tests"])
+            failed_projects = backend.find_projects_by_reports(quality_status="Failed")
+            for failed_project in failed_projects:
+                st.markdown(f"- ❌ **{failed_project.project_name}**: {failed_project.failed_tests or 0} teste(s) falhando")
+        all_projects = cached_all_projects()
         if not all_projects:
             st.info("Nenhum projeto ativo para gerar relatórios de qualidade.")
             return
 
-        project_options_display = {f"{p.id[:8]}... - {p.name}": p.id for p in all_projects}
+        project_options_display = {f"{short_id(p.id)}... - {p.name}": p.id for p in all_projects}
         selected_project_key = st.selectbox(
             "Selecione um Projeto para Relatório de Qualidade",
             options=list(project_options_display.keys()),
@@ -532,38 +940,33 @@ def detailed_reports_page():
 
         if selected_project_key:
             selected_project_id = project_options_display[selected_project_key]
-            # O backend.get_quality_tests_report já lida com a geração on-demand se não encontrado
-            quality_report_data = backend.get_quality_tests_report(selected_project_id)
-
-            if quality_report_data and not quality_report_data.get("error"):
-                st.markdown(f"**Relatório para:** {selected_project_key}")
-                st.write(f"**Status Geral:** {quality_report_data.get('overall_status', 'N/A')}")
-                st.write(f"**Total de Testes:** {quality_report_data.get('total_tests', 'N/A')}")
-                st.write(f"**Testes Aprovados:** {quality_report_data.get('passed_tests', 'N/A')}")
-                st.write(f"**Testes Falhos:** {quality_report_data.get('failed_tests', 'N/A')}")
-                
-                st.markdown("---")
-                st.subheader("Detalhamento dos Testes:")
-                test_results = quality_report_data.get('test_results', [])
-                if test_results:
-                    for test in test_results:
-                        status_emoji = "✅" if test['status'] == 'Passed' else "❌"
-                        st.markdown(f"- {status_emoji} **{test['name']}**: {test['status']} - {test['message']}")
-                else:
-                    st.info("Nenhum detalhe de teste disponível.")
-            else:
-                st.warning(f"Nenhum relatório de qualidade encontrado para o projeto selecionado ou {quality_report_data.get('error', 'Erro desconhecido')}.")
+            st.markdown(f"**Relatório para:** {selected_project_key}")
+            # A geração on-demand roda em segundo plano; o painel mostra o estado e troca pelo relatório quando pronto
+            report_panel("quality", selected_project_id, render_quality_report)
         else:
             st.info("Selecione um projeto.")
 
     elif report_type == "Segurança e Auditoria":
         st.subheader("Relatório de Segurança e Auditoria (ASE)")
-        all_projects = backend.get_all_projects()
+        with st.expander("📈 Visão do Portfólio (último relatório de cada projeto)"):
+            security_portfolio = view_cached("report_portfolio", REPORT_TABLES, backend.get_report_portfolio_summary)["security"]
+            col_security = st.columns(3)
+            col_security[0].metric("Pontuação Média de Segurança",
+                                   f"{security_portfolio['avg_security_score']:.1f}" if security_portfolio["avg_security_score"] is not None else "N/A")
+            col_security[1].metric("Menor Pontuação", security_portfolio["min_security_score"] if security_portfolio["min_security_score"] is not None else "N/A")
+            col_security[2].metric("Vulnerabilidades (total)", security_portfolio["vulnerabilities_found"])
+            if security_portfolio["by_risk_level"]:
+                st.write("**Projetos por Nível de Risco:** " + ", ".join(
+                    f"{risk_level}: {count}" for risk_level, count in security_portfolio["by_risk_level"].items()))
+            for risky_project in backend.find_projects_by_reports(risk_levels=["High", "Critical"]):
+                st.markdown(f"- ⚠️ **{risky_project.project_name}**: risco {risky_project.risk_level}, "
+                            f"pontuação {risky_project.security_score}, {risky_project.vulnerabilities_found} vulnerabilidade(s)")
+        all_projects = cached_all_projects()
         if not all_projects:
             st.info("Nenhum projeto ativo para gerar relatórios de segurança.")
             return
         
-        project_options_display = {f"{p.id[:8]}... - {p.name}": p.id for p in all_projects}
+        project_options_display = {f"{short_id(p.id)}... - {p.name}": p.id for p in all_projects}
         selected_project_key = st.selectbox(
             "Selecione um Projeto para Relatório de Segurança",
             options=list(project_options_display.keys()),
@@ -572,53 +975,15 @@ def detailed_reports_page():
 
         if selected_project_key:
             selected_project_id = project_options_display[selected_project_key]
-            # O backend.get_security_audit_report já lida com a geração on-demand se não encontrado
-            security_report_data = backend.get_security_audit_report(selected_project_id)
-
-            if security_report_data and not security_report_data.get("error"):
-                st.markdown(f"**Relatório para:** {selected_project_key}")
-                st.write(f"**Status Geral de Segurança:** {security_report_data.get('overall_security_status', 'N/A')}")
-                st.write(f"**Vulnerabilidades Encontradas:** {security_report_data.get('vulnerabilities_found', 'N/A')}")
-                st.write(f"**Nível de Risco:** {security_report_data.get('risk_level', 'N/A')}")
-                
-                st.markdown("---")
-                st.subheader("Vulnerabilidades Detalhadas:")
-                vulnerabilities = security_report_data.get('vulnerabilities', [])
-                if vulnerabilities:
-                    for vuln in vulnerabilities:
-                        st.markdown(f"- **{vuln['name']}**: {vuln['severity']} - {vuln['description']}")
-                else:
-                    st.info("Nenhuma vulnerabilidade detalhada disponível.")
-            else:
-                st.warning(f"Nenhum relatório de segurança encontrado para o projeto selecionado ou {security_report_data.get('error', 'Erro desconhecido')}.")
+            st.markdown(f"**Relatório para:** {selected_project_key}")
+            report_panel("security", selected_project_id, render_security_report)
         else:
             st.info("Selecione um projeto.")
 
     elif report_type == "Monitoramento Geral":
         st.subheader("Relatório de Monitoramento Geral (AMS)")
-        # O backend.get_monitoring_summary já lida com a geração on-demand se não encontrado
-        monitoring_summary = backend.get_monitoring_summary() # Resumo global
-        if monitoring_summary and not monitoring_summary.get("error"):
-            st.write(f"**Status Geral dos Sistemas:** {monitoring_summary.get('system_health', {}).get('status', 'N/A')}")
-            st.write(f"**Uptime Médio:** {monitoring_summary.get('system_health', {}).get('average_uptime', 'N/A')}")
-            
-            st.markdown("---")
-            st.subheader("Uso de Recursos (Global):")
-            resources = monitoring_summary.get('resource_usage', {})
-            st.write(f"**CPU:** {resources.get('cpu_usage', 'N/A')}")
-            st.write(f"**Memória:** {resources.get('memory_usage', 'N/A')}")
-            st.write(f"**Rede:** {resources.get('network_traffic', 'N/A')}")
-            
-            st.markdown("---")
-            st.subheader("Alertas Recentes:")
-            alerts = monitoring_summary.get('recent_alerts', [])
-            if alerts:
-                for alert in alerts:
-                    st.warning(f"- **{alert['severity']}**: {alert['message']} ({alert['timestamp']})")
-            else:
-                st.info("Nenhum alerta recente.")
-        else:
-            st.warning(f"Nenhum resumo de monitoramento global disponível ou {monitoring_summary.get('error', 'Erro desconhecido')}.")
+        # Resumo global; quando vence, o anterior continua visível enquanto o novo é gerado
+        report_panel("monitoring", None, render_monitoring_summary)
 
 
 def code_viewer_page():
@@ -628,12 +993,12 @@ def code_viewer_page():
     Inspecione o código-fonte gerado pelos Agentes de Desenvolvimento (ADE-X).
     """)
 
-    all_projects = backend.get_all_projects()
+    all_projects = cached_all_projects()
     if not all_projects:
         st.info("Nenhum projeto ativo com código gerado para exibir.")
         return
 
-    project_options_display = {f"{p.id[:8]}... - {p.name}": p.id for p in all_projects}
+    project_options_display = {f"{short_id(p.id)}... - {p.name}": p.id for p in all_projects}
     selected_project_key = st.selectbox(
         "Selecione um Projeto",
         options=list(project_options_display.keys()),
@@ -644,7 +1009,7 @@ def code_viewer_page():
         selected_project_id = project_options_display[selected_project_key]
         project_name_display = selected_project_key.split(' - ')[1]
 
-        st.subheader(f"Código Gerado para {project_name_display} (ID: {selected_project_id[:8]}...)")
+        st.subheader(f"Código Gerado para {project_name_display} (ID: {short_id(selected_project_id)}...)")
 
         # Formulário para gerar novo código (exemplo)
         with st.expander("Gerar Novo Código (via ADE-X)"):
@@ -665,7 +1030,9 @@ def code_viewer_page():
                             st.error(f"Falha ao gerar código: {result['message']}")
 
 
-        generated_code_list = backend.get_generated_code_for_project(selected_project_id)
+        # Apenas metadados na listagem; o conteúdo é carregado só para o arquivo selecionado
+        generated_code_list = view_cached(("code_metadata", selected_project_id), ("generated_code",),
+                                             lambda: backend.get_generated_code_metadata(selected_project_id))
         selected_code = None
         if generated_code_list:
             code_files_map = {c.filename: c for c in generated_code_list}
@@ -673,7 +1040,7 @@ def code_viewer_page():
 
             if selected_code_file_name:
                 selected_code = code_files_map[selected_code_file_name]
-                st.code(selected_code.content, language=selected_code.language)
+                st.code(backend.get_generated_code_content(selected_code.id) or "", language=selected_code.language)
                 st.markdown(f"**Descrição:** {selected_code.description}")
                 st.markdown(f"**Gerado em:** {selected_code.generated_at.strftime('%Y-%m-%d %H:%M:%S')}")
         else:
@@ -768,7 +1135,13 @@ def code_viewer_page():
         else:
             st.info("Selecione um snippet para habilitar a preparação automática do ambiente de testes.")
 
-        existing_workspaces = backend.get_test_workspaces(selected_project_id)
+        def workspaces_page(cursor: Optional[tuple], limit: int):
+            before, before_id = cursor if cursor else (None, None)
+            return view_cached(("workspaces", selected_project_id, cursor, limit), ("test_workspaces",),
+                               lambda: backend.get_test_workspaces_page(selected_project_id, before=before, before_id=before_id, limit=limit))
+
+        existing_workspaces = paginate(f"workspaces_pager_{selected_project_id}", workspaces_page,
+                                       lambda ws: (ws.created_at, ws.id))
         if existing_workspaces:
             for ws in existing_workspaces:
                 st.markdown(f"**Arquivo:** {ws.filename}  |  **Workspace:** `{ws.workspace_path}`")
@@ -804,12 +1177,74 @@ def infra_backup_management_page():
     Gerencie e monitore a infraestrutura dos projetos e as estratégias de backup.
     """)
 
-    all_projects = backend.get_all_projects()
+    with st.expander("💾 Armazenamento de Código e Documentação"):
+        storage_stats = view_cached("blob_stats", ("generated_code", "documentation"), backend.get_blob_storage_stats)
+        col_storage = st.columns(4)
+        col_storage[0].metric("Blobs Únicos", storage_stats["blobs"], f"{storage_stats['references_count']} referências", delta_color="off")
+        col_storage[1].metric("Conteúdo Lógico", format_bytes(storage_stats["logical_bytes"]))
+        col_storage[2].metric("Gravado em Disco", format_bytes(storage_stats["stored_bytes"]),
+                              f"-{format_bytes(storage_stats['saved_bytes'])}", delta_color="inverse")
+        col_storage[3].metric("Deduplicação / Compressão",
+                              f"{storage_stats['dedup_ratio']:.1f}x / {storage_stats['compression_ratio']:.1f}x")
+
+    with st.expander("🧊 Arquivo Frio de Projetos"):
+        archived_count = sum(1 for p in cached_all_projects() if p.archived_at)
+        st.caption(f"{archived_count} projeto(s) com artefatos no arquivo frio. Projetos concluídos há mais de N dias "
+                   "são arquivados em lote; o acesso aos artefatos os restaura automaticamente.")
+        archive_days = st.number_input("Concluídos há mais de (dias)", min_value=0, value=backend.db_manager.project_archive_days, step=1,
+                                       key="archive_days")
+        if st.button("Arquivar Projetos Concluídos", key="archive_completed_projects"):
+            archive_summary = backend.archive_completed_projects(int(archive_days))
+            if archive_summary["success"]:
+                st.success(f"{len(archive_summary['archived'])} projeto(s) arquivado(s) ({archive_summary['rows']} registro(s)).")
+            else:
+                st.warning(f"{len(archive_summary['archived'])} arquivado(s), {len(archive_summary['failed'])} falha(s).")
+
+    with st.expander("🩺 Saúde do Banco de Dados"):
+        db_health = backend.get_database_health()
+        col_db = st.columns(4)
+        col_db[0].metric("Tamanho do Arquivo", format_bytes(db_health["file_size"]), f"{db_health['page_count']} páginas", delta_color="off")
+        col_db[1].metric("Páginas Livres", db_health["freelist_count"], format_bytes(db_health["free_bytes"]), delta_color="off")
+        col_db[2].metric("Fragmentação", f"{db_health['fragmentation']:.1%}" if db_health["fragmentation"] is not None else "N/A")
+        col_db[3].metric("Auto Vacuum", db_health["auto_vacuum"])
+        if db_health["auto_vacuum"] != "INCREMENTAL":
+            st.warning("O banco não usa auto_vacuum incremental: o espaço liberado só volta ao sistema com uma "
+                       "reconstrução completa (VACUUM), que bloqueia o banco até terminar. Execute fora do horário de uso.")
+            if st.button("Converter para Vacuum Incremental", key="convert_incremental_vacuum"):
+                with st.spinner("Reconstruindo o banco (VACUUM)..."):
+                    vacuum_result = backend.convert_database_to_incremental_vacuum()
+                if vacuum_result["success"]:
+                    st.success(f"Banco convertido em {vacuum_result['duration_ms'] / 1000:.1f} s.")
+                else:
+                    st.error(f"Falha na conversão: {vacuum_result.get('error')}")
+        maintenance_runs = db_health["maintenance_runs"]
+        if maintenance_runs:
+            st.dataframe(pd.DataFrame([
+                {
+                    "Tarefa": run.task,
+                    "Última Execução": run.last_run_at.strftime('%Y-%m-%d %H:%M:%S'),
+                    "Duração (ms)": round(run.duration_ms, 1),
+                    "Resultado": "✅ OK" if run.success else "❌ Falhou",
+                }
+                for run in maintenance_runs.values()
+            ]), hide_index=True, use_container_width=True)
+        else:
+            st.caption("Nenhuma manutenção executada ainda; o agendador roda nas janelas ociosas.")
+        if st.button("Executar Manutenção Agora", key="run_db_maintenance"):
+            with st.spinner("Executando ANALYZE, vacuum incremental e verificação de integridade..."):
+                maintenance_results = backend.run_database_maintenance()
+            failed = [result["task"] for result in maintenance_results if not result["success"]]
+            if failed:
+                st.error(f"Falha nas tarefas: {', '.join(failed)}.")
+            else:
+                st.success("Manutenção concluída.")
+
+    all_projects = cached_all_projects()
     if not all_projects:
         st.info("Nenhum projeto ativo para gerenciar infraestrutura e backup.")
         return
 
-    project_options_display = {f"{p.id[:8]}... - {p.name}": p.id for p in all_projects}
+    project_options_display = {f"{short_id(p.id)}... - {p.name}": p.id for p in all_projects}
     selected_project_key = st.selectbox(
         "Selecione um Projeto",
         options=list(project_options_display.keys()),
@@ -820,55 +1255,90 @@ def infra_backup_management_page():
         selected_project_id = project_options_display[selected_project_key]
         project_name_display = selected_project_key.split(' - ')[1]
 
-        st.subheader(f"Ambiente do Projeto: {project_name_display} (ID: {selected_project_id[:8]}...)")
+        st.subheader(f"Ambiente do Projeto: {project_name_display} (ID: {short_id(selected_project_id)}...)")
+
+        # Status e política de backup vêm do snapshot armazenado: a página não chama o LLM ao renderizar
+        infra_snapshot = backend.get_infra_snapshot(selected_project_id)
+        col_snapshot_info, col_snapshot_refresh = st.columns([3, 1])
+        with col_snapshot_info:
+            if infra_snapshot["infra_status"]:
+                st.caption(f"Snapshot do AID de {infra_snapshot['infra_status'].refreshed_at.strftime('%d/%m/%Y %H:%M:%S')}"
+                           + (" · atualizando em segundo plano..." if infra_snapshot["refreshing"] else ""))
+        with col_snapshot_refresh:
+            if st.button("🔄 Atualizar Snapshot", key=f"refresh_infra_{selected_project_id}", use_container_width=True):
+                with st.spinner("Consultando o AID..."):
+                    backend.refresh_infra_snapshot(selected_project_id)
+                st.rerun()
 
         st.markdown("---")
         st.subheader("Status da Infraestrutura (AID):")
-        # O backend.get_project_infra_status retorna um Dict[str, Any]
-        infra_status = backend.get_project_infra_status(selected_project_id)
-        if infra_status and not infra_status.get('error'):
-            st.write(f"**Status Geral:** {infra_status.get('overall_status', 'N/A')}")
-            for item, detail in infra_status.get('resources', {}).items():
-                st.markdown(f"- **{item}**: {detail['status']} - {detail['message']}")
+        if infra_snapshot["infra_status"] is None:
+            st.info("Gerando o primeiro snapshot da infraestrutura em segundo plano. Atualize a página em instantes.")
         else:
-            st.info(f"Status da infraestrutura não disponível ou {infra_status.get('error', 'Erro desconhecido')}.")
+            infra_status = infra_snapshot["infra_status"].data
+            if not infra_status.get('error'):
+                st.write(f"**Status Geral:** {infra_status.get('overall_status', 'N/A')}")
+                for item, detail in infra_status.get('resources', {}).items():
+                    st.markdown(f"- **{item}**: {detail['status']} - {detail['message']}")
+            else:
+                st.info(f"Status da infraestrutura não disponível ou {infra_status.get('error', 'Erro desconhecido')}.")
 
         st.markdown("---")
         st.subheader("Gestão de Backups (AID):")
-        # Nota: Chamando AIDAgent.configure_backups para *obter* info pode ser um design ambíguo.
-        # Idealmente, haveria um método como `AIDAgent.get_backup_status(project_id)`.
-        # No entanto, seguindo a suposição de que `configure_backups` também retorna status.
-        backup_info = backend.aid_agent.configure_backups(selected_project_id, "Projeto Backup") # Assume que retorna informações de status
+        backup_info = infra_snapshot["backup_status"].data if infra_snapshot["backup_status"] else None
+        backup_history = backend.get_backup_history()
         if backup_info and backup_info.get('success'):
             details = backup_info.get('details', {})
             st.write(f"**Política de Backup:** {details.get('policy_data', 'N/A')}")
-            st.write(f"**Último Status:** {details.get('last_backup_status', 'N/A')}")
             st.write(f"**Próximo Backup Agendado:** {details.get('next_scheduled_backup', 'N/A')}")
             st.write(f"**Mensagem:** {backup_info.get('message', 'N/A')}")
-
-            col_backup_buttons = st.columns(2)
-            with col_backup_buttons[0]:
-                if st.button("Executar Backup Manual", key=f"manual_backup_{selected_project_id}", use_container_width=True):
-                    with st.spinner("Executando backup manual..."):
-                        # O backend.trigger_manual_backup retorna um Dict[str, Any] com 'success' e 'message'
-                        result = backend.trigger_manual_backup(selected_project_id)
-                        if result["success"]:
-                            st.success(result["message"])
-                        else:
-                            st.error(f"Erro no backup manual: {result['message']}")
-                    st.rerun()
-            with col_backup_buttons[1]:
-                if st.button("Agendar Teste de Restauração", key=f"schedule_test_restore_{selected_project_id}", use_container_width=True):
-                    with st.spinner("Agendando teste de restauração..."):
-                        # O backend.schedule_test_restore retorna um Dict[str, Any] com 'success' e 'message'
-                        result = backend.schedule_test_restore(selected_project_id)
-                        if result["success"]:
-                            st.success(result["message"])
-                        else:
-                            st.error(f"Erro ao agendar teste de restauração: {result['message']}")
-                    st.rerun()
         else:
-            st.info("Informações de backup não disponíveis.")
+            st.info("Política de backup do AID não disponível.")
+        # O último status vem do histórico local (manifestos), sempre atual
+        last_backup = backup_history[0]["created_at"][:19].replace("T", " ") if backup_history else None
+        st.write(f"**Último Status:** {f'Success ({last_backup})' if last_backup else 'Nenhum backup realizado'}")
+
+        col_backup_buttons = st.columns(2)
+        with col_backup_buttons[0]:
+            if st.button("Executar Backup Manual", key=f"manual_backup_{selected_project_id}", use_container_width=True):
+                backup_progress = st.progress(0.0, text="Copiando o banco de dados (backup online)...")
+                # O backend.trigger_manual_backup retorna um Dict[str, Any] com 'success' e 'message'
+                result = backend.trigger_manual_backup(
+                    selected_project_id,
+                    progress_callback=lambda fraction: backup_progress.progress(fraction, text=f"Copiando o banco de dados... {fraction:.0%}")
+                )
+                backup_progress.empty()
+                if result["success"]:
+                    st.success(result["message"])
+                else:
+                    st.error(f"Erro no backup manual: {result['message']}")
+        with col_backup_buttons[1]:
+            if st.button("Executar Teste de Restauração", key=f"schedule_test_restore_{selected_project_id}", use_container_width=True):
+                with st.spinner("Restaurando o backup mais recente e verificando a integridade..."):
+                    # O backend.schedule_test_restore retorna um Dict[str, Any] com 'success' e 'message'
+                    result = backend.schedule_test_restore(selected_project_id)
+                    if result["success"]:
+                        st.success(result["message"])
+                    else:
+                        st.error(f"Erro no teste de restauração: {result['message']}")
+
+        if backup_history:
+            st.markdown("**Histórico de Backups:**")
+            st.dataframe(pd.DataFrame([
+                {
+                    "Backup": backup["created_at"][:19].replace("T", " "),
+                    "Banco": format_bytes(backup["db_size"]),
+                    "Comprimido": format_bytes(backup["compressed_size"]),
+                    "Duração (s)": backup["duration_seconds"],
+                    "Vazão (MB/s)": backup["throughput_mb_s"],
+                    "Teste de Restauração": (
+                        ("✅ OK" if backup["restore_test"]["success"] else "❌ Falhou")
+                        + f" ({backup['restore_test']['restore_seconds'] + backup['restore_test']['verify_seconds']:.2f}s)"
+                    ) if backup.get("restore_test") else "Não testado",
+                    "SHA-256": backup["sha256"][:16],
+                }
+                for backup in backup_history
+            ]), use_container_width=True, hide_index=True)
     else:
         st.info("Selecione um projeto para gerenciar a infraestrutura e backup.")
 
@@ -880,12 +1350,12 @@ def documentation_page():
     Acesse e gere a documentação completa dos projetos, mantendo tudo atualizado pelo ADO.
     """)
 
-    all_projects = backend.get_all_projects()
+    all_projects = cached_all_projects()
     if not all_projects:
         st.info("Nenhum projeto ativo com documentação para exibir.")
         return
 
-    project_options_display = {f"{p.id[:8]}... - {p.name}": p.id for p in all_projects}
+    project_options_display = {f"{short_id(p.id)}... - {p.name}": p.id for p in all_projects}
     selected_project_key = st.selectbox(
         "Selecione um Projeto",
         options=list(project_options_display.keys()),
@@ -896,7 +1366,7 @@ def documentation_page():
         selected_project_id = project_options_display[selected_project_key]
         project_name_display = selected_project_key.split(' - ')[1]
 
-        st.subheader(f"Documentação para {project_name_display} (ID: {selected_project_id[:8]}...)")
+        st.subheader(f"Documentação para {project_name_display} (ID: {short_id(selected_project_id)}...)")
 
         if st.button(f"Gerar/Atualizar Documentação (ADO) para {project_name_display}", key=f"generate_doc_{selected_project_id}", use_container_width=True):
             with st.spinner("ADO está gerando/atualizando a documentação..."):
@@ -908,7 +1378,8 @@ def documentation_page():
                     st.error(f"Falha ao gerar documentação: {result['message']}")
             st.rerun() # Recarrega para mostrar a nova documentação na lista
 
-        documentation_list = backend.get_documentation_for_project(selected_project_id)
+        documentation_list = view_cached(("doc_metadata", selected_project_id), ("documentation",),
+                                            lambda: backend.get_documentation_metadata(selected_project_id))
         if documentation_list:
             doc_files_map = {d.filename: d for d in documentation_list}
             selected_doc_file_name = st.selectbox("Selecione um documento:", list(doc_files_map.keys()))
@@ -922,7 +1393,7 @@ def documentation_page():
                 else:
                     st.markdown("**Última Atualização:** N/A")
                 st.markdown("---")
-                st.markdown(selected_doc.content) # Renderiza o markdown
+                st.markdown(backend.get_documentation_content(selected_doc.id) or "") # Renderiza o markdown
         else:
             st.info("Nenhum documento gerado para este projeto ainda.")
     else:
@@ -937,8 +1408,17 @@ def moai_communication_page():
     """)
 
     st.subheader("Histórico de Conversa:")
-    chat_history = backend.get_chat_history() # Usa o método do MOAI que já chama db_manager para obter histórico
-    for chat_message in chat_history:
+    # Janela das mensagens mais recentes; "carregar anteriores" amplia a janela em CHAT_WINDOW
+    if "chat_window" not in st.session_state:
+        st.session_state.chat_window = CHAT_WINDOW
+    chat_window = st.session_state.chat_window
+    chat_messages = backend.get_chat_messages(limit=chat_window + 1)
+    if len(chat_messages) > chat_window:
+        chat_messages = chat_messages[1:]
+        if st.button("⬆️ Carregar mensagens anteriores", key="btn_chat_load_older", use_container_width=True):
+            st.session_state.chat_window += CHAT_WINDOW
+            st.rerun()
+    for chat_message in chat_messages:
         with st.chat_message(chat_message.sender):
             st.markdown(chat_message.message)
 
@@ -967,12 +1447,12 @@ def project_management_page():
     Gerencie os detalhes dos projetos, acompanhe o progresso e faça ajustes em tempo real.
     """)
 
-    all_projects = backend.get_all_projects()
+    all_projects = cached_all_projects()
     if not all_projects:
         st.info("🎉 Nenhum projeto ativo para gerenciar no momento.")
         return
     
-    project_options_display = {f"{p.id[:8]}... - {p.name}": p.id for p in all_projects}
+    project_options_display = {f"{short_id(p.id)}... - {p.name}": p.id for p in all_projects}
     selected_project_key = st.selectbox(
         "Selecione um Projeto para Gerenciar",
         options=list(project_options_display.keys()),
@@ -981,7 +1461,7 @@ def project_management_page():
 
     if selected_project_key:
         selected_project_id = project_options_display[selected_project_key]
-        project = backend.get_project_by_id(selected_project_id)
+        project = cached_project(selected_project_id)
 
         if project:
             # Header com informações principais do projeto
@@ -1021,10 +1501,23 @@ def project_management_page():
                 
                 st.markdown("**Progresso**")
                 st.progress(project.progress / 100, text=f"{project.progress}%")
+
+                if project.archived_at:
+                    st.info(f"🧊 Artefatos arquivados em {project.archived_at.strftime('%d/%m/%Y %H:%M')}. "
+                            "Eles são restaurados automaticamente ao abrir código, relatórios, documentação ou logs do projeto.")
+                elif project.status == "completed":
+                    if st.button("🧊 Arquivar Projeto", key=f"archive_project_{project.id}",
+                                 help="Move código, relatórios, documentação, logs e workspaces para o arquivo frio."):
+                        archive_result = backend.archive_project(project.id)
+                        if archive_result["success"]:
+                            st.success(f"Projeto arquivado ({archive_result['rows']} registro(s)).")
+                            st.rerun()
+                        else:
+                            st.error(archive_result.get("error", "Não foi possível arquivar o projeto."))
             
             with tab_proposal:
                 st.subheader("📄 Especificações da Proposta Original")
-                proposal = backend.get_proposal_by_id(project.proposal_id)
+                proposal = cached_proposal(project.proposal_id)
 
                 if proposal:
                     col_prop1, col_prop2 = st.columns(2)
@@ -1074,7 +1567,7 @@ def project_management_page():
                     st.divider()
                     st.markdown("### 🔧 Editar Especificações da Proposta")
                     
-                    proposal = backend.get_proposal_by_id(project.proposal_id)
+                    proposal = cached_proposal(project.proposal_id)
                     if proposal: # Garante que a proposta existe antes de tentar editar
                         col_edit_title = st.columns(1)
                         edited_proposal_title = st.text_input("Título da Proposta", value=proposal.title)
@@ -1158,6 +1651,47 @@ def project_management_page():
     st.markdown("---")
 
 
+SEARCH_TYPE_LABELS = {
+    "proposal": "📝 Propostas",
+    "code": "💻 Código Gerado",
+    "documentation": "📚 Documentação",
+    "log": "📜 Logs do MOAI",
+}
+
+def search_page():
+    """Renderiza a página de Busca Global (propostas, código, documentação e logs)."""
+    st.header("🔎 Busca Global")
+
+    search_text = st.text_input("Termos de busca", key="search_page_text")
+    selected_types = st.multiselect(
+        "Tipos de conteúdo",
+        options=list(SEARCH_TYPE_LABELS.keys()),
+        default=list(SEARCH_TYPE_LABELS.keys()),
+        format_func=lambda t: SEARCH_TYPE_LABELS[t],
+        key="search_page_types"
+    )
+
+    if not search_text.strip():
+        st.info("Digite um termo para buscar em propostas, código, documentação e logs.")
+        return
+    if not selected_types:
+        st.warning("Selecione ao menos um tipo de conteúdo.")
+        return
+
+    results = backend.search(search_text, entity_types=selected_types, limit=50)
+    if not results:
+        st.info(f"Nenhum resultado encontrado para '{search_text}'.")
+        return
+
+    st.caption(f"{len(results)} resultado(s) mais relevantes para '{search_text}'.")
+    for result in results:
+        with st.container(border=True):
+            project_info = f" · Projeto {short_id(result.project_id)}..." if result.project_id else ""
+            st.markdown(f"**{SEARCH_TYPE_LABELS.get(result.entity_type, result.entity_type)}** · {result.title or 'Sem título'}{project_info}")
+            st.markdown(result.snippet)
+            st.caption(f"ID: {result.entity_id}")
+
+
 def about_page():
     """Renderiza a página 'Sobre'."""
     st.header("ℹ️ Sobre o CognitoLink e a Synapse Forge")
@@ -1180,44 +1714,74 @@ with st.sidebar:
     st.title("✨ CognitoLink")
     st.markdown("--- ✨ Visionary Command Center ✨ ---")
 
+    # Busca global: o formulário evita uma busca a cada tecla digitada.
+    with st.form("global_search_form", clear_on_submit=False):
+        sidebar_search_text = st.text_input("🔎 Buscar", placeholder="Propostas, código, documentação, logs...")
+        if st.form_submit_button("Buscar", use_container_width=True) and sidebar_search_text.strip():
+            st.session_state.search_page_text = sidebar_search_text
+            navigate_to("busca")
+
     st.subheader("Navegação Principal")
     
-    # Botões de navegação, usando navigate_to para mudar a página
-    if st.button("🌟 Dashboard Executivo", key="btn_dashboard", use_container_width=True):
-        navigate_to("dashboard")
+    # Botões de navegação: o callback troca a página antes do rerun do próprio clique
+    st.button("🌟 Dashboard Executivo", key="btn_dashboard", use_container_width=True, on_click=set_current_page, args=("dashboard",))
     
-    if st.button("📝 Entrada de Requisitos", key="btn_requisitos", use_container_width=True):
-        navigate_to("requisitos")
+    st.button("📝 Entrada de Requisitos", key="btn_requisitos", use_container_width=True, on_click=set_current_page, args=("requisitos",))
     
-    pending_proposals_count = backend.get_pending_proposals() # Exibe a contagem de propostas pendentes
-    if st.button(f"✅ Central de Aprovações ({pending_proposals_count})", key="btn_aprovacoes", use_container_width=True):
-        navigate_to("aprovacoes")
+    pending_proposals_count = view_cached("pending_count", ("proposals",), backend.get_pending_proposals) # Exibe a contagem de propostas pendentes
+    st.button(f"✅ Central de Aprovações ({pending_proposals_count})", key="btn_aprovacoes", use_container_width=True, on_click=set_current_page, args=("aprovacoes",))
     
-    if st.button("⏳ Linha do Tempo do Projeto", key="btn_timeline", use_container_width=True):
-        navigate_to("timeline")
+    st.button("⏳ Linha do Tempo do Projeto", key="btn_timeline", use_container_width=True, on_click=set_current_page, args=("timeline",))
     
-    if st.button("🚧 Gestão de Projetos", key="btn_project_management", use_container_width=True):
-        navigate_to("project_management")
+    st.button("🚧 Gestão de Projetos", key="btn_project_management", use_container_width=True, on_click=set_current_page, args=("project_management",))
     
-    if st.button("📊 Relatórios Detalhados", key="btn_relatorios", use_container_width=True):
-        navigate_to("relatorios")
+    st.button("📊 Relatórios Detalhados", key="btn_relatorios", use_container_width=True, on_click=set_current_page, args=("relatorios",))
     
-    if st.button("💬 Comunicação com MOAI", key="btn_chat_moai", use_container_width=True):
-        navigate_to("chat_moai")
+    st.button("💬 Comunicação com MOAI", key="btn_chat_moai", use_container_width=True, on_click=set_current_page, args=("chat_moai",))
     
-    if st.button("📚 Módulo de Documentação", key="btn_documentation", use_container_width=True):
-        navigate_to("documentation")
+    st.button("📚 Módulo de Documentação", key="btn_documentation", use_container_width=True, on_click=set_current_page, args=("documentation",))
     
-    if st.button("💻 Visualizador de Código", key="btn_code_viewer", use_container_width=True):
-        navigate_to("code_viewer")
+    st.button("💻 Visualizador de Código", key="btn_code_viewer", use_container_width=True, on_click=set_current_page, args=("code_viewer",))
     
-    if st.button("⚙️ Gestão de Infraestrutura e Backup", key="btn_infra_backup", use_container_width=True):
-        navigate_to("infra_backup")
+    st.button("⚙️ Gestão de Infraestrutura e Backup", key="btn_infra_backup", use_container_width=True, on_click=set_current_page, args=("infra_backup",))
     
     st.markdown("---")
     
-    if st.button("ℹ️ Sobre o CognitoLink", key="btn_sobre", use_container_width=True):
-        navigate_to("sobre")
+    st.button("ℹ️ Sobre o CognitoLink", key="btn_sobre", use_container_width=True, on_click=set_current_page, args=("sobre",))
+
+    with st.expander("🐞 Depuração do Cache"):
+        cache_snapshot = view_cache.snapshot()
+        entity_stats = backend.get_entity_cache_stats()
+        col_cache1, col_cache2 = st.columns(2)
+        col_cache1.metric("Acertos (views)", f"{cache_snapshot['hit_rate']:.0%}", f"{cache_snapshot['entries']} entradas", delta_color="off")
+        col_cache2.metric("Acertos (entidades)", f"{entity_stats['hit_rate']:.0%}", f"{entity_stats['size']} entradas", delta_color="off")
+        st.caption(f"change_log seq {cache_snapshot['seq']} · {cache_snapshot['seq_checks']} verificação(ões) de sequência")
+        if cache_snapshot["queries"]:
+            st.dataframe(pd.DataFrame([
+                {"Consulta": name, "Acertos": query["hits"], "Faltas": query["misses"],
+                 "Invalidações": query["invalidations"], "Expirações": query["expirations"], "Entradas": query["entries"]}
+                for name, query in cache_snapshot["queries"].items()
+            ]), hide_index=True, use_container_width=True)
+        last_render_ms = st.session_state.get("last_render_ms")
+        st.caption(f"Reruns completos: {len(st.session_state.full_reruns)}/min · "
+                   f"última renderização {f'{last_render_ms:.0f} ms' if last_render_ms is not None else 'N/A'} · "
+                   f"{st.session_state.get('fragment_runs', 0)} atualização(ões) de painéis ao vivo")
+        flight_stats = backend.get_single_flight_stats()
+        st.caption(f"Single-flight: {flight_stats['shared']} de {flight_stats['calls']} chamada(s) coalescida(s) · {flight_stats['in_flight']} em curso")
+        if flight_stats["operations"]:
+            st.dataframe(pd.DataFrame([
+                {"Operação": name, "Chamadas": operation["calls"], "Execuções": operation["executions"],
+                 "Coalescidas": operation["shared"], "Em curso": operation["in_flight"]}
+                for name, operation in flight_stats["operations"].items()
+            ]), hide_index=True, use_container_width=True)
+        speculation = backend.get_speculation_stats()
+        st.caption(f"Especulação pós-aprovação {'ativa' if speculation['enabled'] else 'desativada'}: "
+                   f"acerto {speculation['hit_rate']:.0%} ({speculation['hits']:.0f}/{speculation['hits'] + speculation['misses']:.0f} aprovações) · "
+                   f"{speculation['stored_drafts']}/{speculation['max_drafts']} rascunho(s) · "
+                   f"{speculation['discarded']:.0f} descartado(s) · {speculation['saved_ms'] / 1000:.1f}s de LLM economizados · "
+                   f"{speculation['calls_last_hour']}/{speculation['calls_per_hour']} chamadas/h")
+        if st.button("Limpar Cache de Views", key="btn_clear_view_cache", use_container_width=True):
+            view_cache.invalidate()
 
 # --- Roteamento de Páginas (Conteúdo Principal) ---
 # O conteúdo principal é renderizado com base na página atualmente selecionada no session_state.
@@ -1241,5 +1805,9 @@ elif st.session_state.current_page == "infra_backup":
     infra_backup_management_page()
 elif st.session_state.current_page == "documentation":
     documentation_page()
+elif st.session_state.current_page == "busca":
+    search_page()
 elif st.session_state.current_page == "sobre":
     about_page()
+
+st.session_state.last_render_ms = (time.perf_counter() - SCRIPT_STARTED_AT) * 1000
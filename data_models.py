@@ -1,8 +1,50 @@
 # data_models.py
 import datetime
+import os
+import threading
+import time
+import uuid
 from typing import List, Dict, Any, Optional, Union
 from pydantic import BaseModel, Field, field_validator
 
+# --- Identificadores ordenados por tempo (UUIDv7) ---
+# 48 bits de timestamp Unix em ms, 12 bits de contador monotônico e 62 bits aleatórios.
+# A ordem lexicográfica do texto acompanha a ordem de criação, então a chave primária
+# serve diretamente para consultas por recência e as inserções vão sempre ao fim do índice.
+_id_lock = threading.Lock()
+_last_id_ms = 0
+_id_counter = 0
+
+def _format_uuid7(unix_ms: int, counter: int) -> str:
+    rand_b = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    value = (unix_ms << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | rand_b
+    return str(uuid.UUID(int=value))
+
+def new_id() -> str:
+    """Gera um novo ID de entidade (UUIDv7), estritamente crescente dentro do processo."""
+    global _last_id_ms, _id_counter
+    with _id_lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_id_ms:
+            _last_id_ms, _id_counter = now_ms, 0
+        elif _id_counter < 0xFFF:
+            _id_counter += 1
+        else: # Contador esgotado no mesmo ms: avança o relógio lógico
+            _last_id_ms, _id_counter = _last_id_ms + 1, 0
+        return _format_uuid7(_last_id_ms, _id_counter)
+
+def id_for_timestamp(moment: datetime.datetime) -> str:
+    """ID (UUIDv7) para um instante passado; usado na migração de registros existentes."""
+    return _format_uuid7(int(moment.timestamp() * 1000), 0)
+
+def id_floor(moment: datetime.datetime) -> str:
+    """Menor ID possível para o instante: limite inferior de faixas de tempo sobre a chave primária."""
+    return str(uuid.UUID(int=(int(moment.timestamp() * 1000) << 80) | (0x7 << 76)))
+
+def short_id(entity_id: Optional[str]) -> str:
+    """Forma curta de exibição. Usa o final do ID: em UUIDv7 o início é o timestamp e se repete entre entidades próximas."""
+    return entity_id[-8:] if entity_id else "N/A"
+
 class Proposal(BaseModel):
     id: str
     title: str
@@ -38,6 +80,7 @@ class Project(BaseModel):
     progress: int
     started_at: datetime.datetime
     completed_at: Optional[datetime.datetime] = None
+    archived_at: Optional[datetime.datetime] = None # Preenchido enquanto os artefatos estão no arquivo frio
 
 class GeneratedCode(BaseModel):
     id: str
@@ -48,6 +91,17 @@ class GeneratedCode(BaseModel):
     description: str
     generated_at: datetime.datetime
 
+class GeneratedCodeInfo(BaseModel):
+    # Projeção de GeneratedCode sem o conteúdo, para listagens e seletores
+    id: str
+    project_id: str
+    filename: str
+    language: str
+    description: str
+    size: int = 0
+    line_count: int = 0
+    generated_at: datetime.datetime
+
 class QualityReport(BaseModel):
     id: str
     project_id: str
@@ -69,6 +123,16 @@ class Documentation(BaseModel):
     version: Optional[str] = None
     last_updated: Optional[datetime.datetime] = None
 
+class DocumentationInfo(BaseModel):
+    # Projeção de Documentation sem o conteúdo, para listagens e seletores
+    id: str
+    project_id: str
+    filename: str
+    document_type: str
+    version: Optional[str] = None
+    size: int = 0
+    last_updated: Optional[datetime.datetime] = None
+
 class MonitoringSummary(BaseModel):
     id: str
     project_id: Optional[str]
@@ -90,6 +154,40 @@ class MOAILog(BaseModel):
     agent_id: Optional[str] = None
     status: str
 
+class MOAILogRollup(BaseModel):
+    # Contagem horária de logs já removidos pela retenção
+    bucket: datetime.datetime # Início da hora
+    event_type: str
+    agent_id: Optional[str] = None
+    project_id: Optional[str] = None
+    status: Optional[str] = None
+    count: int
+
+class InfraSnapshot(BaseModel):
+    # Última leitura armazenada do status de infraestrutura/backup (project_id None = global)
+    project_id: Optional[str] = None
+    kind: str # infra_status, backup_status ou infrastructure_health
+    data: Dict[str, Any]
+    refreshed_at: datetime.datetime
+
+class SpeculativeDraft(BaseModel):
+    # Artefatos da orquestração pós-aprovação pré-computados para uma proposta pendente
+    proposal_id: str
+    project_id: str # id reservado para o projeto que a aprovação vai criar
+    provision_message: str
+    backup_message: str
+    code: Optional[Dict[str, Any]] = None # saída do ADE-X (filename, language, content, description)
+    llm_ms: float # tempo de LLM gasto na pré-computação (economizado quando o rascunho é promovido)
+    created_at: datetime.datetime
+
+class MaintenanceRun(BaseModel):
+    # Última execução de uma tarefa de manutenção do banco (optimize, analyze, vacuum, ...)
+    task: str
+    last_run_at: datetime.datetime
+    duration_ms: float
+    success: bool
+    details: Dict[str, Any] = Field(default_factory=dict)
+
 class TestWorkspace(BaseModel):
     id: str
     project_id: str
@@ -101,3 +199,28 @@ class TestWorkspace(BaseModel):
     workspace_path: str
     created_at: datetime.datetime
     last_used_at: Optional[datetime.datetime] = None
+
+class ChangeLogEntry(BaseModel):
+    seq: int
+    table_name: str
+    row_id: str
+    operation: str # INSERT, UPDATE ou DELETE
+    changed_at: datetime.datetime # UTC
+
+class ProjectReportStatus(BaseModel):
+    # Campos-chave do último relatório de qualidade e de segurança de um projeto
+    project_id: str
+    project_name: str
+    quality_status: Optional[str] = None
+    failed_tests: Optional[int] = None
+    risk_level: Optional[str] = None
+    security_score: Optional[int] = None
+    vulnerabilities_found: Optional[int] = None
+
+class SearchResult(BaseModel):
+    entity_type: str # proposal, code, documentation ou log
+    entity_id: str
+    project_id: Optional[str] = None
+    title: Optional[str] = None
+    snippet: str
+    rank: float
@@ -2,29 +2,244 @@
 import sqlite3
 import json
 import datetime
-from typing import List, Dict, Any, Optional
+import functools
+import gzip
+import hashlib
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Iterator, Tuple, Sequence, Type, TypeVar, Callable, get_args
 import logging
 
+from pydantic import BaseModel, TypeAdapter
+
 # Importa os modelos do novo arquivo data_models.py
-from data_models import Proposal, Project, GeneratedCode, QualityReport, SecurityReport, Documentation, MonitoringSummary, ChatMessage, MOAILog, TestWorkspace
+from data_models import Proposal, Project, GeneratedCode, GeneratedCodeInfo, QualityReport, SecurityReport, Documentation, DocumentationInfo, MonitoringSummary, ChatMessage, MOAILog, MOAILogRollup, InfraSnapshot, MaintenanceRun, SpeculativeDraft, TestWorkspace, ChangeLogEntry, ProjectReportStatus, SearchResult, new_id, id_floor, id_for_timestamp, short_id
 
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+@functools.lru_cache(maxsize=None)
+def _list_adapter(model_cls: Type[BaseModel]) -> TypeAdapter:
+    """TypeAdapter de List[model_cls] criado uma única vez por modelo (validação em lote)."""
+    return TypeAdapter(List[model_cls])
+
+
+@functools.lru_cache(maxsize=None)
+def _model_layout(model_cls: Type[BaseModel]) -> Tuple[frozenset, Dict[str, Any], Tuple[str, ...]]:
+    """Campos, defaults simples e campos datetime de um modelo, calculados uma única vez."""
+    defaults = {
+        name: field.default
+        for name, field in model_cls.model_fields.items()
+        if not field.is_required() and field.default_factory is None
+    }
+    datetime_fields = tuple(
+        name for name, field in model_cls.model_fields.items()
+        if field.annotation is datetime.datetime or datetime.datetime in get_args(field.annotation)
+    )
+    return frozenset(model_cls.model_fields), defaults, datetime_fields
+
+
+# Codec dos blobs de conteúdo (zlib da biblioteca padrão; "raw" quando a compressão não compensa)
+BLOB_CODEC = "zlib"
+BLOB_COMPRESSION_LEVEL = 6
+
+
+def _deflate_content(text: str) -> Tuple[str, str, bytes, int]:
+    """Calcula o hash SHA-256 do texto e o comprime. Retorna (hash, codec, dados, tamanho original)."""
+    raw = text.encode("utf-8")
+    compressed = zlib.compress(raw, BLOB_COMPRESSION_LEVEL)
+    if len(compressed) < len(raw):
+        return hashlib.sha256(raw).hexdigest(), BLOB_CODEC, compressed, len(raw)
+    return hashlib.sha256(raw).hexdigest(), "raw", raw, len(raw)
+
+
+def _inflate_content(codec: Optional[str], data: Optional[bytes]) -> Optional[str]:
+    if data is None:
+        return None
+    if codec == BLOB_CODEC:
+        data = zlib.decompress(data)
+    return bytes(data).decode("utf-8")
+
+
+def _construct_trusted(model_cls: Type[ModelT], data: Dict[str, Any], partial: bool = False) -> ModelT:
+    """
+    Equivalente enxuto de model_construct para linhas lidas do próprio banco: não valida,
+    não executa validators, ignora colunas que não são campos do modelo e converte
+    apenas as colunas TIMESTAMP presentes (via datetime.fromisoformat).
+    Com `partial` (projeções) os campos ausentes ficam sem valor, inclusive os opcionais:
+    lê-los levanta AttributeError em vez de devolver o default como se fosse o dado gravado.
+    """
+    field_names, defaults, datetime_fields = _model_layout(model_cls)
+    if not field_names.issuperset(data):
+        data = {key: value for key, value in data.items() if key in field_names}
+    for name in datetime_fields:
+        value = data.get(name)
+        if value.__class__ is str:
+            data[name] = datetime.datetime.fromisoformat(value)
+    fields_set = set(data)
+    if not partial:
+        for name, default in defaults.items():
+            data.setdefault(name, default)
+    instance = model_cls.__new__(model_cls)
+    object.__setattr__(instance, "__dict__", data)
+    object.__setattr__(instance, "__pydantic_fields_set__", fields_set)
+    object.__setattr__(instance, "__pydantic_extra__", None)
+    object.__setattr__(instance, "__pydantic_private__", None)
+    return instance
+
+
+class EntityCache:
+    """
+    Cache LRU em processo, thread-safe, para entidades lidas por id (propostas e projetos).
+    Só as escritas feitas pelo próprio DatabaseManager invalidam entradas diretamente; as de
+    outros processos no mesmo banco chegam via change_log (ver DatabaseManager.sync_entity_cache).
+
+    Um contador de geração é incrementado a cada invalidação: um valor lido do banco só
+    é armazenado se nenhuma invalidação ocorreu durante a leitura, evitando que uma
+    leitura concorrente reinstale um valor desatualizado.
+    Os objetos retornados são compartilhados entre chamadas e devem ser tratados como somente leitura.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get_or_load(self, kind: str, entity_id: str, loader: Callable[[], Optional[ModelT]]) -> Optional[ModelT]:
+        key = (kind, entity_id)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            generation = self._generation
+
+        value = loader()
+        if value is None or self.maxsize <= 0:
+            return value
+
+        with self._lock:
+            if self._generation == generation:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, kind: str, *entity_ids: str):
+        with self._lock:
+            self._generation += 1
+            for entity_id in entity_ids:
+                self._entries.pop((kind, entity_id), None)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+class _NotifyingConnection(sqlite3.Connection):
+    """Conexão que, ao ser fechada após alterar linhas, avisa os ouvintes de escrita do DatabaseManager."""
+    write_listeners: Tuple[Callable[[], None], ...] = ()
+
+    def close(self):
+        changed = self.total_changes > 0
+        super().close()
+        if changed:
+            for listener in self.write_listeners:
+                try:
+                    listener()
+                except Exception as e:
+                    logging.error(f"Erro em ouvinte de escrita do banco: {e}")
+
+
 class DatabaseManager:
-    def __init__(self, db_path: str):
+    # Tamanho padrão das páginas (keyset) e dos lotes de fetchmany usados pelos iteradores
+    DEFAULT_PAGE_SIZE = 50
+    STREAM_BATCH_SIZE = 500
+
+    def __init__(self, db_path: str, trusted_reads: Optional[bool] = None):
         self.db_path = db_path
+        # Leituras confiáveis: os dados foram validados pelos modelos Pydantic na escrita,
+        # então na leitura os modelos são montados sem revalidação (ver _construct_trusted).
+        if trusted_reads is None:
+            trusted_reads = os.getenv("SFORGE_TRUSTED_READS", "1") != "0"
+        self.trusted_reads = trusted_reads
+        # Retenção de logs: horizonte em dias e diretório dos segmentos JSONL arquivados
+        self.log_retention_days = int(os.getenv("SFORGE_LOG_RETENTION_DAYS", "30"))
+        self.log_archive_dir = os.getenv("SFORGE_LOG_ARCHIVE_DIR") or os.path.join(
+            os.path.dirname(os.path.abspath(db_path)), "log_archive")
+        # Arquivo frio: um arquivo JSON comprimido por projeto concluído
+        self.project_archive_dir = os.getenv("SFORGE_PROJECT_ARCHIVE_DIR") or os.path.join(
+            os.path.dirname(os.path.abspath(db_path)), "project_archive")
+        self.project_archive_days = int(os.getenv("SFORGE_PROJECT_ARCHIVE_DAYS", "90"))
+        # Cache de propostas/projetos por id. As escritas desta instância o invalidam na hora; as de
+        # outros processos que compartilham o banco (API, CLI de lote, outra instância) são lidas do
+        # change_log no máximo a cada entity_cache_sync_interval segundos (0 = a cada leitura)
+        self.entity_cache = EntityCache(maxsize=int(os.getenv("SFORGE_ENTITY_CACHE_SIZE", "256")))
+        self.entity_cache_sync_interval = float(os.getenv("SFORGE_ENTITY_CACHE_SYNC_SECONDS", "1"))
+        self._entity_cache_sync_lock = threading.Lock()
+        self._entity_cache_synced_at = 0.0
+        self._entity_cache_seq: Optional[int] = None
+        # Chamados sem argumentos sempre que uma conexão desta instância grava algo (ex.: invalidar caches da UI)
+        self._write_listeners: List[Callable[[], None]] = []
         logging.info(f"DatabaseManager inicializado. Banco de dados: {self.db_path}")
         self.initialize_db()
+        self._entity_cache_seq = self.get_change_seq()
+        self._entity_cache_synced_at = time.monotonic()
+
+    def add_write_listener(self, listener: Callable[[], None]):
+        self._write_listeners.append(listener)
 
     def _connect(self):
-        conn = sqlite3.connect(self.db_path, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
+        conn = sqlite3.connect(self.db_path, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+                               factory=_NotifyingConnection)
+        conn.write_listeners = tuple(self._write_listeners)
         conn.row_factory = sqlite3.Row # Permite acessar colunas por nome
         return conn
 
+    def _read_connect(self):
+        """
+        Conexão para leituras. No modo confiável dispensa o PARSE_DECLTYPES: as colunas
+        TIMESTAMP são convertidas só quando presentes na linha, em _construct_trusted.
+        """
+        if not self.trusted_reads:
+            return self._connect()
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
     def initialize_db(self):
         conn = self._connect()
         cursor = conn.cursor()
 
+        # Em bancos novos o auto_vacuum incremental vale desde já; bancos existentes são
+        # convertidos com um VACUUM completo por ação explícita do administrador (ver run_maintenance("vacuum")).
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
         # Tabela de Propostas (estimated_value_moai agora é REAL para float)
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS proposals (
@@ -70,6 +285,9 @@ class DatabaseManager:
                 content TEXT,
                 description TEXT,
                 generated_at TIMESTAMP,
+                size INTEGER,
+                line_count INTEGER,
+                content_hash TEXT, -- conteúdo em content_blobs; content fica NULL
                 FOREIGN KEY (project_id) REFERENCES projects (id)
             )
         """)
@@ -106,6 +324,8 @@ class DatabaseManager:
                 document_type TEXT,
                 version TEXT,
                 last_updated TIMESTAMP,
+                size INTEGER,
+                content_hash TEXT, -- conteúdo em content_blobs; content fica NULL
                 FOREIGN KEY (project_id) REFERENCES projects (id)
             )
         """)
@@ -162,10 +382,717 @@ class DatabaseManager:
             )
         """)
 
+        # Metadados de tamanho gravados na escrita, para listar arquivos sem ler o conteúdo
+        self._ensure_column(cursor, "generated_code", "size", "INTEGER")
+        self._ensure_column(cursor, "generated_code", "line_count", "INTEGER")
+        self._ensure_column(cursor, "documentation", "size", "INTEGER")
+        cursor.execute("""
+            UPDATE generated_code
+            SET size = length(CAST(content AS BLOB)),
+                line_count = length(content) - length(replace(content, char(10), '')) + 1
+            WHERE size IS NULL AND content IS NOT NULL
+        """)
+        cursor.execute("UPDATE documentation SET size = length(CAST(content AS BLOB)) WHERE size IS NULL AND content IS NOT NULL")
+        # Blobs de conteúdo endereçados por SHA-256: código e documentação idênticos são gravados uma única vez
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS content_blobs (
+                hash TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                data BLOB NOT NULL,
+                raw_size INTEGER NOT NULL,
+                stored_size INTEGER NOT NULL,
+                refcount INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMP
+            )
+        """)
+        self._ensure_column(cursor, "generated_code", "content_hash", "TEXT REFERENCES content_blobs (hash)")
+        # Stub de projeto arquivado: artefatos fora das tabelas quentes, no arquivo indicado
+        self._ensure_column(cursor, "projects", "archived_at", "TIMESTAMP")
+        self._ensure_column(cursor, "projects", "archive_path", "TEXT")
+        self._ensure_column(cursor, "projects", "rehydrated_at", "TIMESTAMP")
+        self._ensure_column(cursor, "documentation", "content_hash", "TEXT REFERENCES content_blobs (hash)")
+        for table in self.BLOB_TABLES:
+            self._create_blob_refcount_triggers(cursor, table)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_generated_code_project ON generated_code (project_id, generated_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_documentation_project ON documentation (project_id, last_updated)")
+
+        # Campos-chave dos relatórios JSON como colunas geradas (JSON1) indexadas
+        for table, (json_column, generated_columns) in self.REPORT_JSON_COLUMNS.items():
+            for column, column_type, json_path in generated_columns:
+                self._ensure_column(cursor, table, column, (
+                    f"{column_type} GENERATED ALWAYS AS "
+                    f"(CASE WHEN json_valid({json_column}) THEN json_extract({json_column}, '{json_path}') END) VIRTUAL"
+                ))
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_project ON {table} (project_id, generated_at)")
+            # Último relatório de cada projeto, base das consultas de portfólio
+            cursor.execute(f"""
+                CREATE VIEW IF NOT EXISTS latest_{table} AS
+                SELECT * FROM {table} r
+                WHERE r.generated_at = (SELECT MAX(generated_at) FROM {table} WHERE project_id = r.project_id)
+            """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_quality_reports_status ON quality_reports (overall_status, failed_tests)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_security_reports_risk ON security_reports (risk_level, security_score)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_security_reports_score ON security_reports (security_score)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_monitoring_summaries_health ON monitoring_summaries (health_status)")
+
+        # Índices para paginação por keyset (ordem recente primeiro) e filtros por projeto/status
+        # Logs e chat são paginados pela própria chave primária (IDs ordenados por tempo), sem índice de timestamp
+        for obsolete_index in ("idx_moai_logs_timestamp", "idx_moai_logs_project", "idx_chat_history_timestamp"):
+            cursor.execute(f"DROP INDEX IF EXISTS {obsolete_index}")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_moai_logs_project_id ON moai_logs (project_id, id)")
+
+        # Contagens horárias dos logs removidos pela retenção ('' quando agente/projeto/status é nulo)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS moai_log_rollups (
+                bucket TIMESTAMP NOT NULL,
+                event_type TEXT NOT NULL,
+                agent_id TEXT NOT NULL DEFAULT '',
+                project_id TEXT NOT NULL DEFAULT '',
+                status TEXT NOT NULL DEFAULT '',
+                count INTEGER NOT NULL,
+                PRIMARY KEY (bucket, event_type, agent_id, project_id, status)
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_moai_log_rollups_project ON moai_log_rollups (project_id, bucket)")
+
+        # Última execução de cada tarefa de manutenção (detalhes em JSON)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS maintenance_runs (
+                task TEXT PRIMARY KEY,
+                last_run_at TIMESTAMP NOT NULL,
+                duration_ms REAL NOT NULL,
+                success INTEGER NOT NULL,
+                details TEXT
+            )
+        """)
+        # Snapshots de infraestrutura/backup gerados pelo AID ('' = global), servidos à UI sem chamar o LLM
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS infra_snapshots (
+                project_id TEXT NOT NULL DEFAULT '',
+                kind TEXT NOT NULL,
+                data TEXT NOT NULL,
+                refreshed_at TIMESTAMP NOT NULL,
+                PRIMARY KEY (project_id, kind)
+            )
+        """)
+        # Rascunhos da orquestração pós-aprovação pré-computados para propostas pendentes
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS speculative_drafts (
+                proposal_id TEXT PRIMARY KEY,
+                project_id TEXT NOT NULL,
+                provision_message TEXT NOT NULL,
+                backup_message TEXT NOT NULL,
+                code TEXT,
+                llm_ms REAL NOT NULL,
+                created_at TIMESTAMP NOT NULL
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_proposals_status ON proposals (status, submitted_at, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_proposals_submitted ON proposals (submitted_at, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_test_workspaces_project ON test_workspaces (project_id, created_at, id)")
+
+        # Versão de dados por tabela, incrementada por triggers a cada escrita (chave de caches derivados)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS data_versions (
+                table_name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        for table in self.VERSIONED_TABLES:
+            cursor.execute("INSERT OR IGNORE INTO data_versions (table_name, version) VALUES (?, 0)", (table,))
+            for operation in ("INSERT", "UPDATE", "DELETE"):
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_version_{operation.lower()} AFTER {operation} ON {table} BEGIN
+                        UPDATE data_versions SET version = version + 1 WHERE table_name = '{table}';
+                    END
+                """)
+
+        self._migrate_time_ordered_ids(cursor)
+        self._initialize_search_index(cursor)
+        for table in self.BLOB_TABLES:
+            self._migrate_inline_content(cursor, table)
+        self._initialize_change_log(cursor)
+
         conn.commit()
         conn.close()
         logging.info("Banco de dados inicializado/verificado com sucesso.")
 
+    # Tabelas acompanhadas pelo change_log e operações registradas. moai_logs só registra inserções:
+    # suas remoções vêm da retenção/exclusão de projeto e não interessam à UI.
+    CHANGE_TRACKED_TABLES = {
+        "proposals": ("INSERT", "UPDATE", "DELETE"),
+        "projects": ("INSERT", "UPDATE", "DELETE"),
+        "generated_code": ("INSERT", "UPDATE", "DELETE"),
+        "documentation": ("INSERT", "UPDATE", "DELETE"),
+        "quality_reports": ("INSERT", "UPDATE", "DELETE"),
+        "security_reports": ("INSERT", "UPDATE", "DELETE"),
+        "monitoring_summaries": ("INSERT", "UPDATE", "DELETE"),
+        "test_workspaces": ("INSERT", "UPDATE", "DELETE"),
+        "chat_history": ("INSERT", "UPDATE", "DELETE"),
+        "moai_logs": ("INSERT",),
+    }
+    # Máximo de mudanças devolvidas por changes_since; acima disso o consumidor recarrega tudo
+    CHANGE_FEED_LIMIT = 1000
+
+    def _initialize_change_log(self, cursor: sqlite3.Cursor):
+        """
+        Cria o change_log (CDC): triggers registram sequência, tabela, id da linha e operação
+        de cada escrita. AUTOINCREMENT garante sequência monotônica mesmo após a poda.
+        """
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS change_log (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_name TEXT NOT NULL,
+                row_id TEXT NOT NULL,
+                operation TEXT NOT NULL,
+                changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP -- UTC
+            )
+        """)
+        for table, operations in self.CHANGE_TRACKED_TABLES.items():
+            for operation in operations:
+                row = "old" if operation == "DELETE" else "new"
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_cdc_{operation.lower()} AFTER {operation} ON {table} BEGIN
+                        INSERT INTO change_log (table_name, row_id, operation) VALUES ('{table}', {row}.id, '{operation}');
+                    END
+                """)
+
+    def get_change_seq(self) -> int:
+        """Última sequência do change_log (consulta O(1) em sqlite_sequence)."""
+        conn = self._read_connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'")
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else 0
+
+    def changes_since(self, seq: Optional[int], limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Mudanças com sequência maior que `seq`, em ordem. Retorna {"seq", "changes", "reset"}:
+        reset=True indica que o consumidor deve descartar tudo o que tem em cache, porque `seq`
+        é desconhecido, as mudanças intermediárias já foram podadas ou passam de `limit`.
+        """
+        limit = limit or self.CHANGE_FEED_LIMIT
+        conn = self._read_connect()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'")
+            row = cursor.fetchone()
+            current_seq = row[0] if row else 0
+            if seq is None or seq > current_seq:
+                return {"seq": current_seq, "changes": [], "reset": True}
+            if seq == current_seq:
+                return {"seq": current_seq, "changes": [], "reset": False}
+            cursor.execute("SELECT MIN(seq) FROM change_log")
+            oldest_seq = cursor.fetchone()[0]
+            if oldest_seq is None or oldest_seq > seq + 1:
+                return {"seq": current_seq, "changes": [], "reset": True}
+            cursor.execute("SELECT * FROM change_log WHERE seq > ? ORDER BY seq LIMIT ?", (seq, limit + 1))
+            rows = cursor.fetchall()
+        finally:
+            conn.close()
+        if len(rows) > limit:
+            return {"seq": current_seq, "changes": [], "reset": True}
+        changes = self._to_models(ChangeLogEntry, rows)
+        return {"seq": changes[-1].seq if changes else seq, "changes": changes, "reset": False}
+
+    # Tabelas do change_log cujas linhas ficam no EntityCache, com o tipo de entidade usado no cache
+    ENTITY_CACHE_KINDS = {"proposals": "proposal", "projects": "project"}
+
+    def sync_entity_cache(self, force: bool = False):
+        """
+        Invalida no EntityCache as propostas e projetos alterados desde a última sincronização,
+        incluindo escritas de outros processos. Sem `force`, consulta o change_log no máximo a
+        cada entity_cache_sync_interval segundos e não espera uma sincronização já em curso.
+        """
+        if not self._entity_cache_sync_lock.acquire(blocking=force):
+            return
+        try:
+            now = time.monotonic()
+            if not force and now - self._entity_cache_synced_at < self.entity_cache_sync_interval:
+                return
+            self._entity_cache_synced_at = now
+            feed = self.changes_since(self._entity_cache_seq)
+            if feed["reset"]:
+                self.entity_cache.clear()
+            else:
+                changed: Dict[str, set] = {}
+                for change in feed["changes"]:
+                    kind = self.ENTITY_CACHE_KINDS.get(change.table_name)
+                    if kind:
+                        changed.setdefault(kind, set()).add(change.row_id)
+                for kind, entity_ids in changed.items():
+                    self.entity_cache.invalidate(kind, *entity_ids)
+            self._entity_cache_seq = feed["seq"]
+        finally:
+            self._entity_cache_sync_lock.release()
+
+    def prune_change_log(self, retain_hours: int = 24, batch_size: int = 5000) -> int:
+        """Remove, em lotes, entradas do change_log mais antigas que `retain_hours`. Retorna quantas removeu."""
+        removed = 0
+        while True:
+            conn = self._connect()
+            cursor = conn.cursor()
+            try:
+                cursor.execute("""
+                    DELETE FROM change_log WHERE seq IN (
+                        SELECT seq FROM change_log WHERE changed_at < datetime('now', ?) ORDER BY seq LIMIT ?
+                    )
+                """, (f"-{retain_hours} hours", batch_size))
+                conn.commit()
+                batch_removed = cursor.rowcount
+            except sqlite3.Error as e:
+                logging.error(f"Erro ao podar o change_log: {e}")
+                conn.rollback()
+                break
+            finally:
+                conn.close()
+            removed += batch_removed
+            if batch_removed < batch_size:
+                break
+        return removed
+
+    # Tabelas com contador de versão em data_versions
+    VERSIONED_TABLES = ("proposals", "projects")
+
+    def get_data_version(self, *tables: str) -> Tuple[int, ...]:
+        """Carimbo de versão das tabelas: muda sempre que alguma delas recebe uma escrita."""
+        conn = self._read_connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT table_name, version FROM data_versions WHERE table_name IN ({', '.join('?' * len(tables))})", tables)
+        versions = dict(cursor.fetchall())
+        conn.close()
+        return tuple(versions.get(table, 0) for table in tables)
+
+    def get_proposal_analytics_rows(self) -> List[Tuple[Any, ...]]:
+        """
+        Projeção colunar das propostas para as análises de portfólio, numa única consulta e sem
+        montar modelos: (status, estimated_value_moai, submitted_at, approved_at, client_name).
+        """
+        conn = self._read_connect()
+        conn.row_factory = None
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT status, estimated_value_moai, submitted_at, approved_at,
+                   CASE WHEN json_valid(requirements) THEN json_extract(requirements, '$.nome_cliente') END AS client_name
+            FROM proposals
+        """)
+        rows = cursor.fetchall()
+        conn.close()
+        return rows
+
+    # Versão do esquema de IDs gravada em PRAGMA user_version (1 = UUIDv7 ordenado por tempo)
+    ID_SCHEME_VERSION = 1
+    # Tabela de entidade -> coluna de data da qual o novo ID é derivado na migração
+    ID_TIMESTAMP_COLUMNS = {
+        "proposals": "submitted_at",
+        "projects": "started_at",
+        "generated_code": "generated_at",
+        "quality_reports": "generated_at",
+        "security_reports": "generated_at",
+        "documentation": "last_updated",
+        "monitoring_summaries": "generated_at",
+        "chat_history": "timestamp",
+        "moai_logs": "timestamp",
+        "test_workspaces": "created_at",
+    }
+    # Colunas que referenciam IDs de outras entidades
+    ID_REFERENCE_COLUMNS = (
+        ("projects", "proposal_id"),
+        ("generated_code", "project_id"),
+        ("quality_reports", "project_id"),
+        ("security_reports", "project_id"),
+        ("documentation", "project_id"),
+        ("monitoring_summaries", "project_id"),
+        ("moai_logs", "project_id"),
+        ("test_workspaces", "project_id"),
+        ("test_workspaces", "code_id"),
+    )
+
+    def _migrate_time_ordered_ids(self, cursor: sqlite3.Cursor):
+        """
+        Migração única dos IDs UUID4 para UUIDv7: cada registro recebe um ID derivado da sua
+        data de criação, e todas as referências são reescritas pelo mapa antigo -> novo.
+        O índice de busca é descartado para ser reconstruído com os novos IDs.
+        """
+        cursor.execute("PRAGMA user_version")
+        if cursor.fetchone()[0] >= self.ID_SCHEME_VERSION:
+            return
+
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS id_remap (old_id TEXT PRIMARY KEY, new_id TEXT NOT NULL)")
+        remapped = 0
+        for table, timestamp_column in self.ID_TIMESTAMP_COLUMNS.items():
+            # O 15º caractere de um UUID é a versão; IDs já no formato v7 são mantidos
+            cursor.execute(f"SELECT id, {timestamp_column} AS created FROM {table} WHERE substr(id, 15, 1) <> '7'")
+            mapping = [
+                (row["id"], id_for_timestamp(row["created"]) if isinstance(row["created"], datetime.datetime) else new_id())
+                for row in cursor.fetchall()
+            ]
+            if not mapping:
+                continue
+            cursor.executemany("INSERT OR IGNORE INTO id_remap (old_id, new_id) VALUES (?, ?)", mapping)
+            cursor.execute(f"""
+                UPDATE {table} SET id = (SELECT new_id FROM id_remap WHERE old_id = {table}.id)
+                WHERE id IN (SELECT old_id FROM id_remap)
+            """)
+            remapped += len(mapping)
+
+        if remapped:
+            for table, column in self.ID_REFERENCE_COLUMNS:
+                cursor.execute(f"""
+                    UPDATE {table} SET {column} = (SELECT new_id FROM id_remap WHERE old_id = {table}.{column})
+                    WHERE {column} IN (SELECT old_id FROM id_remap)
+                """)
+            cursor.execute("DROP TABLE IF EXISTS search_index")
+            cursor.execute("DROP TABLE IF EXISTS search_index_map")
+            self.entity_cache.clear()
+            logging.info(f"{remapped} ID(s) migrados para o formato ordenado por tempo (UUIDv7).")
+        cursor.execute("DROP TABLE id_remap")
+        cursor.execute(f"PRAGMA user_version = {self.ID_SCHEME_VERSION}")
+
+    # Tabelas cujo conteúdo fica em content_blobs (coluna content_hash)
+    BLOB_TABLES = ("generated_code", "documentation")
+    GENERATED_CODE_WITH_BLOB = """
+        SELECT t.*, b.codec AS blob_codec, b.data AS blob_data
+        FROM generated_code t LEFT JOIN content_blobs b ON b.hash = t.content_hash
+    """
+    DOCUMENTATION_WITH_BLOB = """
+        SELECT t.*, b.codec AS blob_codec, b.data AS blob_data
+        FROM documentation t LEFT JOIN content_blobs b ON b.hash = t.content_hash
+    """
+
+    def _create_blob_refcount_triggers(self, cursor: sqlite3.Cursor, table: str):
+        """
+        Mantém content_blobs.refcount pelas próprias escritas da tabela (inclusive exclusões em
+        cascata), removendo o blob quando a última referência some.
+        """
+        release_old = """
+            UPDATE content_blobs SET refcount = refcount - 1 WHERE hash = old.content_hash;
+            DELETE FROM content_blobs WHERE hash = old.content_hash AND refcount <= 0;
+        """
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_blob_ai AFTER INSERT ON {table} WHEN new.content_hash IS NOT NULL BEGIN
+                UPDATE content_blobs SET refcount = refcount + 1 WHERE hash = new.content_hash;
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_blob_au AFTER UPDATE OF content_hash ON {table}
+            WHEN new.content_hash IS NOT old.content_hash BEGIN
+                UPDATE content_blobs SET refcount = refcount + 1 WHERE hash = new.content_hash;
+                {release_old}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_blob_ad AFTER DELETE ON {table} WHEN old.content_hash IS NOT NULL BEGIN
+                {release_old}
+            END
+        """)
+
+    def _store_blob(self, cursor: sqlite3.Cursor, text: str) -> str:
+        """Grava (se ainda não existir) o blob comprimido do texto e retorna seu hash."""
+        content_hash, codec, data, raw_size = _deflate_content(text)
+        cursor.execute("""
+            INSERT OR IGNORE INTO content_blobs (hash, codec, data, raw_size, stored_size, refcount, created_at)
+            VALUES (?, ?, ?, ?, ?, 0, ?)
+        """, (content_hash, codec, data, raw_size, len(data), datetime.datetime.now()))
+        return content_hash
+
+    def _migrate_inline_content(self, cursor: sqlite3.Cursor, table: str, batch_size: int = 200):
+        """Move o conteúdo TEXT legado da tabela para content_blobs, em lotes."""
+        migrated = 0
+        while True:
+            cursor.execute(f"SELECT id, content FROM {table} WHERE content_hash IS NULL AND content IS NOT NULL LIMIT ?",
+                           (batch_size,))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            for row in rows:
+                content_hash = self._store_blob(cursor, row["content"])
+                cursor.execute(f"UPDATE {table} SET content_hash = ?, content = NULL WHERE id = ?", (content_hash, row["id"]))
+                self._index_blob_content(cursor, table, row["id"], row["content"])
+            migrated += len(rows)
+        if migrated:
+            logging.info(f"{migrated} registro(s) de {table} migrados para content_blobs.")
+
+    @staticmethod
+    def _decode_blob_content(data: Dict[str, Any]) -> Dict[str, Any]:
+        # Descomprime o blob apenas para as linhas efetivamente carregadas com conteúdo
+        codec, blob = data.pop("blob_codec", None), data.pop("blob_data", None)
+        if data.get("content") is None:
+            data["content"] = _inflate_content(codec, blob)
+        return data
+
+    def _read_blob_content(self, table: str, entity_id: str) -> Optional[str]:
+        conn = self._read_connect()
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT t.content, b.codec, b.data FROM {table} t
+            LEFT JOIN content_blobs b ON b.hash = t.content_hash
+            WHERE t.id = ?
+        """, (entity_id,))
+        row = cursor.fetchone()
+        conn.close()
+        if not row:
+            return None
+        return row["content"] if row["content"] is not None else _inflate_content(row["codec"], row["data"])
+
+    def get_blob_storage_stats(self) -> Dict[str, Any]:
+        """
+        Estatísticas do armazenamento de conteúdo: bytes lógicos (soma de todas as referências),
+        bytes únicos após deduplicação e bytes efetivamente gravados após compressão.
+        """
+        conn = self._read_connect()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT COUNT(*) AS blobs,
+                   COALESCE(SUM(refcount), 0) AS references_count,
+                   COALESCE(SUM(raw_size * refcount), 0) AS logical_bytes,
+                   COALESCE(SUM(raw_size), 0) AS unique_bytes,
+                   COALESCE(SUM(stored_size), 0) AS stored_bytes
+            FROM content_blobs
+        """)
+        stats = dict(cursor.fetchone())
+        conn.close()
+        stats["dedup_ratio"] = (stats["logical_bytes"] / stats["unique_bytes"]) if stats["unique_bytes"] else 1.0
+        stats["compression_ratio"] = (stats["unique_bytes"] / stats["stored_bytes"]) if stats["stored_bytes"] else 1.0
+        stats["saved_bytes"] = stats["logical_bytes"] - stats["stored_bytes"]
+        return stats
+
+    # Fontes do índice de busca: tipo -> (tabela, project_id, título, corpo, colunas que disparam reindexação).
+    # As expressões usam {row} como alias da linha (NEW nos triggers, a própria tabela no preenchimento inicial).
+    # O conteúdo de código e documentação fica comprimido em content_blobs e não é legível em SQL puro:
+    # vai para a coluna content do índice pelo Python (_index_blob_content), nas escritas desta classe.
+    SEARCH_SOURCES = {
+        "proposal": (
+            "proposals", "NULL", "{row}.title",
+            "coalesce({row}.description, '') || ' ' || coalesce((SELECT group_concat(value, ' ') FROM json_each({row}.requirements)), '')",
+            ("title", "description", "requirements"),
+        ),
+        "code": (
+            "generated_code", "{row}.project_id", "{row}.filename",
+            "coalesce({row}.description, '')",
+            ("filename", "description"),
+        ),
+        "documentation": (
+            "documentation", "{row}.project_id", "{row}.filename",
+            "coalesce({row}.document_type, '')",
+            ("filename", "document_type"),
+        ),
+        "log": (
+            "moai_logs", "{row}.project_id", "{row}.event_type", "coalesce({row}.details, '')",
+            ("event_type", "details"),
+        ),
+    }
+
+    # Tabela com conteúdo em blob -> tipo da entrada no índice de busca
+    BLOB_SEARCH_TYPES = {"generated_code": "code", "documentation": "documentation"}
+
+    def _initialize_search_index(self, cursor: sqlite3.Cursor):
+        """
+        Cria o índice FTS5 unificado (search_index) e os triggers que o mantêm sincronizado.
+        search_index_map dá a cada entidade um rowid estável no índice, permitindo
+        atualizar/remover entradas por rowid em vez de varrer a coluna entity_id.
+        Os triggers usam só SQL puro, então qualquer conexão (sqlite3 da linha de comando,
+        scripts de manutenção) pode gravar nas tabelas indexadas.
+        """
+        cursor.execute("SELECT name FROM pragma_table_info('search_index')")
+        index_columns = {row[0] for row in cursor.fetchall()}
+        if index_columns and "content" not in index_columns:
+            # Índice anterior à coluna content, alimentado por triggers que descomprimiam os blobs
+            cursor.execute("DROP TABLE search_index")
+            cursor.execute("DROP TABLE IF EXISTS search_index_map")
+        needs_backfill = "content" not in index_columns
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS search_index_map (
+                rowid INTEGER PRIMARY KEY,
+                entity_type TEXT NOT NULL,
+                entity_id TEXT NOT NULL,
+                UNIQUE (entity_type, entity_id)
+            )
+        """)
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+                entity_type UNINDEXED, entity_id UNINDEXED, project_id UNINDEXED, title, body, content,
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+        """)
+
+        for entity_type, (table, project_expr, title_expr, body_expr, watched_columns) in self.SEARCH_SOURCES.items():
+            new_values = (project_expr.format(row="new"), title_expr.format(row="new"), body_expr.format(row="new"))
+            map_rowid = f"(SELECT rowid FROM search_index_map WHERE entity_type = '{entity_type}' AND entity_id = {{row}}.id)"
+            insert_entry = f"""
+                INSERT OR IGNORE INTO search_index_map (entity_type, entity_id) VALUES ('{entity_type}', new.id);
+                INSERT INTO search_index (rowid, entity_type, entity_id, project_id, title, body)
+                VALUES ({map_rowid.format(row="new")}, '{entity_type}', new.id, {new_values[0]}, {new_values[1]}, {new_values[2]});
+            """
+            # Atualiza as colunas derivadas da linha e preserva content, que só o Python grava
+            update_entry = f"""
+                UPDATE search_index SET project_id = {new_values[0]}, title = {new_values[1]}, body = {new_values[2]}
+                WHERE rowid = {map_rowid.format(row="new")};
+            """
+            delete_entry = f"DELETE FROM search_index WHERE rowid = {map_rowid.format(row='old')};"
+            # Recriados a cada inicialização para que mudanças nas expressões cheguem a bancos existentes
+            for suffix in ("ai", "au", "ad"):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {table}_search_{suffix}")
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_search_ai AFTER INSERT ON {table} BEGIN {insert_entry} END")
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_search_au AFTER UPDATE OF {', '.join(watched_columns)} ON {table} BEGIN
+                    {update_entry}
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_search_ad AFTER DELETE ON {table} BEGIN
+                    {delete_entry}
+                    DELETE FROM search_index_map WHERE entity_type = '{entity_type}' AND entity_id = old.id;
+                END
+            """)
+
+            if needs_backfill:
+                cursor.execute(f"INSERT OR IGNORE INTO search_index_map (entity_type, entity_id) SELECT '{entity_type}', id FROM {table}")
+                cursor.execute(f"""
+                    INSERT INTO search_index (rowid, entity_type, entity_id, project_id, title, body)
+                    SELECT m.rowid, '{entity_type}', {table}.id, {project_expr.format(row=table)},
+                           {title_expr.format(row=table)}, {body_expr.format(row=table)}
+                    FROM {table} JOIN search_index_map m ON m.entity_type = '{entity_type}' AND m.entity_id = {table}.id
+                """)
+        if needs_backfill:
+            for table in self.BLOB_SEARCH_TYPES:
+                cursor.execute(f"""
+                    SELECT t.id, t.content, b.codec, b.data FROM {table} t
+                    LEFT JOIN content_blobs b ON b.hash = t.content_hash
+                """)
+                for row in cursor.fetchall():
+                    content = row["content"] if row["content"] is not None else _inflate_content(row["codec"], row["data"])
+                    self._index_blob_content(cursor, table, row["id"], content)
+
+    def _index_blob_content(self, cursor: sqlite3.Cursor, table: str, entity_id: str, content: Optional[str]):
+        """Grava o texto do conteúdo na entrada da entidade no índice de busca (criada pelo trigger de inserção)."""
+        cursor.execute("""
+            UPDATE search_index SET content = ?
+            WHERE rowid = (SELECT rowid FROM search_index_map WHERE entity_type = ? AND entity_id = ?)
+        """, (content, self.BLOB_SEARCH_TYPES[table], entity_id))
+
+    # Tabela -> (coluna JSON, [(coluna gerada, tipo, caminho JSON)])
+    REPORT_JSON_COLUMNS = {
+        "quality_reports": ("report_data", (
+            ("overall_status", "TEXT", "$.overall_status"),
+            ("failed_tests", "INTEGER", "$.failed_tests"),
+        )),
+        "security_reports": ("report_data", (
+            ("overall_security_status", "TEXT", "$.overall_security_status"),
+            ("risk_level", "TEXT", "$.risk_level"),
+            ("security_score", "INTEGER", "$.security_score"),
+            ("vulnerabilities_found", "INTEGER", "$.vulnerabilities_found"),
+        )),
+        "monitoring_summaries": ("summary_data", (
+            ("health_status", "TEXT", "$.system_health.status"),
+        )),
+    }
+
+    @staticmethod
+    def _ensure_column(cursor: sqlite3.Cursor, table: str, column: str, declaration: str):
+        """Adiciona a coluna à tabela existente caso ela ainda não exista (migração leve)."""
+        # table_xinfo também lista as colunas geradas, que table_info omite
+        cursor.execute(f"PRAGMA table_xinfo({table})")
+        if column not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+    def _iter_rows(self, query: str, params: Tuple = (), batch_size: Optional[int] = None) -> Iterator[sqlite3.Row]:
+        """
+        Executa a consulta e entrega as linhas em lotes via fetchmany, sem materializar
+        o resultado inteiro. A conexão é fechada quando o gerador termina ou é descartado.
+        """
+        conn = self._read_connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size or self.STREAM_BATCH_SIZE)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+
+    def _fetch_page(self, table: str, order_column: str, filters: List[Tuple[str, Any]],
+                    before: Optional[datetime.datetime], before_id: Optional[str], limit: Optional[int],
+                    columns: str = "*") -> List[sqlite3.Row]:
+        """
+        Busca uma página ordenada por (order_column, id) decrescente usando keyset:
+        o cursor (before, before_id) é o último item da página anterior.
+        Com order_column="id" (IDs ordenados por tempo) before vira um limite na própria chave
+        primária (id_floor), sem índice de timestamp.
+        """
+        where_clauses = []
+        values: List[Any] = []
+        for clause, value in filters:
+            where_clauses.append(clause)
+            values.append(value)
+        if order_column == "id":
+            if before is not None:
+                where_clauses.append("id < ?")
+                values.append(id_floor(before))
+            if before_id is not None:
+                where_clauses.append("id < ?")
+                values.append(before_id)
+        elif before is not None:
+            if before_id is not None:
+                where_clauses.append(f"({order_column}, id) < (?, ?)")
+                values.extend([before, before_id])
+            else:
+                where_clauses.append(f"{order_column} < ?")
+                values.append(before)
+        where_sql = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+        order_sql = "id DESC" if order_column == "id" else f"{order_column} DESC, id DESC"
+        query = f"SELECT {columns} FROM {table} {where_sql} ORDER BY {order_sql} LIMIT ?"
+        values.append(limit or self.DEFAULT_PAGE_SIZE)
+
+        conn = self._read_connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, tuple(values))
+            return cursor.fetchall()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _column_list(model_cls: Type[BaseModel], fields: Optional[Sequence[str]]) -> str:
+        """Monta a lista de colunas de uma projeção, validando os nomes contra os campos do modelo."""
+        if not fields:
+            return "*"
+        unknown = [field for field in fields if field not in model_cls.model_fields]
+        if unknown:
+            raise ValueError(f"Campos desconhecidos para {model_cls.__name__}: {', '.join(unknown)}")
+        return ", ".join(["id"] + [field for field in fields if field != "id"])
+
+    def _to_model(self, model_cls: Type[ModelT], data: Dict[str, Any], partial: bool = False) -> ModelT:
+        if self.trusted_reads or partial:
+            return _construct_trusted(model_cls, data, partial=partial)
+        return model_cls(**data)
+
+    def _to_models(self, model_cls: Type[ModelT], rows: List[sqlite3.Row],
+                   decode: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None, partial: bool = False) -> List[ModelT]:
+        """
+        Converte linhas em modelos. No modo confiável (ou em projeções parciais) usa
+        uma construção sem validação; caso contrário valida a lista inteira com um TypeAdapter em cache.
+        """
+        dicts = [decode(dict(row)) if decode else dict(row) for row in rows]
+        if self.trusted_reads or partial:
+            return [_construct_trusted(model_cls, data, partial=partial) for data in dicts]
+        return _list_adapter(model_cls).validate_python(dicts)
+
+    @staticmethod
+    def _decode_proposal(proposal_dict: Dict[str, Any]) -> Dict[str, Any]:
+        # Só decodifica o JSON de requisitos quando a coluna foi selecionada
+        if proposal_dict.get("requirements") is not None:
+            proposal_dict["requirements"] = json.loads(proposal_dict["requirements"])
+        return proposal_dict
+
+    def _row_to_proposal(self, row: sqlite3.Row, partial: bool = False) -> Proposal:
+        return self._to_model(Proposal, self._decode_proposal(dict(row)), partial=partial)
+
     def add_proposal(self, proposal_data: Dict[str, Any]):
         conn = self._connect()
         cursor = conn.cursor()
@@ -198,54 +1125,75 @@ class DatabaseManager:
                 proposal_data["status"], proposal_data["submitted_at"], proposal_data["approved_at"]
             ))
             conn.commit()
-            logging.info(f"Proposta {proposal_data['id'][:8]}... adicionada com sucesso.")
+            logging.info(f"Proposta {short_id(proposal_data['id'])}... adicionada com sucesso.")
         except sqlite3.Error as e:
             logging.error(f"Erro ao adicionar proposta: {e}")
             conn.rollback()
         finally:
             conn.close()
+            self.entity_cache.invalidate("proposal", proposal_data["id"])
 
-    def get_all_proposals(self) -> List[Proposal]:
-        conn = self._connect()
+    def get_all_proposals(self, fields: Optional[Sequence[str]] = None) -> List[Proposal]:
+        return self.get_proposals(fields=fields)
+
+    def get_proposals(self, status: Optional[str] = None, fields: Optional[Sequence[str]] = None) -> List[Proposal]:
+        """
+        Lista propostas. Com `fields`, seleciona apenas essas colunas (mais o id) e devolve
+        modelos parciais: acessar um campo não selecionado levanta AttributeError.
+        """
+        columns = self._column_list(Proposal, fields)
+        conn = self._read_connect()
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM proposals")
+        if status:
+            cursor.execute(f"SELECT {columns} FROM proposals WHERE status = ?", (status,))
+        else:
+            cursor.execute(f"SELECT {columns} FROM proposals")
         rows = cursor.fetchall()
         conn.close()
-        proposals = []
+        # estimated_value_moai já vem como float ou None do DB (REAL type)
+        return self._to_models(Proposal, rows, decode=self._decode_proposal, partial=bool(fields))
+
+    def get_proposals_page(self, status: Optional[str] = None, before: Optional[datetime.datetime] = None,
+                           before_id: Optional[str] = None, limit: Optional[int] = None,
+                           fields: Optional[Sequence[str]] = None) -> List[Proposal]:
+        """Página de propostas (mais recentes primeiro) a partir do cursor (submitted_at, id)."""
+        filters = [("status = ?", status)] if status else []
+        rows = self._fetch_page("proposals", "submitted_at", filters, before, before_id, limit,
+                                columns=self._column_list(Proposal, fields))
+        return self._to_models(Proposal, rows, decode=self._decode_proposal, partial=bool(fields))
+
+    def iter_proposals(self, status: Optional[str] = None, batch_size: Optional[int] = None,
+                       fields: Optional[Sequence[str]] = None) -> Iterator[Proposal]:
+        columns = self._column_list(Proposal, fields)
+        if status:
+            rows = self._iter_rows(f"SELECT {columns} FROM proposals WHERE status = ? ORDER BY submitted_at DESC, id DESC", (status,), batch_size)
+        else:
+            rows = self._iter_rows(f"SELECT {columns} FROM proposals ORDER BY submitted_at DESC, id DESC", (), batch_size)
         for row in rows:
-            proposal_dict = dict(row)
-            proposal_dict["requirements"] = json.loads(proposal_dict["requirements"])
-            # estimated_value_moai já vem como float ou None do DB (REAL type)
-            proposals.append(Proposal(**proposal_dict))
-        return proposals
+            yield self._row_to_proposal(row, partial=bool(fields))
 
-    def get_proposals(self, status: Optional[str] = None) -> List[Proposal]:
-        conn = self._connect()
+    def count_proposals(self, status: Optional[str] = None) -> int:
+        conn = self._read_connect()
         cursor = conn.cursor()
         if status:
-            cursor.execute("SELECT * FROM proposals WHERE status = ?", (status,))
+            cursor.execute("SELECT COUNT(*) FROM proposals WHERE status = ?", (status,))
         else:
-            cursor.execute("SELECT * FROM proposals")
-        rows = cursor.fetchall()
+            cursor.execute("SELECT COUNT(*) FROM proposals")
+        count = cursor.fetchone()[0]
         conn.close()
-        proposals = []
-        for row in rows:
-            proposal_dict = dict(row)
-            proposal_dict["requirements"] = json.loads(proposal_dict["requirements"])
-            proposals.append(Proposal(**proposal_dict))
-        return proposals
+        return count
 
     def get_proposal_by_id(self, proposal_id: str) -> Optional[Proposal]:
-        conn = self._connect()
+        self.sync_entity_cache()
+        return self.entity_cache.get_or_load("proposal", proposal_id, lambda: self._load_proposal(proposal_id))
+
+    def _load_proposal(self, proposal_id: str) -> Optional[Proposal]:
+        conn = self._read_connect()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM proposals WHERE id = ?", (proposal_id,))
         row = cursor.fetchone()
         conn.close()
-        if row:
-            proposal_dict = dict(row)
-            proposal_dict["requirements"] = json.loads(proposal_dict["requirements"])
-            return Proposal(**proposal_dict)
-        return None
+        return self._row_to_proposal(row) if row else None
 
     def update_proposal(self, proposal_id: str, **kwargs):
         conn = self._connect()
@@ -281,14 +1229,15 @@ class DatabaseManager:
                 values.append(proposal_id)
                 cursor.execute(query, tuple(values))
                 conn.commit()
-                logging.info(f"Proposta {proposal_id[:8]}... atualizada com sucesso.")
+                logging.info(f"Proposta {short_id(proposal_id)}... atualizada com sucesso.")
             else:
-                logging.warning(f"Nenhum campo para atualizar para proposta {proposal_id[:8]}...")
+                logging.warning(f"Nenhum campo para atualizar para proposta {short_id(proposal_id)}...")
         except sqlite3.Error as e:
-            logging.error(f"Erro ao atualizar proposta {proposal_id[:8]}...: {e}")
+            logging.error(f"Erro ao atualizar proposta {short_id(proposal_id)}...: {e}")
             conn.rollback()
         finally:
             conn.close()
+            self.entity_cache.invalidate("proposal", proposal_id)
 
     def update_proposal_status(self, proposal_id: str, new_status: str):
         conn = self._connect()
@@ -298,12 +1247,51 @@ class DatabaseManager:
             cursor.execute("UPDATE proposals SET status = ?, approved_at = ? WHERE id = ?",
                            (new_status, approved_at, proposal_id))
             conn.commit()
-            logging.info(f"Status da proposta {proposal_id[:8]}... atualizado para {new_status}.")
+            logging.info(f"Status da proposta {short_id(proposal_id)}... atualizado para {new_status}.")
         except sqlite3.Error as e:
-            logging.error(f"Erro ao atualizar status da proposta {proposal_id[:8]}...: {e}")
+            logging.error(f"Erro ao atualizar status da proposta {short_id(proposal_id)}...: {e}")
             conn.rollback()
         finally:
             conn.close()
+            self.entity_cache.invalidate("proposal", proposal_id)
+
+    def approve_proposals(self, projects: Sequence[Dict[str, Any]]) -> List[str]:
+        """
+        Aprova em uma única transação as propostas dos projetos informados (cada projeto traz o
+        proposal_id) e insere os projetos. Só propostas ainda pendentes são aprovadas; devolve
+        os IDs dos projetos efetivamente criados (vazio em caso de erro).
+        """
+        approved_at = datetime.datetime.now()
+        created: List[str] = []
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            for project_data in projects:
+                cursor.execute("UPDATE proposals SET status = 'approved', approved_at = ? WHERE id = ? AND status = 'pending'",
+                               (approved_at, project_data["proposal_id"]))
+                if cursor.rowcount != 1:
+                    continue
+                cursor.execute("""
+                    INSERT INTO projects (id, proposal_id, name, client_name, status, progress, started_at, completed_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    project_data["id"], project_data["proposal_id"], project_data["name"],
+                    project_data["client_name"], project_data["status"], project_data["progress"],
+                    project_data["started_at"], project_data["completed_at"]
+                ))
+                created.append(project_data["id"])
+            conn.commit()
+            logging.info(f"{len(created)} proposta(s) aprovada(s) em lote.")
+            return created
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao aprovar propostas em lote: {e}")
+            conn.rollback()
+            return []
+        finally:
+            conn.close()
+            for project_data in projects:
+                self.entity_cache.invalidate("proposal", project_data["proposal_id"])
+                self.entity_cache.invalidate("project", project_data["id"])
 
     def delete_proposal(self, proposal_id: str) -> bool:
         conn = self._connect()
@@ -311,14 +1299,267 @@ class DatabaseManager:
         try:
             cursor.execute("DELETE FROM proposals WHERE id = ?", (proposal_id,))
             conn.commit()
-            logging.info(f"Proposta {proposal_id[:8]}... excluída com sucesso.")
+            logging.info(f"Proposta {short_id(proposal_id)}... excluída com sucesso.")
             return True
         except sqlite3.Error as e:
-            logging.error(f"Erro ao excluir proposta {proposal_id[:8]}...: {e}")
+            logging.error(f"Erro ao excluir proposta {short_id(proposal_id)}...: {e}")
             conn.rollback()
             return False
         finally:
             conn.close()
+            self.entity_cache.invalidate("proposal", proposal_id)
+
+    # Tabelas que dependem de projects via project_id, na ordem de remoção. moai_log_rollups fica de fora
+    # de propósito: é o único registro dos logs já removidos pela retenção e os totais históricos
+    # (count_moai_log_events, séries horárias) não devem encolher quando um projeto é excluído.
+    PROJECT_DEPENDENT_TABLES = (
+        "test_workspaces", "generated_code", "quality_reports", "security_reports",
+        "documentation", "monitoring_summaries", "moai_logs", "infra_snapshots",
+    )
+    # Limite conservador de parâmetros por cláusula IN
+    SQL_IN_CHUNK_SIZE = 500
+
+    def _chunks(self, values: Sequence[str]) -> Iterator[List[str]]:
+        for start in range(0, len(values), self.SQL_IN_CHUNK_SIZE):
+            yield list(values[start:start + self.SQL_IN_CHUNK_SIZE])
+
+    def delete_project_graph(self, proposal_ids: Sequence[str]) -> Dict[str, Any]:
+        """
+        Remove as propostas, os projetos derivados e todos os registros dependentes
+        (código, relatórios, documentação, monitoramento, logs e workspaces) numa única
+        transação. Em caso de erro nada é removido.
+        Retorna os ids de projeto removidos e os caminhos dos workspaces e arquivos frios para limpeza em disco.
+        """
+        proposal_ids = list(dict.fromkeys(proposal_ids))
+        result: Dict[str, Any] = {"success": True, "project_ids": [], "workspace_paths": [], "archive_paths": []}
+        if not proposal_ids:
+            return result
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            project_ids: List[str] = []
+            for chunk in self._chunks(proposal_ids):
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(f"SELECT id FROM projects WHERE proposal_id IN ({placeholders})", chunk)
+                project_ids.extend(row["id"] for row in cursor.fetchall())
+
+            workspace_paths: List[str] = []
+            archive_paths: List[str] = []
+            for chunk in self._chunks(project_ids):
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(f"SELECT workspace_path FROM test_workspaces WHERE project_id IN ({placeholders})", chunk)
+                workspace_paths.extend(row["workspace_path"] for row in cursor.fetchall())
+                cursor.execute(f"SELECT archive_path FROM projects WHERE id IN ({placeholders}) AND archive_path IS NOT NULL", chunk)
+                archive_paths.extend(row["archive_path"] for row in cursor.fetchall())
+                for table in self.PROJECT_DEPENDENT_TABLES:
+                    cursor.execute(f"DELETE FROM {table} WHERE project_id IN ({placeholders})", chunk)
+                cursor.execute(f"DELETE FROM projects WHERE id IN ({placeholders})", chunk)
+
+            for chunk in self._chunks(proposal_ids):
+                placeholders = ", ".join("?" * len(chunk))
+                # Logs de proposta usam o id da proposta como project_id
+                cursor.execute(f"DELETE FROM moai_logs WHERE project_id IN ({placeholders})", chunk)
+                cursor.execute(f"DELETE FROM speculative_drafts WHERE proposal_id IN ({placeholders})", chunk)
+                cursor.execute(f"DELETE FROM proposals WHERE id IN ({placeholders})", chunk)
+
+            conn.commit()
+            result.update(project_ids=project_ids, workspace_paths=workspace_paths, archive_paths=archive_paths)
+            logging.info(f"{len(proposal_ids)} proposta(s) e {len(project_ids)} projeto(s) excluídos em uma transação.")
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao excluir propostas/projetos em cascata: {e}")
+            conn.rollback()
+            result["success"] = False
+        finally:
+            conn.close()
+            self.entity_cache.invalidate("proposal", *proposal_ids)
+            self.entity_cache.invalidate("project", *result["project_ids"])
+        return result
+
+    # Tabelas movidas para o arquivo frio (moai_log_rollups fica: são só contagens horárias)
+    PROJECT_ARCHIVE_TABLES = (
+        "test_workspaces", "generated_code", "quality_reports", "security_reports",
+        "documentation", "monitoring_summaries", "moai_logs",
+    )
+    PROJECT_ARCHIVE_FORMAT = 1
+
+    def _raw_connect(self) -> sqlite3.Connection:
+        """Conexão sem conversão de tipos: os valores vão e voltam do arquivo exatamente como gravados."""
+        conn = sqlite3.connect(self.db_path, factory=_NotifyingConnection)
+        conn.write_listeners = tuple(self._write_listeners)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _stored_columns(cursor: sqlite3.Cursor, table: str) -> List[str]:
+        # Colunas geradas (hidden 2/3 em table_xinfo) são recalculadas pelo SQLite e não entram no arquivo
+        cursor.execute(f"PRAGMA table_xinfo({table})")
+        return [row[1] for row in cursor.fetchall() if row[6] == 0]
+
+    def archive_project(self, project_id: str) -> Dict[str, Any]:
+        """
+        Move código, relatórios, documentação, monitoramento, logs e workspaces de um projeto
+        concluído para um arquivo JSON comprimido (gzip) e deixa na tabela projects um stub com
+        archived_at/archive_path. O arquivo é gravado e sincronizado em disco antes da remoção,
+        dentro da mesma transação de escrita: uma falha não perde dados.
+        O conteúdo dos blobs vai inflado para o arquivo; a contagem de referências libera os blobs.
+        Os diretórios dos workspaces em disco não são tocados.
+        """
+        result: Dict[str, Any] = {"success": False, "project_id": project_id, "rows": 0, "archive_path": None}
+        archive_path = os.path.join(self.project_archive_dir, f"project_{project_id}.json.gz")
+        conn = self._raw_connect()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("SELECT status, archived_at FROM projects WHERE id = ?", (project_id,))
+            project_row = cursor.fetchone()
+            if not project_row or project_row["status"] != "completed" or project_row["archived_at"]:
+                conn.rollback()
+                result["error"] = "Projeto inexistente, não concluído ou já arquivado."
+                return result
+
+            tables: Dict[str, List[Dict[str, Any]]] = {}
+            for table in self.PROJECT_ARCHIVE_TABLES:
+                columns = ", ".join(f"t.{column}" for column in self._stored_columns(cursor, table))
+                if table in self.BLOB_TABLES:
+                    cursor.execute(f"""
+                        SELECT {columns}, b.codec AS blob_codec, b.data AS blob_data
+                        FROM {table} t LEFT JOIN content_blobs b ON b.hash = t.content_hash WHERE t.project_id = ?
+                    """, (project_id,))
+                    rows = [self._decode_blob_content(dict(row)) for row in cursor.fetchall()]
+                else:
+                    cursor.execute(f"SELECT {columns} FROM {table} t WHERE t.project_id = ?", (project_id,))
+                    rows = [dict(row) for row in cursor.fetchall()]
+                tables[table] = rows
+                result["rows"] += len(rows)
+
+            archived_at = datetime.datetime.now()
+            self._write_project_archive(archive_path, {
+                "format": self.PROJECT_ARCHIVE_FORMAT, "project_id": project_id,
+                "archived_at": archived_at.isoformat(), "tables": tables,
+            })
+            for table in self.PROJECT_ARCHIVE_TABLES:
+                cursor.execute(f"DELETE FROM {table} WHERE project_id = ?", (project_id,))
+            cursor.execute("UPDATE projects SET archived_at = ?, archive_path = ? WHERE id = ?",
+                           (str(archived_at), archive_path, project_id))
+            conn.commit()
+            result.update(success=True, archive_path=archive_path)
+            logging.info(f"Projeto {short_id(project_id)}... arquivado ({result['rows']} registro(s)) em {archive_path}.")
+        except (sqlite3.Error, OSError) as e:
+            logging.error(f"Erro ao arquivar o projeto {short_id(project_id)}...: {e}")
+            conn.rollback()
+            result["error"] = str(e)
+        finally:
+            conn.close()
+            self.entity_cache.invalidate("project", project_id)
+        return result
+
+    @staticmethod
+    def _write_project_archive(archive_path: str, payload: Dict[str, Any]):
+        """Grava o arquivo do projeto de forma atômica (arquivo temporário + fsync + rename)."""
+        os.makedirs(os.path.dirname(archive_path), exist_ok=True)
+        tmp_path = f"{archive_path}.tmp"
+        with open(tmp_path, "wb") as raw_file:
+            with gzip.GzipFile(fileobj=raw_file, mode="wb") as gzip_file:
+                gzip_file.write(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+            raw_file.flush()
+            os.fsync(raw_file.fileno())
+        os.replace(tmp_path, archive_path)
+
+    def rehydrate_project(self, project_id: str) -> Dict[str, Any]:
+        """
+        Restaura nas tabelas quentes os artefatos de um projeto arquivado (os triggers refazem
+        blobs, índice de busca e change_log; o texto do conteúdo é reindexado aqui) e remove o arquivo depois do commit.
+        rehydrated_at protege o projeto de ser rearquivado logo em seguida pela rotina em lote.
+        """
+        result: Dict[str, Any] = {"success": False, "project_id": project_id, "rows": 0}
+        conn = self._raw_connect()
+        cursor = conn.cursor()
+        archive_path = None
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("SELECT archived_at, archive_path FROM projects WHERE id = ?", (project_id,))
+            project_row = cursor.fetchone()
+            if not project_row or not project_row["archived_at"]:
+                # Outra chamada pode ter reidratado o projeto enquanto esta esperava o lock
+                conn.rollback()
+                if project_row:
+                    result["success"] = True
+                else:
+                    result["error"] = "Projeto inexistente."
+                return result
+            archive_path = project_row["archive_path"]
+            with gzip.open(archive_path, "rb") as archive_file:
+                payload = json.loads(archive_file.read().decode("utf-8"))
+
+            for table, rows in payload["tables"].items():
+                stored_columns = set(self._stored_columns(cursor, table))
+                for row in rows:
+                    content = row.get("content") if table in self.BLOB_TABLES else None
+                    if content is not None:
+                        row["content_hash"] = self._store_blob(cursor, content)
+                        row["content"] = None
+                    # Colunas removidas do esquema desde o arquivamento são ignoradas
+                    columns = [column for column in row if column in stored_columns]
+                    cursor.execute(
+                        f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                        [row[column] for column in columns],
+                    )
+                    if content is not None and cursor.rowcount:
+                        self._index_blob_content(cursor, table, row["id"], content)
+                    result["rows"] += 1
+            cursor.execute("UPDATE projects SET archived_at = NULL, archive_path = NULL, rehydrated_at = ? WHERE id = ?",
+                           (str(datetime.datetime.now()), project_id))
+            conn.commit()
+            result["success"] = True
+            logging.info(f"Projeto {short_id(project_id)}... reidratado ({result['rows']} registro(s)) de {archive_path}.")
+        except (sqlite3.Error, OSError, ValueError, KeyError) as e:
+            logging.error(f"Erro ao reidratar o projeto {short_id(project_id)}...: {e}")
+            conn.rollback()
+            result["error"] = str(e)
+        finally:
+            conn.close()
+            self.entity_cache.invalidate("project", project_id)
+        if result["success"]:
+            try:
+                os.remove(archive_path)
+            except OSError as e:
+                logging.warning(f"Arquivo {archive_path} restaurado mas não removido: {e}")
+        return result
+
+    def is_project_archived(self, project_id: str) -> bool:
+        project = self.get_project_by_id(project_id)
+        return bool(project and project.archived_at)
+
+    def archive_completed_projects(self, older_than_days: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Arquiva, um projeto por transação, os projetos concluídos há mais de `older_than_days` dias
+        que não foram reidratados nesse intervalo.
+        """
+        days = self.project_archive_days if older_than_days is None else older_than_days
+        cutoff = datetime.datetime.now() - datetime.timedelta(days=days)
+        conn = self._read_connect()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id FROM projects
+            WHERE status = 'completed' AND archived_at IS NULL AND completed_at < ?
+              AND (rehydrated_at IS NULL OR rehydrated_at < ?)
+            ORDER BY completed_at
+        """, (str(cutoff), str(cutoff)))
+        project_ids = [row["id"] for row in cursor.fetchall()]
+        conn.close()
+
+        summary: Dict[str, Any] = {"success": True, "archived": [], "failed": [], "rows": 0, "cutoff": cutoff}
+        for project_id in project_ids:
+            result = self.archive_project(project_id)
+            if result["success"]:
+                summary["archived"].append(project_id)
+                summary["rows"] += result["rows"]
+            else:
+                summary["failed"].append(project_id)
+                summary["success"] = False
+        return summary
 
     def add_project(self, project_data: Dict[str, Any]):
         conn = self._connect()
@@ -333,36 +1574,44 @@ class DatabaseManager:
                 project_data["started_at"], project_data["completed_at"]
             ))
             conn.commit()
-            logging.info(f"Projeto {project_data['id'][:8]}... adicionado com sucesso.")
+            logging.info(f"Projeto {short_id(project_data['id'])}... adicionado com sucesso.")
         except sqlite3.Error as e:
             logging.error(f"Erro ao adicionar projeto: {e}")
             conn.rollback()
         finally:
             conn.close()
+            self.entity_cache.invalidate("project", project_data["id"])
+
+    def entity_cache_stats(self) -> Dict[str, Any]:
+        return self.entity_cache.stats()
 
     def get_all_projects(self) -> List[Project]:
-        conn = self._connect()
+        conn = self._read_connect()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM projects")
         rows = cursor.fetchall()
         conn.close()
-        return [Project(**dict(row)) for row in rows]
+        return self._to_models(Project, rows)
 
     def get_project_by_id(self, project_id: str) -> Optional[Project]:
-        conn = self._connect()
+        self.sync_entity_cache()
+        return self.entity_cache.get_or_load("project", project_id, lambda: self._load_project(project_id))
+
+    def _load_project(self, project_id: str) -> Optional[Project]:
+        conn = self._read_connect()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM projects WHERE id = ?", (project_id,))
         row = cursor.fetchone()
         conn.close()
-        return Project(**dict(row)) if row else None
+        return self._to_model(Project, dict(row)) if row else None
     
     def get_project_by_proposal_id(self, proposal_id: str) -> Optional[Project]:
-        conn = self._connect()
+        conn = self._read_connect()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM projects WHERE proposal_id = ?", (proposal_id,))
         row = cursor.fetchone()
         conn.close()
-        return Project(**dict(row)) if row else None
+        return self._to_model(Project, dict(row)) if row else None
 
     def update_project(self, project_id: str, **kwargs):
         conn = self._connect()
@@ -383,14 +1632,15 @@ class DatabaseManager:
                 values.append(project_id)
                 cursor.execute(query, tuple(values))
                 conn.commit()
-                logging.info(f"Projeto {project_id[:8]}... atualizado com sucesso.")
+                logging.info(f"Projeto {short_id(project_id)}... atualizado com sucesso.")
             else:
-                logging.warning(f"Nenhum campo para atualizar para projeto {project_id[:8]}...")
+                logging.warning(f"Nenhum campo para atualizar para projeto {short_id(project_id)}...")
         except sqlite3.Error as e:
-            logging.error(f"Erro ao atualizar projeto {project_id[:8]}...: {e}")
+            logging.error(f"Erro ao atualizar projeto {short_id(project_id)}...: {e}")
             conn.rollback()
         finally:
             conn.close()
+            self.entity_cache.invalidate("project", project_id)
             
     def update_project_progress(self, project_id: str, new_progress: int):
         conn = self._connect()
@@ -399,12 +1649,13 @@ class DatabaseManager:
             cursor.execute("UPDATE projects SET progress = ? WHERE id = ?",
                            (new_progress, project_id))
             conn.commit()
-            logging.info(f"Progresso do projeto {project_id[:8]}... atualizado para {new_progress}%.")
+            logging.info(f"Progresso do projeto {short_id(project_id)}... atualizado para {new_progress}%.")
         except sqlite3.Error as e:
-            logging.error(f"Erro ao atualizar progresso do projeto {project_id[:8]}...: {e}")
+            logging.error(f"Erro ao atualizar progresso do projeto {short_id(project_id)}...: {e}")
             conn.rollback()
         finally:
             conn.close()
+            self.entity_cache.invalidate("project", project_id)
             
     def update_project_status(self, project_id: str, new_status: str):
         conn = self._connect()
@@ -413,12 +1664,13 @@ class DatabaseManager:
             cursor.execute("UPDATE projects SET status = ? WHERE id = ?",
                            (new_status, project_id))
             conn.commit()
-            logging.info(f"Status do projeto {project_id[:8]}... atualizado para {new_status}.")
+            logging.info(f"Status do projeto {short_id(project_id)}... atualizado para {new_status}.")
         except sqlite3.Error as e:
-            logging.error(f"Erro ao atualizar status do projeto {project_id[:8]}...: {e}")
+            logging.error(f"Erro ao atualizar status do projeto {short_id(project_id)}...: {e}")
             conn.rollback()
         finally:
             conn.close()
+            self.entity_cache.invalidate("project", project_id)
 
     def delete_project(self, project_id: str) -> bool:
         conn = self._connect()
@@ -426,29 +1678,33 @@ class DatabaseManager:
         try:
             cursor.execute("DELETE FROM projects WHERE id = ?", (project_id,))
             conn.commit()
-            logging.info(f"Projeto {project_id[:8]}... excluído com sucesso.")
+            logging.info(f"Projeto {short_id(project_id)}... excluído com sucesso.")
             return True
         except sqlite3.Error as e:
-            logging.error(f"Erro ao excluir projeto {project_id[:8]}...: {e}")
+            logging.error(f"Erro ao excluir projeto {short_id(project_id)}...: {e}")
             conn.rollback()
             return False
         finally:
             conn.close()
+            self.entity_cache.invalidate("project", project_id)
 
     def add_generated_code(self, code_data: Dict[str, Any]):
         conn = self._connect()
         cursor = conn.cursor()
         try:
             cursor.execute("""
-                INSERT INTO generated_code (id, project_id, filename, language, content, description, generated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
+                INSERT INTO generated_code (id, project_id, filename, language, content_hash, description, generated_at,
+                                            size, line_count)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 code_data["id"], code_data["project_id"], code_data["filename"],
-                code_data["language"], code_data["content"], code_data["description"],
-                code_data["generated_at"]
+                code_data["language"], self._store_blob(cursor, code_data["content"]), code_data["description"],
+                code_data["generated_at"],
+                len(code_data["content"].encode("utf-8")), code_data["content"].count("\n") + 1
             ))
+            self._index_blob_content(cursor, "generated_code", code_data["id"], code_data["content"])
             conn.commit()
-            logging.info(f"Código {code_data['id'][:8]}... adicionado para o projeto {code_data['project_id'][:8]}...")
+            logging.info(f"Código {short_id(code_data['id'])}... adicionado para o projeto {short_id(code_data['project_id'])}...")
         except sqlite3.Error as e:
             logging.error(f"Erro ao adicionar código gerado: {e}")
             conn.rollback()
@@ -456,21 +1712,46 @@ class DatabaseManager:
             conn.close()
 
     def get_generated_code_for_project(self, project_id: str) -> List[GeneratedCode]:
-        conn = self._connect()
+        conn = self._read_connect()
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM generated_code WHERE project_id = ?", (project_id,))
+        cursor.execute(f"{self.GENERATED_CODE_WITH_BLOB} WHERE t.project_id = ?", (project_id,))
         rows = cursor.fetchall()
         conn.close()
-        return [GeneratedCode(**dict(row)) for row in rows]
+        return self._to_models(GeneratedCode, rows, decode=self._decode_blob_content)
+
+    def get_generated_code_metadata(self, project_id: str) -> List[GeneratedCodeInfo]:
+        """Lista os arquivos de código do projeto sem carregar a coluna content."""
+        conn = self._read_connect()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, project_id, filename, language, description,
+                   COALESCE(size, 0) AS size, COALESCE(line_count, 0) AS line_count, generated_at
+            FROM generated_code WHERE project_id = ? ORDER BY generated_at ASC
+        """, (project_id,))
+        rows = cursor.fetchall()
+        conn.close()
+        return self._to_models(GeneratedCodeInfo, rows)
+
+    def get_generated_code_content(self, code_id: str) -> Optional[str]:
+        """Carrega sob demanda o conteúdo de um único arquivo de código."""
+        return self._read_blob_content("generated_code", code_id)
+
+    def has_generated_code(self, project_id: str) -> bool:
+        conn = self._read_connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM generated_code WHERE project_id = ? LIMIT 1", (project_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return row is not None
 
     def get_generated_code_by_id(self, code_id: str) -> Optional[GeneratedCode]:
-        conn = self._connect()
+        conn = self._read_connect()
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM generated_code WHERE id = ?", (code_id,))
+        cursor.execute(f"{self.GENERATED_CODE_WITH_BLOB} WHERE t.id = ?", (code_id,))
         row = cursor.fetchone()
         conn.close()
         if row:
-            return GeneratedCode(**dict(row))
+            return self._to_model(GeneratedCode, self._decode_blob_content(dict(row)))
         return None
 
     def delete_generated_code_by_project(self, project_id: str) -> bool:
@@ -479,10 +1760,10 @@ class DatabaseManager:
         try:
             cursor.execute("DELETE FROM generated_code WHERE project_id = ?", (project_id,))
             conn.commit()
-            logging.info(f"Código gerado para projeto {project_id[:8]}... excluído.")
+            logging.info(f"Código gerado para projeto {short_id(project_id)}... excluído.")
             return True
         except sqlite3.Error as e:
-            logging.error(f"Erro ao excluir código gerado para projeto {project_id[:8]}...: {e}")
+            logging.error(f"Erro ao excluir código gerado para projeto {short_id(project_id)}...: {e}")
             conn.rollback()
             return False
         finally:
@@ -517,7 +1798,7 @@ class DatabaseManager:
             conn.close()
 
     def get_test_workspaces(self, project_id: Optional[str] = None) -> List[TestWorkspace]:
-        conn = self._connect()
+        conn = self._read_connect()
         cursor = conn.cursor()
         try:
             if project_id:
@@ -525,18 +1806,33 @@ class DatabaseManager:
             else:
                 cursor.execute("SELECT * FROM test_workspaces ORDER BY created_at DESC")
             rows = cursor.fetchall()
-            return [TestWorkspace(**dict(row)) for row in rows]
+            return self._to_models(TestWorkspace, rows)
         finally:
             conn.close()
 
+    def get_test_workspaces_page(self, project_id: Optional[str] = None, before: Optional[datetime.datetime] = None,
+                                 before_id: Optional[str] = None, limit: Optional[int] = None) -> List[TestWorkspace]:
+        """Página de workspaces (mais recentes primeiro) a partir do cursor (created_at, id)."""
+        filters = [("project_id = ?", project_id)] if project_id else []
+        rows = self._fetch_page("test_workspaces", "created_at", filters, before, before_id, limit)
+        return self._to_models(TestWorkspace, rows)
+
+    def iter_test_workspaces(self, project_id: Optional[str] = None, batch_size: Optional[int] = None) -> Iterator[TestWorkspace]:
+        if project_id:
+            rows = self._iter_rows("SELECT * FROM test_workspaces WHERE project_id = ? ORDER BY created_at DESC, id DESC", (project_id,), batch_size)
+        else:
+            rows = self._iter_rows("SELECT * FROM test_workspaces ORDER BY created_at DESC, id DESC", (), batch_size)
+        for row in rows:
+            yield self._to_model(TestWorkspace, dict(row))
+
     def get_test_workspace_by_id(self, workspace_id: str) -> Optional[TestWorkspace]:
-        conn = self._connect()
+        conn = self._read_connect()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM test_workspaces WHERE id = ?", (workspace_id,))
         row = cursor.fetchone()
         conn.close()
         if row:
-            return TestWorkspace(**dict(row))
+            return self._to_model(TestWorkspace, dict(row))
         return None
 
     def delete_test_workspace(self, workspace_id: str) -> bool:
@@ -580,7 +1876,7 @@ class DatabaseManager:
                 report_data["generated_at"]
             ))
             conn.commit()
-            logging.info(f"Relatório de qualidade {report_data['id'][:8]}... adicionado para o projeto {report_data['project_id'][:8]}...")
+            logging.info(f"Relatório de qualidade {short_id(report_data['id'])}... adicionado para o projeto {short_id(report_data['project_id'])}...")
         except sqlite3.Error as e:
             logging.error(f"Erro ao adicionar relatório de qualidade: {e}")
             conn.rollback()
@@ -588,7 +1884,7 @@ class DatabaseManager:
             conn.close()
 
     def get_quality_report_for_project(self, project_id: str) -> Optional[QualityReport]:
-        conn = self._connect()
+        conn = self._read_connect()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM quality_reports WHERE project_id = ? ORDER BY generated_at DESC LIMIT 1", (project_id,))
         row = cursor.fetchone()
@@ -596,7 +1892,7 @@ class DatabaseManager:
         if row:
             report_dict = dict(row)
             report_dict["report_data"] = json.loads(report_dict["report_data"])
-            return QualityReport(**report_dict)
+            return self._to_model(QualityReport, report_dict)
         return None
 
     def delete_quality_report_by_project(self, project_id: str) -> bool:
@@ -605,10 +1901,10 @@ class DatabaseManager:
         try:
             cursor.execute("DELETE FROM quality_reports WHERE project_id = ?", (project_id,))
             conn.commit()
-            logging.info(f"Relatórios de qualidade para projeto {project_id[:8]}... excluídos.")
+            logging.info(f"Relatórios de qualidade para projeto {short_id(project_id)}... excluídos.")
             return True
         except sqlite3.Error as e:
-            logging.error(f"Erro ao excluir relatórios de qualidade para projeto {project_id[:8]}...: {e}")
+            logging.error(f"Erro ao excluir relatórios de qualidade para projeto {short_id(project_id)}...: {e}")
             conn.rollback()
             return False
         finally:
@@ -626,7 +1922,7 @@ class DatabaseManager:
                 report_data["generated_at"]
             ))
             conn.commit()
-            logging.info(f"Relatório de segurança {report_data['id'][:8]}... adicionado para o projeto {report_data['project_id'][:8]}...")
+            logging.info(f"Relatório de segurança {short_id(report_data['id'])}... adicionado para o projeto {short_id(report_data['project_id'])}...")
         except sqlite3.Error as e:
             logging.error(f"Erro ao adicionar relatório de segurança: {e}")
             conn.rollback()
@@ -634,7 +1930,7 @@ class DatabaseManager:
             conn.close()
 
     def get_security_report_for_project(self, project_id: str) -> Optional[SecurityReport]:
-        conn = self._connect()
+        conn = self._read_connect()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM security_reports WHERE project_id = ? ORDER BY generated_at DESC LIMIT 1", (project_id,))
         row = cursor.fetchone()
@@ -642,7 +1938,7 @@ class DatabaseManager:
         if row:
             report_dict = dict(row)
             report_dict["report_data"] = json.loads(report_dict["report_data"])
-            return SecurityReport(**report_dict)
+            return self._to_model(SecurityReport, report_dict)
         return None
 
     def delete_security_report_by_project(self, project_id: str) -> bool:
@@ -651,10 +1947,10 @@ class DatabaseManager:
         try:
             cursor.execute("DELETE FROM security_reports WHERE project_id = ?", (project_id,))
             conn.commit()
-            logging.info(f"Relatórios de segurança para projeto {project_id[:8]}... excluídos.")
+            logging.info(f"Relatórios de segurança para projeto {short_id(project_id)}... excluídos.")
             return True
         except sqlite3.Error as e:
-            logging.error(f"Erro ao excluir relatórios de segurança para projeto {project_id[:8]}...: {e}")
+            logging.error(f"Erro ao excluir relatórios de segurança para projeto {short_id(project_id)}...: {e}")
             conn.rollback()
             return False
         finally:
@@ -665,15 +1961,16 @@ class DatabaseManager:
         cursor = conn.cursor()
         try:
             cursor.execute("""
-                INSERT INTO documentation (id, project_id, filename, content, document_type, version, last_updated)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
+                INSERT INTO documentation (id, project_id, filename, content_hash, document_type, version, last_updated, size)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 doc_data["id"], doc_data["project_id"], doc_data["filename"],
-                doc_data["content"], doc_data["document_type"], doc_data["version"],
-                doc_data["last_updated"]
+                self._store_blob(cursor, doc_data["content"]), doc_data["document_type"], doc_data["version"],
+                doc_data["last_updated"], len(doc_data["content"].encode("utf-8"))
             ))
+            self._index_blob_content(cursor, "documentation", doc_data["id"], doc_data["content"])
             conn.commit()
-            logging.info(f"Documentação {doc_data['id'][:8]}... adicionada para o projeto {doc_data['project_id'][:8]}...")
+            logging.info(f"Documentação {short_id(doc_data['id'])}... adicionada para o projeto {short_id(doc_data['project_id'])}...")
         except sqlite3.Error as e:
             logging.error(f"Erro ao adicionar documentação: {e}")
             conn.rollback()
@@ -681,28 +1978,117 @@ class DatabaseManager:
             conn.close()
 
     def get_documentation_by_project(self, project_id: str) -> List[Documentation]:
-        conn = self._connect()
+        conn = self._read_connect()
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM documentation WHERE project_id = ? ORDER BY last_updated DESC", (project_id,))
+        cursor.execute(f"{self.DOCUMENTATION_WITH_BLOB} WHERE t.project_id = ? ORDER BY t.last_updated DESC", (project_id,))
         rows = cursor.fetchall()
         conn.close()
-        return [Documentation(**dict(row)) for row in rows]
+        return self._to_models(Documentation, rows, decode=self._decode_blob_content)
     
+    def get_documentation_metadata(self, project_id: str) -> List[DocumentationInfo]:
+        """Lista os documentos do projeto sem carregar a coluna content."""
+        conn = self._read_connect()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, project_id, filename, document_type, version, COALESCE(size, 0) AS size, last_updated
+            FROM documentation WHERE project_id = ? ORDER BY last_updated DESC
+        """, (project_id,))
+        rows = cursor.fetchall()
+        conn.close()
+        return self._to_models(DocumentationInfo, rows)
+
+    def get_documentation_content(self, doc_id: str) -> Optional[str]:
+        """Carrega sob demanda o conteúdo de um único documento."""
+        return self._read_blob_content("documentation", doc_id)
+
     def delete_documentation_by_project(self, project_id: str) -> bool:
         conn = self._connect()
         cursor = conn.cursor()
         try:
             cursor.execute("DELETE FROM documentation WHERE project_id = ?", (project_id,))
             conn.commit()
-            logging.info(f"Documentação para projeto {project_id[:8]}... excluída.")
+            logging.info(f"Documentação para projeto {short_id(project_id)}... excluída.")
             return True
         except sqlite3.Error as e:
-            logging.error(f"Erro ao excluir documentação para projeto {project_id[:8]}...: {e}")
+            logging.error(f"Erro ao excluir documentação para projeto {short_id(project_id)}...: {e}")
             conn.rollback()
             return False
         finally:
             conn.close()
 
+    def get_report_portfolio_summary(self) -> Dict[str, Any]:
+        """
+        Indicadores de portfólio a partir do último relatório de cada projeto, calculados no SQLite
+        sobre as colunas geradas (sem carregar nem decodificar o JSON dos relatórios).
+        """
+        conn = self._read_connect()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT overall_status, COUNT(*) AS projects, COALESCE(SUM(failed_tests), 0) AS failed_tests
+                FROM latest_quality_reports GROUP BY overall_status
+            """)
+            quality_rows = cursor.fetchall()
+            cursor.execute("""
+                SELECT COUNT(*) AS projects, AVG(security_score) AS avg_security_score,
+                       MIN(security_score) AS min_security_score, COALESCE(SUM(vulnerabilities_found), 0) AS vulnerabilities_found
+                FROM latest_security_reports
+            """)
+            security = dict(cursor.fetchone())
+            cursor.execute("SELECT risk_level, COUNT(*) FROM latest_security_reports GROUP BY risk_level")
+            security["by_risk_level"] = {row[0] or "N/A": row[1] for row in cursor.fetchall()}
+            cursor.execute("""
+                SELECT health_status, COUNT(*) FROM latest_monitoring_summaries
+                WHERE project_id IS NOT NULL GROUP BY health_status
+            """)
+            monitoring = {"by_health_status": {row[0] or "N/A": row[1] for row in cursor.fetchall()}}
+        finally:
+            conn.close()
+        quality = {
+            "projects": sum(row["projects"] for row in quality_rows),
+            "failed_tests": sum(row["failed_tests"] for row in quality_rows),
+            "by_status": {row["overall_status"] or "N/A": row["projects"] for row in quality_rows},
+        }
+        return {"quality": quality, "security": security, "monitoring": monitoring}
+
+    def find_projects_by_reports(self, quality_status: Optional[str] = None, risk_levels: Optional[Sequence[str]] = None,
+                                 max_security_score: Optional[int] = None,
+                                 min_failed_tests: Optional[int] = None) -> List[ProjectReportStatus]:
+        """
+        Projetos filtrados pelos campos do último relatório de qualidade/segurança
+        (ex.: overall_status = 'Failed', risk_level em ('High', 'Critical')), via índices das colunas geradas.
+        """
+        where_clauses: List[str] = []
+        values: List[Any] = []
+        if quality_status:
+            where_clauses.append("q.overall_status = ?")
+            values.append(quality_status)
+        if min_failed_tests is not None:
+            where_clauses.append("q.failed_tests >= ?")
+            values.append(min_failed_tests)
+        if risk_levels:
+            where_clauses.append(f"s.risk_level IN ({', '.join('?' * len(risk_levels))})")
+            values.extend(risk_levels)
+        if max_security_score is not None:
+            where_clauses.append("s.security_score <= ?")
+            values.append(max_security_score)
+        where_sql = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+        conn = self._read_connect()
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT p.id AS project_id, p.name AS project_name,
+                   q.overall_status AS quality_status, q.failed_tests,
+                   s.risk_level, s.security_score, s.vulnerabilities_found
+            FROM projects p
+            LEFT JOIN latest_quality_reports q ON q.project_id = p.id
+            LEFT JOIN latest_security_reports s ON s.project_id = p.id
+            {where_sql}
+            ORDER BY s.security_score IS NULL, s.security_score ASC, p.name
+        """, tuple(values))
+        rows = cursor.fetchall()
+        conn.close()
+        return self._to_models(ProjectReportStatus, rows)
+
     def add_monitoring_summary(self, summary_data: Dict[str, Any]):
         conn = self._connect()
         cursor = conn.cursor()
@@ -717,7 +2103,7 @@ class DatabaseManager:
                 summary_data["generated_at"]
             ))
             conn.commit()
-            logging.info(f"Resumo de monitoramento {summary_data['id'][:8]}... adicionado para o projeto {summary_data.get('project_id', 'Global')[:8]}...")
+            logging.info(f"Resumo de monitoramento {short_id(summary_data['id'])}... adicionado para o projeto {short_id(summary_data.get('project_id') or 'Global')}...")
         except sqlite3.Error as e:
             logging.error(f"Erro ao adicionar resumo de monitoramento: {e}")
             conn.rollback()
@@ -725,7 +2111,7 @@ class DatabaseManager:
             conn.close()
             
     def get_monitoring_summary(self, project_id: Optional[str] = None) -> Optional[MonitoringSummary]:
-        conn = self._connect()
+        conn = self._read_connect()
         cursor = conn.cursor()
         if project_id:
             cursor.execute("SELECT * FROM monitoring_summaries WHERE project_id = ? ORDER BY generated_at DESC LIMIT 1", (project_id,))
@@ -736,7 +2122,7 @@ class DatabaseManager:
         if row:
             summary_dict = dict(row)
             summary_dict["summary_data"] = json.loads(summary_dict["summary_data"])
-            return MonitoringSummary(**summary_dict)
+            return self._to_model(MonitoringSummary, summary_dict)
         return None
 
     def update_monitoring_summary(self, summary_id: str, **kwargs):
@@ -761,11 +2147,11 @@ class DatabaseManager:
                 values.append(summary_id)
                 cursor.execute(query, tuple(values))
                 conn.commit()
-                logging.info(f"Resumo de monitoramento {summary_id[:8]}... atualizado com sucesso.")
+                logging.info(f"Resumo de monitoramento {short_id(summary_id)}... atualizado com sucesso.")
             else:
-                logging.warning(f"Nenhum campo para atualizar para resumo de monitoramento {summary_id[:8]}...")
+                logging.warning(f"Nenhum campo para atualizar para resumo de monitoramento {short_id(summary_id)}...")
         except sqlite3.Error as e:
-            logging.error(f"Erro ao atualizar resumo de monitoramento {summary_id[:8]}...: {e}")
+            logging.error(f"Erro ao atualizar resumo de monitoramento {short_id(summary_id)}...: {e}")
             conn.rollback()
         finally:
             conn.close()
@@ -776,10 +2162,10 @@ class DatabaseManager:
         try:
             cursor.execute("DELETE FROM monitoring_summaries WHERE project_id = ?", (project_id,))
             conn.commit()
-            logging.info(f"Resumos de monitoramento para projeto {project_id[:8]}... excluídos.")
+            logging.info(f"Resumos de monitoramento para projeto {short_id(project_id)}... excluídos.")
             return True
         except sqlite3.Error as e:
-            logging.error(f"Erro ao excluir resumos de monitoramento para projeto {project_id[:8]}...: {e}")
+            logging.error(f"Erro ao excluir resumos de monitoramento para projeto {short_id(project_id)}...: {e}")
             conn.rollback()
             return False
         finally:
@@ -797,7 +2183,7 @@ class DatabaseManager:
                 message_data["timestamp"]
             ))
             conn.commit()
-            logging.info(f"Mensagem de chat {message_data['id'][:8]}... adicionada.")
+            logging.info(f"Mensagem de chat {short_id(message_data['id'])}... adicionada.")
         except sqlite3.Error as e:
             logging.error(f"Erro ao adicionar mensagem de chat: {e}")
             conn.rollback()
@@ -805,12 +2191,25 @@ class DatabaseManager:
             conn.close()
 
     def get_chat_history(self) -> List[ChatMessage]:
-        conn = self._connect()
+        conn = self._read_connect()
         cursor = conn.cursor() # Corrigido: 'conect' para 'cursor'
-        cursor.execute("SELECT * FROM chat_history ORDER BY timestamp ASC")
+        cursor.execute("SELECT * FROM chat_history ORDER BY id ASC")
         rows = cursor.fetchall()
         conn.close()
-        return [ChatMessage(**dict(row)) for row in rows]
+        return self._to_models(ChatMessage, rows)
+
+    def get_chat_messages(self, before: Optional[datetime.datetime] = None, before_id: Optional[str] = None,
+                          limit: Optional[int] = None) -> List[ChatMessage]:
+        """
+        Janela das últimas mensagens anteriores ao instante `before` e/ou ao cursor before_id (IDs
+        ordenados por tempo), devolvida em ordem cronológica para renderização direta no chat.
+        """
+        rows = self._fetch_page("chat_history", "id", [], before, before_id, limit)
+        return self._to_models(ChatMessage, list(reversed(rows)))
+
+    def iter_chat_history(self, batch_size: Optional[int] = None) -> Iterator[ChatMessage]:
+        for row in self._iter_rows("SELECT * FROM chat_history ORDER BY id ASC", (), batch_size):
+            yield self._to_model(ChatMessage, dict(row))
     
     def add_moai_log(self, log_data: Dict[str, Any]):
         conn = self._connect()
@@ -824,20 +2223,491 @@ class DatabaseManager:
                 log_data["details"], log_data["project_id"], log_data["agent_id"], log_data["status"]
             ))
             conn.commit()
-            logging.debug(f"Log MOAI {log_data['id'][:8]}... adicionado: {log_data['event_type']}")
+            logging.debug(f"Log MOAI {short_id(log_data['id'])}... adicionado: {log_data['event_type']}")
         except sqlite3.Error as e:
             logging.error(f"Erro ao adicionar log MOAI: {e}")
             conn.rollback()
         finally:
             conn.close()
 
+    @staticmethod
+    def _build_match_query(text: str) -> str:
+        """
+        Converte o texto digitado em uma expressão MATCH segura: cada termo vira uma
+        frase entre aspas (AND implícito) e o último termo aceita prefixo.
+        """
+        terms = [term.replace('"', '""') for term in text.split() if term.strip('"')]
+        if not terms:
+            return ""
+        quoted = [f'"{term}"' for term in terms]
+        quoted[-1] += "*"
+        return " ".join(quoted)
+
+    def search(self, text: str, entity_types: Optional[Sequence[str]] = None, project_id: Optional[str] = None,
+               limit: int = 20) -> List[SearchResult]:
+        """
+        Busca textual (FTS5) em propostas, código gerado, documentação e logs, ordenada por
+        relevância (bm25, com peso maior para o título) e com trecho destacado do conteúdo.
+        """
+        match_query = self._build_match_query(text)
+        if not match_query:
+            return []
+        where_clauses = ["search_index MATCH ?"]
+        values: List[Any] = [match_query]
+        if entity_types:
+            unknown = [entity_type for entity_type in entity_types if entity_type not in self.SEARCH_SOURCES]
+            if unknown:
+                raise ValueError(f"Tipos de busca desconhecidos: {', '.join(unknown)}")
+            where_clauses.append(f"entity_type IN ({', '.join('?' * len(entity_types))})")
+            values.extend(entity_types)
+        if project_id:
+            where_clauses.append("project_id = ?")
+            values.append(project_id)
+        values.append(limit)
+
+        conn = self._read_connect()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"""
+                SELECT entity_type, entity_id, project_id, title,
+                       snippet(search_index, -1, '**', '**', '…', 16) AS snippet,
+                       bm25(search_index, 0.0, 0.0, 0.0, 10.0, 1.0, 1.0) AS rank
+                FROM search_index
+                WHERE {' AND '.join(where_clauses)}
+                ORDER BY rank
+                LIMIT ?
+            """, tuple(values))
+            rows = cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"Erro na busca textual por '{text}': {e}")
+            return []
+        finally:
+            conn.close()
+        return self._to_models(SearchResult, rows)
+
     def get_all_moai_logs(self) -> List[MOAILog]:
+        conn = self._read_connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM moai_logs ORDER BY id ASC")
+        rows = cursor.fetchall()
+        conn.close()
+        return self._to_models(MOAILog, rows)
+
+    def get_moai_logs(self, project_id: Optional[str] = None, before: Optional[datetime.datetime] = None,
+                      before_id: Optional[str] = None, limit: Optional[int] = None,
+                      after_id: Optional[str] = None) -> List[MOAILog]:
+        """
+        Página de logs (mais recentes primeiro), opcionalmente filtrada por projeto, anteriores ao
+        instante `before` e/ou ao cursor before_id.
+        Com after_id retorna só os logs mais novos que ele (deltas para painéis que se atualizam sozinhos).
+        """
+        filters = [("project_id = ?", project_id)] if project_id else []
+        if after_id is not None:
+            filters.append(("id > ?", after_id))
+        rows = self._fetch_page("moai_logs", "id", filters, before, before_id, limit)
+        return self._to_models(MOAILog, rows)
+
+    def latest_logs(self, n: int) -> List[MOAILog]:
+        return self.get_moai_logs(limit=n)
+
+    def iter_moai_logs(self, project_id: Optional[str] = None, batch_size: Optional[int] = None) -> Iterator[MOAILog]:
+        if project_id:
+            rows = self._iter_rows("SELECT * FROM moai_logs WHERE project_id = ? ORDER BY id ASC", (project_id,), batch_size)
+        else:
+            rows = self._iter_rows("SELECT * FROM moai_logs ORDER BY id ASC", (), batch_size)
+        for row in rows:
+            yield self._to_model(MOAILog, dict(row))
+
+    def count_moai_log_events(self) -> Dict[str, int]:
+        """Contagem por tipo de evento somando os logs atuais e as agregações dos logs já retidos."""
+        conn = self._read_connect()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT event_type, SUM(n) FROM (
+                SELECT event_type, COUNT(*) AS n FROM moai_logs GROUP BY event_type
+                UNION ALL
+                SELECT event_type, SUM(count) AS n FROM moai_log_rollups GROUP BY event_type
+            ) GROUP BY event_type
+        """)
+        counts = {row[0]: row[1] for row in cursor.fetchall()}
+        conn.close()
+        return counts
+
+    # Linhas removidas por transação na retenção: lotes curtos para não segurar o lock de escrita
+    LOG_RETENTION_BATCH_SIZE = 1000
+
+    def apply_log_retention(self, older_than: Optional[datetime.datetime] = None,
+                            batch_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Aplica a retenção em moai_logs: os logs anteriores ao horizonte são gravados num segmento
+        JSONL comprimido (gzip), agregados por hora em moai_log_rollups e removidos.
+        Trabalha em lotes pela chave primária (IDs ordenados por tempo); cada lote é lido sem lock
+        e removido numa transação curta, então os escritores só esperam um lote por vez.
+        O segmento é sincronizado em disco antes da remoção: uma falha no meio pode arquivar um
+        lote duas vezes, mas nunca remove um log sem arquivá-lo.
+        """
+        cutoff = older_than or datetime.datetime.now() - datetime.timedelta(days=self.log_retention_days)
+        upper_id = id_floor(cutoff)
+        batch_size = batch_size or self.LOG_RETENTION_BATCH_SIZE
+        segment_path = os.path.join(
+            self.log_archive_dir, f"moai_logs_{datetime.datetime.now():%Y%m%d_%H%M%S}_{short_id(new_id())}.jsonl.gz")
+        result: Dict[str, Any] = {"success": True, "archived": 0, "batches": 0, "segment": None, "cutoff": cutoff}
+
+        while True:
+            conn = self._connect()
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT * FROM moai_logs WHERE id < ? ORDER BY id LIMIT ?", (upper_id, batch_size))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                first_id, last_id = rows[0]["id"], rows[-1]["id"]
+                self._append_log_segment(segment_path, rows)
+
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.execute("""
+                    INSERT INTO moai_log_rollups (bucket, event_type, agent_id, project_id, status, count)
+                    SELECT strftime('%Y-%m-%d %H:00:00', timestamp), coalesce(event_type, ''), coalesce(agent_id, ''),
+                           coalesce(project_id, ''), coalesce(status, ''), COUNT(*)
+                    FROM moai_logs WHERE id BETWEEN ? AND ?
+                    GROUP BY 1, 2, 3, 4, 5
+                    ON CONFLICT (bucket, event_type, agent_id, project_id, status) DO UPDATE SET count = count + excluded.count
+                """, (first_id, last_id))
+                cursor.execute("DELETE FROM moai_logs WHERE id BETWEEN ? AND ?", (first_id, last_id))
+                conn.commit()
+                result["archived"] += len(rows)
+                result["batches"] += 1
+                result["segment"] = segment_path
+            except (sqlite3.Error, OSError) as e:
+                logging.error(f"Erro na retenção de logs do MOAI: {e}")
+                conn.rollback()
+                result.update(success=False, error=str(e))
+                break
+            finally:
+                conn.close()
+
+        if result["archived"]:
+            logging.info(f"Retenção de logs: {result['archived']} log(s) anteriores a {cutoff:%Y-%m-%d %H:%M} "
+                         f"arquivados em {segment_path} ({result['batches']} lote(s)).")
+        return result
+
+    @staticmethod
+    def _append_log_segment(segment_path: str, rows: List[sqlite3.Row]):
+        """Acrescenta as linhas ao segmento como um novo membro gzip e força a gravação em disco."""
+        os.makedirs(os.path.dirname(segment_path), exist_ok=True)
+        lines = "".join(
+            json.dumps(dict(row), ensure_ascii=False, default=lambda value: value.isoformat()) + "\n" for row in rows
+        )
+        with open(segment_path, "ab") as raw_file:
+            with gzip.GzipFile(fileobj=raw_file, mode="ab") as gzip_file:
+                gzip_file.write(lines.encode("utf-8"))
+            raw_file.flush()
+            os.fsync(raw_file.fileno())
+
+    def get_log_rollups(self, project_id: Optional[str] = None, since: Optional[datetime.datetime] = None,
+                        until: Optional[datetime.datetime] = None) -> List[MOAILogRollup]:
+        """Série horária dos logs retidos, opcionalmente filtrada por projeto e intervalo."""
+        where_clauses, values = [], []
+        if project_id:
+            where_clauses.append("project_id = ?")
+            values.append(project_id)
+        if since:
+            where_clauses.append("bucket >= ?")
+            values.append(since.strftime("%Y-%m-%d %H:00:00"))
+        if until:
+            where_clauses.append("bucket < ?")
+            values.append(until.strftime("%Y-%m-%d %H:%M:%S"))
+        where_sql = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+        conn = self._read_connect()
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT bucket, event_type, nullif(agent_id, '') AS agent_id, nullif(project_id, '') AS project_id,
+                   nullif(status, '') AS status, count
+            FROM moai_log_rollups {where_sql} ORDER BY bucket, event_type
+        """, tuple(values))
+        rows = cursor.fetchall()
+        conn.close()
+        return self._to_models(MOAILogRollup, rows)
+
+    # Tarefas de manutenção, páginas devolvidas por passo de incremental_vacuum e
+    # linhas amostradas por índice no ANALYZE (PRAGMA analysis_limit)
+    MAINTENANCE_TASKS = (
+        "vacuum", "incremental_vacuum", "analyze", "optimize", "quick_check", "stats",
+        "prune_change_log", "log_retention", "archive_projects",
+    )
+    INCREMENTAL_VACUUM_PAGES = 256
+    ANALYSIS_LIMIT = 1000
+    AUTO_VACUUM_MODES = {0: "NONE", 1: "FULL", 2: "INCREMENTAL"}
+
+    def run_maintenance(self, task: str, max_pages: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Executa uma tarefa de manutenção e registra o resultado em maintenance_runs:
+        - vacuum: reconstrução completa, com o banco bloqueado; só por ação explícita, para ativar auto_vacuum=INCREMENTAL num banco antigo;
+        - incremental_vacuum: devolve ao sistema até `max_pages` páginas livres;
+        - analyze: ANALYZE amostrado (analysis_limit) para as estatísticas do planejador;
+        - optimize: PRAGMA optimize, que só reanalisa o que mudou desde a última análise;
+        - quick_check: verificação de integridade sem o cruzamento índice x tabela do integrity_check;
+        - stats: ocupação das páginas (dbstat), base do indicador de fragmentação;
+        - prune_change_log: poda do change_log além da janela de retenção (ver prune_change_log);
+        - log_retention: arquivo, agregação horária e remoção dos logs antigos (ver apply_log_retention);
+        - archive_projects: arquivo frio dos projetos concluídos antigos (ver archive_completed_projects).
+        """
+        if task not in self.MAINTENANCE_TASKS:
+            raise ValueError(f"Tarefa de manutenção desconhecida: {task}")
+        started = time.perf_counter()
+        details: Dict[str, Any] = {}
+        success = True
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            if task == "vacuum":
+                cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                cursor.execute("VACUUM")
+            elif task == "incremental_vacuum":
+                freelist_before = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+                # Cada passo do pragma libera uma página e execute() só dá o primeiro; executescript vai até o fim
+                conn.executescript(f"PRAGMA incremental_vacuum({int(max_pages or self.INCREMENTAL_VACUUM_PAGES)})")
+                details["pages_freed"] = freelist_before - cursor.execute("PRAGMA freelist_count").fetchone()[0]
+            elif task == "analyze":
+                cursor.execute(f"PRAGMA analysis_limit = {self.ANALYSIS_LIMIT}")
+                cursor.execute("ANALYZE")
+            elif task == "optimize":
+                cursor.execute("PRAGMA optimize")
+            elif task == "prune_change_log":
+                # Lotes em transações próprias: os escritores esperam no máximo um lote
+                details["removed"] = self.prune_change_log()
+            elif task == "log_retention":
+                retention = self.apply_log_retention()
+                success = retention["success"]
+                details.update({key: retention[key] for key in ("archived", "batches", "segment", "error") if key in retention})
+            elif task == "archive_projects":
+                summary = self.archive_completed_projects()
+                success = summary["success"]
+                details.update(archived=len(summary["archived"]), failed=len(summary["failed"]), rows=summary["rows"],
+                               cutoff=summary["cutoff"].isoformat())
+            elif task == "quick_check":
+                messages = [row[0] for row in cursor.execute("PRAGMA quick_check(20)").fetchall()]
+                success = messages == ["ok"]
+                details["messages"] = messages
+            else:
+                cursor.execute("SELECT SUM(pgsize), SUM(unused) FROM dbstat WHERE aggregate = 1")
+                used_bytes, unused_bytes = cursor.fetchone()
+                details.update(used_page_bytes=used_bytes or 0, unused_bytes=unused_bytes or 0)
+        except sqlite3.Error as e:
+            logging.error(f"Erro na manutenção do banco ({task}): {e}")
+            success = False
+            details["error"] = str(e)
+        finally:
+            conn.close()
+
+        result = {"task": task, "success": success, "duration_ms": (time.perf_counter() - started) * 1000, **details}
+        self._record_maintenance_run(task, result["duration_ms"], success, details)
+        return result
+
+    def _record_maintenance_run(self, task: str, duration_ms: float, success: bool, details: Dict[str, Any]):
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                INSERT INTO maintenance_runs (task, last_run_at, duration_ms, success, details) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (task) DO UPDATE SET last_run_at = excluded.last_run_at, duration_ms = excluded.duration_ms,
+                                                 success = excluded.success, details = excluded.details
+            """, (task, datetime.datetime.now(), duration_ms, int(success), json.dumps(details)))
+            conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao registrar a manutenção {task}: {e}")
+            conn.rollback()
+        finally:
+            conn.close()
+
+    def save_infra_snapshot(self, project_id: Optional[str], kind: str, data: Dict[str, Any]) -> Optional[InfraSnapshot]:
+        snapshot = InfraSnapshot(project_id=project_id, kind=kind, data=data, refreshed_at=datetime.datetime.now())
         conn = self._connect()
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM moai_logs ORDER BY timestamp ASC")
+        try:
+            cursor.execute("""
+                INSERT INTO infra_snapshots (project_id, kind, data, refreshed_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (project_id, kind) DO UPDATE SET data = excluded.data, refreshed_at = excluded.refreshed_at
+            """, (project_id or "", kind, json.dumps(data, default=str), snapshot.refreshed_at))
+            conn.commit()
+            return snapshot
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao salvar snapshot {kind} do projeto {short_id(project_id) if project_id else 'GLOBAL'}...: {e}")
+            conn.rollback()
+            return None
+        finally:
+            conn.close()
+
+    def get_infra_snapshots(self, project_id: Optional[str]) -> Dict[str, InfraSnapshot]:
+        """Snapshots armazenados do projeto (ou globais, com project_id None), por tipo."""
+        conn = self._read_connect()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT nullif(project_id, '') AS project_id, kind, data, refreshed_at FROM infra_snapshots WHERE project_id = ?
+        """, (project_id or "",))
         rows = cursor.fetchall()
         conn.close()
-        return [MOAILog(**dict(row)) for row in rows]
+
+        def decode(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+            snapshot["data"] = json.loads(snapshot["data"])
+            return snapshot
+        return {snapshot.kind: snapshot for snapshot in self._to_models(InfraSnapshot, rows, decode=decode)}
+
+    def save_speculative_draft(self, draft: Dict[str, Any]) -> bool:
+        """Grava o rascunho só se a proposta ainda estiver pendente (aprovada ou removida no meio: descarta)."""
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                INSERT OR REPLACE INTO speculative_drafts (proposal_id, project_id, provision_message, backup_message, code, llm_ms, created_at)
+                SELECT ?, ?, ?, ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM proposals WHERE id = ? AND status = 'pending')
+            """, (
+                draft["proposal_id"], draft["project_id"], draft["provision_message"], draft["backup_message"],
+                json.dumps(draft["code"]) if draft.get("code") else None, draft["llm_ms"], draft["created_at"],
+                draft["proposal_id"]
+            ))
+            conn.commit()
+            return cursor.rowcount == 1
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao salvar rascunho especulativo da proposta {short_id(draft['proposal_id'])}...: {e}")
+            conn.rollback()
+            return False
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _decode_speculative_draft(draft: Dict[str, Any]) -> Dict[str, Any]:
+        draft["code"] = json.loads(draft["code"]) if draft["code"] else None
+        return draft
+
+    def get_speculative_draft(self, proposal_id: str) -> Optional[SpeculativeDraft]:
+        conn = self._read_connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM speculative_drafts WHERE proposal_id = ?", (proposal_id,))
+        rows = cursor.fetchall()
+        conn.close()
+        drafts = self._to_models(SpeculativeDraft, rows, decode=self._decode_speculative_draft)
+        return drafts[0] if drafts else None
+
+    def take_speculative_draft(self, proposal_id: str) -> Optional[SpeculativeDraft]:
+        """Lê e remove o rascunho da proposta numa transação: cada rascunho é promovido uma única vez."""
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("SELECT * FROM speculative_drafts WHERE proposal_id = ?", (proposal_id,))
+            rows = cursor.fetchall()
+            cursor.execute("DELETE FROM speculative_drafts WHERE proposal_id = ?", (proposal_id,))
+            conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao promover rascunho especulativo da proposta {short_id(proposal_id)}...: {e}")
+            conn.rollback()
+            return None
+        finally:
+            conn.close()
+        drafts = self._to_models(SpeculativeDraft, rows, decode=self._decode_speculative_draft)
+        return drafts[0] if drafts else None
+
+    # Rascunho de proposta aprovada ainda pode ser promovido pela orquestração enquanto isso
+    SPECULATIVE_DRAFT_APPROVAL_GRACE = datetime.timedelta(hours=1)
+
+    def discard_speculative_drafts(self, proposal_ids: Optional[Sequence[str]] = None) -> int:
+        """
+        Remove os rascunhos das propostas informadas; sem `proposal_ids`, remove os órfãos: de
+        propostas excluídas ou rejeitadas, ou aprovadas há mais de SPECULATIVE_DRAFT_APPROVAL_GRACE.
+        Retorna quantos foram removidos.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            removed = 0
+            if proposal_ids is None:
+                cursor.execute("""
+                    DELETE FROM speculative_drafts WHERE proposal_id NOT IN (
+                        SELECT id FROM proposals WHERE status = 'pending' OR (status = 'approved' AND approved_at >= ?)
+                    )
+                """, (datetime.datetime.now() - self.SPECULATIVE_DRAFT_APPROVAL_GRACE,))
+                removed = cursor.rowcount
+            else:
+                for chunk in self._chunks(list(dict.fromkeys(proposal_ids))):
+                    cursor.execute(f"DELETE FROM speculative_drafts WHERE proposal_id IN ({', '.join('?' * len(chunk))})", chunk)
+                    removed += cursor.rowcount
+            conn.commit()
+            return removed
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao descartar rascunhos especulativos: {e}")
+            conn.rollback()
+            return 0
+        finally:
+            conn.close()
+
+    def get_speculation_candidates(self, limit: int) -> List[str]:
+        """Propostas pendentes sem rascunho, das mais antigas para as mais novas."""
+        conn = self._read_connect()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT p.id FROM proposals p LEFT JOIN speculative_drafts d ON d.proposal_id = p.id
+            WHERE p.status = 'pending' AND d.proposal_id IS NULL
+            ORDER BY p.submitted_at, p.id LIMIT ?
+        """, (limit,))
+        candidates = [row["id"] for row in cursor.fetchall()]
+        conn.close()
+        return candidates
+
+    def count_speculative_drafts(self) -> int:
+        conn = self._read_connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM speculative_drafts")
+        count = cursor.fetchone()[0]
+        conn.close()
+        return count
+
+    def get_maintenance_runs(self) -> Dict[str, MaintenanceRun]:
+        """Última execução de cada tarefa de manutenção, por tarefa."""
+        conn = self._read_connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM maintenance_runs")
+        rows = cursor.fetchall()
+        conn.close()
+
+        def decode(run: Dict[str, Any]) -> Dict[str, Any]:
+            run["success"] = bool(run["success"])
+            run["details"] = json.loads(run["details"]) if run["details"] else {}
+            return run
+        return {run.task: run for run in self._to_models(MaintenanceRun, rows, decode=decode)}
+
+    def get_database_health(self) -> Dict[str, Any]:
+        """
+        Tamanho do arquivo (incluindo o WAL, se houver), páginas livres e fragmentação.
+        A fragmentação soma as páginas livres ao espaço não usado dentro das páginas, medido
+        pela última tarefa "stats" (a varredura do dbstat não roda a cada leitura).
+        """
+        conn = self._read_connect()
+        cursor = conn.cursor()
+        page_size = cursor.execute("PRAGMA page_size").fetchone()[0]
+        page_count = cursor.execute("PRAGMA page_count").fetchone()[0]
+        freelist_count = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+        auto_vacuum = cursor.execute("PRAGMA auto_vacuum").fetchone()[0]
+        conn.close()
+
+        file_size = sum(os.path.getsize(path) for path in (self.db_path, f"{self.db_path}-wal") if os.path.exists(path))
+        health = {
+            "file_size": file_size,
+            "page_size": page_size,
+            "page_count": page_count,
+            "freelist_count": freelist_count,
+            "free_bytes": freelist_count * page_size,
+            "freelist_ratio": freelist_count / page_count if page_count else 0.0,
+            "auto_vacuum": self.AUTO_VACUUM_MODES.get(auto_vacuum, str(auto_vacuum)),
+            "unused_ratio": None,
+            "fragmentation": None,
+        }
+        stats_run = self.get_maintenance_runs().get("stats")
+        if stats_run and stats_run.success and page_count:
+            unused_bytes = stats_run.details.get("unused_bytes", 0)
+            health["unused_ratio"] = unused_bytes / (page_count * page_size)
+            health["fragmentation"] = (unused_bytes + health["free_bytes"]) / (page_count * page_size)
+        return health
 
     def delete_moai_logs_by_project(self, project_id: str) -> bool:
         conn = self._connect()
@@ -849,10 +2719,10 @@ class DatabaseManager:
             else:
                 cursor.execute("DELETE FROM moai_logs WHERE project_id = ?", (project_id,))
             conn.commit()
-            logging.info(f"Logs MOAI para projeto {project_id[:8] if project_id else 'GLOBAL'}... excluídos.")
+            logging.info(f"Logs MOAI para projeto {short_id(project_id) if project_id else 'GLOBAL'}... excluídos.")
             return True
         except sqlite3.Error as e:
-            logging.error(f"Erro ao excluir logs MOAI para projeto {project_id[:8] if project_id else 'GLOBAL'}...: {e}")
+            logging.error(f"Erro ao excluir logs MOAI para projeto {short_id(project_id) if project_id else 'GLOBAL'}...: {e}")
             conn.rollback()
             return False
         finally:
@@ -0,0 +1,113 @@
+# db_maintenance.py
+import datetime
+import logging
+import os
+import threading
+from typing import Callable, Dict, Any, List, Optional
+
+from database_manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseMaintenance:
+    """
+    Agenda a manutenção do SQLite (ver DatabaseManager.run_maintenance) em janelas ociosas.
+    Uma thread de fundo acorda a cada `interval` segundos e considera o banco ocioso quando a
+    sequência do change_log não mudou desde a verificação anterior; só então executa as tarefas
+    vencidas, uma por vez. As tarefas de limpeza (HOUSEKEEPING_TASKS) trabalham em lotes curtos e
+    rodam mesmo com o banco ocupado, senão um servidor sempre ativo nunca as executaria.
+    A última execução de cada tarefa fica em maintenance_runs, então os intervalos sobrevivem a
+    reinícios da aplicação.
+
+    A conversão de bancos antigos para auto_vacuum=INCREMENTAL (tarefa "vacuum") reescreve o
+    arquivo inteiro com o banco bloqueado e por isso nunca é agendada: é uma ação explícita do
+    administrador (painel de saúde do banco). Sem ela, as tarefas automáticas se limitam aos
+    passos curtos de incremental_vacuum, que só têm efeito em bancos já convertidos.
+    """
+
+    # Intervalo mínimo entre execuções de cada tarefa periódica
+    SCHEDULE = {
+        "incremental_vacuum": datetime.timedelta(minutes=10),
+        "analyze": datetime.timedelta(days=1),
+        "optimize": datetime.timedelta(hours=1),
+        "quick_check": datetime.timedelta(days=1),
+        "stats": datetime.timedelta(hours=1),
+        "archive_projects": datetime.timedelta(days=1),
+        "prune_change_log": datetime.timedelta(hours=1),
+        "log_retention": datetime.timedelta(hours=1),
+    }
+
+    # Tarefas que não dependem de uma janela ociosa
+    HOUSEKEEPING_TASKS = ("prune_change_log", "log_retention")
+
+    def __init__(self, db_manager: DatabaseManager, interval: Optional[float] = None,
+                 on_results: Optional[Callable[[List[Dict[str, Any]]], None]] = None):
+        self.db_manager = db_manager
+        # Segundos entre verificações de ociosidade; 0 desativa o agendador
+        self.interval = float(os.getenv("SFORGE_MAINTENANCE_INTERVAL", "300")) if interval is None else interval
+        self.on_results = on_results
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_seq: Optional[int] = None
+
+    def start(self):
+        if self.interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="sforge-maintenance", daemon=True)
+        self._thread.start()
+        logger.info(f"Manutenção do banco agendada (verificação a cada {self.interval:.0f}s).")
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_due_tasks(housekeeping_only=not self._is_idle())
+            except Exception as e:
+                logger.error(f"Erro no agendador de manutenção do banco: {e}")
+
+    def _is_idle(self) -> bool:
+        seq = self.db_manager.get_change_seq()
+        idle = self._last_seq is not None and seq == self._last_seq
+        self._last_seq = seq
+        return idle
+
+    def due_tasks(self, now: Optional[datetime.datetime] = None) -> List[str]:
+        """Tarefas vencidas, na ordem de execução de MAINTENANCE_TASKS."""
+        now = now or datetime.datetime.now()
+        runs = self.db_manager.get_maintenance_runs()
+        health = self.db_manager.get_database_health()
+        due = []
+        for task in self.db_manager.MAINTENANCE_TASKS:
+            if task not in self.SCHEDULE:
+                continue
+            if task == "incremental_vacuum" and (health["auto_vacuum"] != "INCREMENTAL" or not health["freelist_count"]):
+                continue
+            if task not in runs or now - runs[task].last_run_at >= self.SCHEDULE[task]:
+                due.append(task)
+        return due
+
+    def run_due_tasks(self, force: bool = False, housekeeping_only: bool = False) -> List[Dict[str, Any]]:
+        """
+        Executa as tarefas vencidas (ou todas as periódicas, com `force`; só as de limpeza, com
+        `housekeeping_only`) e repassa os resultados a `on_results`. Chamadas concorrentes
+        esperam a execução em curso.
+        """
+        with self._lock:
+            if force:
+                tasks = [task for task in self.db_manager.MAINTENANCE_TASKS if task in self.SCHEDULE]
+            else:
+                tasks = self.due_tasks()
+            if housekeeping_only:
+                tasks = [task for task in tasks if task in self.HOUSEKEEPING_TASKS]
+            results = [self.db_manager.run_maintenance(task) for task in tasks]
+        if results:
+            logger.info("Manutenção do banco executada: " + ", ".join(
+                f"{result['task']} ({'ok' if result['success'] else 'falhou'}, {result['duration_ms']:.0f} ms)" for result in results))
+            if self.on_results:
+                self.on_results(results)
+        return results
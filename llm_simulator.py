@@ -1,10 +1,12 @@
 # llm_simulator.py
 import concurrent.futures
+import contextlib
 import json
 import logging
 import os
+import threading
 import time
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Iterator, Optional, Union
 
 import ollama
 from pydantic import BaseModel, ValidationError
@@ -35,6 +37,11 @@ class LLMSimulator:
         self._check_timeout_seconds = float(os.getenv("OLLAMA_CHECK_TIMEOUT", "2"))
         self._chat_check_timeout_seconds = float(os.getenv("OLLAMA_CHAT_CHECK_TIMEOUT", "10"))
         self._check_cooldown_seconds = float(os.getenv("OLLAMA_CHECK_COOLDOWN", "5"))
+        # Atividade interativa (tudo o que não roda em background_priority): mede a ociosidade do LLM
+        self._activity_lock = threading.Lock()
+        self._interactive_calls = 0
+        self._last_interactive_at = time.monotonic()
+        self._priority = threading.local()
 
         if eager_init:
             self._initialize_client(timeout=self._check_timeout_seconds)
@@ -110,12 +117,46 @@ class LLMSimulator:
             self._is_available = False
             return False
 
+    @contextlib.contextmanager
+    def background_priority(self):
+        """Marca as chamadas feitas nesta thread como trabalho de fundo: não contam como atividade interativa."""
+        self._priority.background = True
+        try:
+            yield
+        finally:
+            self._priority.background = False
+
+    @contextlib.contextmanager
+    def _track_activity(self):
+        if getattr(self._priority, "background", False):
+            yield
+            return
+        with self._activity_lock:
+            self._interactive_calls += 1
+        try:
+            yield
+        finally:
+            with self._activity_lock:
+                self._interactive_calls -= 1
+                self._last_interactive_at = time.monotonic()
+
+    def interactive_idle_seconds(self) -> Optional[float]:
+        """Segundos desde o fim da última chamada interativa; None enquanto houver alguma em curso."""
+        with self._activity_lock:
+            if self._interactive_calls:
+                return None
+            return time.monotonic() - self._last_interactive_at
+
     def chat(self, messages: List[Dict[str, str]], model: str = "mistral", response_model: Optional[type[BaseModel]] = None, json_mode: bool = False) -> Union[Dict[str, Any], BaseModel]:
         """
         Simula uma interação de chat com o LLM.
         Se response_model é fornecido, tenta analisar a resposta para esse modelo Pydantic.
         Se json_mode é True, solicita saída JSON ao LLM.
         """
+        with self._track_activity():
+            return self._chat(messages, model, response_model, json_mode)
+
+    def _chat(self, messages: List[Dict[str, str]], model: str, response_model: Optional[type[BaseModel]], json_mode: bool) -> Union[Dict[str, Any], BaseModel]:
         # First, check availability. This will raise LLMConnectionError if not available.
         if not self.is_available(timeout=self._chat_check_timeout_seconds):
             raise LLMConnectionError("LLM não está disponível. O servidor Ollama pode estar inativo ou mal configurado.")
@@ -218,3 +259,26 @@ class LLMSimulator:
             # Catch any other unexpected errors during the chat interaction.
             logger.error(f"LLMGenerationError: Ocorreu um erro inesperado durante o chat do LLM: {e}", exc_info=True)
             raise LLMGenerationError(f"Erro inesperado durante a interação com o LLM: {e}")
+
+    def chat_stream(self, messages: List[Dict[str, str]], model: str = "mistral") -> Iterator[str]:
+        """
+        Versão em streaming de `chat` (texto livre, sem response_model): gera os trechos do
+        conteúdo à medida que o Ollama os devolve.
+        """
+        if not self.is_available(timeout=self._chat_check_timeout_seconds) or self.client is None:
+            raise LLMConnectionError("LLM não está disponível. O servidor Ollama pode estar inativo ou mal configurado.")
+        with self._track_activity():
+            yield from self._chat_stream(messages, model)
+
+    def _chat_stream(self, messages: List[Dict[str, str]], model: str) -> Iterator[str]:
+        try:
+            for part in self.client.chat(model=model, messages=list(messages), options={'temperature': 0.7}, stream=True):
+                content = part['message']['content']
+                if content:
+                    yield content
+        except ollama.ResponseError as re:
+            logger.error(f"LLMGenerationError: Erro da API Ollama: {re}. Modelo: {model}")
+            raise LLMGenerationError(f"Erro da API Ollama durante a geração: {re}")
+        except Exception as e:
+            logger.error(f"LLMGenerationError: Ocorreu um erro inesperado durante o chat do LLM em streaming: {e}", exc_info=True)
+            raise LLMGenerationError(f"Erro inesperado durante a interação com o LLM: {e}")
@@ -0,0 +1,365 @@
+# moai_api.py
+"""
+API HTTP/JSON do MOAI, sem interface, ao lado do CognitoLink.
+
+Expõe propostas, projetos, código, relatórios, jobs e chat do SynapseForgeBackend num servidor
+assíncrono (Starlette + uvicorn, já instalados com o Streamlit). As chamadas ao backend, que são
+bloqueantes, rodam em dois pools de threads: um para leituras (metadados, servidas pelo cache de
+view models) e outro, menor, para operações que chamam o LLM, para que gerações longas não
+bloqueiem as leituras. Chat e geração de código respondem em streaming (NDJSON).
+
+O processo usa o mesmo banco (synapse_forge.db) que o CognitoLink. Para compartilhar também a
+fila de jobs e a coalescência (single-flight), rode a API dentro do processo do Streamlit
+definindo SFORGE_API_PORT; como processo separado, os jobs rodam nos executores deste processo
+e os resultados chegam ao CognitoLink pelo banco (change_log).
+
+As threads de fundo (manutenção do banco e especulação pós-aprovação) ficam com o CognitoLink;
+um processo só de API as inicia com --background-services.
+
+Uso: python moai_api.py [--host 127.0.0.1] [--port 8600] [--background-services]
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+import uvicorn
+from pydantic import BaseModel
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+
+from data_models import Proposal
+from MOAI import SynapseForgeBackend
+from view_cache import ViewModelCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8600
+# Intervalo entre eventos de progresso nas respostas em streaming de operações longas
+STREAM_HEARTBEAT_SECONDS = 1.0
+MAX_PAGE_SIZE = 500
+
+
+class APIError(Exception):
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def json_response(data: Any, status_code: int = 200) -> Response:
+    body = json.dumps(data, default=_json_default, ensure_ascii=False)
+    return Response(body, status_code=status_code, media_type="application/json")
+
+
+def ndjson_line(event: Dict[str, Any]) -> str:
+    return json.dumps(event, default=_json_default, ensure_ascii=False) + "\n"
+
+
+def _partial_dump(model: BaseModel, fields: Optional[list]) -> Dict[str, Any]:
+    """Serializa um modelo; para projeções (modelos parciais), só os campos selecionados."""
+    if not fields:
+        return model.model_dump(mode="json")
+    return {field: getattr(model, field) for field in ["id"] + [f for f in fields if f != "id"]}
+
+
+class MOAIAPI:
+    """Rotas HTTP sobre o SynapseForgeBackend, com pools separados para leituras e chamadas ao LLM."""
+
+    def __init__(self, backend: Optional[SynapseForgeBackend] = None, read_workers: Optional[int] = None,
+                 llm_workers: Optional[int] = None):
+        self.backend = backend or SynapseForgeBackend()
+        self.read_pool = ThreadPoolExecutor(max_workers=read_workers or int(os.getenv("SFORGE_API_WORKERS", "16")),
+                                            thread_name_prefix="sforge-api")
+        self.llm_pool = ThreadPoolExecutor(max_workers=llm_workers or int(os.getenv("SFORGE_API_LLM_WORKERS", "4")),
+                                           thread_name_prefix="sforge-api-llm")
+        # Mesmo cache de view models do CognitoLink: escritas do backend invalidam pelo change_log
+        self.view_cache = ViewModelCache(self.backend)
+        self.backend.add_write_listener(self.view_cache.mark_dirty)
+        self.app = Starlette(routes=[
+            Route("/health", self.health),
+            Route("/proposals", self.list_proposals, methods=["GET"]),
+            Route("/proposals", self.create_proposal, methods=["POST"]),
+            Route("/proposals/{proposal_id}", self.get_proposal, methods=["GET"]),
+            Route("/proposals/{proposal_id}/status", self.update_proposal_status, methods=["POST"]),
+            Route("/projects", self.list_projects, methods=["GET"]),
+            Route("/projects/{project_id}", self.get_project, methods=["GET"]),
+            Route("/projects/{project_id}/code", self.list_code, methods=["GET"]),
+            Route("/projects/{project_id}/code", self.generate_code, methods=["POST"]),
+            Route("/code/{code_id}", self.get_code, methods=["GET"]),
+            Route("/reports/{kind}", self.get_report, methods=["GET"]),
+            Route("/reports/{kind}", self.request_report, methods=["POST"]),
+            Route("/jobs", self.list_jobs, methods=["GET"]),
+            Route("/chat", self.list_chat, methods=["GET"]),
+            Route("/chat", self.post_chat, methods=["POST"]),
+        ], exception_handlers={APIError: self._api_error})
+
+    # --- Infraestrutura ---
+
+    @staticmethod
+    async def _api_error(request: Request, exc: APIError) -> Response:
+        return json_response({"error": exc.message}, status_code=exc.status_code)
+
+    async def _read(self, fn: Callable[..., Any], *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.read_pool, fn, *args)
+
+    async def _llm(self, fn: Callable[..., Any], *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.llm_pool, fn, *args)
+
+    def _cached(self, key: Any, depends_on, loader: Callable[[], Any]) -> Any:
+        """Leitura pelo cache de view models (roda nas threads do pool de leitura)."""
+        self.view_cache.sync()
+        return self.view_cache.get(key, depends_on, loader)
+
+    @staticmethod
+    async def _body(request: Request) -> Dict[str, Any]:
+        try:
+            body = await request.json()
+        except ValueError:
+            raise APIError(400, "Corpo da requisição não é JSON válido.")
+        if not isinstance(body, dict):
+            raise APIError(400, "O corpo da requisição deve ser um objeto JSON.")
+        return body
+
+    @staticmethod
+    def _limit(request: Request) -> Optional[int]:
+        limit = request.query_params.get("limit")
+        if limit is None:
+            return None
+        try:
+            return max(1, min(int(limit), MAX_PAGE_SIZE))
+        except ValueError:
+            raise APIError(400, "Parâmetro 'limit' inválido.")
+
+    @staticmethod
+    def _datetime_param(request: Request, name: str) -> Optional[datetime.datetime]:
+        value = request.query_params.get(name)
+        if value is None:
+            return None
+        try:
+            return datetime.datetime.fromisoformat(value)
+        except ValueError:
+            raise APIError(400, f"Parâmetro '{name}' deve estar no formato ISO 8601.")
+
+    async def _stream_from_thread(self, iterator_factory: Callable[[], Iterator[str]]) -> AsyncIterator[str]:
+        """Consome um gerador bloqueante numa thread do pool do LLM, repassando os itens ao event loop."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        def produce():
+            try:
+                for item in iterator_factory():
+                    loop.call_soon_threadsafe(queue.put_nowait, item)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        self.llm_pool.submit(produce)
+        while True:
+            item = await queue.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    # --- Rotas ---
+
+    async def health(self, request: Request) -> Response:
+        return json_response({"status": "ok", "change_seq": await self._read(self.backend.get_change_seq)})
+
+    async def list_proposals(self, request: Request) -> Response:
+        status = request.query_params.get("status")
+        before = self._datetime_param(request, "before")
+        before_id = request.query_params.get("before_id")
+        limit = self._limit(request)
+        fields = [field for field in request.query_params.get("fields", "").split(",") if field] or None
+        if fields and any(field not in Proposal.model_fields for field in fields):
+            raise APIError(400, "Campo desconhecido em 'fields'.")
+        proposals = await self._read(self._cached, ("api_proposals", status, before, before_id, limit, tuple(fields or ())), ("proposals",),
+                                     lambda: self.backend.get_proposals_page(status, before=before, before_id=before_id, limit=limit, fields=fields))
+        items = [_partial_dump(proposal, fields) for proposal in proposals]
+        next_cursor = None
+        if proposals and (not fields or "submitted_at" in fields):
+            next_cursor = {"before": proposals[-1].submitted_at, "before_id": proposals[-1].id}
+        return json_response({"items": items, "next": next_cursor})
+
+    async def get_proposal(self, request: Request) -> Response:
+        proposal_id = request.path_params["proposal_id"]
+        proposal = await self._read(self._cached, ("api_proposal", proposal_id), (("proposals", proposal_id),),
+                                    lambda: self.backend.get_proposal_by_id(proposal_id))
+        if not proposal:
+            raise APIError(404, "Proposta não encontrada.")
+        return json_response(proposal)
+
+    async def create_proposal(self, request: Request) -> Response:
+        """Gera a proposta pelo ANP a partir de um `req_data`; envios idênticos simultâneos são coalescidos."""
+        req_data = await self._body(request)
+        if not req_data.get("nome_projeto") or not req_data.get("nome_cliente"):
+            raise APIError(400, "Campos obrigatórios: nome_projeto e nome_cliente.")
+        proposal = await self._llm(self.backend.generate_proposal, req_data)
+        return json_response(proposal, status_code=201)
+
+    async def update_proposal_status(self, request: Request) -> Response:
+        proposal_id = request.path_params["proposal_id"]
+        new_status = (await self._body(request)).get("status")
+        if new_status not in ("pending", "approved", "rejected"):
+            raise APIError(400, "Status deve ser 'pending', 'approved' ou 'rejected'.")
+        if not await self._read(self.backend.get_proposal_by_id, proposal_id):
+            raise APIError(404, "Proposta não encontrada.")
+        # A aprovação dispara a orquestração (AID, ADE-X...), que chama o LLM
+        project_id = await self._llm(self.backend.update_proposal_status, proposal_id, new_status)
+        return json_response({"proposal_id": proposal_id, "status": new_status, "project_id": project_id})
+
+    async def list_projects(self, request: Request) -> Response:
+        projects = await self._read(self._cached, "api_projects", ("projects",), self.backend.get_all_projects)
+        return json_response({"items": projects})
+
+    async def get_project(self, request: Request) -> Response:
+        project_id = request.path_params["project_id"]
+        project = await self._read(self._cached, ("api_project", project_id), (("projects", project_id),),
+                                   lambda: self.backend.get_project_by_id(project_id))
+        if not project:
+            raise APIError(404, "Projeto não encontrado.")
+        return json_response(project)
+
+    async def list_code(self, request: Request) -> Response:
+        project_id = request.path_params["project_id"]
+        code_files = await self._read(self._cached, ("api_code_metadata", project_id), ("generated_code",),
+                                      lambda: self.backend.get_generated_code_metadata(project_id))
+        return json_response({"items": code_files})
+
+    async def get_code(self, request: Request) -> Response:
+        code_id = request.path_params["code_id"]
+        content = await self._read(self.backend.get_generated_code_content, code_id)
+        if content is None:
+            raise APIError(404, "Código não encontrado.")
+        return json_response({"id": code_id, "content": content})
+
+    async def generate_code(self, request: Request) -> Response:
+        """
+        Gera código pelo ADE-X, respondendo em NDJSON: "started", "running" a cada
+        STREAM_HEARTBEAT_SECONDS enquanto o LLM trabalha e "done" com o resultado.
+        """
+        project_id = request.path_params["project_id"]
+        body = await self._body(request)
+        filename = body.get("filename") or "new_module.py"
+        language = body.get("language") or "Python"
+        description = body.get("description") or ""
+        if not await self._read(self.backend.get_project_by_id, project_id):
+            raise APIError(404, "Projeto não encontrado.")
+
+        async def events() -> AsyncIterator[str]:
+            started = time.monotonic()
+            job = asyncio.ensure_future(self._llm(self.backend.generate_code_for_project, project_id, filename, language, description))
+            yield ndjson_line({"event": "started", "project_id": project_id, "filename": filename})
+            while True:
+                done, _ = await asyncio.wait({job}, timeout=STREAM_HEARTBEAT_SECONDS)
+                if done:
+                    break
+                yield ndjson_line({"event": "running", "elapsed_s": round(time.monotonic() - started, 1)})
+            try:
+                result = job.result()
+            except Exception as e:
+                result = {"success": False, "message": f"Erro ao gerar código: {e}"}
+            yield ndjson_line({"event": "done", "elapsed_s": round(time.monotonic() - started, 1), **result})
+
+        return StreamingResponse(events(), media_type="application/x-ndjson")
+
+    async def get_report(self, request: Request) -> Response:
+        """Estado do relatório (ver SynapseForgeBackend.request_report); enfileira a geração se faltar."""
+        return json_response(await self._report_state(request, regenerate=False))
+
+    async def request_report(self, request: Request) -> Response:
+        body = await self._body(request)
+        state = await self._report_state(request, regenerate=bool(body.get("regenerate", True)), project_id=body.get("project_id"))
+        return json_response(state, status_code=202 if state["pending"] else 200)
+
+    async def _report_state(self, request: Request, regenerate: bool, project_id: Optional[str] = None) -> Dict[str, Any]:
+        kind = request.path_params["kind"]
+        if kind not in self.backend.REPORT_KINDS:
+            raise APIError(404, f"Tipo de relatório desconhecido: {kind}")
+        project_id = project_id or request.query_params.get("project_id")
+        if not project_id and kind not in self.backend.GLOBAL_REPORT_KINDS:
+            raise APIError(400, f"Parâmetro 'project_id' é obrigatório para relatórios do tipo '{kind}'.")
+        return await self._read(self.backend.request_report, kind, project_id, regenerate)
+
+    async def list_jobs(self, request: Request) -> Response:
+        return json_response({
+            "active": self.backend.get_active_jobs(),
+            "stats": self.backend.get_single_flight_stats(),
+            "speculation": await self._read(self.backend.get_speculation_stats),
+        })
+
+    async def list_chat(self, request: Request) -> Response:
+        before = self._datetime_param(request, "before")
+        before_id = request.query_params.get("before_id")
+        messages = await self._read(self.backend.get_chat_messages, before, before_id, self._limit(request))
+        return json_response({"items": messages, "next": {"before_id": messages[0].id} if messages else None})
+
+    async def post_chat(self, request: Request) -> Response:
+        """Envia uma mensagem ao MOAI; a resposta vem em NDJSON, um trecho por linha, e é gravada no histórico ao final."""
+        message = (await self._body(request)).get("message", "").strip()
+        if not message:
+            raise APIError(400, "Campo obrigatório: message.")
+        await self._read(self.backend.add_chat_message, "user", message)
+
+        async def events() -> AsyncIterator[str]:
+            chunks = []
+            async for chunk in self._stream_from_thread(lambda: self.backend.stream_moai_chat(message)):
+                chunks.append(chunk)
+                yield ndjson_line({"delta": chunk})
+            await self._read(self.backend.add_chat_message, "assistant", "".join(chunks))
+            yield ndjson_line({"done": True})
+
+        return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+def build_app(backend: Optional[SynapseForgeBackend] = None) -> Starlette:
+    return MOAIAPI(backend).app
+
+
+def serve_in_background(backend: SynapseForgeBackend, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> threading.Thread:
+    """Sobe a API numa thread daemon do processo atual (ex.: do Streamlit), compartilhando o backend."""
+    server = uvicorn.Server(uvicorn.Config(build_app(backend), host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="sforge-api", daemon=True)
+    thread.start()
+    logger.info(f"API do MOAI escutando em http://{host}:{port} (no processo do CognitoLink).")
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.getenv("SFORGE_API_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("SFORGE_API_PORT", str(DEFAULT_PORT))))
+    parser.add_argument("--background-services", action="store_true",
+                        help="inicia também a manutenção do banco e a especulação pós-aprovação")
+    args = parser.parse_args()
+    backend = SynapseForgeBackend()
+    if args.background_services:
+        backend.start_background_services()
+    uvicorn.run(build_app(backend), host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
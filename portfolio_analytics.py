@@ -0,0 +1,109 @@
+# portfolio_analytics.py
+import logging
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from database_manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+PROPOSAL_COLUMNS = ["status", "estimated_value_moai", "submitted_at", "approved_at", "client_name"]
+
+
+class PortfolioAnalytics:
+    """
+    Análises de portfólio das propostas calculadas de forma vetorizada (pandas/NumPy).
+    Os dados são lidos com uma única projeção colunar e os quadros derivados ficam em cache,
+    chaveados pela versão de dados de `proposals` (data_versions): enquanto nenhuma proposta
+    muda, as chamadas não recalculam nada e custam só a leitura da versão.
+    """
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db_manager = db_manager
+        self._lock = threading.Lock()
+        self._version: Optional[Tuple[int, ...]] = None
+        self._frames: Dict[str, Any] = {}
+
+    def _current_frames(self) -> Dict[str, Any]:
+        version = self.db_manager.get_data_version("proposals")
+        with self._lock:
+            if version != self._version:
+                self._frames = self._compute(self._load_proposals())
+                self._version = version
+                logger.info(f"Análises de portfólio recalculadas (versão de dados {version}).")
+            return self._frames
+
+    def _load_proposals(self) -> pd.DataFrame:
+        frame = pd.DataFrame.from_records(self.db_manager.get_proposal_analytics_rows(), columns=PROPOSAL_COLUMNS)
+        frame["estimated_value_moai"] = pd.to_numeric(frame["estimated_value_moai"], errors="coerce")
+        for column in ("submitted_at", "approved_at"):
+            frame[column] = pd.to_datetime(frame[column], errors="coerce", format="ISO8601")
+        frame["client_name"] = frame["client_name"].fillna("Cliente Desconhecido")
+        return frame
+
+    @staticmethod
+    def _compute(frame: pd.DataFrame) -> Dict[str, Any]:
+        approved = frame["status"].eq("approved")
+        rejected = frame["status"].eq("rejected")
+        values = frame["estimated_value_moai"]
+
+        summary = {
+            "propostas_geradas": int(len(frame)),
+            "propostas_aprovadas": int(approved.sum()),
+            "propostas_rejeitadas": int(rejected.sum()),
+            "taxa_aprovacao": float(approved.mean() * 100) if len(frame) else 0.0,
+            "valor_total_gerado": float(values.sum()),
+            "valor_total_aprovado": float(values[approved].sum()),
+        }
+
+        # Tendência mensal: a taxa considera apenas propostas já decididas (aprovadas + rejeitadas)
+        monthly = frame.assign(
+            month=frame["submitted_at"].dt.to_period("M").dt.to_timestamp(),
+            approved=approved, rejected=rejected,
+        ).groupby("month").agg(proposals=("status", "size"), approved=("approved", "sum"), rejected=("rejected", "sum"),
+                               value=("estimated_value_moai", "sum"))
+        decided = monthly["approved"] + monthly["rejected"]
+        monthly["approval_rate"] = np.where(decided > 0, monthly["approved"] / decided.where(decided > 0, 1) * 100, np.nan)
+        approval_trend = monthly.reset_index()
+
+        value_distribution = frame.loc[values.notna(), ["status", "estimated_value_moai"]].reset_index(drop=True)
+        value_stats = value_distribution.groupby("status")["estimated_value_moai"].describe(percentiles=[0.5, 0.9])
+
+        approval_days = (frame.loc[approved, "approved_at"] - frame.loc[approved, "submitted_at"]).dt.total_seconds() / 86400
+        time_to_approval = pd.DataFrame({
+            "submitted_at": frame.loc[approved, "submitted_at"],
+            "days": approval_days,
+        }).dropna().reset_index(drop=True)
+        time_to_approval_stats = {
+            "count": int(len(time_to_approval)),
+            "mean_days": float(time_to_approval["days"].mean()) if len(time_to_approval) else None,
+            "median_days": float(time_to_approval["days"].median()) if len(time_to_approval) else None,
+            "p90_days": float(time_to_approval["days"].quantile(0.9)) if len(time_to_approval) else None,
+        }
+
+        clients = frame.assign(approved=approved, approved_value=values.where(approved, 0.0)).groupby("client_name").agg(
+            proposals=("status", "size"), approved=("approved", "sum"),
+            total_value=("estimated_value_moai", "sum"), approved_value=("approved_value", "sum"),
+        )
+        clients["approval_rate"] = clients["approved"] / clients["proposals"] * 100
+        client_breakdown = clients.sort_values("total_value", ascending=False).reset_index()
+
+        return {
+            "summary": summary,
+            "approval_trend": approval_trend,
+            "value_distribution": value_distribution,
+            "value_stats": value_stats,
+            "time_to_approval": time_to_approval,
+            "time_to_approval_stats": time_to_approval_stats,
+            "client_breakdown": client_breakdown,
+        }
+
+    def commercial_summary(self) -> Dict[str, Any]:
+        return dict(self._current_frames()["summary"])
+
+    def frames(self) -> Dict[str, Any]:
+        """Todos os quadros calculados (compartilhados pelo cache: trate-os como somente leitura)."""
+        return self._current_frames()
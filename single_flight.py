@@ -0,0 +1,155 @@
+# single_flight.py
+import functools
+import inspect
+import json
+import logging
+import threading
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def flight_key(operation: str, project_id: Optional[str] = None, params: Optional[Dict[str, Any]] = None) -> Tuple[str, Optional[str], str]:
+    """Chave (operação, projeto, parâmetros); os parâmetros são serializados de forma canônica."""
+    return (operation, project_id, json.dumps(params or {}, sort_keys=True, default=str, ensure_ascii=False))
+
+
+class SingleFlight:
+    """
+    Coalescência de chamadas idênticas em curso ("single-flight") para as operações caras do
+    SynapseForgeBackend. Enquanto uma execução de uma chave está em andamento, as chamadas
+    concorrentes com a mesma chave não executam de novo: aguardam e recebem o mesmo resultado
+    (ou a mesma exceção). Como o backend é um singleton, isso vale entre sessões do Streamlit
+    do mesmo processo. Nada fica em cache depois que a execução termina.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def _operation(key: Hashable) -> str:
+        return key[0] if isinstance(key, tuple) else str(key)
+
+    def _count(self, key: Hashable, counter: str):
+        operation_stats = self.stats.setdefault(self._operation(key), {"calls": 0, "executions": 0, "shared": 0})
+        operation_stats["calls"] += 1
+        operation_stats[counter] += 1
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        """Retorna (future da chave, True se esta chamada é a líder e deve executar)."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self._count(key, "shared")
+                return call, False
+            call = Future()
+            call.set_running_or_notify_cancel()
+            self._calls[key] = call
+            self._count(key, "executions")
+            return call, True
+
+    def _forget(self, key: Hashable, call: Future):
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Executa `fn` na thread atual, ou espera a execução já em curso da mesma chave."""
+        call, leader = self._join(key)
+        if not leader:
+            logger.debug(f"Single-flight: chamada {self._operation(key)} coalescida com a execução em curso.")
+            return call.result()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._forget(key, call)
+            call.set_exception(e)
+            raise
+        self._forget(key, call)
+        call.set_result(result)
+        return result
+
+    def submit(self, key: Hashable, executor: Executor, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """Versão assíncrona de `do`: agenda `fn` no executor; chamadas concorrentes recebem o mesmo future."""
+        call, leader = self._join(key)
+        if not leader:
+            return call
+
+        def run():
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                self._forget(key, call)
+                call.set_exception(e)
+            else:
+                self._forget(key, call)
+                call.set_result(result)
+
+        try:
+            executor.submit(run)
+        except BaseException as e:
+            self._forget(key, call)
+            call.set_exception(e)
+        return call
+
+    def in_flight(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._calls
+
+    def active(self) -> List[Dict[str, Any]]:
+        """Execuções em curso, uma por chave (operação, projeto, parâmetros)."""
+        with self._lock:
+            keys = list(self._calls)
+        return [
+            {"operation": key[0], "project_id": key[1], "params": json.loads(key[2])}
+            if isinstance(key, tuple) and len(key) == 3 else {"operation": str(key), "project_id": None, "params": {}}
+            for key in keys
+        ]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Contadores por operação, para o painel de depuração."""
+        with self._lock:
+            in_flight: Dict[str, int] = {}
+            for key in self._calls:
+                name = self._operation(key)
+                in_flight[name] = in_flight.get(name, 0) + 1
+            operations = {
+                name: {**counters, "in_flight": in_flight.get(name, 0)}
+                for name, counters in sorted(self.stats.items())
+            }
+        return {
+            "operations": operations,
+            "calls": sum(operation["calls"] for operation in operations.values()),
+            "shared": sum(operation["shared"] for operation in operations.values()),
+            "in_flight": sum(in_flight.values()),
+        }
+
+
+def coalesced(operation: str, key_args: Optional[Iterable[str]] = None):
+    """
+    Decora um método do backend para passar por `self.single_flight`. A chave é
+    (operation, project_id, demais argumentos); `key_args` restringe os argumentos que
+    entram na chave (ex.: para ignorar conteúdo gerado pelo LLM que muda a cada chamada).
+    Argumentos chamáveis, como callbacks de progresso, nunca entram na chave.
+    """
+    key_args = tuple(key_args) if key_args is not None else None
+
+    def decorator(method: Callable[..., Any]) -> Callable[..., Any]:
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(list(bound.arguments.items())[1:])
+            project_id = arguments.pop("project_id", None)
+            params = {
+                name: value for name, value in arguments.items()
+                if not callable(value) and (key_args is None or name in key_args)
+            }
+            return self.single_flight.do(flight_key(operation, project_id, params), method, self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,235 @@
+# speculation.py
+import datetime
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Sequence, Tuple
+
+from data_models import Project, SpeculativeDraft, new_id, short_id
+from database_manager import DatabaseManager
+from llm_simulator import LLMSimulator
+
+logger = logging.getLogger(__name__)
+
+
+class ProposalSpeculator:
+    """
+    Pré-computa, com o LLM ocioso, a orquestração pós-aprovação das propostas pendentes:
+    provisionamento e backups pelo AID e código inicial pelo ADE-X. Os artefatos ficam como
+    rascunhos em speculative_drafts, com o id do projeto já reservado; na aprovação são
+    promovidos sem chamar o LLM e na rejeição, edição ou exclusão da proposta são descartados.
+
+    O trabalho especulativo tem prioridade menor que o interativo: só começa depois de
+    `idle_seconds` sem chamadas interativas ao LLM e sem operações em curso (`is_busy`), roda em
+    background_priority, volta a verificar a ociosidade entre uma etapa e outra e não espera
+    pelos semáforos de modelo das orquestrações reais. Orçamentos: rascunhos guardados
+    (max_drafts) e chamadas ao LLM por hora (calls_per_hour).
+    """
+
+    # Etapas da orquestração pós-aprovação, na mesma ordem de _orchestrate_after_approval
+    STEPS = (("provision", "AID"), ("backups", "AID"), ("code", "ADE-X"))
+
+    def __init__(self, db_manager: DatabaseManager, llm_simulator: LLMSimulator, aid_agent, adex_agent,
+                 build_code_brief: Callable[[Project], str], model_slot: Callable[[str], threading.BoundedSemaphore],
+                 is_busy: Callable[[], bool]):
+        self.db_manager = db_manager
+        self.llm_simulator = llm_simulator
+        self.aid_agent = aid_agent
+        self.adex_agent = adex_agent
+        self.build_code_brief = build_code_brief
+        self.model_slot = model_slot
+        self.is_busy = is_busy
+        self.enabled = os.getenv("SFORGE_SPECULATION_ENABLED", "1") != "0"
+        # Segundos entre verificações; 0 desativa a thread
+        self.interval = float(os.getenv("SFORGE_SPECULATION_INTERVAL", "5"))
+        self.idle_seconds = float(os.getenv("SFORGE_SPECULATION_IDLE_SECONDS", "30"))
+        self.max_drafts = int(os.getenv("SFORGE_SPECULATION_MAX_DRAFTS", "10"))
+        self.calls_per_hour = int(os.getenv("SFORGE_SPECULATION_CALLS_PER_HOUR", "30"))
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._calls: Deque[float] = deque() # instantes (monotonic) das chamadas especulativas da última hora
+        self._current: Optional[str] = None
+        self._cancelled = False
+        self.stats: Dict[str, float] = {
+            "drafts": 0, "llm_calls": 0, "llm_ms": 0.0, "hits": 0, "misses": 0,
+            "discarded": 0, "aborted": 0, "failed": 0, "saved_ms": 0.0,
+        }
+
+    def start(self):
+        if not self.enabled or self.interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="sforge-speculation", daemon=True)
+        self._thread.start()
+        logger.info(f"Especulação pós-aprovação ativa (LLM ocioso há {self.idle_seconds:.0f}s, até {self.max_drafts} rascunhos, "
+                    f"{self.calls_per_hour} chamadas/h).")
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Erro na especulação pós-aprovação: {e}")
+
+    def _count(self, counter: str, amount: float = 1):
+        with self._lock:
+            self.stats[counter] += amount
+
+    def is_idle(self) -> bool:
+        idle = self.llm_simulator.interactive_idle_seconds()
+        return idle is not None and idle >= self.idle_seconds and not self.is_busy()
+
+    def _budget_left(self) -> int:
+        cutoff = time.monotonic() - 3600
+        with self._lock:
+            while self._calls and self._calls[0] < cutoff:
+                self._calls.popleft()
+            return self.calls_per_hour - len(self._calls)
+
+    def run_once(self) -> Optional[SpeculativeDraft]:
+        """Uma rodada: pré-computa o rascunho da proposta pendente mais antiga, se o LLM estiver ocioso e houver orçamento."""
+        if not self.is_idle():
+            return None
+        # Propostas aprovadas ou rejeitadas por caminhos que não passam por claim/discard
+        stale = self.db_manager.discard_speculative_drafts()
+        if stale:
+            self._count("discarded", stale)
+        if self.db_manager.count_speculative_drafts() >= self.max_drafts or self._budget_left() < len(self.STEPS):
+            return None
+        if not self.llm_simulator.is_available():
+            return None
+        candidates = self.db_manager.get_speculation_candidates(1)
+        return self.speculate(candidates[0]) if candidates else None
+
+    def speculate(self, proposal_id: str) -> Optional[SpeculativeDraft]:
+        proposal = self.db_manager.get_proposal_by_id(proposal_id)
+        if not proposal or proposal.status != "pending":
+            return None
+        # Mesmo projeto que a aprovação criaria, com o id reservado no rascunho
+        project = Project(
+            id=new_id(),
+            proposal_id=proposal.id,
+            name=proposal.title,
+            client_name=proposal.requirements.get('nome_cliente', 'Cliente Desconhecido'),
+            status="active",
+            progress=0,
+            started_at=datetime.datetime.now()
+        )
+        with self._lock:
+            self._current, self._cancelled = proposal_id, False
+        results: Dict[str, Dict[str, Any]] = {}
+        llm_ms = 0.0
+        try:
+            with self.llm_simulator.background_priority():
+                for step, agent_code in self.STEPS:
+                    if self._stop.is_set() or self._cancelled or not self.is_idle():
+                        logger.debug(f"Especulação da proposta {short_id(proposal_id)}... interrompida antes de '{step}': trabalho interativo tem prioridade.")
+                        self._count("aborted")
+                        return None
+                    outcome = self._run_step(step, agent_code, project)
+                    if outcome is None:
+                        self._count("aborted")
+                        return None
+                    results[step], elapsed_ms = outcome
+                    llm_ms += elapsed_ms
+                    if step != "code" and not results[step]["success"]:
+                        logger.warning(f"Especulação da proposta {short_id(proposal_id)}... falhou em '{step}': {results[step]['message']}")
+                        self._count("failed")
+                        return None
+        finally:
+            with self._lock:
+                self._current = None
+
+        code = results["code"]
+        draft = SpeculativeDraft(
+            proposal_id=proposal_id,
+            project_id=project.id,
+            provision_message=results["provision"]["message"],
+            backup_message=results["backups"]["message"],
+            # Falha do ADE-X: sem código no rascunho, a aprovação gera de novo
+            code=None if code.get("error") or not code.get("filename") else {
+                key: code.get(key) for key in ("filename", "language", "content", "description")
+            },
+            llm_ms=llm_ms,
+            created_at=datetime.datetime.now()
+        )
+        if self._cancelled or not self.db_manager.save_speculative_draft(draft.dict()):
+            # Aprovada, rejeitada ou editada durante a pré-computação
+            self._count("aborted")
+            return None
+        self._count("drafts")
+        logger.info(f"Rascunho pós-aprovação da proposta {short_id(proposal_id)}... pré-computado em {llm_ms:.0f} ms de LLM.")
+        return draft
+
+    def _run_step(self, step: str, agent_code: str, project: Project) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Executa uma etapa; None se o modelo está ocupado com orquestrações reais (a especulação cede a vez)."""
+        slot = self.model_slot(agent_code)
+        if not slot.acquire(blocking=False):
+            return None
+        with self._lock:
+            self._calls.append(time.monotonic())
+        started = time.perf_counter()
+        try:
+            if step == "provision":
+                result = self.aid_agent.provision_environment(project.id, project.name)
+            elif step == "backups":
+                result = self.aid_agent.configure_backups(project.id, project.name)
+            else:
+                result = self.adex_agent.generate_code(project.name, project.client_name, self.build_code_brief(project))
+        finally:
+            slot.release()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self._count("llm_calls")
+        self._count("llm_ms", elapsed_ms)
+        return result, elapsed_ms
+
+    def reserved_project_id(self, proposal_id: str) -> Optional[str]:
+        """Id de projeto reservado pelo rascunho da proposta, para a aprovação criar o projeto com ele."""
+        draft = self.db_manager.get_speculative_draft(proposal_id)
+        return draft.project_id if draft else None
+
+    def claim(self, proposal_id: str, project_id: str) -> Optional[SpeculativeDraft]:
+        """Retira o rascunho da proposta aprovada; só é promovido se foi gerado para este projeto."""
+        draft = self.db_manager.take_speculative_draft(proposal_id)
+        if draft and draft.project_id == project_id:
+            self._count("hits")
+            self._count("saved_ms", draft.llm_ms)
+            return draft
+        if draft:
+            self._count("discarded")
+        self._count("misses")
+        return None
+
+    def discard(self, proposal_ids: Sequence[str]):
+        """Descarta os rascunhos (proposta rejeitada, editada ou excluída) e interrompe a pré-computação em curso delas."""
+        with self._lock:
+            if self._current in proposal_ids:
+                self._cancelled = True
+        removed = self.db_manager.discard_speculative_drafts(proposal_ids)
+        if removed:
+            self._count("discarded", removed)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Contadores, taxa de acerto e orçamento, para o painel de depuração."""
+        budget_left = self._budget_left()
+        with self._lock:
+            stats = dict(self.stats)
+            current = self._current
+        approvals = stats["hits"] + stats["misses"]
+        return {
+            **stats,
+            "hit_rate": stats["hits"] / approvals if approvals else 0.0,
+            "waste_rate": stats["discarded"] / stats["drafts"] if stats["drafts"] else 0.0,
+            "stored_drafts": self.db_manager.count_speculative_drafts(),
+            "max_drafts": self.max_drafts,
+            "calls_last_hour": self.calls_per_hour - budget_left,
+            "calls_per_hour": self.calls_per_hour,
+            "enabled": self.enabled and self.interval > 0,
+            "current": current,
+        }
@@ -0,0 +1,132 @@
+# tests/conftest.py
+import datetime
+import os
+import sys
+
+import pytest
+
+# Os módulos da aplicação ficam na raiz do repositório
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_models import Documentation, GeneratedCode, Project, Proposal, new_id  # noqa: E402
+from database_manager import DatabaseManager  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "synapse_forge.db")
+
+
+@pytest.fixture
+def db(db_path):
+    return DatabaseManager(db_path)
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    """
+    SynapseForgeBackend isolado num diretório temporário (o backend usa synapse_forge.db no
+    diretório atual), sem threads de fundo e com o LLM indisponível.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("SFORGE_MAINTENANCE_INTERVAL", "0")
+    monkeypatch.setenv("SFORGE_SPECULATION_ENABLED", "0")
+    from llm_simulator import LLMSimulator
+    monkeypatch.setattr(LLMSimulator, "is_available", lambda self, timeout=None: False)
+    from MOAI import SynapseForgeBackend
+    SynapseForgeBackend._instance = None
+    instance = SynapseForgeBackend()
+    yield instance
+    for executor in (instance.background_executor, instance.report_executor, instance.orchestration_executor):
+        executor.shutdown(wait=True)
+    SynapseForgeBackend._instance = None
+
+
+def make_proposal(db: DatabaseManager, **overrides) -> Proposal:
+    proposal = Proposal(**{
+        "id": new_id(),
+        "title": "Portal do Cliente",
+        "description": "Portal de autoatendimento",
+        "requirements": {"nome_projeto": "Portal", "nome_cliente": "ACME"},
+        "problem_understanding_moai": "Atendimento manual",
+        "solution_proposal_moai": "Portal web",
+        "scope_moai": "MVP",
+        "technologies_suggested_moai": "Python, FastAPI",
+        "estimated_value_moai": 50000.0,
+        "estimated_time_moai": "3 meses",
+        "terms_conditions_moai": "Padrão",
+        "status": "pending",
+        "submitted_at": datetime.datetime.now(),
+        **overrides,
+    })
+    db.add_proposal(proposal.model_dump())
+    return proposal
+
+
+def make_project(db: DatabaseManager, proposal: Proposal, **overrides) -> Project:
+    project = Project(**{
+        "id": new_id(),
+        "proposal_id": proposal.id,
+        "name": proposal.title,
+        "client_name": "ACME",
+        "status": "active",
+        "progress": 0,
+        "started_at": datetime.datetime.now(),
+        **overrides,
+    })
+    db.add_project(project.model_dump())
+    return project
+
+
+def make_code(db: DatabaseManager, project: Project, **overrides) -> GeneratedCode:
+    code = GeneratedCode(**{
+        "id": new_id(),
+        "project_id": project.id,
+        "filename": "main.py",
+        "language": "python",
+        "content": "def calcular_fatura(cliente):\n    return cliente.saldo * 1.1\n",
+        "description": "Cálculo de faturas",
+        "generated_at": datetime.datetime.now(),
+        **overrides,
+    })
+    db.add_generated_code(code.model_dump())
+    return code
+
+
+def make_documentation(db: DatabaseManager, project: Project, **overrides) -> Documentation:
+    doc = Documentation(**{
+        "id": new_id(),
+        "project_id": project.id,
+        "filename": "README.md",
+        "content": "# Portal\n\nGuia de implantação com Kubernetes.\n",
+        "document_type": "README",
+        "version": "1.0",
+        "last_updated": datetime.datetime.now(),
+        **overrides,
+    })
+    db.add_documentation(doc.model_dump())
+    return doc
+
+
+def age_change_log(db: DatabaseManager, hours: int):
+    """Recua o changed_at de todas as entradas do change_log, para testar a poda."""
+    conn = db._connect()
+    conn.execute("UPDATE change_log SET changed_at = datetime('now', ?)", (f"-{hours} hours",))
+    conn.commit()
+    conn.close()
+
+
+class DatabaseBackend:
+    """Só o que o ViewModelCache usa do SynapseForgeBackend, sobre um DatabaseManager."""
+
+    def __init__(self, db: DatabaseManager):
+        self.db = db
+
+    def get_change_seq(self):
+        return self.db.get_change_seq()
+
+    def changes_since(self, seq):
+        return self.db.changes_since(seq)
+
+    def sync_entity_cache(self):
+        self.db.sync_entity_cache(force=True)
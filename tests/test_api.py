@@ -0,0 +1,73 @@
+# tests/test_api.py
+import datetime
+import time
+
+import pytest
+from starlette.testclient import TestClient
+
+from conftest import make_proposal
+import moai_api
+from moai_api import build_app
+
+
+@pytest.fixture
+def client(backend):
+    with TestClient(build_app(backend)) as test_client:
+        yield test_client
+
+
+@pytest.mark.parametrize("kind", ["quality", "security"])
+def test_project_reports_require_project_id(client, backend, kind):
+    response = client.get(f"/reports/{kind}")
+    assert response.status_code == 400
+    assert "project_id" in response.json()["error"]
+    assert client.post(f"/reports/{kind}", json={}).status_code == 400
+    # Nenhum job foi enfileirado para o projeto None
+    assert not backend.single_flight.in_flight(backend._report_flight_key(kind, None))
+
+
+def test_monitoring_report_has_global_variant(client):
+    response = client.get("/reports/monitoring")
+    assert response.status_code == 200
+    assert {"data", "generated_at", "pending", "error"} <= set(response.json())
+
+
+def test_unknown_report_kind(client):
+    assert client.get("/reports/desconhecido").status_code == 404
+
+
+def test_proposal_listing_pages_with_projection(client, backend):
+    for index in range(3):
+        make_proposal(backend.db_manager, status="draft", title=f"Lote {index}",
+                      submitted_at=datetime.datetime(2025, 3, 1 + index, 9, 0))
+
+    first = client.get("/proposals", params={"status": "draft", "limit": 2, "fields": "title,submitted_at"}).json()
+    assert [item["title"] for item in first["items"]] == ["Lote 2", "Lote 1"]
+    assert set(first["items"][0]) == {"id", "title", "submitted_at"}
+
+    rest = client.get("/proposals", params={"status": "draft", "limit": 2, **first["next"]}).json()
+    assert [item["title"] for item in rest["items"]] == ["Lote 0"]
+    assert client.get("/proposals", params={"fields": "senha"}).status_code == 400
+    assert client.get("/proposals", params={"before": "ontem"}).status_code == 400
+
+
+def test_chat_listing_by_instant(client, backend):
+    backend.add_chat_message("user", "antes")
+    instant = datetime.datetime.now()
+    time.sleep(0.002)
+    backend.add_chat_message("user", "depois")
+
+    messages = client.get("/chat", params={"before": instant.isoformat()}).json()["items"]
+    assert messages[-1]["message"] == "antes"
+    assert "depois" not in [message["message"] for message in messages]
+
+
+@pytest.mark.parametrize("flag, started", [([], False), (["--background-services"], True)])
+def test_background_services_start_only_with_the_flag(backend, monkeypatch, flag, started):
+    calls = []
+    monkeypatch.setattr(backend, "start_background_services", lambda: calls.append("start"))
+    monkeypatch.setattr(moai_api.uvicorn, "run", lambda app, **kwargs: calls.append("run"))
+    monkeypatch.setattr("sys.argv", ["moai_api.py", *flag])
+
+    moai_api.main()
+    assert calls == (["start", "run"] if started else ["run"])
@@ -0,0 +1,118 @@
+# tests/test_archive.py
+import datetime
+import os
+import sqlite3
+
+from conftest import make_code, make_documentation, make_project, make_proposal
+from data_models import new_id
+
+
+def populate_completed_project(db):
+    now = datetime.datetime.now()
+    project = make_project(db, make_proposal(db, status="approved"), status="completed", progress=100,
+                           completed_at=now - datetime.timedelta(days=200))
+    code = make_code(db, project)
+    make_code(db, project, filename="util.py", content=code.content)  # mesmo blob, duas referências
+    make_documentation(db, project)
+    db.add_quality_report({"id": new_id(), "project_id": project.id, "generated_at": now,
+                           "report_data": {"overall_status": "PASS", "failed_tests": 0}})
+    db.add_security_report({"id": new_id(), "project_id": project.id, "generated_at": now,
+                            "report_data": {"overall_security_status": "OK", "risk_level": "Baixo",
+                                            "security_score": 92, "vulnerabilities_found": 1}})
+    db.add_monitoring_summary({"id": new_id(), "project_id": project.id, "generated_at": now,
+                               "summary_data": {"system_health": {"status": "Healthy"}}})
+    db.add_moai_log({"id": new_id(), "timestamp": now, "event_type": "PROJECT_COMPLETED", "details": "Concluído",
+                     "project_id": project.id, "agent_id": "AGP", "status": "SUCCESS"})
+    db.add_test_workspace({"id": new_id(), "project_id": project.id, "project_name": project.name, "code_id": code.id,
+                           "filename": code.filename, "language": code.language, "workspace_path": "/tmp/ws",
+                           "created_at": now})
+    return project, code
+
+
+def project_archive_state(db, project_id):
+    conn = sqlite3.connect(db.db_path)
+    state = conn.execute("SELECT archived_at, archive_path, rehydrated_at FROM projects WHERE id = ?", (project_id,)).fetchone()
+    conn.close()
+    return state
+
+
+def snapshot(db, project_id):
+    """Linhas do projeto em cada tabela arquivável, exatamente como gravadas, com o texto dos blobs."""
+    conn = sqlite3.connect(db.db_path)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    tables = {}
+    for table in db.PROJECT_ARCHIVE_TABLES:
+        columns = ", ".join(f"t.{column}" for column in db._stored_columns(cursor, table))
+        if table in db.BLOB_TABLES:
+            columns += ", b.codec, b.data, b.refcount"
+            join = "LEFT JOIN content_blobs b ON b.hash = t.content_hash"
+        else:
+            join = ""
+        cursor.execute(f"SELECT {columns} FROM {table} t {join} WHERE t.project_id = ? ORDER BY t.id", (project_id,))
+        tables[table] = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+    return tables
+
+
+def test_archive_and_rehydrate_round_trip(db):
+    project, code = populate_completed_project(db)
+    before = snapshot(db, project.id)
+    search_before = {result.entity_id for result in db.search("calcular_fatura")}
+    assert all(before.values())
+
+    archived = db.archive_completed_projects(older_than_days=90)
+
+    assert archived["archived"] == [project.id]
+    assert not any(snapshot(db, project.id).values())
+    assert db.get_project_by_id(project.id).archived_at
+    archived_at, archive_path, _ = project_archive_state(db, project.id)
+    assert archived_at and os.path.exists(archive_path)
+    assert db.get_blob_storage_stats()["blobs"] == 0
+    assert not db.search("calcular_fatura")
+
+    rehydrated = db.rehydrate_project(project.id)
+
+    assert rehydrated["success"] and rehydrated["rows"] == archived["rows"]
+    assert snapshot(db, project.id) == before
+    assert not os.path.exists(archive_path)
+    assert db.get_project_by_id(project.id).archived_at is None
+    archived_at, archive_path, rehydrated_at = project_archive_state(db, project.id)
+    assert (archived_at, archive_path) == (None, None) and rehydrated_at
+    assert {result.entity_id for result in db.search("calcular_fatura")} == search_before
+    [metadata] = [item for item in db.get_generated_code_metadata(project.id) if item.id == code.id]
+    assert (metadata.size, metadata.line_count) == (len(code.content.encode("utf-8")), code.content.count("\n") + 1)
+
+    # Reidratado há pouco: a rotina em lote não o arquiva de novo
+    assert db.archive_completed_projects(older_than_days=90)["archived"] == []
+
+
+def test_scheduler_archives_completed_projects(backend):
+    db = backend.db_manager
+    project, _ = populate_completed_project(db)
+    # A construção do backend não arquiva nada por conta própria
+    assert project_archive_state(db, project.id)[0] is None
+
+    results = {result["task"]: result for result in backend.maintenance.run_due_tasks()}
+
+    assert results["archive_projects"]["success"] and results["archive_projects"]["archived"] == 1
+    assert db.is_project_archived(project.id)
+    assert db.get_moai_logs(limit=1)[0].event_type == "PROJECTS_ARCHIVED"
+    assert "archive_projects" not in backend.maintenance.due_tasks()
+
+
+def test_workspace_and_code_generation_rehydrate_the_project(backend, monkeypatch):
+    db = backend.db_manager
+    monkeypatch.setattr(backend.test_workspace_manager, "_create_virtualenv", lambda path: path / ".venv")
+    project, code = populate_completed_project(db)
+    db.archive_completed_projects(older_than_days=90)
+
+    workspace = backend.prepare_test_workspace(project.id, code.id)
+    assert workspace["success"]
+    assert not db.is_project_archived(project.id)
+
+    db.archive_completed_projects(older_than_days=0)
+    assert db.is_project_archived(project.id)
+    backend.generate_code_for_project(project.id, "novo.py", "python", "Rotina nova")
+    assert not db.is_project_archived(project.id)
+    assert len(db.get_generated_code_metadata(project.id)) >= 2
@@ -0,0 +1,62 @@
+# tests/test_backups.py
+import gzip
+import os
+
+from agent_aid import AgentAID
+from conftest import make_proposal
+
+
+def test_backup_and_restore_round_trip(db):
+    make_proposal(db)
+    aid = AgentAID(llm_simulator=None, db_path=db.db_path)
+    fractions = []
+
+    backup = aid.trigger_manual_backup("global", progress_callback=fractions.append)
+
+    assert backup["success"]
+    manifest = backup["details"]
+    assert fractions and fractions[-1] == 1.0
+    assert manifest["compressed_size"] < manifest["db_size"]
+    assert [entry["filename"] for entry in aid.list_backups()] == [manifest["filename"]]
+    assert not any(entry.endswith(".partial") for entry in os.listdir(aid.backup_dir))
+
+    restore = aid.schedule_test_restore("global")
+    assert restore["success"] and restore["details"]["checksum_ok"] and restore["details"]["integrity"] == "ok"
+    assert aid.list_backups()[0]["restore_test"]["success"]
+
+
+def test_restore_detects_a_changed_backup(db):
+    aid = AgentAID(llm_simulator=None, db_path=db.db_path)
+    manifest = aid.trigger_manual_backup("global")["details"]
+    archive_path = os.path.join(aid.backup_dir, manifest["filename"])
+    with gzip.open(archive_path, "rb") as archive_file:
+        data = archive_file.read()
+    with gzip.open(archive_path, "wb") as archive_file:
+        archive_file.write(data + b"\0" * 16)
+
+    restore = aid.schedule_test_restore("global")
+    assert not restore["success"] and not restore["details"]["checksum_ok"]
+
+
+def test_restore_reports_a_corrupted_backup(db):
+    make_proposal(db)
+    aid = AgentAID(llm_simulator=None, db_path=db.db_path)
+    manifest = aid.trigger_manual_backup("global")["details"]
+    archive_path = os.path.join(aid.backup_dir, manifest["filename"])
+    with gzip.open(archive_path, "rb") as archive_file:
+        data = bytearray(archive_file.read())
+    data[-1] ^= 0xFF
+    with gzip.open(archive_path, "wb") as archive_file:
+        archive_file.write(bytes(data))
+
+    restore = aid.schedule_test_restore("global")
+    assert not restore["success"]
+
+
+def test_retention_keeps_the_most_recent_backups(db):
+    aid = AgentAID(llm_simulator=None, db_path=db.db_path)
+    aid.backup_retention = 2
+    filenames = [aid.trigger_manual_backup("global")["details"]["filename"] for _ in range(3)]
+
+    assert [entry["filename"] for entry in aid.list_backups()] == filenames[:0:-1]
+    assert len(os.listdir(aid.backup_dir)) == 4  # arquivo .db.gz + manifesto de cada backup mantido
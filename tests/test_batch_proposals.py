@@ -0,0 +1,98 @@
+# tests/test_batch_proposals.py
+import json
+
+import pytest
+
+import batch_proposals
+from batch_proposals import normalize_requirements, read_requirements, row_key
+
+VALID = {"nome_projeto": "Portal", "nome_cliente": "ACME", "problema_negocio": "Processo manual"}
+
+
+def write_jsonl(path, lines):
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_read_csv_rows_with_line_numbers(tmp_path):
+    path = tmp_path / "reqs.csv"
+    path.write_text("nome_projeto,nome_cliente,problema_negocio\nPortal,ACME,Manual\nApp,Beta,Lento\n", encoding="utf-8")
+    rows = list(read_requirements(str(path)))
+    assert [line for line, _ in rows] == [2, 3]
+    assert normalize_requirements(rows[1][1])["nome_cliente"] == "Beta"
+
+
+def test_read_jsonl_skips_blank_lines(tmp_path):
+    path = write_jsonl(tmp_path / "reqs.jsonl", [json.dumps(VALID), "", json.dumps(VALID)])
+    assert [line for line, _ in read_requirements(path)] == [1, 3]
+
+
+@pytest.mark.parametrize("raw, message", [
+    ("{nao é json", "JSON inválido"),
+    ('["x"]', "esperado um objeto"),
+    ("42", "esperado um objeto"),
+    (json.dumps({"nome_projeto": "Portal"}), "campos obrigatórios ausentes"),
+])
+def test_normalize_rejects_invalid_rows(raw, message):
+    with pytest.raises(ValueError, match=message):
+        normalize_requirements(raw)
+
+
+def test_normalize_fills_optional_fields():
+    req_data = normalize_requirements({**VALID, "restricoes": None, "extra": "ignorado"})
+    assert set(req_data) == set(batch_proposals.REQ_FIELDS)
+    assert req_data["restricoes"] == "" and "extra" not in req_data
+
+
+def test_row_key_changes_with_content():
+    assert row_key(1, VALID) == row_key(1, dict(VALID))
+    assert row_key(1, VALID) != row_key(1, {**VALID, "nome_cliente": "Outro"})
+    assert row_key(1, VALID) != row_key(2, VALID)
+
+
+def test_run_counts_invalid_lines_and_resumes(tmp_path, backend, monkeypatch):
+    generated = []
+
+    def generate_proposal(req_data):
+        generated.append(req_data["nome_projeto"])
+        return backend.create_proposal(req_data)
+    monkeypatch.setattr(backend, "generate_proposal", generate_proposal)
+
+    path = write_jsonl(tmp_path / "reqs.jsonl", [
+        json.dumps(VALID),
+        "{quebrado",
+        '["x"]',
+        json.dumps({**VALID, "nome_projeto": "App"}),
+        json.dumps({"nome_projeto": "Sem cliente"}),
+    ])
+    progress = str(tmp_path / "reqs.progress.jsonl")
+
+    stats = batch_proposals.run(path, concurrency=2, progress_path=progress)
+    assert (stats["generated"], stats["failed"], stats["invalid"], stats["skipped"]) == (2, 0, 3, 0)
+    assert sorted(generated) == ["App", "Portal"]
+
+    # Retomada: as linhas já geradas são puladas
+    stats = batch_proposals.run(path, concurrency=2, progress_path=progress)
+    assert (stats["generated"], stats["skipped"], stats["invalid"]) == (0, 2, 3)
+    assert len(generated) == 2
+
+
+def test_load_progress_drops_a_truncated_last_line(tmp_path, capsys):
+    path = tmp_path / "progress.jsonl"
+    record = json.dumps({"key": "ab", "status": "ok"}) + "\n"
+    path.write_bytes(record.encode("utf-8") + b'{"key": "cd", "sta')
+
+    assert batch_proposals.load_progress(str(path)) == {"ab": {"key": "ab", "status": "ok"}}
+    assert path.read_text(encoding="utf-8") == record
+    assert "incompleta" in capsys.readouterr().err
+
+
+def test_load_progress_completes_the_last_record_and_rejects_corrupted_middle_lines(tmp_path):
+    path = tmp_path / "progress.jsonl"
+    path.write_text(json.dumps({"key": "ab", "status": "ok"}), encoding="utf-8")
+    assert set(batch_proposals.load_progress(str(path))) == {"ab"}
+    assert path.read_text(encoding="utf-8").endswith("}\n")
+
+    path.write_text('{"key": "ab"\n' + json.dumps({"key": "cd", "status": "ok"}) + "\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        batch_proposals.load_progress(str(path))
@@ -0,0 +1,62 @@
+# tests/test_bulk_approval.py
+import threading
+import time
+
+from conftest import make_proposal
+
+
+class SlowAgents:
+    """AID e ADE-X sem LLM: cada chamada demora um pouco e registra o pico de chamadas simultâneas."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def _call(self):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(0.05)
+        with self.lock:
+            self.running -= 1
+
+    def provision_environment(self, project_id, project_name):
+        self._call()
+        return {"success": True, "message": f"Ambiente de {project_name} provisionado"}
+
+    def configure_backups(self, project_id, project_name):
+        self._call()
+        return {"success": True, "message": f"Backups de {project_name} configurados"}
+
+    def generate_code(self, project_name, client_name, brief):
+        return {"filename": "main.py", "language": "Python", "content": "print('ok')\n", "description": "Inicial"}
+
+
+def wait_for_batch(backend, batch_id):
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        batch = next(batch for batch in backend.get_bulk_approval_progress()["batches"] if batch["batch_id"] == batch_id)
+        if batch["finished_at"]:
+            return batch
+        time.sleep(0.01)
+    raise AssertionError("O lote não terminou.")
+
+
+def test_bulk_approval_respects_the_per_model_limit(backend):
+    db = backend.db_manager
+    backend.aid_agent = backend.adex_agent = agents = SlowAgents()
+    backend.orchestration_model_limit = 2
+    backend.orchestration_model_limits = {}
+    pending = [make_proposal(db, title=f"Lote {index}") for index in range(6)]
+    rejected = make_proposal(db, status="rejected")
+
+    result = backend.bulk_approve_proposals([proposal.id for proposal in pending] + [rejected.id, pending[0].id])
+    assert (result["approved"], result["skipped"]) == (6, 1)
+
+    batch = wait_for_batch(backend, result["batch_id"])
+    assert (batch["completed"], batch["failed"]) == (6, 0)
+    # 4 workers no executor, mas no máximo 2 chamadas simultâneas ao modelo do AID
+    assert agents.peak == 2
+    assert {db.get_proposal_by_id(proposal.id).status for proposal in pending} == {"approved"}
+    assert all(db.has_generated_code(project_id) for project_id in result["project_ids"])
@@ -0,0 +1,44 @@
+# tests/test_change_log.py
+from conftest import age_change_log, make_project, make_proposal
+
+
+def test_feed_lists_writes_in_order(db):
+    seq = db.get_change_seq()
+    proposal = make_proposal(db)
+    project = make_project(db, proposal)
+    db.update_proposal_status(proposal.id, "approved")
+
+    feed = db.changes_since(seq)
+    assert not feed["reset"] and feed["seq"] == db.get_change_seq()
+    assert [(change.table_name, change.row_id, change.operation) for change in feed["changes"]] == [
+        ("proposals", proposal.id, "INSERT"),
+        ("projects", project.id, "INSERT"),
+        ("proposals", proposal.id, "UPDATE"),
+    ]
+    assert db.changes_since(feed["seq"]) == {"seq": feed["seq"], "changes": [], "reset": False}
+
+
+def test_unknown_or_overflowing_cursor_asks_for_reset(db):
+    seq = db.get_change_seq()
+    for _ in range(3):
+        make_proposal(db)
+
+    assert db.changes_since(None)["reset"]
+    assert db.changes_since(db.get_change_seq() + 10)["reset"]
+    assert db.changes_since(seq, limit=2)["reset"]
+    assert len(db.changes_since(seq, limit=3)["changes"]) == 3
+
+
+def test_pruning_removes_old_entries_and_resets_stale_cursors(db):
+    seq = db.get_change_seq()
+    make_proposal(db)
+    make_proposal(db)
+
+    assert db.prune_change_log() == 0
+    age_change_log(db, 48)
+    assert db.prune_change_log(batch_size=1) == 2
+    assert db.changes_since(seq)["reset"]
+    # A sequência continua crescendo depois da poda
+    current = db.get_change_seq()
+    make_proposal(db)
+    assert len(db.changes_since(current)["changes"]) == 1
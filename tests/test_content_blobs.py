@@ -0,0 +1,39 @@
+# tests/test_content_blobs.py
+import sqlite3
+
+from conftest import make_code, make_documentation, make_project, make_proposal
+
+
+def blob_rows(db):
+    conn = sqlite3.connect(db.db_path)
+    rows = conn.execute("SELECT hash, codec, refcount FROM content_blobs ORDER BY refcount").fetchall()
+    conn.close()
+    return rows
+
+
+def test_identical_content_is_stored_once_and_compressed(db):
+    project = make_project(db, make_proposal(db))
+    content = "def calcular():\n    return 42\n" * 200
+    first = make_code(db, project, content=content)
+    make_code(db, project, filename="copia.py", content=content)
+    make_documentation(db, project, content=content)
+
+    [(_, codec, refcount)] = blob_rows(db)
+    assert refcount == 3 and codec == "zlib"
+    assert db.get_generated_code_by_id(first.id).content == content
+    stats = db.get_blob_storage_stats()
+    assert stats["blobs"] == 1 and stats["references_count"] == 3
+    assert stats["dedup_ratio"] == 3.0 and stats["compression_ratio"] > 1
+
+
+def test_blob_is_removed_with_its_last_reference(db):
+    project = make_project(db, make_proposal(db))
+    make_code(db, project, content="x = 1\n")
+    make_documentation(db, project, content="x = 1\n")
+    make_documentation(db, make_project(db, make_proposal(db)), content="# Outro\n")
+
+    db.delete_generated_code_by_project(project.id)
+    assert [refcount for _, _, refcount in blob_rows(db)] == [1, 1]
+    db.delete_documentation_by_project(project.id)
+    assert len(blob_rows(db)) == 1
+    assert db.get_blob_storage_stats()["references_count"] == 1
@@ -0,0 +1,27 @@
+# tests/test_content_metadata.py
+from conftest import make_code, make_documentation, make_project, make_proposal
+
+
+def test_code_metadata_carries_size_and_line_count(db):
+    project = make_project(db, make_proposal(db))
+    code = make_code(db, project)
+    make_code(db, project, filename="vazio.py", content="")
+
+    listing = {info.filename: info for info in db.get_generated_code_metadata(project.id)}
+    assert set(listing) == {"main.py", "vazio.py"}
+    assert listing["main.py"].size == len(code.content.encode("utf-8"))
+    assert listing["main.py"].line_count == len(code.content.split("\n"))
+    assert listing["vazio.py"].size == 0
+    assert not hasattr(listing["main.py"], "content")
+    assert db.get_generated_code_content(code.id) == code.content
+
+
+def test_documentation_metadata_loads_content_on_demand(db):
+    project = make_project(db, make_proposal(db))
+    doc = make_documentation(db, project)
+
+    [info] = db.get_documentation_metadata(project.id)
+    assert (info.id, info.document_type, info.version) == (doc.id, "README", "1.0")
+    assert info.size == len(doc.content.encode("utf-8"))
+    assert db.get_documentation_content(doc.id) == doc.content
+    assert db.get_documentation_content("inexistente") is None
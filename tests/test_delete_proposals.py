@@ -0,0 +1,71 @@
+# tests/test_delete_proposals.py
+import datetime
+import sqlite3
+
+from conftest import make_code, make_documentation, make_project, make_proposal
+from data_models import new_id
+
+GRAPH_TABLES = ("proposals", "projects", "generated_code", "documentation", "quality_reports",
+                "security_reports", "monitoring_summaries", "moai_logs", "test_workspaces")
+
+
+def populate(db):
+    now = datetime.datetime.now()
+    proposal = make_proposal(db, status="approved")
+    project = make_project(db, proposal)
+    code = make_code(db, project)
+    make_documentation(db, project)
+    db.add_quality_report({"id": new_id(), "project_id": project.id, "generated_at": now,
+                           "report_data": {"overall_status": "PASS"}})
+    db.add_security_report({"id": new_id(), "project_id": project.id, "generated_at": now,
+                            "report_data": {"overall_security_status": "OK"}})
+    db.add_monitoring_summary({"id": new_id(), "project_id": project.id, "generated_at": now,
+                               "summary_data": {"system_health": {"status": "Healthy"}}})
+    for owner_id in (project.id, proposal.id):  # logs de proposta usam o id da proposta como project_id
+        db.add_moai_log({"id": new_id(), "timestamp": now, "event_type": "TASK", "details": "Log",
+                         "project_id": owner_id, "agent_id": "MOAI", "status": "INFO"})
+    db.add_test_workspace({"id": new_id(), "project_id": project.id, "project_name": project.name, "code_id": code.id,
+                           "filename": code.filename, "language": code.language, "workspace_path": f"/tmp/ws-{project.id}",
+                           "created_at": now})
+    return proposal, project
+
+
+def row_counts(db):
+    conn = sqlite3.connect(db.db_path)
+    counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in GRAPH_TABLES}
+    conn.close()
+    return counts
+
+
+def test_deletes_the_whole_graph_and_keeps_other_proposals(db):
+    kept_proposal, kept_project = populate(db)
+    before = row_counts(db)
+    proposal, project = populate(db)
+
+    result = db.delete_project_graph([proposal.id, proposal.id])
+    assert result["success"]
+    assert result["project_ids"] == [project.id]
+    assert result["workspace_paths"] == [f"/tmp/ws-{project.id}"]
+    assert row_counts(db) == before
+    assert db.get_proposal_by_id(proposal.id) is None
+    assert db.get_project_by_id(project.id) is None
+    assert db.get_project_by_id(kept_project.id) is not None
+
+
+def test_failure_rolls_back_every_table(db):
+    proposal, project = populate(db)
+    before = row_counts(db)
+    conn = sqlite3.connect(db.db_path)
+    conn.execute("CREATE TRIGGER block_project_delete BEFORE DELETE ON projects "
+                 "BEGIN SELECT RAISE(ABORT, 'exclusão bloqueada'); END")
+    conn.commit()
+    conn.close()
+
+    assert not db.delete_project_graph([proposal.id])["success"]
+    assert row_counts(db) == before
+    assert db.get_proposal_by_id(proposal.id) is not None
+
+
+def test_empty_selection_is_a_no_op(db):
+    result = db.delete_project_graph([])
+    assert result["success"] and result["project_ids"] == [] and result["workspace_paths"] == []
@@ -0,0 +1,94 @@
+# tests/test_entity_cache.py
+from conftest import DatabaseBackend, age_change_log, make_project, make_proposal
+from database_manager import DatabaseManager, EntityCache
+from view_cache import ViewModelCache
+
+
+def test_same_instance_writes_invalidate_immediately(db):
+    proposal = make_proposal(db)
+    assert db.get_proposal_by_id(proposal.id).status == "pending"
+    db.update_proposal_status(proposal.id, "rejected")
+    assert db.get_proposal_by_id(proposal.id).status == "rejected"
+
+
+def test_lru_evicts_least_recently_used_and_skips_missing():
+    cache = EntityCache(maxsize=2)
+    loads = []
+
+    def load(entity_id):
+        return cache.get_or_load("proposal", entity_id, lambda: loads.append(entity_id) or entity_id.upper())
+
+    assert load("a") == "A" and load("b") == "B"
+    load("a")  # "a" passa a ser o mais recente
+    load("c")  # expulsa "b"
+    load("b")
+    assert loads == ["a", "b", "c", "b"]
+    assert cache.get_or_load("proposal", "x", lambda: None) is None
+    assert cache.stats()["size"] == 2 and cache.stats()["hits"] == 1
+
+
+def test_invalidation_during_load_is_not_cached():
+    cache = EntityCache()
+    stale = cache.get_or_load("project", "p", lambda: cache.invalidate("project", "p") or "antigo")
+    assert stale == "antigo"
+    assert cache.get_or_load("project", "p", lambda: "novo") == "novo"
+
+
+def test_other_instance_writes_are_seen_after_sync_interval(db_path):
+    reader, writer = DatabaseManager(db_path), DatabaseManager(db_path)
+    reader.entity_cache_sync_interval = 0
+    proposal = make_proposal(writer)
+    project = make_project(writer, proposal)
+    assert reader.get_proposal_by_id(proposal.id).status == "pending"
+    assert reader.get_project_by_id(project.id).progress == 0
+
+    writer.update_proposal_status(proposal.id, "rejected")
+    writer.update_project_progress(project.id, 40)
+    assert reader.get_proposal_by_id(proposal.id).status == "rejected"
+    assert reader.get_project_by_id(project.id).progress == 40
+
+
+def test_sync_is_throttled_and_keeps_unchanged_entries(db_path):
+    reader, writer = DatabaseManager(db_path), DatabaseManager(db_path)
+    reader.entity_cache_sync_interval = 3600
+    first, second = make_proposal(writer), make_proposal(writer)
+    reader.sync_entity_cache(force=True)
+    reader.get_proposal_by_id(first.id)
+    reader.get_proposal_by_id(second.id)
+
+    writer.update_proposal_status(first.id, "approved")
+    # Dentro do intervalo a leitura pode estar defasada; a sincronização forçada corrige
+    reader.sync_entity_cache(force=True)
+    hits = reader.entity_cache_stats()["hits"]
+    assert reader.get_proposal_by_id(first.id).status == "approved"
+    assert reader.get_proposal_by_id(second.id).status == "pending"
+    assert reader.entity_cache_stats()["hits"] == hits + 1
+
+
+def test_view_cache_reload_sees_other_instance_writes(db_path):
+    reader, writer = DatabaseManager(db_path), DatabaseManager(db_path)
+    reader.entity_cache_sync_interval = 3600
+    proposal = make_proposal(writer)
+    view_cache = ViewModelCache(DatabaseBackend(reader), seq_check_interval=0)
+    view_cache.sync()
+
+    def load_status():
+        return view_cache.get(("status", proposal.id), [("proposals", proposal.id)],
+                              lambda: reader.get_proposal_by_id(proposal.id).status)
+
+    assert load_status() == "pending"
+    writer.update_proposal_status(proposal.id, "rejected")
+    view_cache.sync()
+    assert load_status() == "rejected"
+
+
+def test_pruned_change_log_clears_cache(db_path):
+    reader, writer = DatabaseManager(db_path), DatabaseManager(db_path)
+    proposal = make_proposal(writer)
+    reader.get_proposal_by_id(proposal.id)
+    writer.update_proposal_status(proposal.id, "rejected")
+    age_change_log(writer, 48)
+    assert writer.prune_change_log() > 0
+    reader.sync_entity_cache(force=True)
+    assert reader.entity_cache_stats()["size"] == 0
+    assert reader.get_proposal_by_id(proposal.id).status == "rejected"
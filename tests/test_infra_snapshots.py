@@ -0,0 +1,75 @@
+# tests/test_infra_snapshots.py
+import datetime
+import threading
+import time
+
+from conftest import make_project, make_proposal
+
+
+class FakeAID:
+    """AID sem LLM: conta as chamadas e segura a resposta até `release` ser sinalizado."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+
+    def get_infrastructure_status(self, project_id):
+        self.calls += 1
+        self.release.wait(5)
+        return {"overall_status": "Operational", "resources": {}, "alerts": []}
+
+    def configure_backups(self, project_id, project_name):
+        return {"success": True, "message": f"Backups diários de {project_name}"}
+
+
+def wait_for_refresh(backend, project_id):
+    """Espera o log gravado ao fim da atualização em segundo plano."""
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        if any(log.event_type == "INFRA_SNAPSHOT_REFRESHED" for log in backend.db_manager.get_moai_logs(project_id=project_id)):
+            return
+        time.sleep(0.01)
+    raise AssertionError("A atualização do snapshot não terminou.")
+
+
+def test_missing_snapshot_triggers_one_background_refresh(backend):
+    project = make_project(backend.db_manager, make_proposal(backend.db_manager))
+    backend.aid_agent = aid = FakeAID()
+
+    first = backend.get_infra_snapshot(project.id)
+    second = backend.get_infra_snapshot(project.id)
+    assert first["infra_status"] is None and second["refreshing"]
+
+    aid.release.set()
+    wait_for_refresh(backend, project.id)
+    served = backend.get_infra_snapshot(project.id)
+    assert aid.calls == 1
+    assert served["infra_status"].data["overall_status"] == "Operational"
+    assert served["backup_status"].data["success"]
+
+
+def test_stale_snapshot_is_served_while_it_refreshes(backend):
+    project = make_project(backend.db_manager, make_proposal(backend.db_manager))
+    backend.aid_agent = aid = FakeAID()
+    backend.db_manager.save_infra_snapshot(project.id, "infra_status", {"overall_status": "Degraded"})
+    backend.db_manager.save_infra_snapshot(project.id, "backup_status", {"success": True})
+    backend.infra_snapshot_max_age = datetime.timedelta(0)
+
+    stale = backend.get_infra_snapshot(project.id)
+    assert stale["infra_status"].data == {"overall_status": "Degraded"} and stale["refreshing"]
+
+    aid.release.set()
+    wait_for_refresh(backend, project.id)
+    assert aid.calls == 1
+    assert backend.db_manager.get_infra_snapshots(project.id)["infra_status"].data["overall_status"] == "Operational"
+
+
+def test_snapshots_are_removed_with_the_project(db):
+    proposal = make_proposal(db, status="approved")
+    project = make_project(db, proposal)
+    db.save_infra_snapshot(project.id, "infra_status", {"overall_status": "Operational"})
+    db.save_infra_snapshot(None, "infrastructure_health", {"overall_status": "Operacional"})
+
+    db.delete_project_graph([proposal.id])
+    assert db.get_infra_snapshots(project.id) == {}
+    assert set(db.get_infra_snapshots(None)) == {"infrastructure_health"}
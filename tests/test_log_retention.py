@@ -0,0 +1,48 @@
+# tests/test_log_retention.py
+import datetime
+import gzip
+import json
+
+from conftest import make_project, make_proposal
+from data_models import id_for_timestamp
+
+
+def add_log(db, moment, event_type="TASK", project_id=None):
+    log_id = id_for_timestamp(moment)
+    db.add_moai_log({"id": log_id, "timestamp": moment, "event_type": event_type, "details": event_type,
+                     "project_id": project_id, "agent_id": "MOAI", "status": "INFO"})
+    return log_id
+
+
+def test_old_logs_are_archived_rolled_up_and_removed(db):
+    # Início de hora: os cinco primeiros logs caem no mesmo balde do rollup
+    old = (datetime.datetime.now() - datetime.timedelta(days=60)).replace(minute=0, second=0, microsecond=0)
+    for minutes in range(5):
+        add_log(db, old + datetime.timedelta(minutes=minutes, seconds=1), event_type="PROJECT_STARTED")
+    add_log(db, old + datetime.timedelta(hours=2), event_type="TASK")
+    recent_id = add_log(db, datetime.datetime.now(), event_type="TASK")
+    counts_before = db.count_moai_log_events()
+
+    result = db.apply_log_retention(batch_size=2)
+
+    assert result["success"] and result["archived"] == 6 and result["batches"] == 3
+    assert [log.id for log in db.get_moai_logs()] == [recent_id]
+    assert db.count_moai_log_events() == counts_before
+    assert [(rollup.event_type, rollup.count) for rollup in db.get_log_rollups()] == [("PROJECT_STARTED", 5), ("TASK", 1)]
+    with gzip.open(result["segment"], "rt", encoding="utf-8") as segment:
+        archived = [json.loads(line) for line in segment]
+    assert len(archived) == 6 and {row["event_type"] for row in archived} == {"PROJECT_STARTED", "TASK"}
+
+    assert db.apply_log_retention()["archived"] == 0
+
+
+def test_rollups_survive_project_deletion(db):
+    proposal = make_proposal(db, status="approved")
+    project = make_project(db, proposal)
+    add_log(db, datetime.datetime.now() - datetime.timedelta(days=60), project_id=project.id)
+    db.apply_log_retention()
+
+    assert db.delete_project_graph([proposal.id])["success"]
+    [rollup] = db.get_log_rollups(project_id=project.id)
+    assert rollup.count == 1
+    assert db.count_moai_log_events()["TASK"] == 1
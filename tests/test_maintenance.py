@@ -0,0 +1,105 @@
+# tests/test_maintenance.py
+import datetime
+import os
+import sqlite3
+
+from conftest import age_change_log, make_code, make_project, make_proposal
+from database_manager import DatabaseManager
+from db_maintenance import DatabaseMaintenance
+
+
+def _change_log_size(db) -> int:
+    conn = db._read_connect()
+    count = conn.execute("SELECT COUNT(*) FROM change_log").fetchone()[0]
+    conn.close()
+    return count
+
+
+def test_prune_change_log_is_a_scheduled_task(db):
+    make_proposal(db)
+    age_change_log(db, 48)
+    maintenance = DatabaseMaintenance(db, interval=0)
+
+    assert "prune_change_log" in maintenance.due_tasks()
+    results = {result["task"]: result for result in maintenance.run_due_tasks(housekeeping_only=True)}
+
+    assert set(results) == set(maintenance.HOUSEKEEPING_TASKS)
+    assert results["prune_change_log"]["removed"] > 0
+    assert _change_log_size(db) == 0
+    assert "prune_change_log" in db.get_maintenance_runs()
+    assert "prune_change_log" not in maintenance.due_tasks()
+    later = datetime.datetime.now() + maintenance.SCHEDULE["prune_change_log"]
+    assert "prune_change_log" in maintenance.due_tasks(later)
+
+
+def test_prune_change_log_runs_while_database_is_busy(db):
+    maintenance = DatabaseMaintenance(db, interval=0)
+    maintenance._is_idle()
+    make_proposal(db)
+    age_change_log(db, 48)
+
+    # O banco mudou desde a última verificação: só as tarefas de limpeza rodam
+    assert not maintenance._is_idle()
+    results = maintenance.run_due_tasks(housekeeping_only=True)
+
+    assert {result["task"] for result in results} == set(maintenance.HOUSEKEEPING_TASKS)
+    assert _change_log_size(db) == 0
+    assert "analyze" not in db.get_maintenance_runs()
+
+
+def test_log_retention_runs_from_the_scheduler(backend):
+    # A inicialização não roda mais a retenção por conta própria
+    assert "log_retention" not in backend.db_manager.get_maintenance_runs()
+    logs_before = backend.db_manager.get_moai_logs(limit=1000)
+    assert logs_before
+    backend.db_manager.log_retention_days = 0
+
+    results = backend.maintenance.run_due_tasks(housekeeping_only=True)
+
+    retention = next(result for result in results if result["task"] == "log_retention")
+    assert retention["success"] and retention["archived"] >= len(logs_before)
+    assert backend.db_manager.get_log_rollups()
+    assert [log.event_type for log in backend.db_manager.get_moai_logs(limit=1000)] == ["LOG_RETENTION"]
+    assert backend.db_manager.get_maintenance_runs()["log_retention"].success
+
+
+def test_full_vacuum_is_never_scheduled(db_path):
+    # Banco criado antes do auto_vacuum incremental
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE legado (id INTEGER PRIMARY KEY)")
+    conn.commit()
+    conn.close()
+    db = DatabaseManager(db_path)
+    maintenance = DatabaseMaintenance(db, interval=0)
+    assert db.get_database_health()["auto_vacuum"] == "NONE"
+
+    assert not {"vacuum", "incremental_vacuum"} & set(maintenance.due_tasks())
+    maintenance.run_due_tasks(force=True)
+    assert db.get_database_health()["auto_vacuum"] == "NONE"
+    assert "vacuum" not in db.get_maintenance_runs()
+
+    # A conversão é uma ação explícita
+    assert db.run_maintenance("vacuum")["success"]
+    assert db.get_database_health()["auto_vacuum"] == "INCREMENTAL"
+
+
+def test_incremental_vacuum_is_due_only_with_free_pages(db):
+    maintenance = DatabaseMaintenance(db, interval=0)
+    assert "incremental_vacuum" not in maintenance.due_tasks()
+    project = make_project(db, make_proposal(db))
+    for index in range(40):
+        make_code(db, project, filename=f"mod{index}.py", content=os.urandom(4096).hex())
+    db.delete_generated_code_by_project(project.id)
+    assert db.get_database_health()["freelist_count"] > 0
+
+    assert "incremental_vacuum" in maintenance.due_tasks()
+    [result] = [result for result in maintenance.run_due_tasks() if result["task"] == "incremental_vacuum"]
+    assert result["success"] and result["pages_freed"] > 0
+
+
+def test_backend_converts_the_database_on_request(backend):
+    result = backend.convert_database_to_incremental_vacuum()
+
+    assert result["success"]
+    assert backend.get_database_health()["maintenance_runs"]["vacuum"].success
+    assert backend.db_manager.get_moai_logs(limit=1)[0].event_type == "DB_MAINTENANCE"
@@ -0,0 +1,144 @@
+# tests/test_migrations.py
+import datetime
+import json
+import sqlite3
+import uuid
+
+from data_models import id_floor, id_for_timestamp, new_id
+from database_manager import DatabaseManager
+
+# Esquema do banco antes das migrações (IDs UUID4 e conteúdo TEXT inline)
+BASELINE_SCHEMA = """
+    CREATE TABLE proposals (
+        id TEXT PRIMARY KEY, title TEXT NOT NULL, description TEXT, requirements TEXT,
+        problem_understanding_moai TEXT, solution_proposal_moai TEXT, scope_moai TEXT,
+        technologies_suggested_moai TEXT, estimated_value_moai REAL, estimated_time_moai TEXT,
+        terms_conditions_moai TEXT, status TEXT NOT NULL, submitted_at TIMESTAMP, approved_at TIMESTAMP
+    );
+    CREATE TABLE projects (
+        id TEXT PRIMARY KEY, proposal_id TEXT, name TEXT NOT NULL, client_name TEXT, status TEXT NOT NULL,
+        progress INTEGER, started_at TIMESTAMP, completed_at TIMESTAMP,
+        FOREIGN KEY (proposal_id) REFERENCES proposals (id)
+    );
+    CREATE TABLE generated_code (
+        id TEXT PRIMARY KEY, project_id TEXT, filename TEXT NOT NULL, language TEXT, content TEXT,
+        description TEXT, generated_at TIMESTAMP, FOREIGN KEY (project_id) REFERENCES projects (id)
+    );
+    CREATE TABLE quality_reports (
+        id TEXT PRIMARY KEY, project_id TEXT, report_data TEXT, generated_at TIMESTAMP,
+        FOREIGN KEY (project_id) REFERENCES projects (id)
+    );
+    CREATE TABLE security_reports (
+        id TEXT PRIMARY KEY, project_id TEXT, report_data TEXT, generated_at TIMESTAMP,
+        FOREIGN KEY (project_id) REFERENCES projects (id)
+    );
+    CREATE TABLE documentation (
+        id TEXT PRIMARY KEY, project_id TEXT, filename TEXT NOT NULL, content TEXT, document_type TEXT,
+        version TEXT, last_updated TIMESTAMP, FOREIGN KEY (project_id) REFERENCES projects (id)
+    );
+    CREATE TABLE monitoring_summaries (
+        id TEXT PRIMARY KEY, project_id TEXT, summary_data TEXT, generated_at TIMESTAMP,
+        FOREIGN KEY (project_id) REFERENCES projects (id)
+    );
+    CREATE TABLE chat_history (id TEXT PRIMARY KEY, sender TEXT NOT NULL, message TEXT NOT NULL, timestamp TIMESTAMP);
+    CREATE TABLE moai_logs (
+        id TEXT PRIMARY KEY, timestamp TIMESTAMP, event_type TEXT, details TEXT, project_id TEXT,
+        agent_id TEXT, status TEXT
+    );
+    CREATE TABLE test_workspaces (
+        id TEXT PRIMARY KEY, project_id TEXT NOT NULL, project_name TEXT, code_id TEXT, filename TEXT,
+        language TEXT, description TEXT, workspace_path TEXT NOT NULL, created_at TIMESTAMP, last_used_at TIMESTAMP,
+        FOREIGN KEY (project_id) REFERENCES projects (id), FOREIGN KEY (code_id) REFERENCES generated_code (id)
+    );
+"""
+
+SUBMITTED_AT = "2024-03-01 09:30:00"
+CODE_CONTENT = "def conciliar_pagamentos(lote):\n    return sorted(lote)\n" * 20
+
+
+def create_baseline_db(path: str) -> dict:
+    ids = {name: str(uuid.uuid4()) for name in ("proposal", "project", "code", "doc", "log", "workspace")}
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    conn.execute(
+        "INSERT INTO proposals (id, title, description, requirements, status, submitted_at, approved_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (ids["proposal"], "Portal Financeiro", "Conciliação bancária", json.dumps({"nome_cliente": "ACME"}),
+         "approved", SUBMITTED_AT, "2024-03-02 10:00:00"))
+    conn.execute(
+        "INSERT INTO projects (id, proposal_id, name, client_name, status, progress, started_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (ids["project"], ids["proposal"], "Portal Financeiro", "ACME", "active", 40, "2024-03-02 10:00:00"))
+    conn.execute(
+        "INSERT INTO generated_code (id, project_id, filename, language, content, description, generated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (ids["code"], ids["project"], "conciliacao.py", "python", CODE_CONTENT, "Conciliação", "2024-03-03 11:00:00"))
+    conn.execute(
+        "INSERT INTO documentation (id, project_id, filename, content, document_type, version, last_updated) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (ids["doc"], ids["project"], "README.md", "Manual de operação do portal", "README", "1.0", "2024-03-04 12:00:00"))
+    conn.execute(
+        "INSERT INTO moai_logs (id, timestamp, event_type, details, project_id, status) VALUES (?, ?, ?, ?, ?, ?)",
+        (ids["log"], "2024-03-02 10:00:01", "PROJECT_STARTED", "Projeto iniciado", ids["project"], "INFO"))
+    conn.execute(
+        "INSERT INTO test_workspaces (id, project_id, project_name, code_id, filename, language, workspace_path, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (ids["workspace"], ids["project"], "Portal Financeiro", ids["code"], "conciliacao.py", "python", "/tmp/ws", "2024-03-05 13:00:00"))
+    conn.commit()
+    conn.close()
+    return ids
+
+
+def test_baseline_database_is_migrated(db_path):
+    old_ids = create_baseline_db(db_path)
+
+    db = DatabaseManager(db_path)
+
+    [proposal] = db.get_all_proposals()
+    [project] = db.get_all_projects()
+    [code] = db.get_generated_code_for_project(project.id)
+    [doc] = db.get_documentation_by_project(project.id)
+    [workspace] = db.get_test_workspaces(project.id)
+    [log] = db.get_moai_logs(project_id=project.id)
+
+    # IDs UUIDv7 derivados da data de criação, com as referências reescritas
+    new_ids = [proposal.id, project.id, code.id, doc.id, workspace.id, log.id]
+    assert all(uuid.UUID(entity_id).version == 7 for entity_id in new_ids)
+    assert not set(new_ids) & set(old_ids.values())
+    assert id_floor(proposal.submitted_at) <= proposal.id < id_floor(project.started_at)
+    assert project.proposal_id == proposal.id
+    assert (code.project_id, doc.project_id, log.project_id) == (project.id, project.id, project.id)
+    assert (workspace.project_id, workspace.code_id) == (project.id, code.id)
+
+    # Conteúdo movido para content_blobs sem perdas
+    assert code.content == CODE_CONTENT
+    assert doc.content == "Manual de operação do portal"
+    conn = sqlite3.connect(db_path)
+    inline = conn.execute(
+        "SELECT COUNT(*) FROM generated_code WHERE content IS NOT NULL OR content_hash IS NULL").fetchone()[0]
+    user_version = conn.execute("PRAGMA user_version").fetchone()[0]
+    conn.close()
+    assert inline == 0
+    assert user_version == db.ID_SCHEME_VERSION
+    assert db.get_blob_storage_stats()["stored_bytes"] < db.get_blob_storage_stats()["logical_bytes"]
+
+    # Índice de busca preenchido com os novos IDs e o conteúdo descomprimido
+    assert {result.entity_id for result in db.search("conciliar_pagamentos")} == {code.id}
+    assert doc.id in {result.entity_id for result in db.search("operação")}
+    assert proposal.id in {result.entity_id for result in db.search("bancária", entity_types=["proposal"])}
+
+
+def test_migration_is_idempotent(db_path):
+    create_baseline_db(db_path)
+    first = DatabaseManager(db_path)
+    ids = sorted(p.id for p in first.get_all_proposals())
+
+    reopened = DatabaseManager(db_path)
+
+    assert sorted(p.id for p in reopened.get_all_proposals()) == ids
+    assert len(reopened.search("conciliar_pagamentos")) == 1
+
+
+def test_new_ids_grow_with_time_and_bound_time_ranges():
+    ids = [new_id() for _ in range(5000)] # mais de 4096 no mesmo ms esgota o contador
+    assert ids == sorted(ids) and len(set(ids)) == len(ids)
+    assert all(uuid.UUID(entity_id).version == 7 for entity_id in ids)
+
+    moment = datetime.datetime(2025, 3, 1, 9, 0)
+    assert id_floor(moment) <= id_for_timestamp(moment) < id_floor(moment + datetime.timedelta(milliseconds=1))
+    assert id_floor(moment) < ids[0]
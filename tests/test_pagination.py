@@ -0,0 +1,115 @@
+# tests/test_pagination.py
+import datetime
+import time
+
+from conftest import make_project, make_proposal
+from data_models import new_id
+
+
+def add_log(db, event_type="TASK", project_id=None):
+    log_id = new_id()
+    db.add_moai_log({"id": log_id, "timestamp": datetime.datetime.now(), "event_type": event_type,
+                     "details": event_type, "project_id": project_id, "agent_id": "MOAI", "status": "INFO"})
+    time.sleep(0.002)
+    return log_id
+
+
+def add_chat(db, message):
+    message_id = new_id()
+    db.add_chat_message({"id": message_id, "sender": "user", "message": message,
+                         "timestamp": datetime.datetime.now()})
+    time.sleep(0.002)
+    return message_id
+
+
+def test_log_pages_follow_the_cursor_without_gaps(db):
+    ids = [add_log(db) for _ in range(7)]
+    seen = []
+    page = db.get_moai_logs(limit=3)
+    while page:
+        seen.extend(log.id for log in page)
+        last = page[-1]
+        page = db.get_moai_logs(before=last.timestamp, before_id=last.id, limit=3)
+    assert seen == list(reversed(ids))
+    assert [log.id for log in db.latest_logs(2)] == [ids[-1], ids[-2]]
+
+
+def test_log_pages_filter_by_project_and_instant(db):
+    project = make_project(db, make_proposal(db))
+    early = [add_log(db, project_id=project.id) for _ in range(2)]
+    add_log(db)
+    instant = datetime.datetime.now()
+    time.sleep(0.002)
+    add_log(db, project_id=project.id)
+
+    assert [log.id for log in db.get_moai_logs(project_id=project.id, before=instant)] == list(reversed(early))
+    assert len(db.get_moai_logs(before=instant)) == 3
+    assert len(db.get_moai_logs(project_id=project.id)) == 3
+
+
+def test_log_deltas_after_the_last_shown_id(db):
+    project = make_project(db, make_proposal(db))
+    shown = [add_log(db, project_id=project.id) for _ in range(3)]
+    assert db.get_moai_logs(project_id=project.id, after_id=shown[-1]) == []
+
+    newer = [add_log(db, project_id=project.id) for _ in range(2)]
+    other = add_log(db)
+    assert [log.id for log in db.get_moai_logs(project_id=project.id, after_id=shown[-1])] == list(reversed(newer))
+    assert [log.id for log in db.get_moai_logs(after_id=shown[-1], limit=1)] == [other]
+
+
+def test_chat_window_is_chronological(db):
+    ids = [add_chat(db, f"mensagem {i}") for i in range(5)]
+    window = db.get_chat_messages(limit=2)
+    assert [message.id for message in window] == ids[-2:]
+
+    older = db.get_chat_messages(before=window[0].timestamp, before_id=window[0].id, limit=2)
+    assert [message.id for message in older] == ids[1:3]
+
+    instant = datetime.datetime.now()
+    add_chat(db, "depois")
+    assert [message.id for message in db.get_chat_messages(before=instant)] == ids
+
+
+def test_proposal_pages_break_timestamp_ties_by_id(db):
+    submitted_at = datetime.datetime(2025, 3, 1, 9, 0)
+    ids = sorted(make_proposal(db, submitted_at=submitted_at).id for _ in range(5))
+    make_proposal(db, status="approved", submitted_at=submitted_at)
+    seen = []
+    page = db.get_proposals_page(status="pending", limit=2)
+    while page:
+        seen.extend(proposal.id for proposal in page)
+        last = page[-1]
+        page = db.get_proposals_page(status="pending", before=last.submitted_at, before_id=last.id, limit=2)
+    assert seen == list(reversed(ids))
+    assert db.count_proposals("pending") == 5
+
+
+def test_workspace_pages(db):
+    project = make_project(db, make_proposal(db))
+    start = datetime.datetime(2025, 3, 1, 9, 0)
+    ids = []
+    for i in range(4):
+        workspace_id = new_id()
+        db.add_test_workspace({"id": workspace_id, "project_id": project.id, "project_name": project.name,
+                               "code_id": new_id(), "filename": f"mod{i}.py", "language": "python",
+                               "workspace_path": f"/tmp/ws{i}", "created_at": start + datetime.timedelta(minutes=i)})
+        ids.append(workspace_id)
+
+    first = db.get_test_workspaces_page(project_id=project.id, limit=3)
+    assert [workspace.id for workspace in first] == ids[:0:-1]
+    rest = db.get_test_workspaces_page(project_id=project.id, before=first[-1].created_at,
+                                       before_id=first[-1].id, limit=3)
+    assert [workspace.id for workspace in rest] == ids[:1]
+
+
+def test_iterators_stream_every_row_in_order(db):
+    project = make_project(db, make_proposal(db, status="approved"))
+    log_ids = [add_log(db, project_id=project.id) for _ in range(5)]
+    chat_ids = [add_chat(db, f"mensagem {i}") for i in range(5)]
+    proposals = [make_proposal(db, submitted_at=datetime.datetime(2025, 3, i + 1)) for i in range(4)]
+
+    assert [log.id for log in db.iter_moai_logs(project_id=project.id, batch_size=2)] == log_ids
+    assert [message.id for message in db.iter_chat_history(batch_size=2)] == chat_ids
+    streamed = [proposal.id for proposal in db.iter_proposals(status="pending", batch_size=2)]
+    assert streamed == [proposal.id for proposal in reversed(proposals)]
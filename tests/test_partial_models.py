@@ -0,0 +1,24 @@
+# tests/test_partial_models.py
+import pytest
+
+from conftest import make_proposal
+
+
+@pytest.mark.parametrize("trusted_reads", [True, False])
+def test_unselected_fields_raise_even_when_optional(db, trusted_reads):
+    db.trusted_reads = trusted_reads
+    make_proposal(db, estimated_value_moai=1000.0)
+
+    [proposal] = db.get_proposals(fields=["title", "status"])
+
+    assert (proposal.title, proposal.status) == ("Portal do Cliente", "pending")
+    assert proposal.id
+    for field in ("approved_at", "estimated_value_moai", "description"):
+        with pytest.raises(AttributeError):
+            getattr(proposal, field)
+
+
+def test_full_reads_fill_optional_defaults(db):
+    make_proposal(db)
+    [proposal] = db.get_proposals()
+    assert proposal.approved_at is None
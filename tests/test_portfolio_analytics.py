@@ -0,0 +1,46 @@
+# tests/test_portfolio_analytics.py
+import datetime
+
+import pytest
+
+from conftest import make_proposal
+from portfolio_analytics import PortfolioAnalytics
+
+
+def populate(db):
+    march, april = datetime.datetime(2025, 3, 3, 9, 0), datetime.datetime(2025, 4, 7, 9, 0)
+    make_proposal(db, status="approved", estimated_value_moai=100000.0, submitted_at=march,
+                  approved_at=march + datetime.timedelta(days=2))
+    make_proposal(db, status="rejected", estimated_value_moai=20000.0, submitted_at=march)
+    make_proposal(db, status="approved", estimated_value_moai=30000.0, submitted_at=april,
+                  approved_at=april + datetime.timedelta(days=4), requirements={"nome_cliente": "Globex"})
+    make_proposal(db, status="pending", estimated_value_moai=None, submitted_at=april)
+
+
+def test_summary_trend_and_breakdowns(db):
+    populate(db)
+    analytics = PortfolioAnalytics(db)
+
+    summary = analytics.commercial_summary()
+    assert summary["propostas_geradas"] == 4
+    assert (summary["propostas_aprovadas"], summary["propostas_rejeitadas"]) == (2, 1)
+    assert summary["valor_total_gerado"] == 150000.0 and summary["valor_total_aprovado"] == 130000.0
+
+    frames = analytics.frames()
+    # A taxa mensal considera só as propostas decididas: a pendente de abril não conta
+    assert frames["approval_trend"]["approval_rate"].tolist() == [50.0, 100.0]
+    assert frames["time_to_approval_stats"]["mean_days"] == pytest.approx(3.0)
+    clients = frames["client_breakdown"].set_index("client_name")
+    assert clients.loc["ACME", "proposals"] == 3 and clients.loc["ACME", "approved_value"] == 100000.0
+    assert clients.loc["Globex", "approval_rate"] == 100.0
+
+
+def test_frames_are_recomputed_only_when_proposals_change(db):
+    populate(db)
+    analytics = PortfolioAnalytics(db)
+    frames = analytics.frames()
+
+    assert analytics.frames() is frames
+    make_proposal(db, status="approved", estimated_value_moai=5000.0)
+    assert analytics.frames() is not frames
+    assert analytics.commercial_summary()["propostas_aprovadas"] == 3
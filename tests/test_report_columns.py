@@ -0,0 +1,53 @@
+# tests/test_report_columns.py
+import datetime
+import sqlite3
+
+from conftest import make_project, make_proposal
+from data_models import new_id
+
+
+def add_reports(db, project, quality, security, generated_at):
+    db.add_quality_report({"id": new_id(), "project_id": project.id, "generated_at": generated_at,
+                           "report_data": quality})
+    db.add_security_report({"id": new_id(), "project_id": project.id, "generated_at": generated_at,
+                            "report_data": security})
+
+
+def test_portfolio_uses_the_latest_report_of_each_project(db):
+    earlier = datetime.datetime(2025, 3, 1, 9, 0)
+    later = earlier + datetime.timedelta(days=1)
+    portal = make_project(db, make_proposal(db), name="Portal")
+    estoque = make_project(db, make_proposal(db), name="Estoque")
+    add_reports(db, portal, {"overall_status": "Passed", "failed_tests": 0},
+                {"risk_level": "Low", "security_score": 95, "vulnerabilities_found": 0}, earlier)
+    add_reports(db, portal, {"overall_status": "Failed", "failed_tests": 3},
+                {"risk_level": "High", "security_score": 40, "vulnerabilities_found": 5}, later)
+    add_reports(db, estoque, {"overall_status": "Passed", "failed_tests": 0},
+                {"risk_level": "Low", "security_score": 88, "vulnerabilities_found": 1}, later)
+    db.add_monitoring_summary({"id": new_id(), "project_id": portal.id, "generated_at": later,
+                               "summary_data": {"system_health": {"status": "Degraded"}}})
+
+    summary = db.get_report_portfolio_summary()
+    assert summary["quality"] == {"projects": 2, "failed_tests": 3, "by_status": {"Failed": 1, "Passed": 1}}
+    assert summary["security"]["by_risk_level"] == {"High": 1, "Low": 1}
+    assert summary["security"]["min_security_score"] == 40
+    assert summary["security"]["vulnerabilities_found"] == 6
+    assert summary["monitoring"]["by_health_status"] == {"Degraded": 1}
+
+    [failing] = db.find_projects_by_reports(quality_status="Failed")
+    assert (failing.project_id, failing.failed_tests, failing.risk_level) == (portal.id, 3, "High")
+    assert [row.project_name for row in db.find_projects_by_reports(max_security_score=90)] == ["Portal", "Estoque"]
+    assert db.find_projects_by_reports(risk_levels=["Critical"]) == []
+
+
+def test_malformed_report_reads_as_null(db):
+    project = make_project(db, make_proposal(db))
+    add_reports(db, project, {"overall_status": "Passed"}, {"risk_level": "Low"}, datetime.datetime.now())
+    conn = sqlite3.connect(db.db_path)
+    conn.execute("UPDATE quality_reports SET report_data = 'relatório inválido'")
+    conn.commit()
+    conn.close()
+
+    [row] = db.find_projects_by_reports()
+    assert row.quality_status is None and row.risk_level == "Low"
+    assert db.get_report_portfolio_summary()["quality"]["by_status"] == {"N/A": 1}
@@ -0,0 +1,97 @@
+# tests/test_reports.py
+import datetime
+import threading
+import time
+
+from data_models import MonitoringSummary, new_id
+
+
+def wait_report_job(backend, kind, project_id=None):
+    deadline = time.monotonic() + 10
+    while backend.single_flight.in_flight(backend._report_flight_key(kind, project_id)):
+        assert time.monotonic() < deadline, "job de relatório não terminou"
+        time.sleep(0.01)
+
+
+def failing_generator(calls):
+    def generate(project_id):
+        calls.append(project_id)
+        raise RuntimeError("LLM fora do ar")
+    return generate
+
+
+def test_missing_report_is_not_retried_after_failure(backend, monkeypatch):
+    project_id = new_id()
+    calls = []
+    monkeypatch.setattr(backend, "_generate_monitoring_summary", failing_generator(calls))
+    for _ in range(5):
+        state = backend.request_report("monitoring", project_id)
+        wait_report_job(backend, "monitoring", project_id)
+    state = backend.request_report("monitoring", project_id)
+    assert len(calls) == 1
+    assert state["data"] is None and not state["pending"]
+    assert "LLM fora do ar" in state["error"]
+
+
+def test_concurrent_requests_do_not_retry_a_failed_report(backend, monkeypatch):
+    project_id = new_id()
+    calls = []
+
+    def generate(project_id):
+        calls.append(project_id)
+        time.sleep(0.01)
+        raise RuntimeError("LLM fora do ar")
+    monkeypatch.setattr(backend, "_generate_monitoring_summary", generate)
+
+    def poll():
+        for _ in range(30):
+            backend.request_report("monitoring", project_id)
+    threads = [threading.Thread(target=poll) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wait_report_job(backend, "monitoring", project_id)
+
+    assert len(calls) == 1
+    assert "LLM fora do ar" in backend.request_report("monitoring", project_id)["error"]
+
+
+def test_stale_monitoring_summary_is_not_retried_after_failure(backend, monkeypatch):
+    project_id = new_id()
+    old = MonitoringSummary(id=new_id(), project_id=project_id, summary_data={"overall_health": "OK"},
+                            generated_at=datetime.datetime.now() - backend.monitoring_max_age - datetime.timedelta(minutes=1))
+    backend.db_manager.add_monitoring_summary(old.model_dump())
+    calls = []
+    monkeypatch.setattr(backend, "_generate_monitoring_summary", failing_generator(calls))
+
+    for _ in range(5):
+        state = backend.request_report("monitoring", project_id)
+        wait_report_job(backend, "monitoring", project_id)
+    state = backend.request_report("monitoring", project_id)
+    assert len(calls) == 1
+    # O resumo vencido continua sendo servido junto com o erro
+    assert state["data"] == {"overall_health": "OK"}
+    assert state["error"] and not state["pending"]
+
+    backend.request_report("monitoring", project_id, regenerate=True)
+    wait_report_job(backend, "monitoring", project_id)
+    assert len(calls) == 2
+
+
+def test_stale_monitoring_summary_is_regenerated(backend, monkeypatch):
+    project_id = new_id()
+    old = MonitoringSummary(id=new_id(), project_id=project_id, summary_data={"overall_health": "OK"},
+                            generated_at=datetime.datetime.now() - backend.monitoring_max_age - datetime.timedelta(minutes=1))
+    backend.db_manager.add_monitoring_summary(old.model_dump())
+
+    def generate(project_id):
+        fresh = MonitoringSummary(id=new_id(), project_id=project_id, summary_data={"overall_health": "Novo"},
+                                  generated_at=datetime.datetime.now())
+        backend.db_manager.add_monitoring_summary(fresh.model_dump())
+    monkeypatch.setattr(backend, "_generate_monitoring_summary", generate)
+
+    assert backend.request_report("monitoring", project_id)["data"] == {"overall_health": "OK"}
+    wait_report_job(backend, "monitoring", project_id)
+    state = backend.request_report("monitoring", project_id)
+    assert state["data"] == {"overall_health": "Novo"} and state["error"] is None
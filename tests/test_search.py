@@ -0,0 +1,76 @@
+# tests/test_search.py
+import sqlite3
+
+import pytest
+
+from conftest import make_code, make_documentation, make_project, make_proposal
+from database_manager import DatabaseManager
+
+
+def _search_ids(db, text):
+    return {result.entity_id for result in db.search(text)}
+
+
+def test_search_filters_by_type_and_project_and_matches_prefixes(db):
+    project = make_project(db, make_proposal(db, title="Plataforma de Faturação"))
+    other = make_project(db, make_proposal(db, title="Aplicativo de Estoque"))
+    code = make_code(db, project, description="Emissão de faturas")
+    make_code(db, other, description="Emissão de faturas")
+
+    results = db.search("fatura")
+    assert {result.entity_type for result in results} == {"proposal", "code"}
+    assert results[0].entity_type == "proposal"  # título pesa mais que o corpo
+    assert _search_ids(db, "faturacao") == {project.proposal_id}  # sem diacríticos
+    assert {result.entity_id for result in db.search("fatu", entity_types=["code"], project_id=project.id)} == {code.id}
+    assert db.search('  "" ') == []
+    with pytest.raises(ValueError):
+        db.search("fatura", entity_types=["planilha"])
+
+
+def test_compressed_content_is_searchable(db):
+    project = make_project(db, make_proposal(db))
+    code = make_code(db, project)
+    doc = make_documentation(db, project)
+
+    assert code.id in _search_ids(db, "calcular_fatura")
+    assert doc.id in _search_ids(db, "kubernetes")
+    assert "**" in db.search("kubernetes")[0].snippet
+
+
+def test_plain_sqlite_connection_can_write_indexed_tables(db, db_path):
+    project = make_project(db, make_proposal(db))
+    code = make_code(db, project)
+    doc = make_documentation(db, project)
+
+    # Sem as funções registradas pelo DatabaseManager, como no sqlite3 da linha de comando
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE generated_code SET description = 'Rotina de cobrança' WHERE id = ?", (code.id,))
+    conn.execute("UPDATE documentation SET filename = 'GUIA.md'")
+    conn.execute("DELETE FROM documentation WHERE id = ?", (doc.id,))
+    conn.commit()
+    conn.close()
+
+    assert code.id in _search_ids(db, "cobrança")
+    assert code.id in _search_ids(db, "calcular_fatura")
+    assert doc.id not in _search_ids(db, "kubernetes")
+
+
+def test_index_from_blob_triggers_is_rebuilt(db_path):
+    db = DatabaseManager(db_path)
+    proposal = make_proposal(db)
+    code = make_code(db, make_project(db, proposal))
+    # Índice no formato anterior, sem a coluna content
+    conn = sqlite3.connect(db_path)
+    conn.execute("DROP TABLE search_index")
+    conn.execute("""
+        CREATE VIRTUAL TABLE search_index USING fts5(
+            entity_type UNINDEXED, entity_id UNINDEXED, project_id UNINDEXED, title, body
+        )
+    """)
+    conn.commit()
+    conn.close()
+
+    reopened = DatabaseManager(db_path)
+
+    assert code.id in _search_ids(reopened, "calcular_fatura")
+    assert proposal.id in _search_ids(reopened, "autoatendimento")
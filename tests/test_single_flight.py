@@ -0,0 +1,88 @@
+# tests/test_single_flight.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from single_flight import SingleFlight, coalesced, flight_key
+
+
+def run_concurrently(count, target):
+    results = [None] * count
+
+    def worker(index):
+        try:
+            results[index] = target()
+        except Exception as e:
+            results[index] = e
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    executions = []
+
+    def slow():
+        executions.append(1)
+        started.set()
+        release.wait(5)
+        return {"relatorio": "pronto"}
+
+    threads, results = run_concurrently(1, lambda: flights.do(flight_key("report", "p1"), slow))
+    started.wait(5)
+    followers, shared_results = run_concurrently(4, lambda: flights.do(flight_key("report", "p1"), slow))
+    deadline = time.monotonic() + 5
+    while flights.snapshot()["shared"] < 4 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert flights.active() == [{"operation": "report", "project_id": "p1", "params": {}}]
+    release.set()
+    for thread in threads + followers:
+        thread.join()
+
+    assert len(executions) == 1
+    assert results + shared_results == [{"relatorio": "pronto"}] * 5
+    assert flights.snapshot()["operations"]["report"] == {"calls": 5, "executions": 1, "shared": 4, "in_flight": 0}
+    # Nada fica em cache: a próxima chamada executa de novo
+    flights.do(flight_key("report", "p1"), slow)
+    assert len(executions) == 2
+
+
+def test_errors_are_shared_and_not_cached():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def failing():
+        calls.append(1)
+        release.wait(5)
+        raise RuntimeError("LLM fora do ar")
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = flights.submit(("code", None, "{}"), executor, failing)
+        assert flights.submit(("code", None, "{}"), executor, failing) is future
+        release.set()
+        with pytest.raises(RuntimeError):
+            future.result(5)
+    assert len(calls) == 1 and not flights.in_flight(("code", None, "{}"))
+
+
+def test_coalesced_keys_ignore_callbacks_and_unlisted_arguments():
+    class Backend:
+        def __init__(self):
+            self.single_flight = SingleFlight()
+            self.keys = []
+
+        @coalesced("generate_code", key_args=["filename"])
+        def generate(self, project_id, filename, description, progress_callback=None):
+            self.keys.extend(self.single_flight.active())
+            return filename
+
+    backend = Backend()
+    assert backend.generate("p1", "main.py", "texto que muda", progress_callback=print) == "main.py"
+    assert backend.keys == [{"operation": "generate_code", "project_id": "p1", "params": {"filename": "main.py"}}]
+    assert flight_key("x", params={"b": 1, "a": 2}) == flight_key("x", params={"a": 2, "b": 1})
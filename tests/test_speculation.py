@@ -0,0 +1,78 @@
+# tests/test_speculation.py
+import pytest
+
+from conftest import make_proposal
+
+
+@pytest.fixture
+def agent_calls(backend, monkeypatch):
+    """Troca as chamadas ao LLM do AID e do ADE-X por respostas fixas e registra (etapa, em background_priority)."""
+    calls = []
+    backend.speculator.idle_seconds = 0
+    monkeypatch.setattr(backend.llm_simulator, "is_available", lambda timeout=None: True)
+
+    def fake(step, result):
+        def call(*args, **kwargs):
+            calls.append((step, getattr(backend.llm_simulator._priority, "background", False)))
+            return result
+        return call
+    monkeypatch.setattr(backend.aid_agent, "provision_environment", fake("provision", {"success": True, "message": "Ambiente pronto"}))
+    monkeypatch.setattr(backend.aid_agent, "configure_backups", fake("backups", {"success": True, "message": "Backups diários"}))
+    monkeypatch.setattr(backend.adex_agent, "generate_code", fake("code", {
+        "filename": "main.py", "language": "Python", "content": "print('ok')\n", "description": "Inicial"}))
+    return calls
+
+
+def test_background_threads_start_only_on_request(backend):
+    assert backend.maintenance._thread is None and backend.speculator._thread is None
+
+    backend.maintenance.interval = backend.speculator.interval = 3600
+    backend.speculator.enabled = True
+    backend.start_background_services()
+    try:
+        assert backend.maintenance._thread.is_alive() and backend.speculator._thread.is_alive()
+    finally:
+        backend.maintenance.stop()
+        backend.speculator.stop()
+        backend.maintenance._thread.join(5)
+        backend.speculator._thread.join(5)
+
+
+def test_approval_promotes_the_draft_without_llm_calls(backend, agent_calls):
+    proposal = make_proposal(backend.db_manager, title="Portal especulado")
+
+    draft = backend.speculator.speculate(proposal.id)
+    assert [step for step, _ in agent_calls] == ["provision", "backups", "code"]
+    assert all(background for _, background in agent_calls)
+
+    agent_calls.clear()
+    project_id = backend.update_proposal_status(proposal.id, "approved")
+    assert project_id == draft.project_id and agent_calls == []
+    assert [code.filename for code in backend.db_manager.get_generated_code_for_project(project_id)] == ["main.py"]
+    assert backend.speculator.snapshot()["hits"] == 1
+    assert backend.db_manager.get_speculative_draft(proposal.id) is None
+
+
+def test_drafts_are_discarded_on_rejection_or_edit(backend, agent_calls):
+    rejected, edited = make_proposal(backend.db_manager), make_proposal(backend.db_manager)
+    backend.speculator.speculate(rejected.id)
+    backend.speculator.speculate(edited.id)
+
+    backend.update_proposal_status(rejected.id, "rejected")
+    backend.update_proposal_content(edited.id, {"scope_moai": "Escopo revisado"})
+    assert backend.db_manager.count_speculative_drafts() == 0
+    assert backend.speculator.snapshot()["discarded"] == 2
+
+
+def test_speculation_waits_for_an_idle_llm_and_respects_the_budget(backend, agent_calls):
+    speculator = backend.speculator
+    speculator.calls_per_hour = len(speculator.STEPS)
+    make_proposal(backend.db_manager)
+
+    with backend.llm_simulator._track_activity():
+        assert speculator.run_once() is None
+    assert agent_calls == []
+
+    assert speculator.run_once() is not None
+    assert speculator.run_once() is None # orçamento de chamadas da hora esgotado
+    assert len(agent_calls) == 3
@@ -0,0 +1,43 @@
+# tests/test_ui_paging.py
+import os
+
+import pytest
+
+from conftest import make_proposal
+
+AppTest = pytest.importorskip("streamlit.testing.v1").AppTest
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cognitolink.py")
+
+
+def open_page(page):
+    app = AppTest.from_file(APP_PATH, default_timeout=60)
+    app.session_state.current_page = page
+    app.run()
+    assert not app.exception
+    return app
+
+
+def test_approvals_tab_reads_one_page_at_a_time(backend):
+    for index in range(23):
+        make_proposal(backend.db_manager, title=f"Lote {index:02d}")
+    app = open_page("aprovacoes")
+    pending_expanders = lambda: [expander for expander in app.expander if " Lote " in expander.label]
+    assert len(pending_expanders()) == 10
+
+    app.button(key="proposals_pager_pending_next").click().run()
+    assert len(pending_expanders()) == 10
+    app.button(key="proposals_pager_pending_next").click().run()
+    assert not app.exception and len(pending_expanders()) == 3
+
+    app.selectbox(key="proposals_pager_pending_size").set_value(50).run()
+    assert len(pending_expanders()) == 23
+
+
+def test_chat_renders_a_window_of_recent_messages(backend):
+    for index in range(40):
+        backend.add_chat_message("user", f"mensagem {index}")
+    app = open_page("chat_moai")
+    assert len(app.chat_message) == 30
+
+    app.button(key="btn_chat_load_older").click().run()
+    assert not app.exception and len(app.chat_message) == min(60, len(backend.db_manager.get_chat_history()))
@@ -0,0 +1,57 @@
+# tests/test_view_cache.py
+import time
+
+from conftest import DatabaseBackend, make_proposal
+from view_cache import ViewModelCache
+
+
+def make_cache(db, seq_check_interval=3600):
+    view_cache = ViewModelCache(DatabaseBackend(db), seq_check_interval=seq_check_interval)
+    view_cache.sync()
+    return view_cache
+
+
+def test_writes_invalidate_only_dependent_entries(db):
+    first, second = make_proposal(db), make_proposal(db)
+    view_cache = make_cache(db)
+    loads = []
+
+    def status(proposal_id):
+        return view_cache.get(("status", proposal_id), [("proposals", proposal_id)],
+                              lambda: loads.append(proposal_id) or db.get_proposal_by_id(proposal_id).status)
+
+    def pending_count():
+        return view_cache.get("pending", ["proposals"], lambda: loads.append("pending") or db.count_proposals("pending"))
+
+    assert (status(first.id), status(second.id), pending_count()) == ("pending", "pending", 2)
+    db.update_proposal_status(first.id, "approved")
+    view_cache.mark_dirty()
+    view_cache.sync()
+
+    assert (status(first.id), status(second.id), pending_count()) == ("approved", "pending", 1)
+    assert loads == [first.id, second.id, "pending", first.id, "pending"]
+    assert view_cache.snapshot()["queries"]["status"]["invalidations"] == 1
+
+
+def test_clean_cache_does_not_query_the_change_log(db):
+    view_cache = make_cache(db)
+    checks = view_cache.seq_checks
+    make_proposal(db)  # sem o gancho de escrita: só aparece depois do intervalo de verificação
+
+    view_cache.sync()
+    assert view_cache.seq_checks == checks
+    view_cache.seq_check_interval = 0
+    view_cache.sync()
+    assert view_cache.seq_checks == checks + 1 and view_cache.snapshot()["seq"] == db.get_change_seq()
+
+
+def test_ttl_expires_entries_without_writes(db):
+    view_cache = make_cache(db)
+    values = iter([1, 2])
+
+    assert view_cache.get("infra", [], lambda: next(values), ttl=0.05) == 1
+    assert view_cache.get("infra", [], lambda: next(values), ttl=0.05) == 1
+    time.sleep(0.06)
+    assert view_cache.get("infra", [], lambda: next(values), ttl=0.05) == 2
+    assert view_cache.snapshot()["queries"]["infra"] == {"hits": 1, "misses": 2, "invalidations": 0,
+                                                         "expirations": 1, "entries": 1}
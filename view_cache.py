@@ -0,0 +1,129 @@
+# view_cache.py
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ViewModelCache:
+    """
+    Cache de view models entre as páginas do CognitoLink e o SynapseForgeBackend, compartilhado
+    por todas as sessões do processo.
+
+    Cada entrada declara dependências (tabelas ou pares (tabela, id)) e, opcionalmente, um TTL.
+    A invalidação usa o change_log: `sync()` consulta a sequência apenas quando um gancho de
+    escrita do backend marcou o cache como sujo ou quando `seq_check_interval` expirou (para
+    escritas de outros processos); sem mudanças, uma troca de página não toca o SQLite.
+    Um contador de geração impede que uma leitura concorrente a uma invalidação grave um valor
+    desatualizado. Os valores são compartilhados: trate-os como somente leitura.
+    """
+
+    def __init__(self, backend: Any, seq_check_interval: float = 5.0):
+        self.backend = backend
+        self.seq_check_interval = seq_check_interval
+        self._entries: Dict[Hashable, Tuple[frozenset, Any, Optional[float]]] = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._seq: Optional[int] = None
+        self._dirty = True
+        self._last_check = 0.0
+        self.seq_checks = 0
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def _query_name(key: Hashable) -> str:
+        return key[0] if isinstance(key, tuple) else str(key)
+
+    def _count(self, key: Hashable, counter: str):
+        query_stats = self.stats.setdefault(self._query_name(key), {"hits": 0, "misses": 0, "invalidations": 0, "expirations": 0})
+        query_stats[counter] += 1
+
+    @property
+    def seq(self) -> Optional[int]:
+        """Sequência do change_log vista na última sincronização."""
+        return self._seq
+
+    def mark_dirty(self):
+        """Gancho de escrita: a próxima sincronização consulta o change_log imediatamente."""
+        self._dirty = True
+
+    def sync(self):
+        """Descarta as entradas afetadas pelas mudanças registradas desde a última sincronização."""
+        now = time.monotonic()
+        with self._lock:
+            if not self._dirty and now - self._last_check < self.seq_check_interval:
+                return
+            self._dirty = False
+            self._last_check = now
+            seq = self._seq
+        self.seq_checks += 1
+        if seq is not None and self.backend.get_change_seq() == seq:
+            return
+        feed = self.backend.changes_since(seq)
+        if feed["reset"] or feed["changes"]:
+            # As entradas descartadas serão recarregadas: o cache de entidades precisa estar em dia
+            self.backend.sync_entity_cache()
+        if feed["reset"]:
+            self.invalidate()
+        elif feed["changes"]:
+            changed = {change.table_name for change in feed["changes"]}
+            changed.update((change.table_name, change.row_id) for change in feed["changes"])
+            self.invalidate(changed)
+        with self._lock:
+            self._seq = feed["seq"]
+
+    def get(self, key: Hashable, depends_on: Iterable, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Retorna o valor em cache para `key` ou o carrega com `loader()` (somente leituras do banco)."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and (entry[2] is None or entry[2] > now):
+                self._count(key, "hits")
+                return entry[1]
+            if entry:
+                del self._entries[key]
+                self._count(key, "expirations")
+            self._count(key, "misses")
+            generation = self._generation
+
+        value = loader()
+        with self._lock:
+            if self._generation == generation:
+                self._entries[key] = (frozenset(depends_on), value, now + ttl if ttl else None)
+        return value
+
+    def invalidate(self, changed: Optional[Iterable] = None):
+        """Remove as entradas que dependem de `changed` (tabelas ou pares (tabela, id)); sem argumento, remove tudo."""
+        with self._lock:
+            self._generation += 1
+            if changed is None:
+                keys = list(self._entries)
+            else:
+                changed = set(changed)
+                keys = [key for key, (depends_on, _, _) in self._entries.items() if changed.intersection(depends_on)]
+            for key in keys:
+                del self._entries[key]
+                self._count(key, "invalidations")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Contadores por consulta, para o painel de depuração."""
+        with self._lock:
+            entries_per_query: Dict[str, int] = {}
+            for key in self._entries:
+                name = self._query_name(key)
+                entries_per_query[name] = entries_per_query.get(name, 0) + 1
+            queries = {
+                name: {**counters, "entries": entries_per_query.get(name, 0)}
+                for name, counters in sorted(self.stats.items())
+            }
+        hits = sum(query["hits"] for query in queries.values())
+        lookups = hits + sum(query["misses"] for query in queries.values())
+        return {
+            "queries": queries,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": sum(entries_per_query.values()),
+            "seq": self._seq,
+            "seq_checks": self.seq_checks,
+        }